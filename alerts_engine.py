@@ -0,0 +1,188 @@
+# alerts_engine.py
+"""
+Price, move, RSI/RVOL and trade-idea alerts.
+
+Alerts are indexed by symbol and metric into sorted threshold arrays, one for
+upward crossings and one for downward crossings. A quote only touches its own
+symbol's arrays: two binary searches per metric find every threshold between the
+previous and the new value, so the cost per tick doesn't grow with the number of
+alerts. Alerts are one-shot; a triggered alert is removed from the index.
+
+The first value seen for a symbol/metric only sets the baseline, so alerts fire
+on crossings, not on levels that were already passed when the app started.
+"""
+import os
+import json
+import uuid
+import threading
+from datetime import datetime
+import numpy as np
+
+ALERTS_FILE = os.path.join("cache", "alerts.json")
+
+UP, DOWN = 1, -1
+
+# Alert kind -> (metric, direction); "move" watches |change %| in both directions
+KINDS = {
+    'price_above': ('price', UP),
+    'price_below': ('price', DOWN),
+    'move': ('change_percent', None),
+    'rsi_above': ('rsi', UP),
+    'rsi_below': ('rsi', DOWN),
+    'rvol_above': ('rvol', UP),
+    'target': ('price', UP), # Trade idea target
+    'stop': ('price', DOWN) # Trade idea stop
+}
+
+def describe(alert):
+    """Notification text for an alert."""
+    symbol, level = alert['symbol'], alert['level']
+    kind = alert['kind']
+    text = {
+        'price_above': f"{symbol} rose above ${level:,.2f}",
+        'price_below': f"{symbol} fell below ${level:,.2f}",
+        'move': f"{symbol} moved more than {level:g}% today",
+        'rsi_above': f"{symbol} RSI crossed above {level:g}",
+        'rsi_below': f"{symbol} RSI crossed below {level:g}",
+        'rvol_above': f"{symbol} relative volume crossed {level:g}x",
+        'target': f"{symbol} hit its target (${level:,.2f})",
+        'stop': f"{symbol} hit its stop (${level:,.2f})"
+    }.get(kind, f"{symbol} {kind} {level}")
+    if alert.get('note'):
+        text += f" - {alert['note']}"
+    return text
+
+class _SymbolIndex:
+    """Sorted thresholds for one symbol: metric -> direction -> (levels, alert ids)."""
+    def __init__(self, alerts):
+        entries = {}
+        for alert in alerts:
+            metric, direction = KINDS[alert['kind']]
+            level = float(alert['level'])
+            if direction is None: # move: +level up, -level down
+                entries.setdefault((metric, UP), []).append((abs(level), alert['id']))
+                entries.setdefault((metric, DOWN), []).append((-abs(level), alert['id']))
+            else:
+                entries.setdefault((metric, direction), []).append((level, alert['id']))
+        self.levels = {}
+        for key, items in entries.items():
+            items.sort(key=lambda e: e[0])
+            self.levels[key] = (np.array([e[0] for e in items]), [e[1] for e in items])
+        self.metrics = {metric for metric, _ in self.levels}
+
+    def crossed(self, metric, previous, value):
+        """Ids of alerts whose threshold lies between previous and value (in the move's direction)."""
+        ids = []
+        if value > previous and (metric, UP) in self.levels:
+            levels, alert_ids = self.levels[(metric, UP)]
+            # previous < level <= value
+            ids += alert_ids[np.searchsorted(levels, previous, side='right'):np.searchsorted(levels, value, side='right')]
+        elif value < previous and (metric, DOWN) in self.levels:
+            levels, alert_ids = self.levels[(metric, DOWN)]
+            # value <= level < previous
+            ids += alert_ids[np.searchsorted(levels, value, side='left'):np.searchsorted(levels, previous, side='left')]
+        return ids
+
+class AlertsEngine:
+    """Active alerts plus the per-symbol index and the last value seen per symbol/metric."""
+    def __init__(self, alerts=None):
+        self.alerts = {} # id -> alert dict
+        self.by_symbol = {} # symbol -> {alert ids}
+        self.index = {} # symbol -> _SymbolIndex
+        self.last = {} # (symbol, metric) -> last value
+        self._lock = threading.Lock()
+        for alert in alerts or []:
+            self._insert(alert)
+        for symbol in self.by_symbol:
+            self._reindex(symbol)
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def _insert(self, alert):
+        self.alerts[alert['id']] = alert
+        self.by_symbol.setdefault(alert['symbol'], set()).add(alert['id'])
+
+    def _reindex(self, symbol):
+        ids = self.by_symbol.get(symbol)
+        if ids:
+            self.index[symbol] = _SymbolIndex([self.alerts[i] for i in ids])
+        else:
+            self.by_symbol.pop(symbol, None)
+            self.index.pop(symbol, None)
+
+    def add(self, symbol, kind, level, note="", alert_id=None, **extra):
+        """Adds (or replaces) an alert and returns it. `kind` is one of KINDS."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown alert kind: {kind}")
+        alert = {'id': alert_id or str(uuid.uuid4()), 'symbol': symbol, 'kind': kind, 'level': float(level),
+                 'note': note, 'created_at': datetime.now().isoformat(), **extra}
+        with self._lock:
+            self._remove(alert['id'])
+            self._insert(alert)
+            self._reindex(symbol)
+        return alert
+
+    def _remove(self, alert_id):
+        alert = self.alerts.pop(alert_id, None)
+        if alert is not None:
+            self.by_symbol.get(alert['symbol'], set()).discard(alert_id)
+        return alert
+
+    def remove(self, alert_id):
+        with self._lock:
+            alert = self._remove(alert_id)
+            if alert is not None:
+                self._reindex(alert['symbol'])
+        return alert
+
+    def for_symbol(self, symbol):
+        return [self.alerts[i] for i in self.by_symbol.get(symbol, ())]
+
+    def check(self, symbol, values):
+        """
+        Feeds the latest values for one symbol ({metric: value}) and returns the alerts
+        they triggered, each with the triggering 'value' and 'message' added.
+        """
+        with self._lock:
+            index = self.index.get(symbol)
+            fired = []
+            for metric, value in values.items():
+                if value is None or value != value: # None/NaN
+                    continue
+                key = (symbol, metric)
+                previous = self.last.get(key)
+                self.last[key] = value
+                if index is None or previous is None or metric not in index.metrics:
+                    continue
+                for alert_id in index.crossed(metric, previous, value):
+                    alert = self._remove(alert_id)
+                    if alert is not None:
+                        fired.append(dict(alert, value=value, message=describe(alert),
+                                          triggered_at=datetime.now().isoformat()))
+            if fired:
+                self._reindex(symbol)
+            return fired
+
+    # --- Persistence ---
+
+    def save(self, path=ALERTS_FILE):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with self._lock:
+                alerts = list(self.alerts.values())
+            with open(path, 'w') as f:
+                json.dump(alerts, f, indent=2)
+        except Exception as e:
+            print(f"Error saving alerts: {e}")
+
+    @classmethod
+    def load(cls, path=ALERTS_FILE):
+        alerts = []
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    alerts = [a for a in json.load(f) if a.get('kind') in KINDS]
+            except Exception as e:
+                print(f"Error reading alerts: {e}")
+        return cls(alerts)
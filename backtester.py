@@ -0,0 +1,192 @@
+# backtester.py
+"""
+Vectorized backtest of the opportunity rules.
+
+Replays scanner.apply_rules (confidence, opportunity score, profile match, ATR
+stop/target, horizon) and, given per-date RS, scanner.apply_relative_strength on
+every symbol and every date of an aligned bar set, then
+walks each setup forward to its stop, target or horizon expiry. Everything is a
+(symbols x dates) array operation; the only Python loop is over holding days.
+"""
+import time
+import numpy as np
+
+import indicator_engine
+import scanner
+
+# Holding period in bars for each scanner horizon code (Position, Swing, Mean Reversion)
+HORIZON_DAYS = (20, 10, 3)
+FORWARD_DAYS = (5, 10, 21)
+CONFIDENCE_BUCKETS = ((50, 60), (60, 70), (70, 80), (80, 90), (90, 99))
+OUTCOMES = ('target', 'stop', 'expired') # simulate_trades outcome codes 0, 1, 2
+
+def forward_returns(close, days):
+    """Close-to-close return `days` bars ahead (NaN where the future isn't known)."""
+    out = np.full(close.shape, np.nan)
+    if close.shape[1] > days:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[:, :-days] = close[:, days:] / close[:, :-days] - 1
+    return out
+
+def simulate_trades(bars, entry, stop, target, hold):
+    """
+    Walks every setup forward from its entry close. A bar touching both levels counts
+    as a stop (conservative). Setups still open after `hold` bars exit at that close.
+    Returns (outcome code, return, bars held) matrices; outcome -1 where the future
+    isn't long enough to judge.
+    """
+    high, low, close = bars['high'], bars['low'], bars['close']
+    n, t = close.shape
+    max_hold = int(hold.max()) if hold.size else 0
+
+    outcome = np.full((n, t), -1)
+    exit_price = np.full((n, t), np.nan)
+    held = np.zeros((n, t), dtype=int)
+    open_ = np.ones((n, t), dtype=bool)
+
+    for h in range(1, max_hold + 1):
+        if h >= t:
+            break
+        # Bar h after each entry, aligned to the entry column
+        fut_high = np.full((n, t), np.nan)
+        fut_low = np.full((n, t), np.nan)
+        fut_close = np.full((n, t), np.nan)
+        fut_high[:, :-h], fut_low[:, :-h], fut_close[:, :-h] = high[:, h:], low[:, h:], close[:, h:]
+
+        active = open_ & (h <= hold) & ~np.isnan(fut_close)
+        hit_stop = active & (fut_low <= stop)
+        hit_target = active & ~hit_stop & (fut_high >= target)
+        expire = active & ~hit_stop & ~hit_target & (h == hold)
+
+        for code, mask, price in ((1, hit_stop, stop), (0, hit_target, target), (2, expire, fut_close)):
+            outcome[mask] = code
+            exit_price[mask] = price[mask]
+            held[mask] = h
+            open_ &= ~mask
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = exit_price / entry - 1
+    return outcome, returns, held
+
+def _summary(mask, outcome, returns, risk_pct):
+    """Aggregate stats for the setups selected by `mask`."""
+    judged = mask & (outcome >= 0)
+    count = int(judged.sum())
+    if not count:
+        return {'trades': 0}
+    r = returns[judged]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r_multiple = r / risk_pct[judged]
+    wins = r > 0
+    return {
+        'trades': count,
+        'target_rate': float((outcome[judged] == 0).mean()),
+        'stop_rate': float((outcome[judged] == 1).mean()),
+        'expired_rate': float((outcome[judged] == 2).mean()),
+        'win_rate': float(wins.mean()),
+        'avg_return': float(r.mean()),
+        'avg_r_multiple': float(np.nanmean(r_multiple)),
+        'profit_factor': float(r[wins].sum() / -r[~wins].sum()) if (~wins).any() and r[~wins].sum() < 0 else float('inf')
+    }
+
+def run(bars, profiles=("DEFENSIVE", "BALANCED", "SPECULATIVE"), sectors=None, beta=None,
+        rs=None, rvol_threshold=0.0, top_k=10):
+    """
+    Backtests the opportunity rules over an aligned bar set.
+    `sectors` is per symbol. `beta` is either per symbol and date (N, T), e.g.
+    risk_engine.rolling_beta, so each date only uses beta known by then, or one value
+    per symbol; unknown betas count as 1.0. `rs` is the (N, T) composite relative
+    strength (relative_strength.rs_series) folded into opp_score as the live scan
+    does; without it scores are the rules alone. For each profile the
+    report covers every valid setup, the matching setups, and the daily top-k list
+    the app would have shown, plus forward returns per confidence bucket and the
+    correlation of opp_score with forward returns.
+    """
+    start = time.perf_counter()
+    n, t = bars['close'].shape
+    series = indicator_engine.compute_indicator_series(bars)
+    valid = series['bars'] >= indicator_engine.MIN_BARS
+
+    sectors = np.array([s or '' for s in ([None] * n if sectors is None else sectors)], dtype=object)[:, None]
+    beta = np.ones(n) if beta is None else np.asarray(beta, dtype=np.float64)
+    beta = np.where(np.isfinite(beta), beta, 1.0)
+    if beta.ndim == 1:
+        beta = beta[:, None]
+    rvol_ok = scanner.rounded_column(series, 'rvol') >= rvol_threshold
+
+    close = bars['close']
+    fwd = {days: forward_returns(close, days) for days in FORWARD_DAYS}
+
+    report = {'symbols': n, 'dates': t, 'profiles': {}}
+    for profile in profiles:
+        rules = scanner.apply_rules(series, profile, sectors, beta)
+        if rs is not None:
+            scanner.apply_relative_strength(rules, rs)
+        entry = scanner.rounded_column(series, 'price')
+        hold = np.asarray(HORIZON_DAYS)[rules['horizon']]
+        outcome, returns, held = simulate_trades(bars, entry, rules['stop'], rules['target'], hold)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            risk_pct = (entry - rules['stop']) / entry
+
+        # The app's daily list: rank by (match, rvol ok, score), first symbols win ties
+        key = rules['is_match'] * 1_000_000 + rvol_ok * 1_000 + rules['opp_score']
+        key = np.where(valid, key, -1)
+        order = np.argsort(-key, axis=0, kind='stable')[:top_k]
+        shown = np.zeros((n, t), dtype=bool)
+        np.put_along_axis(shown, order, True, axis=0)
+        shown &= valid
+
+        buckets = {}
+        for lo, hi in CONFIDENCE_BUCKETS:
+            in_bucket = valid & (rules['confidence'] >= lo) & (rules['confidence'] < hi)
+            buckets[f"{lo}-{hi - 1}"] = {
+                'setups': int(in_bucket.sum()),
+                **{f"fwd_{d}d": float(np.nanmean(np.where(in_bucket, fwd[d], np.nan))) if in_bucket.any() else None
+                   for d in FORWARD_DAYS}
+            }
+
+        scores = rules['opp_score'][valid].astype(float)
+        future = fwd[FORWARD_DAYS[1]][valid]
+        known = ~np.isnan(future)
+        ic = float(np.corrcoef(scores[known], future[known])[0, 1]) if known.sum() > 2 and scores[known].std() > 0 else None
+
+        report['profiles'][profile] = {
+            'all_setups': _summary(valid, outcome, returns, risk_pct),
+            'matched_setups': _summary(valid & rules['is_match'], outcome, returns, risk_pct),
+            'top_k': _summary(shown, outcome, returns, risk_pct),
+            'avg_bars_held': float(held[shown & (outcome >= 0)].mean()) if (shown & (outcome >= 0)).any() else 0.0,
+            'confidence_buckets': buckets,
+            'score_ic_10d': ic
+        }
+
+    report['seconds'] = round(time.perf_counter() - start, 3)
+    return report
+
+def format_report(report):
+    """Plain-text summary of a backtest report."""
+    lines = [f"Backtest: {report['symbols']} symbols x {report['dates']} bars ({report['seconds']}s)"]
+    for profile, r in report['profiles'].items():
+        lines.append(f"\n{profile}")
+        for name in ('all_setups', 'matched_setups', 'top_k'):
+            s = r[name]
+            if not s['trades']:
+                lines.append(f"  {name:15} no trades")
+                continue
+            lines.append(f"  {name:15} trades={s['trades']:>7}  target={s['target_rate']:.1%}  stop={s['stop_rate']:.1%}  "
+                         f"expired={s['expired_rate']:.1%}  win={s['win_rate']:.1%}  avg={s['avg_return']:+.2%}  "
+                         f"R={s['avg_r_multiple']:+.2f}")
+        ic = r['score_ic_10d']
+        lines.append(f"  opp_score vs 10d forward return: {ic:+.3f}" if ic is not None else "  opp_score IC: n/a")
+        for bucket, b in r['confidence_buckets'].items():
+            fwd = "  ".join(f"{k}={v:+.2%}" if v is not None else f"{k}=n/a" for k, v in b.items() if k.startswith('fwd'))
+            lines.append(f"  confidence {bucket:6} setups={b['setups']:>7}  {fwd}")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    import argparse
+    import data_service
+
+    parser = argparse.ArgumentParser(description="Backtest the opportunity rules over the scan universe.")
+    parser.add_argument("--years", type=float, default=5, help="Years of daily bars to replay (default 5)")
+    args = parser.parse_args()
+    print(format_report(data_service.run_backtest(args.years)))
@@ -0,0 +1,184 @@
+# bar_store.py
+"""
+Local OHLCV bar storage.
+
+Each symbol/interval pair is kept as one float64 .npy file under cache/bars with rows
+[timestamp, open, high, low, close, volume], sorted by timestamp. Timestamps are epoch
+seconds of the exchange wall-clock time (daily bars are normalized to midnight), so bars
+from different symbols line up without timezone juggling.
+"""
+import os
+import time
+import threading
+import numpy as np
+
+BARS_DIR = os.path.join("cache", "bars")
+FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+COL = {name: i for i, name in enumerate(FIELDS)}
+DAILY_INTERVALS = ('1d', '5d', '1wk', '1mo', '3mo')
+MAX_FILL_BARS = 5 # Longest gap get_aligned_bars bridges with a flat bar; longer gaps stay NaN
+ADJUSTMENT_TOLERANCE = 1e-4 # Relative close difference that means Yahoo re-adjusted the history
+
+# In-memory copy of every series loaded this session: (symbol, interval) -> ndarray
+BAR_CACHE = {}
+_LOCK = threading.Lock()
+
+def bar_path(symbol, interval="1d"):
+    """Returns the .npy path for a symbol's bars."""
+    return os.path.join(BARS_DIR, f"{symbol}_{interval}.npy")
+
+def empty_bars():
+    return np.empty((0, len(FIELDS)), dtype=np.float64)
+
+def bars_from_history(df, interval="1d"):
+    """Converts a yfinance history DataFrame to a bar array."""
+    if df is None or df.empty:
+        return empty_bars()
+
+    idx = df.index
+    if getattr(idx, 'tz', None) is not None:
+        idx = idx.tz_localize(None) # Keep exchange wall-clock time
+    if interval in DAILY_INTERVALS:
+        idx = idx.normalize()
+
+    bars = np.empty((len(df), len(FIELDS)), dtype=np.float64)
+    bars[:, 0] = idx.values.astype('datetime64[s]').astype(np.int64)
+    bars[:, 1] = df['Open'].to_numpy(dtype=np.float64)
+    bars[:, 2] = df['High'].to_numpy(dtype=np.float64)
+    bars[:, 3] = df['Low'].to_numpy(dtype=np.float64)
+    bars[:, 4] = df['Close'].to_numpy(dtype=np.float64)
+    bars[:, 5] = df['Volume'].to_numpy(dtype=np.float64)
+
+    # Drop rows Yahoo returns without a close (e.g. a half-formed pre-market bar)
+    return bars[~np.isnan(bars[:, 4])]
+
+def merge_bars(existing, new):
+    """Merges two bar arrays; rows in `new` replace rows with the same timestamp."""
+    if existing is None or len(existing) == 0:
+        return new
+    if new is None or len(new) == 0:
+        return existing
+    combined = np.concatenate([existing, new])
+    # Stable sort keeps `new` after `existing`, so the last duplicate wins
+    order = np.argsort(combined[:, 0], kind='stable')
+    combined = combined[order]
+    keep = np.append(combined[1:, 0] != combined[:-1, 0], True)
+    return combined[keep]
+
+def adjustment_changed(existing, new, tolerance=ADJUSTMENT_TOLERANCE):
+    """
+    True if `new` (an adjusted download) no longer agrees with the stored bars it overlaps.
+    Yahoo back-adjusts the whole history for splits and dividends, so after an ex-date
+    every older close shifts and an incremental fetch can't simply be merged. The last
+    stored bar is skipped: it may be an intraday bar that was still forming.
+    """
+    if existing is None or len(existing) < 2 or new is None or not len(new):
+        return False
+    settled = existing[:-1]
+    common, old_pos, new_pos = np.intersect1d(settled[:, 0], new[:, 0], return_indices=True)
+    if not len(common):
+        return False
+    old_close = settled[old_pos, COL['close']]
+    new_close = new[new_pos, COL['close']]
+    return bool(np.any(np.abs(new_close - old_close) > tolerance * np.abs(old_close)))
+
+def load_bars(symbol, interval="1d", mmap=False):
+    """
+    Returns the stored bars for a symbol (empty array if none).
+    With mmap=True the file is memory-mapped read-only and not cached, so worker
+    processes share the OS page cache instead of each holding a copy.
+    """
+    key = (symbol, interval)
+    if key in BAR_CACHE:
+        return BAR_CACHE[key]
+
+    path = bar_path(symbol, interval)
+    bars = empty_bars()
+    if os.path.exists(path):
+        try:
+            bars = np.load(path, mmap_mode='r' if mmap else None)
+        except Exception as e:
+            print(f"Error reading bars for {symbol}: {e}")
+
+    if mmap:
+        return bars
+    with _LOCK:
+        BAR_CACHE[key] = bars
+    return bars
+
+def save_bars(symbol, bars, interval="1d"):
+    """Stores bars in memory and on disk."""
+    with _LOCK:
+        BAR_CACHE[(symbol, interval)] = bars
+    try:
+        os.makedirs(BARS_DIR, exist_ok=True)
+        np.save(bar_path(symbol, interval), bars)
+    except Exception as e:
+        print(f"Error writing bars for {symbol}: {e}")
+
+def update_bars(symbol, new_bars, interval="1d"):
+    """Merges freshly downloaded bars into the store and returns the merged series."""
+    merged = merge_bars(load_bars(symbol, interval), new_bars)
+    save_bars(symbol, merged, interval)
+    return merged
+
+def bars_age_seconds(symbol, interval="1d"):
+    """Seconds since the symbol's bar file was last written (inf if never)."""
+    path = bar_path(symbol, interval)
+    if not os.path.exists(path):
+        return float('inf')
+    return time.time() - os.path.getmtime(path)
+
+def get_aligned_bars(symbols, lookback=None, interval="1d", mmap=False, max_fill=MAX_FILL_BARS):
+    """
+    Aligns stored bars for many symbols on a shared timestamp axis.
+    Returns a dict with 'symbols' (those that have data), 'timestamps' (T,) and one
+    (N, T) float64 matrix per OHLCV field. Gaps of up to `max_fill` bars are
+    forward-filled (volume 0); bars before a symbol's first bar, and past the cap in a
+    longer gap (a delisted or long-halted symbol), stay NaN rather than a stale price.
+    """
+    series = []
+    for sym in symbols:
+        bars = load_bars(sym, interval, mmap=mmap)
+        if len(bars):
+            series.append((sym, bars))
+
+    if not series:
+        empty = np.empty((0, 0))
+        return {'symbols': [], 'timestamps': np.empty(0), 'open': empty, 'high': empty,
+                'low': empty, 'close': empty, 'volume': empty}
+
+    timestamps = np.unique(np.concatenate([b[:, 0] for _, b in series]))
+    if lookback:
+        timestamps = timestamps[-lookback:]
+
+    n, t = len(series), len(timestamps)
+    matrix = np.full((len(FIELDS) - 1, n, t), np.nan)
+    for row, (_, bars) in enumerate(series):
+        bars = bars[bars[:, 0] >= timestamps[0]]
+        pos = np.searchsorted(timestamps, bars[:, 0])
+        matrix[:, row, pos] = bars[:, 1:].T
+
+    # Fill short gaps (a holiday on one exchange, a brief halt) with a flat bar at the last close
+    valid = ~np.isnan(matrix[3])
+    fill_idx = np.where(valid, np.arange(t), 0)
+    np.maximum.accumulate(fill_idx, axis=1, out=fill_idx)
+    started = np.maximum.accumulate(valid, axis=1)
+    gap = started & ~valid
+    if max_fill is not None:
+        gap &= np.arange(t) - fill_idx <= max_fill
+    last_close = matrix[3][np.arange(n)[:, None], fill_idx]
+    for field in range(3):
+        matrix[field] = np.where(gap, last_close, matrix[field])
+    matrix[3] = np.where(valid | gap, last_close, np.nan)
+    matrix[4] = np.where(gap, 0.0, matrix[4])
+
+    return {
+        'symbols': [sym for sym, _ in series],
+        'timestamps': timestamps,
+        'open': matrix[0],
+        'high': matrix[1],
+        'low': matrix[2],
+        'close': matrix[3],
+        'volume': matrix[4]
+    }
@@ -0,0 +1,160 @@
+# chart_decimation.py
+"""
+Chart decimation on columnar arrays.
+
+Candles are bucketed OHLC-preserving (first open, max high, min low, last close,
+summed volume), so no wick is ever lost. Lines keep each bucket's min and max
+point (spikes survive), and are then thinned to the target width with LTTB
+(Largest-Triangle-Three-Buckets), which keeps the visual shape of the series
+instead of averaging it away.
+
+Both are served from a pyramid built once per series: level k holds buckets of
+2**k bars, each level derived from the one below in one vectorized pass, so any
+pixel width (and, for zoomed charts, any index range) is answered from a level of
+roughly that size without rescanning the raw bars. RangeExtremes answers the
+Y-axis range of any such index range in constant time.
+"""
+import numpy as np
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+def lttb(x, y, threshold):
+    """Indices of the `threshold` points LTTB keeps from (x, y); first and last are always kept."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # Inner buckets split points 1..n-2 evenly; each is scored against the next one's average
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    next_lo = edges[1:]
+    next_hi = np.r_[edges[2:], n]
+    cx = (np.r_[0.0, np.cumsum(x)][next_hi] - np.r_[0.0, np.cumsum(x)][next_lo]) / (next_hi - next_lo)
+    cy = (np.r_[0.0, np.cumsum(y)][next_hi] - np.r_[0.0, np.cumsum(y)][next_lo]) / (next_hi - next_lo)
+
+    # Sequential by nature (each pick depends on the last); buckets are small, so plain floats
+    xs, ys = x.tolist(), y.tolist()
+    bounds, cx, cy = edges.tolist(), cx.tolist(), cy.tolist()
+    keep = [0]
+    a = 0
+    for b in range(threshold - 2):
+        ax, ay, bx, by = xs[a], ys[a], cx[b], cy[b]
+        best, best_area = bounds[b], -1.0
+        for i in range(bounds[b], bounds[b + 1]):
+            # Twice the area of triangle (a, i, next average)
+            area = abs((ax - bx) * (ys[i] - ay) - (ax - xs[i]) * (by - ay))
+            if area > best_area:
+                best, best_area = i, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return np.array(keep, dtype=np.int64)
+
+class OHLCPyramid:
+    """Min/max OHLC levels of one series: level k has ceil(n / 2**k) candles."""
+    def __init__(self, columns):
+        level = {f: np.asarray(columns[f], dtype=np.float64) for f in FIELDS}
+        level['start'] = np.arange(len(level['close']))
+        self.size = len(level['close'])
+        self.levels = [level]
+        while len(level['close']) > 1:
+            level = self._halve(level)
+            self.levels.append(level)
+
+    @staticmethod
+    def _halve(level):
+        n = len(level['close'])
+        first = np.arange(0, n, 2)
+        last = np.minimum(first + 1, n - 1)
+        return {
+            'open': level['open'][first],
+            'high': np.fmax(level['high'][first], level['high'][last]),
+            'low': np.fmin(level['low'][first], level['low'][last]),
+            'close': level['close'][last],
+            'volume': np.nan_to_num(level['volume'][first]) + np.where(last != first, np.nan_to_num(level['volume'][last]), 0),
+            'start': level['start'][first]
+        }
+
+    def view(self, target, start=0, end=None):
+        """
+        At most `target` candles covering raw bars [start, end), from the finest level
+        that fits. Returns the level's columns for that range plus 'bucket' (bars per candle).
+        """
+        end = self.size if end is None else end
+        count = max(1, end - start)
+        k = 0
+        while k < len(self.levels) - 1 and count / (1 << k) > target:
+            k += 1
+        level = self.levels[k]
+        lo, hi = start >> k, ((end - 1) >> k) + 1
+        out = {name: values[lo:hi] for name, values in level.items()}
+        out['bucket'] = 1 << k
+        return out
+
+class LinePyramid:
+    """Per-bucket min and max points of one series: level k keeps two raw indices per 2**k bars."""
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.size = len(self.values)
+        # Level 0: every point is its own min and max (NaNs never win)
+        self._low = np.where(np.isnan(self.values), np.inf, self.values)
+        self._high = np.where(np.isnan(self.values), -np.inf, self.values)
+        index = np.arange(self.size)
+        level = (index, index)
+        self.levels = [level]
+        while len(level[0]) > 1:
+            level = self._halve(level)
+            self.levels.append(level)
+
+    def _halve(self, level):
+        imin, imax = level
+        n = len(imin)
+        first = np.arange(0, n, 2)
+        last = np.minimum(first + 1, n - 1)
+        new_min = np.where(self._low[imin[last]] < self._low[imin[first]], imin[last], imin[first])
+        new_max = np.where(self._high[imax[last]] > self._high[imax[first]], imax[last], imax[first])
+        return new_min, new_max
+
+    def view(self, target, start=0, end=None):
+        """Raw indices of about `target` points covering [start, end): min/max candidates thinned by LTTB."""
+        end = self.size if end is None else end
+        count = max(1, end - start)
+        # Coarsest level still giving at least 2 candidates per output point
+        k = 0
+        while k < len(self.levels) - 1 and count / (1 << (k + 1)) >= target:
+            k += 1
+        imin, imax = self.levels[k]
+        lo, hi = start >> k, ((end - 1) >> k) + 1
+        # The range's own end points anchor the line to the viewport edges
+        candidates = np.unique(np.concatenate([imin[lo:hi], imax[lo:hi], [start, end - 1]]))
+        candidates = candidates[(candidates >= start) & (candidates < end) & ~np.isnan(self.values[candidates])]
+        if len(candidates) <= target:
+            return candidates
+        return candidates[lttb(candidates.astype(np.float64), self.values[candidates], target)]
+
+class RangeExtremes:
+    """
+    Sparse tables of lows and highs: min/max over any bar range [start, end) in O(1),
+    so a zoomed or panned chart rescales its Y axis without scanning the bars.
+    Level k holds the extremes of every 2**k-bar window; a query covers the range
+    with two (overlapping) windows.
+    """
+    def __init__(self, low, high):
+        low = np.asarray(low, dtype=np.float64)
+        high = np.asarray(high, dtype=np.float64)
+        self.size = len(low)
+        self.mins = [np.where(np.isnan(low), np.inf, low)]
+        self.maxs = [np.where(np.isnan(high), -np.inf, high)]
+        span = 1
+        while 2 * span <= self.size:
+            self.mins.append(np.minimum(self.mins[-1][:-span], self.mins[-1][span:]))
+            self.maxs.append(np.maximum(self.maxs[-1][:-span], self.maxs[-1][span:]))
+            span *= 2
+
+    def query(self, start=0, end=None):
+        """(min, max) over bars [start, end); (inf, -inf) if the range holds no values."""
+        end = self.size if end is None else end
+        if end <= start:
+            return np.inf, -np.inf
+        k = int(end - start).bit_length() - 1
+        tail = end - (1 << k)
+        return (min(self.mins[k][start], self.mins[k][tail]),
+                max(self.maxs[k][start], self.maxs[k][tail]))
@@ -0,0 +1,115 @@
+# correlation_engine.py
+"""
+Rolling return correlations for a whole universe.
+
+RollingCorrelation keeps, over the last `window` daily returns, the pairwise
+sufficient statistics of every symbol pair: observation counts, sums, sums of
+squares and cross products (each an N x N matrix, so symbols with shorter history
+get pandas-style pairwise-complete correlations). A new bar is a rank-one update
+(add the new return vector, subtract the one leaving the window), and any
+submatrix or average pairwise correlation is read straight off the statistics.
+"""
+import numpy as np
+
+class RollingCorrelation:
+    def __init__(self, symbols, window):
+        self.symbols = list(symbols)
+        self.index = {sym: i for i, sym in enumerate(self.symbols)}
+        self.window = window
+        n = len(self.symbols)
+
+        self.count = np.zeros((n, n)) # Bars where both i and j have a return
+        self.sum = np.zeros((n, n)) # sum of r_i over those bars
+        self.sumsq = np.zeros((n, n)) # sum of r_i^2 over those bars
+        self.cross = np.zeros((n, n)) # sum of r_i * r_j
+
+        self.returns = np.full((n, window), np.nan) # Ring buffer of the returns in the window
+        self.pos = 0 # Slot of the oldest return
+        self.filled = 0
+        self.last_close = np.full(n, np.nan)
+        self.last_timestamp = None
+
+    @classmethod
+    def from_bars(cls, bars, window):
+        """Builds the engine from aligned bars (bar_store.get_aligned_bars format)."""
+        engine = cls(bars['symbols'], window)
+        close = bars['close']
+        if close.shape[1] == 0:
+            return engine
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = close[:, 1:] / close[:, :-1] - 1
+        returns = returns[:, -window:]
+
+        # Full rebuild as matrix products; later bars go through update()
+        valid = (~np.isnan(returns)).astype(np.float64)
+        r = np.nan_to_num(returns)
+        engine.count = valid @ valid.T
+        engine.sum = r @ valid.T
+        engine.sumsq = (r * r) @ valid.T
+        engine.cross = r @ r.T
+
+        t = returns.shape[1]
+        engine.returns[:, :t] = returns
+        engine.pos = 0 if t == window else t
+        engine.filled = t
+        engine.last_close = close[:, -1].copy()
+        engine.last_timestamp = bars['timestamps'][-1]
+        return engine
+
+    def _apply(self, r, sign):
+        """Adds (sign=1) or removes (sign=-1) one return vector from the statistics."""
+        valid = (~np.isnan(r)).astype(np.float64)
+        r = np.nan_to_num(r)
+        self.count += sign * np.outer(valid, valid)
+        self.sum += sign * np.outer(r, valid)
+        self.sumsq += sign * np.outer(r * r, valid)
+        self.cross += sign * np.outer(r, r)
+
+    def update(self, closes, timestamp=None):
+        """Advances the window by one bar of closes (one per symbol, NaN if missing)."""
+        closes = np.asarray(closes, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = closes / self.last_close - 1
+
+        if self.filled == self.window:
+            self._apply(self.returns[:, self.pos], -1)
+        else:
+            self.filled += 1
+        self._apply(r, 1)
+
+        self.returns[:, self.pos] = r
+        self.pos = (self.pos + 1) % self.window
+        # Like from_bars, a return needs both adjacent closes: no return across a gap
+        self.last_close = closes
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+
+    def matrix(self, symbols=None):
+        """
+        Correlation matrix for `symbols` (default: all), in the given order.
+        Pairs with fewer than 3 shared returns come back as NaN.
+        """
+        rows = np.arange(len(self.symbols)) if symbols is None else np.array([self.index[s] for s in symbols], dtype=int)
+        ix = np.ix_(rows, rows)
+        n = self.count[ix]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_i = self.sum[ix] / n
+            mean_j = mean_i.T
+            cov = self.cross[ix] / n - mean_i * mean_j
+            var_i = self.sumsq[ix] / n - mean_i * mean_i
+            var_j = var_i.T
+            corr = cov / np.sqrt(var_i * var_j)
+        corr = np.where(n >= 3, np.clip(corr, -1.0, 1.0), np.nan)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+    def average_pairwise(self, symbols):
+        """Mean of the off-diagonal correlations among `symbols` (0.0 if under two are known)."""
+        symbols = [s for s in symbols if s in self.index]
+        if len(symbols) < 2:
+            return 0.0
+        corr = self.matrix(symbols)
+        off_diagonal = corr[~np.eye(len(symbols), dtype=bool)]
+        off_diagonal = off_diagonal[~np.isnan(off_diagonal)]
+        return float(off_diagonal.mean()) if len(off_diagonal) else 0.0
@@ -8,8 +8,25 @@ from datetime import datetime, timedelta
 import time
 import pytz
 import uuid
+import threading
 from enum import Enum
-from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+import bar_store
+import indicator_engine
+import scanner
+import correlation_engine
+import risk_engine
+import regime_engine
+import sentiment_engine
+import backtester
+import outcome_tracker
+import screener
+import alerts_engine
+import resampler
+import relative_strength
+import sector_index
 
 # --- Caching & Async Globals ---
 DATA_CACHE = {}
@@ -110,10 +127,10 @@ if not os.path.exists(CACHE_DIR):
     os.makedirs(CACHE_DIR)
 
 def get_cached_data(key, max_age_seconds=60):
-    """Retrieves data from in-memory cache if valid."""
+    """Retrieves data from in-memory cache if valid (max_age_seconds=None accepts any age)."""
     if key in DATA_CACHE:
         entry = DATA_CACHE[key]
-        if time.time() - entry['timestamp'] < max_age_seconds:
+        if max_age_seconds is None or time.time() - entry['timestamp'] < max_age_seconds:
             return entry['data']
     return None
 
@@ -125,11 +142,11 @@ def set_cached_data(key, data):
     }
 
 def get_file_cache(filename, max_age_hours=24):
-    """Retrieves data from file cache if valid."""
+    """Retrieves data from file cache if valid (max_age_hours=None accepts any age)."""
     filepath = os.path.join(CACHE_DIR, filename)
     if os.path.exists(filepath):
         mtime = os.path.getmtime(filepath)
-        if time.time() - mtime < max_age_hours * 3600:
+        if max_age_hours is None or time.time() - mtime < max_age_hours * 3600:
             try:
                 with open(filepath, 'r') as f:
                     return json.load(f)
@@ -145,6 +162,177 @@ def set_file_cache(filename, data):
             json.dump(data, f)
     except Exception as e:
         print(f"Error writing cache file {filename}: {e}")
+
+# --- Network Resilience (Deadlines & Circuit Breakers) ---
+
+# Per-operation deadlines in seconds. Adjust with configure_network().
+FETCH_DEADLINES = {
+    'quote': 4.0,
+    'history': 8.0,
+    'news': 5.0,
+    'info': 6.0,
+    'calendar': 5.0
+}
+BREAKER_FAILURE_THRESHOLD = 3 # Consecutive failures before a breaker opens
+BREAKER_COOLDOWN_SECONDS = 60 # How long an open breaker short-circuits calls
+
+# Dedicated pool so a hung yfinance call never blocks THREAD_POOL callers past their deadline
+NETWORK_POOL = ThreadPoolExecutor(max_workers=16)
+
+class FetchUnavailable(Exception):
+    """Raised when an endpoint is down (open breaker or missed deadline) and nothing is cached."""
+    pass
+
+class CircuitBreaker:
+    """
+    Tracks consecutive failures for one endpoint type.
+    CLOSED -> OPEN after `failure_threshold` failures; OPEN -> HALF_OPEN after the cooldown,
+    letting a single probe call through. A successful probe closes the breaker again.
+    """
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, cooldown_seconds=BREAKER_COOLDOWN_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Returns True if a network call may be attempted right now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.cooldown_seconds:
+                self.state = self.HALF_OPEN # Let exactly one probe through
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit breaker '{self.name}' opened after {self.failures} failures.")
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+BREAKERS = {name: CircuitBreaker(name) for name in FETCH_DEADLINES}
+
+def configure_network(deadlines=None, failure_threshold=None, cooldown_seconds=None):
+    """Overrides per-endpoint deadlines and breaker tuning at runtime."""
+    if deadlines:
+        FETCH_DEADLINES.update(deadlines)
+        for name in deadlines:
+            BREAKERS.setdefault(name, CircuitBreaker(name))
+    for breaker in BREAKERS.values():
+        if failure_threshold is not None:
+            breaker.failure_threshold = failure_threshold
+        if cooldown_seconds is not None:
+            breaker.cooldown_seconds = cooldown_seconds
+
+def get_network_status():
+    """Returns the breaker state per endpoint, e.g. {'quote': 'CLOSED', ...}."""
+    return {name: breaker.state for name, breaker in BREAKERS.items()}
+
+def guarded_fetch(endpoint, cache_key, fetch_fn, is_empty=None):
+    """
+    Runs fetch_fn under the endpoint's deadline and circuit breaker.
+    Successful results are stored in the memory cache under cache_key. When the breaker is
+    open, the deadline passes or the call raises, the freshest cached value is returned instead.
+    Returns (value, is_stale). Raises FetchUnavailable if there is nothing cached to fall back on.
+    """
+    breaker = BREAKERS[endpoint]
+    error = "circuit open"
+    
+    if breaker.allow():
+        future = NETWORK_POOL.submit(fetch_fn)
+        try:
+            value = future.result(timeout=FETCH_DEADLINES[endpoint])
+            # The endpoint answered, even if with nothing (unknown symbol, no news):
+            # that closes the breaker, including after a HALF_OPEN probe
+            breaker.record_success()
+            if is_empty is not None and is_empty(value):
+                stale = get_cached_data(cache_key, max_age_seconds=None) if cache_key else None
+                return (stale, True) if stale is not None else (value, False)
+            if cache_key:
+                set_cached_data(cache_key, value)
+            return value, False
+        except FuturesTimeoutError:
+            # A running yfinance call can't be interrupted, so it keeps its NETWORK_POOL
+            # worker until it returns. That is bounded: the breaker opens after
+            # BREAKER_FAILURE_THRESHOLD misses and stops submitting, so each endpoint
+            # strands at most a few of the 16 workers per cooldown.
+            future.cancel() # Still queued (pool saturated)? Then it never runs
+            breaker.record_failure()
+            error = f"deadline of {FETCH_DEADLINES[endpoint]}s exceeded"
+        except Exception as e:
+            breaker.record_failure()
+            error = str(e)
+            
+    stale = get_cached_data(cache_key, max_age_seconds=None) if cache_key else None
+    if stale is not None:
+        return stale, True
+    raise FetchUnavailable(f"{endpoint} unavailable ({error})")
+
+def fetch_quote(symbol):
+    """Fetches the fast_info quote fields as a plain dict (guarded, 'quote' endpoint)."""
+    def _fetch():
+        info = yf.Ticker(symbol).fast_info
+        return {
+            'last_price': info.last_price,
+            'previous_close': info.previous_close,
+            'open': info.open,
+            'day_high': info.day_high,
+            'day_low': info.day_low,
+            'last_volume': info.last_volume,
+            'market_cap': info.market_cap
+        }
+    quote, stale = guarded_fetch('quote', f"{symbol}_quote", _fetch)
+    return dict(quote, stale=True) if stale else quote
+
+def fetch_history(symbol, period="1mo", interval="1d", start=None, end=None):
+    """
+    Fetches OHLCV history (guarded, 'history' endpoint).
+    A stale fallback is flagged via df.attrs['stale'].
+    """
+    if start is not None:
+        cache_key = f"{symbol}_history_{start:%Y%m%d}_{interval}"
+        fetch = lambda: yf.Ticker(symbol).history(start=start, end=end, interval=interval)
+    else:
+        cache_key = f"{symbol}_history_{period}_{interval}"
+        fetch = lambda: yf.Ticker(symbol).history(period=period, interval=interval)
+        
+    df, stale = guarded_fetch('history', cache_key, fetch, is_empty=lambda d: d is None or d.empty)
+    if stale:
+        df = df.copy(deep=False)
+        df.attrs['stale'] = True
+    return df
+
+def fetch_info(symbol):
+    """Fetches ticker.info (guarded, 'info' endpoint)."""
+    info, stale = guarded_fetch('info', f"{symbol}_info", lambda: yf.Ticker(symbol).info, is_empty=lambda d: not d)
+    return dict(info, stale=True) if stale else info
+
+def fetch_raw_news(symbol):
+    """Fetches raw ticker.news items (guarded, 'news' endpoint)."""
+    news, _ = guarded_fetch('news', f"{symbol}_raw_news", lambda: yf.Ticker(symbol).news, is_empty=lambda d: not d)
+    return news or []
+
+def fetch_calendar(symbol):
+    """Fetches ticker.calendar (guarded, 'calendar' endpoint)."""
+    calendar, _ = guarded_fetch('calendar', f"{symbol}_calendar", lambda: yf.Ticker(symbol).calendar, is_empty=lambda d: not d)
+    return calendar
+
 def fetch_stock_data(symbol, period="1mo", interval="1d"):
     """
     Fetches stock data using yfinance, falling back to mock data if it fails.
@@ -163,12 +351,11 @@ def fetch_stock_data(symbol, period="1mo", interval="1d"):
         return file_cached
 
     try:
-        ticker = yf.Ticker(symbol)
         # Get fast info if available
-        info = ticker.fast_info
+        info = fetch_quote(symbol)
         
-        price = info.last_price
-        prev_close = info.previous_close
+        price = info['last_price']
+        prev_close = info['previous_close']
         
         if price is None or prev_close is None:
             raise ValueError("Missing price data")
@@ -177,7 +364,10 @@ def fetch_stock_data(symbol, period="1mo", interval="1d"):
         change_percent = (change / prev_close) * 100
         
         # Fetch history for sparkline (last 30 points)
-        history = ticker.history(period=period, interval=interval)
+        try:
+            history = fetch_history(symbol, period=period, interval=interval)
+        except FetchUnavailable:
+            history = pd.DataFrame()
         history_prices = history['Close'].tolist() if not history.empty else []
         history_dates = [dt.strftime("%Y-%m-%d") for dt in history.index] if not history.empty else []
         
@@ -191,24 +381,38 @@ def fetch_stock_data(symbol, period="1mo", interval="1d"):
             'name': name,
             'history': history_prices,
             'history_dates': history_dates,
+            # Yahoo's latest bar is the session the quote belongs to (the previous one pre-market or on a holiday)
+            'session_date': history_dates[-1] if history_dates else None,
             'timestamps': ['10:00 AM', '10:30 AM', '11:00 AM', '11:30 AM', '12:00 PM', '12:30 PM', '1:00 PM', '1:30 PM', '2:00 PM', '2:30 PM', '3:00 PM', '3:30 PM', '4:00 PM'],
             'rvol': random.uniform(0.5, 3.0),
-            'open': info.open if info.open else price,
-            'high': info.day_high if info.day_high else price,
-            'low': info.day_low if info.day_low else price,
-            'volume': info.last_volume if info.last_volume else 0,
-            'market_cap': info.market_cap if info.market_cap else 0,
+            'open': info['open'] if info['open'] else price,
+            'high': info['day_high'] if info['day_high'] else price,
+            'low': info['day_low'] if info['day_low'] else price,
+            'volume': info['last_volume'] if info['last_volume'] else 0,
+            'market_cap': info['market_cap'] if info['market_cap'] else 0,
             'pe_ratio': 0, # Placeholder
             'dividend_yield': 0 # Placeholder
         }
         
+        if info.get('stale') or history.attrs.get('stale'):
+            # Served from cache while Yahoo is unreachable; don't persist as fresh
+            data['stale'] = True
+            return data
+        
         # 2. Set Cache (In-Memory + File)
         set_cached_data(cache_key, data)
         set_file_cache(f"{symbol}_stock_data.json", data)
+        apply_quote_to_indicators(symbol, data)
+        apply_quote_to_sector_index(symbol, data)
+        check_alerts(symbol, data)
         return data
 
     except Exception as e:
         # print(f"Error fetching {symbol}: {e}. Using mock data.")
+        # Freshest cached quote of any age beats a mock one
+        stale = get_cached_data(cache_key, max_age_seconds=None) or get_file_cache(f"{symbol}_stock_data.json", max_age_hours=None)
+        if stale:
+            return dict(stale, stale=True)
         return generate_mock_data(symbol)
 
 def generate_mock_data(symbol):
@@ -264,8 +468,7 @@ def fetch_fundamentals(symbol):
         return cached
 
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        info = fetch_info(symbol)
         
         data = {
             'market_cap': info.get('marketCap'),
@@ -327,8 +530,7 @@ def get_talking_points():
     points = []
     try:
         # Fetch news for a major index or popular stock
-        ticker = yf.Ticker("SPY") 
-        news = ticker.news
+        news = fetch_raw_news("SPY")
         
         if news:
             for item in news[:4]:
@@ -378,85 +580,540 @@ def get_rationale(symbol):
         "Primary support levels hold firm, providing a solid risk/reward ratio for short-term entries."
     )
 
+# --- Bar Store & Universe Indicators ---
+
+# Approximate trading bars per yfinance period
+PERIOD_BARS = {'5d': 5, '1mo': 21, '3mo': 63, '6mo': 126, '1y': 252, '2y': 504, '5y': 1260, '10y': 2520}
+BAR_MAX_AGE_SECONDS = 3600 # Same freshness window as the stock data file cache
+BATCH_DOWNLOAD_SIZE = 25 # Symbols per yf.download request (each request gets the 'history' deadline)
+BARS_VERSION = 0 # Bumped whenever ensure_bars stores new bars; derived caches compare against it
+READJUSTED_SYMBOLS = set() # Symbols whose whole history was replaced; incremental state must be rebuilt
+
+def _download_bars(symbols, period, interval="1d"):
+    """Bulk-downloads history for several symbols in one request. Returns {symbol: bars}."""
+    def _fetch():
+        return yf.download(symbols, period=period, interval=interval, group_by='ticker',
+                           auto_adjust=True, threads=True, progress=False)
+
+    df, _ = guarded_fetch('history', None, _fetch, is_empty=lambda d: d is None or d.empty)
+    if df is None or df.empty:
+        return {}
+
+    results = {}
+    for sym in symbols:
+        if isinstance(df.columns, pd.MultiIndex):
+            if sym not in df.columns.get_level_values(0):
+                continue
+            sub = df[sym]
+        else:
+            sub = df
+        sub = sub.dropna(how='all')
+        if not sub.empty:
+            results[sym] = bar_store.bars_from_history(sub, interval)
+    return results
+
+def _period_covering(days):
+    """Smallest yfinance period that spans `days` calendar days."""
+    for period, bars in PERIOD_BARS.items():
+        if bars * 7 / 5 >= days:
+            return period
+    return "max"
+
+def ensure_bars(symbols, period="6mo", interval="1d"):
+    """
+    Makes sure the bar store holds fresh history of at least `period` for each symbol.
+    Symbols with too little history get a full download; stale ones only fetch the bars
+    they are missing (plus the last settled bar, to check it still matches). If a split
+    or dividend re-adjusted the history in between, the whole series is downloaded again
+    instead of splicing two adjustment bases. Downloads are batched; failures leave the
+    stored bars untouched.
+    """
+    global BARS_VERSION
+    needed = PERIOD_BARS.get(period, 126)
+    to_fetch = {} # period -> [symbols]
+    
+    for sym in symbols:
+        if bar_store.bars_age_seconds(sym, interval) < BAR_MAX_AGE_SECONDS:
+            continue
+        bars = bar_store.load_bars(sym, interval)
+        if len(bars) < needed * 0.9:
+            fetch_period = period
+        else:
+            days_missing = (time.time() - bars[-2, 0]) / 86400 + 1
+            fetch_period = _period_covering(days_missing)
+        to_fetch.setdefault(fetch_period, []).append(sym)
+
+    readjusted = {} # period -> [symbols]
+    for fetch_period, syms in to_fetch.items():
+        for i in range(0, len(syms), BATCH_DOWNLOAD_SIZE):
+            batch = syms[i:i + BATCH_DOWNLOAD_SIZE]
+            try:
+                downloaded = _download_bars(batch, fetch_period, interval)
+            except FetchUnavailable:
+                continue
+            except Exception as e:
+                print(f"Error downloading bars: {e}")
+                continue
+            for sym, bars in downloaded.items():
+                stored = bar_store.load_bars(sym, interval)
+                if fetch_period != period and bar_store.adjustment_changed(stored, bars):
+                    span_days = (time.time() - stored[0, 0]) / 86400 + 1
+                    full_period = max(period, _period_covering(span_days), key=lambda p: PERIOD_BARS.get(p, float('inf')))
+                    readjusted.setdefault(full_period, []).append(sym)
+                    continue
+                bar_store.update_bars(sym, bars, interval)
+            if downloaded:
+                BARS_VERSION += 1
+
+    for full_period, syms in readjusted.items():
+        for i in range(0, len(syms), BATCH_DOWNLOAD_SIZE):
+            batch = syms[i:i + BATCH_DOWNLOAD_SIZE]
+            try:
+                downloaded = _download_bars(batch, full_period, interval)
+            except FetchUnavailable:
+                continue
+            except Exception as e:
+                print(f"Error downloading bars: {e}")
+                continue
+            # Replace rather than merge: every stored bar is on the old adjustment basis
+            for sym, bars in downloaded.items():
+                bar_store.save_bars(sym, bars, interval)
+                READJUSTED_SYMBOLS.add(sym)
+            if downloaded:
+                BARS_VERSION += 1
+
+def get_universe_bars(symbols, period="6mo", interval="1d"):
+    """Returns aligned (symbols x bars) OHLCV matrices from the bar store."""
+    ensure_bars(symbols, period, interval)
+    return bar_store.get_aligned_bars(symbols, lookback=PERIOD_BARS.get(period), interval=interval)
+
+# Live indicator accumulators (indicator_engine.IndicatorState), persisted between sessions
+INDICATOR_STATE = None
+INDICATOR_STATE_FILE = os.path.join(CACHE_DIR, "indicator_state.npz")
+_STATE_LOCK = threading.RLock()
+
+def _sync_state_with_bars(state, symbols, interval="1d"):
+    """Feeds bars stored since the state's last bar into it. Returns True if anything changed."""
+    c = bar_store.COL
+    changed = False
+    for sym in symbols:
+        row = state.index.get(sym)
+        bars = bar_store.load_bars(sym, interval)
+        if row is None or not len(bars):
+            continue
+        # The provisional bar is re-applied with its final values, newer bars advance the state
+        start = np.searchsorted(bars[:, 0], state.bar_timestamp[row]) if not np.isnan(state.bar_timestamp[row]) else 0
+        for bar in bars[start:]:
+            state.update(sym, bar[c['close']], volume=bar[c['volume']], high=bar[c['high']],
+                         low=bar[c['low']], timestamp=bar[c['timestamp']])
+            changed = True
+    return changed
+
+def get_indicator_state(symbols, period="6mo"):
+    """
+    Returns the live IndicatorState covering `symbols`.
+    Loaded from disk on first use and advanced bar by bar from the bar store; it is only
+    rebuilt from full history when symbols it doesn't track yet show up, or when a
+    symbol's stored history was re-adjusted.
+    """
+    global INDICATOR_STATE
+    ensure_bars(symbols, period)
+
+    with _STATE_LOCK:
+        state = INDICATOR_STATE
+        if state is None and os.path.exists(INDICATOR_STATE_FILE):
+            try:
+                state = indicator_engine.IndicatorState.load(INDICATOR_STATE_FILE)
+            except Exception as e:
+                print(f"Error loading indicator state: {e}")
+
+        missing = [s for s in symbols if (state is None or s not in state.index) and len(bar_store.load_bars(s))]
+        readjusted = state is not None and not READJUSTED_SYMBOLS.isdisjoint(state.index)
+        if state is None or missing or readjusted:
+            tracked = state.symbols if state is not None else []
+            universe = list(dict.fromkeys(tracked + list(symbols)))
+            state = indicator_engine.IndicatorState.from_bars(
+                bar_store.get_aligned_bars(universe, lookback=PERIOD_BARS.get(period)))
+            READJUSTED_SYMBOLS.difference_update(universe)
+            changed = True
+        else:
+            changed = _sync_state_with_bars(state, symbols)
+
+        INDICATOR_STATE = state
+        if changed:
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                state.save(INDICATOR_STATE_FILE)
+            except Exception as e:
+                print(f"Error saving indicator state: {e}")
+        return state
+
+def apply_quote_to_indicators(symbol, quote):
+    """
+    Folds a live quote (fetch_stock_data format) into the provisional bar of the quote's
+    session in O(1). Outside a session (weekends, holidays, pre-market) that is the last
+    completed bar, which the quote then merely restates. No-op until the indicator state
+    has been built, and for quotes without a session date.
+    """
+    if not quote.get('session_date'):
+        return
+    with _STATE_LOCK:
+        if INDICATOR_STATE is None or quote.get('price') is None:
+            return
+        session = np.datetime64(quote['session_date'], 's').astype(np.int64)
+        row = INDICATOR_STATE.index.get(symbol)
+        if row is not None and session < INDICATOR_STATE.bar_timestamp[row]:
+            return # A quote from a session the state has already moved past
+        INDICATOR_STATE.update(symbol, float(quote['price']), volume=quote.get('volume') or None,
+                               high=quote.get('high'), low=quote.get('low'), timestamp=float(session))
+
+# --- Alerts ---
+
+ALERTS = None # alerts_engine.AlertsEngine, loaded on first use
+ALERT_LISTENERS = [] # Callables receiving each triggered alert (called from worker threads)
+_ALERTS_LOCK = threading.Lock()
+
+def get_alerts_engine():
+    global ALERTS
+    with _ALERTS_LOCK:
+        if ALERTS is None:
+            ALERTS = alerts_engine.AlertsEngine.load()
+        return ALERTS
+
+def add_alert_listener(callback):
+    ALERT_LISTENERS.append(callback)
+
+def add_alert(symbol, kind, level, note=""):
+    """Adds a price_above/price_below/move/rsi_above/rsi_below/rvol_above alert and persists it."""
+    engine = get_alerts_engine()
+    alert = engine.add(symbol, kind, level, note)
+    engine.save()
+    return alert
+
+def remove_alert(alert_id):
+    engine = get_alerts_engine()
+    if engine.remove(alert_id) is not None:
+        engine.save()
+
+def get_alerts(symbol=None):
+    engine = get_alerts_engine()
+    return engine.for_symbol(symbol) if symbol else list(engine.alerts.values())
+
+def add_idea_alerts(idea):
+    """Stop and target alerts for a newly logged trade idea."""
+    engine = get_alerts_engine()
+    setup = idea.get('trade_setup') or {}
+    for kind in ('stop', 'target'):
+        if setup.get(kind):
+            engine.add(idea['symbol'], kind, setup[kind], note="Trade idea",
+                       alert_id=f"idea:{idea['id']}:{kind}", idea_id=idea['id'])
+    engine.save()
+
+def clear_idea_alerts(history):
+    """Drops the stop/target alerts of ideas that are no longer OPEN."""
+    engine = get_alerts_engine()
+    removed = [engine.remove(f"idea:{idea.get('id')}:{kind}") for idea in history
+               if idea.get('status', outcome_tracker.OPEN) != outcome_tracker.OPEN for kind in ('stop', 'target')]
+    if any(alert is not None for alert in removed):
+        engine.save()
+
+def check_alerts(symbol, quote):
+    """
+    Checks a fresh quote (plus live RSI/RVOL from the indicator state) against the
+    symbol's alerts. Triggered alerts are removed and, if notifications are enabled,
+    passed to the listeners.
+    """
+    engine = get_alerts_engine()
+    if symbol not in engine.index:
+        return []
+    values = {'price': quote.get('price'), 'change_percent': quote.get('change_percent')}
+    with _STATE_LOCK:
+        if INDICATOR_STATE is not None:
+            values.update(INDICATOR_STATE.live_values(symbol) or {})
+    fired = engine.check(symbol, values)
+    if fired:
+        engine.save()
+        if load_settings().get("notifications", True):
+            for alert in fired:
+                for callback in ALERT_LISTENERS:
+                    try:
+                        callback(alert)
+                    except Exception as e:
+                        print(f"Error delivering alert: {e}")
+    return fired
+
+def get_universe_indicators(symbols, period="6mo"):
+    """
+    Returns current indicators for every symbol as an indicator_engine.IndicatorTable.
+    Read from the incremental state, so it reflects quotes applied since the last bar.
+    """
+    state = get_indicator_state(symbols, period)
+    with _STATE_LOCK:
+        table = state.snapshot()
+    return table.select([table.index[s] for s in symbols if s in table.index])
+
+# Rolling correlation engines by window length (bars)
+CORRELATION_ENGINES = {}
+_CORRELATION_LOCK = threading.Lock()
+
+def get_correlation_engine(symbols, window=63):
+    """
+    Returns a correlation_engine.RollingCorrelation over the last `window` daily
+    returns that covers `symbols`. Advanced bar by bar as the bar store grows; only
+    rebuilt when symbols it doesn't track yet show up.
+    """
+    period = next((p for p, bars in PERIOD_BARS.items() if bars >= window), "10y")
+    ensure_bars(symbols, period)
+    
+    with _CORRELATION_LOCK:
+        engine = CORRELATION_ENGINES.get(window)
+        missing = [s for s in symbols if (engine is None or s not in engine.index) and len(bar_store.load_bars(s))]
+        if engine is None or missing:
+            universe = list(dict.fromkeys((engine.symbols if engine else []) + list(symbols)))
+            engine = correlation_engine.RollingCorrelation.from_bars(
+                bar_store.get_aligned_bars(universe, lookback=window + 1), window)
+        elif engine.last_timestamp is not None:
+            recent = bar_store.get_aligned_bars(engine.symbols, lookback=window + 1)
+            last = np.flatnonzero(recent['timestamps'] == engine.last_timestamp)
+            if recent['symbols'] != engine.symbols or not len(last) or \
+                    not np.allclose(recent['close'][:, last[0]], engine.last_close, equal_nan=True):
+                # The bar the engine ended on was revised (e.g. an intraday bar closed); rebuild
+                engine = correlation_engine.RollingCorrelation.from_bars(recent, window)
+            else:
+                # Feed any bars newer than the engine's last one
+                for t in range(last[0] + 1, len(recent['timestamps'])):
+                    engine.update(recent['close'][:, t], recent['timestamps'][t])
+        CORRELATION_ENGINES[window] = engine
+        return engine
+
+# Batch risk metrics, recomputed only when new bars arrive
+RISK_BENCHMARK = "SPY"
+RISK_TABLE = None
+RISK_TABLE_VERSION = None
+_RISK_LOCK = threading.Lock()
+
+def get_risk_table(symbols, lookback="1y"):
+    """
+    Returns a risk_engine.RiskTable with beta/Sharpe/volatility/drawdown for
+    `symbols` at every lookback (3mo, 1y, 3y), computed in one pass against SPY.
+    History covering `lookback` is downloaded first if needed.
+    """
+    global RISK_TABLE, RISK_TABLE_VERSION
+    period = "5y" if lookback == "3y" else lookback
+    ensure_bars(list(symbols) + [RISK_BENCHMARK], period)
+    
+    with _RISK_LOCK:
+        table = RISK_TABLE
+        missing = [s for s in symbols if (table is None or s not in table) and len(bar_store.load_bars(s))]
+        if table is None or missing or RISK_TABLE_VERSION != BARS_VERSION:
+            universe = list(dict.fromkeys((table.symbols if table else []) + list(symbols) + [RISK_BENCHMARK]))
+            bars = bar_store.get_aligned_bars(universe, lookback=max(risk_engine.LOOKBACKS.values()) + 1)
+            table = risk_engine.compute_risk(bars, RISK_BENCHMARK)
+            RISK_TABLE, RISK_TABLE_VERSION = table, BARS_VERSION
+        return table
+
+RS_BENCHMARK = RISK_BENCHMARK
+RS_TABLE = None
+RS_TABLE_VERSION = None
+_RS_LOCK = threading.Lock()
+
+def get_relative_strength_table(symbols=()):
+    """
+    Returns a relative_strength.RSTable ranking the scan universe plus `symbols` over
+    1w/1m/3m/6m against SPY and each sector ETF. Recomputed in one pass whenever new
+    bars arrive (or unknown symbols are asked for), otherwise served from cache.
+    """
+    global RS_TABLE, RS_TABLE_VERSION
+    with _RS_LOCK:
+        table = RS_TABLE
+        ranked = list(dict.fromkeys((table.symbols if table else []) + get_scan_universe() + list(symbols)))
+        ranked = [s for s in ranked if s != RS_BENCHMARK and s not in SECTOR_ETF_TO_NAME]
+    ensure_bars(ranked + [RS_BENCHMARK] + list(SECTOR_ETF_TO_NAME), "1y")
+    
+    with _RS_LOCK:
+        table = RS_TABLE
+        missing = [s for s in symbols if (table is None or s not in table) and len(bar_store.load_bars(s))]
+        if table is None or missing or RS_TABLE_VERSION != BARS_VERSION:
+            bars = bar_store.get_aligned_bars(ranked + [RS_BENCHMARK] + list(SECTOR_ETF_TO_NAME),
+                                              lookback=relative_strength.LOOKBACK_BARS)
+            is_ranked = set(ranked)
+            table = relative_strength.compute(bars, RS_BENCHMARK,
+                                              sectors=[SYMBOL_TO_SECTOR.get(s) for s in bars['symbols']],
+                                              ranked=[s in is_ranked for s in bars['symbols']])
+            RS_TABLE, RS_TABLE_VERSION = table, BARS_VERSION
+        return table
+
+def get_relative_strength(symbols):
+    """Composite RS (0-100, None if unknown) per symbol, e.g. for the watchlist."""
+    try:
+        rs = get_relative_strength_table(symbols).column('rs', symbols=symbols)
+        return {sym: (round(float(v)) if np.isfinite(v) else None) for sym, v in zip(symbols, rs)}
+    except Exception as e:
+        print(f"Error ranking relative strength: {e}")
+        return {sym: None for sym in symbols}
+
+def get_watchlist_quotes(symbols, cached=False):
+    """
+    Watchlist rows (fetch_stock_data format plus 'rs') for every symbol at once. With
+    cached=True, only quotes already in the memory or file cache (any age) are returned
+    and RS comes from the last ranked table, so nothing touches the network. Otherwise
+    quotes are fetched in parallel and RS is ranked once for the whole list.
+    """
+    if cached:
+        quotes = [get_cached_data(f"{sym}_stock_1mo_1d", max_age_seconds=None)
+                  or get_file_cache(f"{sym}_stock_data.json", max_age_hours=None) for sym in symbols]
+        table = RS_TABLE
+        rs = {sym: None for sym in symbols}
+        if table is not None:
+            ranked = table.column('rs', symbols=symbols)
+            rs = {sym: (round(float(v)) if np.isfinite(v) else None) for sym, v in zip(symbols, ranked)}
+    else:
+        # Own pool: callers may already be on THREAD_POOL
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            quotes = list(pool.map(fetch_stock_data, symbols))
+        rs = get_relative_strength(symbols)
+    return [dict(quote, rs=rs.get(quote['symbol'])) for quote in quotes if quote]
+
+# --- Sector Indexes ---
+
+SECTOR_INDEXES = {} # ETF -> (sector_index.SectorIndex, BARS_VERSION it was built from)
+SECTOR_SHARES_FILE = os.path.join(CACHE_DIR, "sector_shares.json")
+SECTOR_SHARES = None # symbol -> shares outstanding, loaded on first use
+_SECTOR_INDEX_LOCK = threading.Lock()
+
+def sector_constituents(etf):
+    return sorted(sym for sym, e in SYMBOL_TO_SECTOR.items() if e == etf)
+
+def _sector_shares():
+    """Shares outstanding per symbol, seeded from cached quotes (market cap / price). Call with the lock held."""
+    global SECTOR_SHARES
+    if SECTOR_SHARES is None:
+        SECTOR_SHARES = get_file_cache("sector_shares.json", max_age_hours=None) or {}
+        for data in get_all_cached_tickers():
+            if data.get('symbol') not in SECTOR_SHARES and not data.get('stale'):
+                shares = _quote_shares(data)
+                if shares:
+                    SECTOR_SHARES[data['symbol']] = shares
+    return SECTOR_SHARES
+
+def _quote_shares(quote):
+    price, market_cap = quote.get('price'), quote.get('market_cap')
+    if price and market_cap and price > 0:
+        return market_cap / price
+    return None
+
+def _quote_session(quote):
+    """The quote's session as a bar_store timestamp, or None if it has no session date."""
+    if not quote.get('session_date'):
+        return None
+    return float(np.datetime64(quote['session_date'], 's').astype(np.int64))
+
+def get_sector_index(etf):
+    """
+    The SectorIndex for a sector ETF, built from stored bars only (no downloads) and
+    rebuilt whenever new bars arrive. Returns None if no constituent has bars yet.
+    """
+    with _SECTOR_INDEX_LOCK:
+        entry = SECTOR_INDEXES.get(etf)
+        if entry and entry[1] == BARS_VERSION:
+            return entry[0]
+        shares = _sector_shares()
+        bars = bar_store.get_aligned_bars(sector_constituents(etf), lookback=PERIOD_BARS['1y'])
+        if not bars['symbols']:
+            return None
+        index = sector_index.SectorIndex(etf, bars['symbols'], bars['close'], bars['timestamps'],
+                                         [shares.get(s, np.nan) for s in bars['symbols']])
+        # Quotes fetched since the bars were stored
+        for sym in bars['symbols']:
+            quote = get_cached_data(f"{sym}_stock_1mo_1d", max_age_seconds=BAR_MAX_AGE_SECONDS)
+            if quote and not quote.get('stale'):
+                index.update(sym, quote['price'], prev_close=quote['price'] - quote['change'],
+                             session=_quote_session(quote))
+        SECTOR_INDEXES[etf] = (index, BARS_VERSION)
+        return index
+
+def apply_quote_to_sector_index(symbol, quote):
+    """Folds a live quote into its sector's index in O(1) and records its shares outstanding."""
+    etf = SYMBOL_TO_SECTOR.get(symbol)
+    if etf is None or quote.get('price') is None:
+        return
+    shares = _quote_shares(quote)
+    with _SECTOR_INDEX_LOCK:
+        known = _sector_shares()
+        previous = known.get(symbol)
+        if shares and (previous is None or abs(shares / previous - 1) > 0.01):
+            known[symbol] = shares
+            set_file_cache("sector_shares.json", known)
+        entry = SECTOR_INDEXES.get(etf)
+        if entry:
+            entry[0].update(symbol, quote['price'], prev_close=quote['price'] - quote.get('change', 0.0), shares=shares,
+                            session=_quote_session(quote))
+
+def get_sector_index_data(sector_name):
+    """
+    Sector stats, top/bottom performers and per-constituent contributions for the sector
+    popup, all from the sector index and local caches (no network calls).
+    Returns (sector_data, performers, contributions), or None if the sector has no bars yet.
+    """
+    etf = {v: k for k, v in SECTOR_ETF_TO_NAME.items()}.get(sector_name)
+    index = get_sector_index(etf) if etf else None
+    if index is None:
+        return None
+    
+    members = [index.constituent(s) for s in index.symbols]
+    members = [m for m in members if m]
+    for m in members:
+        m['name'] = STOCK_NAMES.get(m['symbol'], m['symbol'])
+    members.sort(key=lambda m: m['change_percent'], reverse=True)
+    limit = 3
+    performers = {'top': members[:limit], 'bottom': members[-limit:] if len(members) > limit else []}
+    
+    # Cap-weighted fundamentals from whatever is cached: harmonic P/E, yield and beta
+    weights = index.weights()
+    pe_inverse = yield_sum = beta_sum = 0.0
+    pe_weight = yield_weight = beta_weight = 0.0
+    risk = RISK_TABLE
+    for sym, w in zip(index.symbols, weights):
+        if not np.isfinite(w):
+            continue
+        fundamentals = get_file_cache(f"{sym}_fundamentals.json", max_age_hours=None) or {}
+        if fundamentals.get('pe_ratio'):
+            pe_inverse += w / fundamentals['pe_ratio']
+            pe_weight += w
+        if fundamentals.get('dividend_yield') is not None:
+            yield_sum += w * fundamentals['dividend_yield']
+            yield_weight += w
+        beta = risk.column('beta', symbols=[sym])[0] if risk is not None and sym in risk else np.nan
+        if np.isfinite(beta):
+            beta_sum += w * beta
+            beta_weight += w
+    
+    sector_data = {
+        'name': sector_name,
+        'symbol': etf,
+        'is_index': True,
+        'price': index.level,
+        'change': index.change,
+        'change_percent': index.change_percent,
+        'equal_change_percent': index.equal_change_percent,
+        'pe': pe_weight / pe_inverse if pe_inverse > 0 else 0.0,
+        'yield': yield_sum / yield_weight if yield_weight else 0.0,
+        'beta': beta_sum / beta_weight if beta_weight else 1.0,
+        'market_cap': index.market_cap,
+        'constituents': len(index.symbols),
+        'description': f"Cap-weighted index of {len(index.symbols)} {sector_name} stocks (base 100, one year ago)"
+    }
+    return sector_data, performers, index.contributions()
+
 # --- Narrative Engine Logic ---
 
 def calculate_real_indicators(symbol):
     """
-    Calculates real technical indicators using pandas (Manual implementation).
+    Calculates real technical indicators from the bar store.
     Returns a dictionary of indicators or None if calculation fails.
     """
     try:
-        ticker = yf.Ticker(symbol)
-        # Fetch 6 months to ensure enough data for indicators (e.g. 50 SMA)
-        df = ticker.history(period="6mo", interval="1d")
-        
-        if df.empty or len(df) < 50:
-            return None
-            
-        close = df['Close']
-        
-        # --- RSI (14) ---
-        delta = close.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        # Fix division by zero or initial NaNs if needed, but rolling mean handles it mostly.
-        # Better RSI calculation (Wilder's Smoothing) is standard but simple rolling is okay for now.
-        # Let's use Exponential Moving Average for RSI to be closer to standard? 
-        # Actually, standard RSI uses Wilder's smoothing.
-        # Simple implementation:
-        delta = close.diff()
-        up = delta.clip(lower=0)
-        down = -1 * delta.clip(upper=0)
-        ema_up = up.ewm(com=13, adjust=False).mean()
-        ema_down = down.ewm(com=13, adjust=False).mean()
-        rs = ema_up / ema_down
-        df['RSI'] = 100 - (100 / (1 + rs))
-
-        # --- MACD (12, 26, 9) ---
-        exp1 = close.ewm(span=12, adjust=False).mean()
-        exp2 = close.ewm(span=26, adjust=False).mean()
-        df['MACD'] = exp1 - exp2
-        df['MACD_SIGNAL'] = df['MACD'].ewm(span=9, adjust=False).mean()
-        
-        # --- Bollinger Bands (20, 2) ---
-        df['BBM'] = close.rolling(window=20).mean()
-        df['STD'] = close.rolling(window=20).std()
-        df['BBU'] = df['BBM'] + (df['STD'] * 2)
-        df['BBL'] = df['BBM'] - (df['STD'] * 2)
-        
-        # --- RVOL (Volume / 20-day MA Volume) ---
-        df['Vol_MA'] = df['Volume'].rolling(window=20).mean()
-        df['RVOL'] = df['Volume'] / df['Vol_MA']
-        
-        # --- 50 SMA ---
-        df['SMA_50'] = close.rolling(window=50).mean()
-        
-        # Get last row
-        last = df.iloc[-1]
-        
-        indicators = {
-            'rsi': round(last['RSI'], 2) if pd.notna(last['RSI']) else 50.0,
-            'macd': round(last['MACD'], 2) if pd.notna(last.get('MACD')) else 0.0,
-            'macd_signal': round(last['MACD_SIGNAL'], 2) if pd.notna(last.get('MACD_SIGNAL')) else 0.0,
-            'bb_upper': round(last['BBU'], 2) if pd.notna(last.get('BBU')) else 0.0,
-            'bb_lower': round(last['BBL'], 2) if pd.notna(last.get('BBL')) else 0.0,
-            'bb_middle': round(last['BBM'], 2) if pd.notna(last.get('BBM')) else 0.0,
-            'price': round(last['Close'], 2),
-            'rvol': round(last['RVOL'], 2) if pd.notna(last['RVOL']) else 1.0,
-            'sma_50': round(last['SMA_50'], 2) if pd.notna(last['SMA_50']) else 0.0,
-            'volume': int(last['Volume'])
-        }
-        
-        # Distance from SMA
-        if indicators['sma_50'] > 0:
-            indicators['sma_50_distance'] = round(((indicators['price'] - indicators['sma_50']) / indicators['sma_50']) * 100, 2)
-        else:
-            indicators['sma_50_distance'] = 0.0
-            
-        return indicators
-        
+        return get_universe_indicators([symbol]).row(symbol)
     except Exception as e:
         print(f"Error calculating indicators for {symbol}: {e}")
         return None
@@ -515,105 +1172,159 @@ def calculate_setup_confidence(indicators):
 def calculate_atr(symbol, period=14):
     """Calculates Average True Range."""
     try:
-        ticker = yf.Ticker(symbol)
-        # Fetch enough data for 14 period ATR
-        df = ticker.history(period="1mo", interval="1d")
-        if df.empty:
+        bars = get_universe_bars([symbol], period="1mo")
+        if not bars['symbols']:
             return 1.0
             
-        high_low = df['High'] - df['Low']
-        high_close = (df['High'] - df['Close'].shift()).abs()
-        low_close = (df['Low'] - df['Close'].shift()).abs()
-        
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        atr = true_range.rolling(window=period).mean().iloc[-1]
-        
-        return atr if pd.notna(atr) else 1.0
+        atr = indicator_engine.atr_series(bars['high'], bars['low'], bars['close'], period)[0, -1]
+        return float(atr) if np.isfinite(atr) else 1.0
     except:
         return 1.0
 
-def generate_narrative(symbol, indicators=None):
+NARRATIVE_BENCHMARK = '^GSPC'
+
+def _quote_change(quote):
+    return quote.get('change_percent') if quote else None
+
+def gather_narrative_inputs(symbols, indicators_by_symbol, rs_table=None):
+    """
+    Fetches everything generate_narrative needs for many symbols at once: each stock's
+    quote, its sector ETF quote, the index quote, (for consolidating setups only)
+    the latest headline, and multi-period relative strength from `rs_table`. Without
+    a table the last ranked one is used if there is one; ranking the universe just
+    for a narrative isn't worth its 1y bar download, so otherwise RS is left out.
+    Unique quotes are fetched once, all in parallel. Returns {symbol: inputs}.
+    """
+    if rs_table is None:
+        rs_table = RS_TABLE
+    quote_symbols = set(symbols) | {NARRATIVE_BENCHMARK}
+    quote_symbols |= {SYMBOL_TO_SECTOR[s] for s in symbols if s in SYMBOL_TO_SECTOR}
+    news_symbols = [s for s in symbols if indicators_by_symbol.get(s) and _needs_catalyst_news(indicators_by_symbol[s])]
+    
+    # Own pool: this usually runs on THREAD_POOL already, and nesting there could starve it
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        quote_futures = {sym: pool.submit(fetch_stock_data, sym) for sym in quote_symbols}
+        news_futures = {sym: pool.submit(fetch_news_for_symbol, sym, 48) for sym in news_symbols}
+        quotes = {}
+        for sym, f in quote_futures.items():
+            try:
+                quotes[sym] = f.result()
+            except Exception as e:
+                print(f"Error fetching narrative quote for {sym}: {e}")
+        news = {}
+        for sym, f in news_futures.items():
+            try:
+                news[sym] = f.result()
+            except Exception as e:
+                print(f"Error fetching narrative news for {sym}: {e}")
+    
+    inputs = {}
+    for sym in symbols:
+        latest = (news.get(sym) or [None])[0]
+        rs = rs_table.row(sym) if rs_table is not None else None
+        inputs[sym] = {
+            'stock_change': _quote_change(quotes.get(sym)),
+            'sector_change': _quote_change(quotes.get(SYMBOL_TO_SECTOR.get(sym))),
+            'index_change': _quote_change(quotes.get(NARRATIVE_BENCHMARK)),
+            'news_headline': latest['headline'] if latest else None,
+            'news_sentiment': latest['sentiment'] if latest else None,
+            'rs': rs['rs'] if rs else None,
+            'rs_vs_market_3m': rs['vs_market_3m'] if rs else None,
+            'sector_rank_3m': rs['sector_rank_3m'] if rs else None
+        }
+    return inputs
+
+def _needs_catalyst_news(indicators):
+    """Only the consolidation branch of the narrative mentions news."""
+    return indicators['rvol'] <= 1.5 and 30 <= indicators['rsi'] <= 70
+
+def generate_narrative(symbol, indicators=None, inputs=None):
     """
     Generates a narrative based on REAL technical indicators.
+    `inputs` comes from gather_narrative_inputs; without it the inputs are fetched here.
     """
     if indicators is None:
         indicators = calculate_real_indicators(symbol)
         if indicators is None:
             return [{'content': "Data unavailable", 'type': TokenType.CONTEXT.value, 'sentiment': Sentiment.NEUTRAL.value}]
-
+    if inputs is None:
+        inputs = gather_narrative_inputs([symbol], {symbol: indicators})[symbol]
+        
+    tokens = _narrative_tokens(
+        indicators['rvol'], indicators['rsi'], indicators['price'], indicators['sma_50'],
+        inputs.get('stock_change'), inputs.get('sector_change'), inputs.get('index_change'),
+        inputs.get('news_headline'), inputs.get('news_sentiment'), SYMBOL_TO_SECTOR.get(symbol) is not None,
+        inputs.get('rs'), inputs.get('rs_vs_market_3m'), inputs.get('sector_rank_3m'))
+    return [{'content': c, 'type': t, 'sentiment': s} for c, t, s in tokens]
+
+@lru_cache(maxsize=2048)
+def _narrative_tokens(rvol, rsi, price, sma_50, stock_change, sector_change, index_change,
+                      news_headline, news_sentiment, has_sector, rs=None, rs_vs_market_3m=None, sector_rank_3m=None):
+    """
+    Pure narrative builder, memoized on its inputs.
+    Returns a tuple of (content, type, sentiment) tokens.
+    """
     tokens = []
     
-    # Extract real metrics
-    rvol = indicators['rvol']
-    rsi = indicators['rsi']
-    sma_dist = indicators['sma_50_distance']
-    price = indicators['price']
-    sma_50 = indicators['sma_50']
-    
     # 1. Institutional Action (High RVOL)
     if rvol > 1.5:
-        tokens.append({'content': "INSTITUTIONAL ACCUMULATION", 'type': TokenType.ACTION.value, 'sentiment': Sentiment.BULLISH.value})
-        tokens.append({'content': f"detected; volume is {rvol}x average,", 'type': TokenType.EVIDENCE.value, 'sentiment': Sentiment.BULLISH.value})
+        tokens.append(("INSTITUTIONAL ACCUMULATION", TokenType.ACTION.value, Sentiment.BULLISH.value))
+        tokens.append((f"detected; volume is {rvol}x average,", TokenType.EVIDENCE.value, Sentiment.BULLISH.value))
         
         if price > sma_50:
-             tokens.append({'content': f"confirming breakout above 50SMA (${sma_50}).", 'type': TokenType.CONTEXT.value, 'sentiment': Sentiment.BULLISH.value})
+             tokens.append((f"confirming breakout above 50SMA (${sma_50}).", TokenType.CONTEXT.value, Sentiment.BULLISH.value))
         else:
-             tokens.append({'content': f"fighting resistance at 50SMA (${sma_50}).", 'type': TokenType.CONTEXT.value, 'sentiment': Sentiment.NEUTRAL.value})
+             tokens.append((f"fighting resistance at 50SMA (${sma_50}).", TokenType.CONTEXT.value, Sentiment.NEUTRAL.value))
              
     # 2. Oversold/Overbought (RSI)
     elif rsi < 30:
-        tokens.append({'content': "OVERSOLD CAPITULATION", 'type': TokenType.ACTION.value, 'sentiment': Sentiment.BULLISH.value})
-        tokens.append({'content': f"RSI is {rsi}, suggesting mean reversion bounce.", 'type': TokenType.EVIDENCE.value, 'sentiment': Sentiment.BULLISH.value})
+        tokens.append(("OVERSOLD CAPITULATION", TokenType.ACTION.value, Sentiment.BULLISH.value))
+        tokens.append((f"RSI is {rsi}, suggesting mean reversion bounce.", TokenType.EVIDENCE.value, Sentiment.BULLISH.value))
         
     elif rsi > 70:
-        tokens.append({'content': "OVEREXTENDED RALLY", 'type': TokenType.ACTION.value, 'sentiment': Sentiment.BEARISH.value})
-        tokens.append({'content': f"RSI is {rsi}, profit taking likely.", 'type': TokenType.EVIDENCE.value, 'sentiment': Sentiment.BEARISH.value})
+        tokens.append(("OVEREXTENDED RALLY", TokenType.ACTION.value, Sentiment.BEARISH.value))
+        tokens.append((f"RSI is {rsi}, profit taking likely.", TokenType.EVIDENCE.value, Sentiment.BEARISH.value))
         
     # 3. Consolidation (Default)
     else:
-        tokens.append({'content': "CONSOLIDATING", 'type': TokenType.ACTION.value, 'sentiment': Sentiment.NEUTRAL.value})
-        tokens.append({'content': f"near 50-day SMA (${sma_50});", 'type': TokenType.CONTEXT.value, 'sentiment': Sentiment.NEUTRAL.value})
+        tokens.append(("CONSOLIDATING", TokenType.ACTION.value, Sentiment.NEUTRAL.value))
+        tokens.append((f"near 50-day SMA (${sma_50});", TokenType.CONTEXT.value, Sentiment.NEUTRAL.value))
         
-        # Try to find a real news catalyst
-        news = fetch_news_for_symbol(symbol, lookback_hours=48)
-        if news:
-            latest = news[0]
-            headline = latest['headline']
+        # Real news catalyst, if there is one
+        if news_headline:
+            headline = news_headline
             # Truncate if too long
             if len(headline) > 60:
                 headline = headline[:57] + "..."
-            tokens.append({'content': f"News: {headline}", 'type': TokenType.CATALYST.value, 'sentiment': latest['sentiment']})
+            tokens.append((f"News: {headline}", TokenType.CATALYST.value, news_sentiment))
         else:
-            tokens.append({'content': "awaiting catalyst.", 'type': TokenType.CATALYST.value, 'sentiment': Sentiment.NEUTRAL.value})
+            tokens.append(("awaiting catalyst.", TokenType.CATALYST.value, Sentiment.NEUTRAL.value))
 
     # 4. Sector Context & Relative Strength
-    try:
-        # Sector Comparison
-        sector_sym = SYMBOL_TO_SECTOR.get(symbol)
-        if sector_sym:
-            sector_data = fetch_stock_data(sector_sym)
-            stock_data = fetch_stock_data(symbol)
+    if has_sector and stock_change is not None and sector_change is not None:
+        rel_perf = stock_change - sector_change
+        if abs(rel_perf) > 0.5:
+            perf_text = "outperforming" if rel_perf > 0 else "underperforming"
+            sentiment = Sentiment.BULLISH.value if rel_perf > 0 else Sentiment.BEARISH.value
+            tokens.append((f"{perf_text} sector by {abs(rel_perf):.1f}%.", TokenType.CONTEXT.value, sentiment))
             
-            if sector_data and stock_data:
-                rel_perf = stock_data['change_percent'] - sector_data['change_percent']
-                if abs(rel_perf) > 0.5:
-                    perf_text = "outperforming" if rel_perf > 0 else "underperforming"
-                    sentiment = Sentiment.BULLISH.value if rel_perf > 0 else Sentiment.BEARISH.value
-                    tokens.append({'content': f"{perf_text} sector by {abs(rel_perf):.1f}%.", 'type': TokenType.CONTEXT.value, 'sentiment': sentiment})
-                    
-        # Market Comparison (vs SPY)
-        spy_data = fetch_stock_data('^GSPC')
-        stock_data = fetch_stock_data(symbol) # Re-fetch or reuse? Reuse would be better but fetch is cached/fast enough for now
-        if spy_data and stock_data:
-             rel_spy = stock_data['change_percent'] - spy_data['change_percent']
-             if rel_spy > 1.0:
-                 tokens.append({'content': "Showing relative strength vs Market.", 'type': TokenType.EVIDENCE.value, 'sentiment': Sentiment.BULLISH.value})
-                 
-    except Exception as e:
-        print(f"Error adding context: {e}")
-
-    return tokens
+    # Market Comparison (vs the index)
+    if stock_change is not None and index_change is not None:
+        if stock_change - index_change > 1.0:
+            tokens.append(("Showing relative strength vs Market.", TokenType.EVIDENCE.value, Sentiment.BULLISH.value))
+
+    # Multi-period Relative Strength (percentile across the universe)
+    if rs is not None and (rs >= 80 or rs <= 20):
+        leader = rs >= 80
+        text = f"RS {rs:.0f}: {'leading' if leader else 'lagging'} the universe"
+        if rs_vs_market_3m is not None:
+            text += f" ({rs_vs_market_3m:+.1f}% vs SPY over 3M"
+            if sector_rank_3m is not None:
+                text += f", top {100 - sector_rank_3m:.0f}% of sector" if leader else f", bottom {sector_rank_3m:.0f}% of sector"
+            text += ")"
+        tokens.append((text + ".", TokenType.EVIDENCE.value, Sentiment.BULLISH.value if leader else Sentiment.BEARISH.value))
+
+    return tuple(tokens)
 
 def get_opportunities(risk_profile="BALANCED", settings=None):
     """
@@ -629,161 +1340,114 @@ def get_opportunities(risk_profile="BALANCED", settings=None):
     if cached:
         return cached
         
-    # 1. Filter Pool based on mock risk profile mapping (simplified)
-    pool = list(STOCK_NAMES.keys())
+    # 1. Score the whole covered universe in one vectorized pass
+    universe = get_scan_universe(settings)
+    rvol_threshold = settings.get('rvol_threshold', 0.0)
+    if len(universe) > settings.get('sharded_scan_threshold', 300) and scanner.MAX_WORKERS > 1:
+        # Large universes on multi-core machines: worker processes read the bar store directly.
+        # They score as of the last stored bar; live quotes in the indicator state aren't seen.
+        ensure_bars(universe)
+        results = scanner.scan_sharded(universe, risk_profile,
+                                       sectors=[SYMBOL_TO_SECTOR.get(sym) for sym in universe],
+                                       beta=get_risk_table(universe).column('beta', symbols=universe),
+                                       rvol_threshold=rvol_threshold, lookback=PERIOD_BARS['6mo'])
+    else:
+        table = get_universe_indicators(universe)
+        results = scanner.scan(table, risk_profile,
+                               sectors=[SYMBOL_TO_SECTOR.get(sym) for sym in table.symbols],
+                               beta=get_risk_table(table.symbols).column('beta', symbols=table.symbols),
+                               rvol_threshold=rvol_threshold)
     
-    # Filter by Sector
-    SECTOR_ETF_TO_NAME = {
-        'XLK': 'Technology', 'XLF': 'Financials', 'XLE': 'Energy',
-        'XLV': 'Healthcare', 'XLI': 'Industrials', 'XLP': 'Staples',
-        'XLU': 'Utilities', 'XLY': 'Discretionary', 'XLB': 'Materials',
-        'XLC': 'Communication'
-    }
+    # Multi-period relative strength: leaders get a boost, laggards a penalty
+    rs_table = None
+    try:
+        rs_table = get_relative_strength_table(results['symbols'])
+        scanner.apply_relative_strength(results, rs_table.column('rs', symbols=results['symbols']))
+    except Exception as e:
+        print(f"Error ranking relative strength: {e}")
+        scanner.apply_relative_strength(results, np.full(len(results['symbols']), np.nan))
     
-    allowed_sectors = settings.get('coverage_sectors', [])
-    filtered_pool = []
+    # Logged ideas share the universe's freshly stored bars
+    update_idea_outcomes()
     
-    for sym in pool:
-        etf = SYMBOL_TO_SECTOR.get(sym)
-        if etf:
-            sector_name = SECTOR_ETF_TO_NAME.get(etf, "Unknown")
-            if sector_name in allowed_sectors or not allowed_sectors:
-                filtered_pool.append(sym)
-        else:
-            filtered_pool.append(sym)
-            
-    pool = filtered_pool
+    # 2. Top 10 by (match, RVOL OK, score); only these get narratives and catalysts
+    top = scanner.top_k(results, 10)
+    top_symbols = [results['symbols'][i] for i in top]
+    top_indicators = {sym: results['table'].row(sym) for sym in top_symbols}
     
-    # Limit pool for performance, but ensure enough candidates
-    import random
-    random.shuffle(pool)
-    pool = pool[:20] # Analyze 20 stocks to ensure we find enough matches
+    # Gather narrative inputs and catalysts in bulk, so building the list does no I/O
+    narrative_inputs = gather_narrative_inputs(top_symbols, top_indicators, rs_table)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        catalysts = dict(zip(top_symbols, pool.map(get_next_catalyst, top_symbols)))
     
     scored_opps = []
-    
-    # Parallel Indicator Calculation
-    def process_symbol(symbol):
-        indicators = calculate_real_indicators(symbol)
-        if not indicators:
-            return None
-        return (symbol, indicators)
-
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        results = list(executor.map(process_symbol, pool))
-        
-    for res in results:
-        if not res:
-            continue
-            
-        symbol, indicators = res
-            
-        # Filter by RVOL Threshold (Problem Ten)
-        min_rvol = settings.get('rvol_threshold', 0.0)
-        is_rvol_ok = indicators['rvol'] >= min_rvol
-        # if indicators['rvol'] < min_rvol:
-        #     continue # Relaxed to ensure we get results
-            
-        # Calculate Confidence
-        confidence = calculate_setup_confidence(indicators)
-        
-        # Calculate Opportunity Score
-        opp_score = confidence
-        if indicators['rvol'] > 2.0: opp_score += 10
-        elif indicators['rvol'] > 1.5: opp_score += 5
-        elif indicators['rvol'] < 0.8: opp_score -= 5
-        
-        # Price Action Modifier
-        if indicators['price'] > indicators['sma_50']: opp_score += 3
-        
-        # Calculate ATR
-        atr = calculate_atr(symbol)
-        
-        # Trade Setup Parameters
-        price = indicators['price']
-        stop_loss = 0.0
-        target = 0.0
-        pos_size = "0%"
-        horizon = "Unknown"
-        
-        # Risk Profile Logic
-        beta = indicators.get('beta', 1.0)
-        is_match = False
-        
-        # Determine Match & Setup based on Requested Profile
-        if risk_profile == "DEFENSIVE":
-            is_defensive_sector = SYMBOL_TO_SECTOR.get(symbol) in ['XLP', 'XLU', 'XLV']
-            if beta <= 0.9 or is_defensive_sector: # Relaxed slightly from 0.85
-                is_match = True
-                
-            stop_loss = price - (1.5 * atr)
-            target = price + (2.0 * atr)
-            pos_size = "2-3%"
-            
-        elif risk_profile == "BALANCED":
-            if 0.7 <= beta <= 1.5: # Relaxed slightly
-                is_match = True
-                
-            stop_loss = price - (2.0 * atr)
-            target = price + (3.0 * atr)
-            pos_size = "3-5%"
-            
-        else: # SPECULATIVE
-            is_spec_sector = SYMBOL_TO_SECTOR.get(symbol) in ['XLK', 'XLC', 'XLY']
-            if beta >= 1.1 or is_spec_sector: # Relaxed from 1.2
-                is_match = True
-                
-            stop_loss = price - (2.5 * atr)
-            target = price + (5.0 * atr)
-            pos_size = "5-8%"
-            
-        risk_reward = (target - price) / (price - stop_loss) if (price - stop_loss) > 0 else 0
-        
-        # Time Horizon Logic
-        if indicators['rvol'] > 2.5 and indicators['macd'] > indicators['macd_signal']:
-            horizon = "Swing (3-10 Days)"
-        elif indicators['rsi'] < 30:
-            horizon = "Mean Reversion (1-3 Days)"
-        else:
-            horizon = "Position (2-4 Weeks)"
-            
-        # Generate Narrative
-        narrative = generate_narrative(symbol, indicators)
-        
-        # Get Catalyst (Earnings)
-        catalyst = get_next_catalyst(symbol)
+    for i, symbol in zip(top, top_symbols):
+        indicators = top_indicators[symbol]
         
         scored_opps.append({
             'symbol': symbol,
             'name': STOCK_NAMES.get(symbol, symbol),
-            'confidence': confidence,
-            'opp_score': opp_score,
-            'narrative': narrative,
-            'catalyst': catalyst,
-            'trade_setup': {
-                'entry': price,
-                'stop': round(stop_loss, 2),
-                'target': round(target, 2),
-                'risk_reward': round(risk_reward, 2),
-                'position_size': pos_size,
-                'time_horizon': horizon
-            },
+            'confidence': int(results['confidence'][i]),
+            'opp_score': int(results['opp_score'][i]),
+            'narrative': generate_narrative(symbol, indicators, narrative_inputs[symbol]),
+            'catalyst': catalysts[symbol],
+            'trade_setup': scanner.trade_setup(results, i),
             'rvol': indicators['rvol'],
+            'rs': None if np.isnan(results['rs'][i]) else int(round(results['rs'][i])),
             'history': [], 
             'change': 0.0,
-            'change': 0.0,
             'change_percent': 0.0,
-            'is_match': is_match,
-            'is_rvol_ok': is_rvol_ok
+            'is_match': bool(results['is_match'][i]),
+            'is_rvol_ok': bool(results['is_rvol_ok'][i])
         })
         
-    # Sort by Match (True first), then RVOL OK, then Opportunity Score
-    scored_opps.sort(key=lambda x: (x['is_match'], x['is_rvol_ok'], x['opp_score']), reverse=True)
-    
-    # Return top 10 (guarantees at least 3 if pool has 3 valid stocks)
-    result = scored_opps[:10]
+    result = scored_opps
     set_cached_data(cache_key, result)
     return result
 
+def get_scan_universe(settings=None):
+    """
+    Every tradeable symbol the app knows about (indices excluded), restricted to the
+    sectors in the user's coverage settings. Sorted, so scans are reproducible.
+    """
+    if settings is None:
+        settings = load_settings()
+    
+    symbols = [sym for sym in sorted(set(STOCK_NAMES) | set(SYMBOL_TO_SECTOR) | set(load_universe_file(settings.get('universe_file'))))
+               if not sym.startswith('^')]
+    coverage = coverage_screen(settings)
+    if coverage is None:
+        return symbols
+    keep = coverage.mask({'sector': sector_column(symbols)}, len(symbols))
+    return [sym for sym, ok in zip(symbols, keep) if ok]
+
+def sector_column(symbols):
+    """Sector name per symbol ('' for symbols without a sector ETF), for screens."""
+    return np.array([SECTOR_ETF_TO_NAME.get(SYMBOL_TO_SECTOR[sym], "Unknown") if sym in SYMBOL_TO_SECTOR else ""
+                     for sym in symbols], dtype=object)
+
+def coverage_screen(settings):
+    """The coverage_sectors setting as a screen (symbols without a known sector always pass)."""
+    allowed = settings.get('coverage_sectors', [])
+    if not allowed:
+        return None
+    return screener.Screen("Coverage", f"sector == '' or sector in {tuple(allowed)!r}")
+
+def load_universe_file(path):
+    """Reads extra tickers from a text/CSV file (first column, header lines ignored)."""
+    if not path or not os.path.exists(path):
+        return []
+    symbols = []
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                sym = line.split(',')[0].strip().strip('"').upper()
+                if sym and sym.replace('-', '').replace('.', '').isalnum() and sym not in ('SYMBOL', 'TICKER'):
+                    symbols.append(sym.replace('.', '-')) # Yahoo uses BRK-B, not BRK.B
+    except Exception as e:
+        print(f"Error reading universe file {path}: {e}")
+    return symbols
+
 def get_sector_data(sector_name):
     """
     Fetches comprehensive sector data using Sector ETFs as proxies.
@@ -800,8 +1464,10 @@ def get_sector_data(sector_name):
             return None
             
         # Enrich with extra stats
-        ticker = yf.Ticker(etf_symbol)
-        info = ticker.info
+        try:
+            info = fetch_info(etf_symbol)
+        except FetchUnavailable:
+            info = {}
         
         data['yield'] = info.get('yield', 0)
         data['pe'] = info.get('trailingPE', 0)
@@ -900,14 +1566,19 @@ def calculate_sector_stats(sector_name, tickers):
     if not tickers:
         return None
         
-    avg_change = sum(t.get('change_percent', 0.0) for t in tickers) / len(tickers)
-    total_assets = sum(t.get('market_cap', 0) for t in tickers)
+    equal_change = sum(t.get('change_percent', 0.0) for t in tickers) / len(tickers)
+    total_assets = sum(t.get('market_cap') or 0 for t in tickers)
+    avg_change = equal_change
+    if total_assets > 0:
+        # Cap-weighted, like the sector index
+        avg_change = sum((t.get('market_cap') or 0) * t.get('change_percent', 0.0) for t in tickers) / total_assets
     
     return {
         'name': sector_name,
         'price': 0.0,
         'change': 0.0,
         'change_percent': avg_change,
+        'equal_change_percent': equal_change,
         'pe': 0.0,
         'yield': 0.0,
         'beta': 1.0,
@@ -1063,52 +1734,39 @@ def get_morning_espresso_narrative():
 
 # --- News Engine ---
 
+NEWS_CACHE_FILE = "news_cache.json"
+SENTIMENT_MEMO_FILE = "sentiment_memo.json" # Memoized headline scores, under CACHE_DIR
+_SENTIMENT_MEMO_LOADED = False
+
+def _load_sentiment_memo():
+    """Seeds the sentiment memo from its cache file once per session."""
+    global _SENTIMENT_MEMO_LOADED
+    if _SENTIMENT_MEMO_LOADED:
+        return
+    _SENTIMENT_MEMO_LOADED = True
+    sentiment_engine.load_memo(get_file_cache(SENTIMENT_MEMO_FILE, max_age_hours=None))
+
+def save_sentiment_memo():
+    """Writes the sentiment memo if headlines were scored since the last write."""
+    if sentiment_engine.memo_dirty():
+        set_file_cache(SENTIMENT_MEMO_FILE, sentiment_engine.export_memo())
+
 def analyze_sentiment(headline):
     """
-    Analyzes headline sentiment using keyword scoring.
+    Analyzes headline sentiment using keyword and phrase scoring with negation.
     Returns: BULLISH, BEARISH, or NEUTRAL
     """
-    headline_lower = headline.lower()
-    
-    bullish_keywords = [
-        "beat", "beats", "exceed", "exceeds", "surge", "surges", "surged", "rally", "rallies", "rallied",
-        "upgrade", "upgraded", "breakout", "breakthrough", "growth", "strong", "robust", "outperform",
-        "acquisition", "approved", "approval", "win", "wins", "won", "positive", "record", "high",
-        "soar", "soars", "jump", "jumps", "expand"
-    ]
-    
-    bearish_keywords = [
-        "miss", "misses", "missed", "decline", "declines", "declined", "fall", "falls", "fell",
-        "drop", "drops", "dropped", "plunge", "plunges", "plunged", "downgrade", "downgraded",
-        "lawsuit", "investigation", "probe", "recall", "cut", "cuts", "loss", "losses", "weak",
-        "weakness", "underperform", "concern", "concerns", "warning", "warns", "warned", "risk",
-        "low", "slump", "slumps", "tumble"
-    ]
-    
-    bullish_score = 0
-    bearish_score = 0
-    
-    words = headline_lower.split()
-    
-    # Simple scoring (could be weighted)
-    for word in words:
-        # Strip punctuation
-        clean_word = word.strip('.,:;!?')
-        if clean_word in bullish_keywords:
-            bullish_score += 1
-        elif clean_word in bearish_keywords:
-            bearish_score += 1
-            
-    if bullish_score > bearish_score:
-        return Sentiment.BULLISH.value
-    elif bearish_score > bullish_score:
-        return Sentiment.BEARISH.value
-    else:
-        return Sentiment.NEUTRAL.value
+    _load_sentiment_memo()
+    return sentiment_engine.classify(headline)
+
+def analyze_sentiment_batch(headlines):
+    """Scores many headlines at once; previously seen headlines come from the memo."""
+    _load_sentiment_memo()
+    return sentiment_engine.classify_batch(headlines)
 
 def load_news_from_cache(symbol, max_age_hours=1):
-    """Loads news from local JSON cache if fresh."""
-    cache_file = "news_cache.json"
+    """Loads news from local JSON cache if fresh (max_age_hours=None accepts any age)."""
+    cache_file = NEWS_CACHE_FILE
     if not os.path.exists(cache_file):
         return None
         
@@ -1119,7 +1777,7 @@ def load_news_from_cache(symbol, max_age_hours=1):
         if symbol in cache:
             entry = cache[symbol]
             last_updated = datetime.fromisoformat(entry['last_updated'])
-            if datetime.now() - last_updated < timedelta(hours=max_age_hours):
+            if max_age_hours is None or datetime.now() - last_updated < timedelta(hours=max_age_hours):
                 return entry['articles']
     except Exception as e:
         print(f"Cache load error: {e}")
@@ -1127,8 +1785,8 @@ def load_news_from_cache(symbol, max_age_hours=1):
     return None
 
 def save_news_to_cache(symbol, articles):
-    """Saves news to local JSON cache."""
-    cache_file = "news_cache.json"
+    """Saves news to local JSON cache (and the sentiment memo, if it changed)."""
+    cache_file = NEWS_CACHE_FILE
     cache = {}
     
     if os.path.exists(cache_file):
@@ -1148,6 +1806,7 @@ def save_news_to_cache(symbol, articles):
             json.dump(cache, f, indent=2)
     except Exception as e:
         print(f"Cache save error: {e}")
+    save_sentiment_memo()
 
 def fetch_news_for_symbol(symbol, lookback_hours=24):
     """
@@ -1160,12 +1819,12 @@ def fetch_news_for_symbol(symbol, lookback_hours=24):
         
     news_events = []
     try:
-        ticker = yf.Ticker(symbol)
-        raw_news = ticker.news
+        raw_news = fetch_raw_news(symbol)
         
         cutoff_time = datetime.now() - timedelta(hours=lookback_hours)
+        sentiments = analyze_sentiment_batch([item.get('title', '') for item in raw_news])
         
-        for item in raw_news:
+        for item, sentiment in zip(raw_news, sentiments):
             # Parse timestamp
             ts = item.get('providerPublishTime')
             if ts:
@@ -1177,7 +1836,6 @@ def fetch_news_for_symbol(symbol, lookback_hours=24):
                 continue
                 
             headline = item.get('title', '')
-            sentiment = analyze_sentiment(headline)
             
             event = {
                 'event_id': f"{symbol}_{item.get('uuid', uuid.uuid4())}",
@@ -1194,6 +1852,11 @@ def fetch_news_for_symbol(symbol, lookback_hours=24):
         # Save to cache
         save_news_to_cache(symbol, news_events)
         
+    except FetchUnavailable:
+        # News endpoint down: serve whatever we stored last time, regardless of age
+        stale_news = load_news_from_cache(symbol, max_age_hours=None)
+        if stale_news:
+            return [dict(event, stale=True) for event in stale_news]
     except Exception as e:
         print(f"Error fetching news for {symbol}: {e}")
         
@@ -1204,8 +1867,7 @@ def get_next_catalyst(symbol):
     Finds next earnings date or event.
     """
     try:
-        ticker = yf.Ticker(symbol)
-        calendar = ticker.calendar
+        calendar = fetch_calendar(symbol)
         
         if calendar and 'Earnings Date' in calendar:
             # yfinance calendar format varies, sometimes it's a dict, sometimes list
@@ -1234,8 +1896,7 @@ def fetch_fundamentals(symbol):
     Returns a dictionary of metrics.
     """
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        info = fetch_info(symbol)
         
         # Valuation
         pe = info.get('trailingPE', 0)
@@ -1275,66 +1936,11 @@ def fetch_fundamentals(symbol):
 
 def calculate_risk_metrics(symbol, lookback_years=1):
     """
-    Calculates real risk metrics (Beta, Sharpe, Volatility, Drawdown).
+    Returns real risk metrics (Beta, Sharpe, Volatility, Drawdown) from the batch risk table.
     """
     try:
-        ticker = yf.Ticker(symbol)
-        # Fetch 1 year of data
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=365*lookback_years)
-        
-        df = ticker.history(start=start_date, end=end_date, interval="1d")
-        if df.empty or len(df) < 200:
-            return None
-            
-        # Benchmark (SPY) for Beta
-        spy = yf.Ticker("SPY")
-        spy_df = spy.history(start=start_date, end=end_date, interval="1d")
-        
-        # Align dates
-        df_rets = df['Close'].pct_change().dropna()
-        spy_rets = spy_df['Close'].pct_change().dropna()
-        
-        # Inner join to ensure same dates
-        aligned = pd.concat([df_rets, spy_rets], axis=1, join='inner')
-        aligned.columns = ['Stock', 'SPY']
-        
-        returns = aligned['Stock']
-        market_returns = aligned['SPY']
-        
-        # 1. Beta
-        covariance = returns.cov(market_returns)
-        variance = market_returns.var()
-        beta = covariance / variance if variance != 0 else 1.0
-        
-        # 2. Volatility (Annualized)
-        volatility = returns.std() * np.sqrt(252)
-        
-        # 3. Sharpe Ratio (Risk Free Rate assumed 4%)
-        rf_rate = 0.04
-        excess_returns = returns - (rf_rate / 252)
-        sharpe = (excess_returns.mean() / returns.std()) * np.sqrt(252) if returns.std() != 0 else 0
-        
-        # 4. Max Drawdown
-        cumulative = (1 + returns).cumprod()
-        peak = cumulative.cummax()
-        drawdown = (cumulative - peak) / peak
-        max_drawdown = drawdown.min()
-        
-        # Classification
-        risk_level = "MODERATE"
-        if beta > 1.5 or volatility > 0.4:
-            risk_level = "AGGRESSIVE"
-        elif beta < 0.8 and volatility < 0.2:
-            risk_level = "DEFENSIVE"
-            
-        return {
-            'beta': round(beta, 2),
-            'sharpe': round(sharpe, 2),
-            'volatility': round(volatility * 100, 1),
-            'max_drawdown': round(max_drawdown * 100, 1),
-            'risk_level': risk_level
-        }
+        lookback = "3y" if lookback_years >= 3 else "1y" if lookback_years >= 1 else "3mo"
+        return get_risk_table([symbol], lookback).row(symbol, lookback)
         
     except Exception as e:
         print(f"Error calculating risk metrics for {symbol}: {e}")
@@ -1350,7 +1956,10 @@ def load_settings():
         "dark_mode": True,
         "notifications": True,
         "rvol_threshold": 1.0,
-        "coverage_sectors": ["Technology", "Financials", "Energy", "Healthcare", "Industrials", "Staples", "Utilities", "Discretionary", "Materials"]
+        "coverage_sectors": ["Technology", "Financials", "Energy", "Healthcare", "Industrials", "Staples", "Utilities", "Discretionary", "Materials"],
+        "universe_file": "", # Optional ticker list (one per line or first CSV column) added to the scan
+        "sharded_scan_threshold": 300, # Universe size above which scans run in worker processes
+        "screens": {} # Saved screens: name -> filter expression (see screener.py)
     }
     
     if not os.path.exists(settings_file):
@@ -1374,80 +1983,125 @@ def save_settings(settings):
     except Exception as e:
         print(f"Error saving settings: {e}")
 
+# --- Screens ---
+
+SCREEN_RESULTS = {} # Latest run_screens() output: name -> [symbols]
+SCREEN_COLUMNS = scanner.INDICATOR_COLUMNS + ('sector', 'beta')
+
+def screen_extra_columns(symbols):
+    """Non-indicator screen columns (sector, beta) in `symbols` order."""
+    return {
+        'sector': sector_column(symbols),
+        'beta': get_risk_table(symbols).column('beta', symbols=symbols)
+    }
+
+def get_screens(settings=None):
+    """Saved screens from settings, compiled. Invalid ones are skipped."""
+    if settings is None:
+        settings = load_settings()
+    screens = []
+    for name, expression in settings.get('screens', {}).items():
+        try:
+            screens.append(screener.Screen(name, expression))
+        except screener.ScreenError as e:
+            print(f"Skipping screen {name}: {e}")
+    return screens
+
+def save_screen(name, expression):
+    """
+    Validates and saves a named screen (replacing one with the same name).
+    Raises screener.ScreenError if the expression doesn't compile or uses unknown columns.
+    """
+    screener.Screen(name, expression, columns=SCREEN_COLUMNS)
+    settings = load_settings()
+    settings['screens'] = {**settings.get('screens', {}), name: expression}
+    save_settings(settings)
+
+def delete_screen(name):
+    settings = load_settings()
+    settings['screens'] = {k: v for k, v in settings.get('screens', {}).items() if k != name}
+    save_settings(settings)
+    SCREEN_RESULTS.pop(name, None)
+
+def run_screens(settings=None):
+    """Evaluates every saved screen over the scan universe. Returns {name: [symbols]}."""
+    if settings is None:
+        settings = load_settings()
+    screens = get_screens(settings)
+    if not screens:
+        SCREEN_RESULTS.clear()
+        return {}
+    try:
+        table = get_universe_indicators(get_scan_universe(settings))
+        results = screener.run(screens, table, screen_extra_columns(table.symbols))
+        SCREEN_RESULTS.clear()
+        SCREEN_RESULTS.update(results)
+        return results
+    except Exception as e:
+        print(f"Error running screens: {e}")
+        return dict(SCREEN_RESULTS)
+
 # --- Phase 5: Market Regime & Advanced Analytics ---
 
-def detect_market_regime():
+# Regime histories by (symbol, interval), extended from the bar store
+REGIME_HISTORIES = {}
+_REGIME_LOCK = threading.Lock()
+REGIME_CHECK_BARS = 6 # Stored closes compared with the bars to spot a re-adjusted history
+
+def _regime_bars(history, count):
+    """The last `count` bars a regime history was built from, as bar_store rows (no open/volume)."""
+    rows = np.full((min(count, len(history)), len(bar_store.FIELDS)), np.nan)
+    for name in ('timestamp', 'high', 'low', 'close'):
+        rows[:, bar_store.COL[name]] = history.data[name][len(history) - len(rows):]
+    return rows
+
+def get_regime_history(symbol="SPY", interval="1d", period=None):
+    """
+    Returns the regime_engine.RegimeHistory for any symbol (index, sector ETF, stock)
+    and interval. Built once from stored bars, then extended with new bars only;
+    rebuilt if the stored bars were re-adjusted since.
     """
-    Analyzes SPY to determine the current market regime.
-    Returns a dictionary with regime details.
+    if period is None:
+        period = "2y" if interval in bar_store.DAILY_INTERVALS else "1mo" # Yahoo caps intraday history
+    ensure_bars([symbol], period, interval)
+    
+    with _REGIME_LOCK:
+        key = (symbol, interval)
+        history = REGIME_HISTORIES.get(key)
+        if history is None:
+            history = regime_engine.RegimeHistory.load(symbol, interval)
+        bars = bar_store.load_bars(symbol, interval)
+        if len(bars):
+            if bar_store.adjustment_changed(_regime_bars(history, REGIME_CHECK_BARS), bars):
+                # A split or dividend re-adjusted the stored bars: classify on the new basis from scratch
+                history = regime_engine.RegimeHistory(symbol, interval)
+            # Re-feed the last known bar (it may have been revised) plus anything newer
+            last = history.last_timestamp
+            new = bars if last is None else bars[bars[:, 0] >= last]
+            unchanged = last is not None and len(new) == 1 and np.allclose(
+                new[0, [2, 3, 4]], [history.data['high'][-1], history.data['low'][-1], history.data['close'][-1]])
+            if len(new) and not unchanged:
+                history.extend(new)
+                history.save()
+        REGIME_HISTORIES[key] = history
+        return history
+
+def detect_market_regime(symbol="SPY", interval="1d"):
+    """
+    Returns the current market regime for `symbol` (SPY by default).
+    Reads the stored regime history instead of re-downloading and re-classifying.
     """
     try:
-        spy = yf.Ticker("SPY")
-        # Fetch enough data for 50 SMA and ATR
-        df = spy.history(period="3mo", interval="1d")
+        regime = get_regime_history(symbol, interval).latest()
         
-        if df.empty or len(df) < 50:
+        if regime is None:
             return {
                 "regime": "NEUTRAL",
                 "trend": "SIDEWAYS",
                 "volatility": "NORMAL",
                 "description": "Insufficient data to determine regime."
             }
-            
-        close = df['Close']
-        
-        # 1. Trend Analysis (20 vs 50 SMA)
-        sma_20 = close.rolling(window=20).mean().iloc[-1]
-        sma_50 = close.rolling(window=50).mean().iloc[-1]
-        current_price = close.iloc[-1]
-        
-        trend = "SIDEWAYS"
-        if current_price > sma_20 > sma_50:
-            trend = "STRONG UPTREND"
-        elif current_price < sma_20 < sma_50:
-            trend = "STRONG DOWNTREND"
-        elif current_price > sma_50:
-            trend = "UPTREND"
-        elif current_price < sma_50:
-            trend = "DOWNTREND"
-            
-        # 2. Volatility Analysis (ATR / Price)
-        high_low = df['High'] - df['Low']
-        atr_14 = high_low.rolling(window=14).mean().iloc[-1]
-        atr_pct = (atr_14 / current_price) * 100
-        
-        volatility = "NORMAL"
-        if atr_pct > 1.5:
-            volatility = "HIGH"
-        elif atr_pct < 0.5:
-            volatility = "LOW"
-            
-        # 3. Regime Classification
-        regime = "NEUTRAL"
-        description = "Market is directionless."
-        
-        if trend == "STRONG UPTREND" and volatility == "LOW":
-            regime = "BULLISH GRIND"
-            description = "Steady uptrend with low volatility. Buy dips."
-        elif trend == "STRONG UPTREND" and volatility == "HIGH":
-            regime = "VOLATILE BULL"
-            description = "Uptrend but choppy. Wide stops needed."
-        elif trend == "STRONG DOWNTREND":
-            regime = "BEARISH"
-            description = "Market in correction. Cash is king."
-        elif trend == "SIDEWAYS" and volatility == "HIGH":
-            regime = "CHOPPY"
-            description = "No clear trend and high risk. Reduce size."
-            
-        return {
-            "regime": regime,
-            "trend": trend,
-            "volatility": volatility,
-            "description": description,
-            "sma_20": round(sma_20, 2),
-            "sma_50": round(sma_50, 2),
-            "atr_pct": round(atr_pct, 2)
-        }
+        return regime
         
     except Exception as e:
         print(f"Error detecting market regime: {e}")
@@ -1469,8 +2123,10 @@ def analyze_sector_rotation():
     try:
         # Batch fetch would be ideal, but loop is fine for 11 items
         for sym, name in sectors.items():
-            ticker = yf.Ticker(sym)
-            hist = ticker.history(period="1mo", interval="1d")
+            try:
+                hist = fetch_history(sym, period="1mo", interval="1d")
+            except FetchUnavailable:
+                continue
             
             if not hist.empty:
                 current = hist['Close'].iloc[-1]
@@ -1505,8 +2161,7 @@ def get_earnings_calendar(days=7):
     upcoming = []
     for sym in SAMPLE_STOCKS:
         try:
-            ticker = yf.Ticker(sym)
-            cal = ticker.calendar
+            cal = fetch_calendar(sym)
             if cal and 'Earnings Date' in cal:
                 dates = cal.get('Earnings Date', [])
                 if dates:
@@ -1525,68 +2180,79 @@ def get_earnings_calendar(days=7):
     upcoming.sort(key=lambda x: x['days_until'])
     return upcoming
 
+IDEA_HISTORY_FILE = "idea_history.json"
+_HISTORY_LOCK = threading.Lock()
+
+def _read_idea_history():
+    if not os.path.exists(IDEA_HISTORY_FILE):
+        return []
+    try:
+        with open(IDEA_HISTORY_FILE, 'r') as f:
+            return json.load(f)
+    except:
+        return []
+
+def _write_idea_history(history):
+    try:
+        with open(IDEA_HISTORY_FILE, 'w') as f:
+            json.dump(history, f, indent=2)
+    except Exception as e:
+        print(f"Error saving history: {e}")
+
 def save_opportunity_to_history(opportunity):
     """
     Saves a generated opportunity to a history JSON file.
     """
-    history_file = "idea_history.json"
-    history = []
-    
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, 'r') as f:
-                history = json.load(f)
-        except:
-            pass
+    with _HISTORY_LOCK:
+        history = _read_idea_history()
             
-    # Add timestamp and ID
-    opportunity['created_at'] = datetime.now().isoformat()
-    opportunity['id'] = str(uuid.uuid4())
-    opportunity['status'] = 'OPEN' # OPEN, CLOSED, EXPIRED
-    
-    # Keep only last 50
-    history.insert(0, opportunity)
-    history = history[:50]
-    
-    try:
-        with open(history_file, 'w') as f:
-            json.dump(history, f, indent=2)
-    except Exception as e:
-        print(f"Error saving history: {e}")
+        # Add timestamp and ID
+        opportunity['created_at'] = datetime.now().isoformat()
+        opportunity['id'] = str(uuid.uuid4())
+        opportunity['status'] = outcome_tracker.OPEN # OPEN, CLOSED, EXPIRED
+        
+        # Keep only last 50
+        history.insert(0, opportunity)
+        history = history[:50]
+        _write_idea_history(history)
+    add_idea_alerts(opportunity)
+
+def update_idea_outcomes(fetch=False):
+    """
+    Re-evaluates OPEN ideas whose symbols have new bars (stop/target hit, expiry or
+    mark-to-market) and writes the results back. With fetch=True missing bars are
+    downloaded first. Returns the updated history.
+    """
+    with _HISTORY_LOCK:
+        history = _read_idea_history()
+        symbols = sorted({idea['symbol'] for idea in history
+                          if idea.get('status', outcome_tracker.OPEN) == outcome_tracker.OPEN and idea.get('symbol')})
+        if not symbols:
+            return history
+        if fetch:
+            ensure_bars(symbols)
+            
+        bars_by_symbol = {sym: bar_store.load_bars(sym) for sym in symbols}
+        try:
+            if outcome_tracker.evaluate(history, bars_by_symbol):
+                _write_idea_history(history)
+                clear_idea_alerts(history)
+        except Exception as e:
+            print(f"Error updating idea outcomes: {e}")
+        return history
 
 def get_idea_history():
-    history_file = "idea_history.json"
-    if not os.path.exists(history_file):
-        return []
-    try:
-        with open(history_file, 'r') as f:
-            return json.load(f)
-    except:
-        return []
+    """Logged ideas with their outcomes, evaluated against the bars already stored."""
+    return update_idea_outcomes()
 
 def analyze_portfolio_correlation(symbols):
+    """Average pairwise correlation of 3-month daily returns among `symbols`."""
     if not symbols or len(symbols) < 2:
         return 0.0
         
     try:
-        data = {}
-        for sym in symbols:
-            ticker = yf.Ticker(sym)
-            hist = ticker.history(period="3mo", interval="1d")
-            if not hist.empty:
-                data[sym] = hist['Close'].pct_change().dropna()
-                
-        df = pd.DataFrame(data)
-        corr_matrix = df.corr()
-        
-        # Calculate average off-diagonal correlation
-        n = len(df.columns)
-        if n < 2: return 0.0
-        
-        sum_corr = corr_matrix.sum().sum() - n
-        avg_corr = sum_corr / (n * (n - 1))
-        
-        return round(avg_corr, 2)
+        engine = get_correlation_engine(symbols, window=63)
+        return round(engine.average_pairwise(symbols), 2)
         
     except Exception as e:
         print(f"Error calculating correlation: {e}")
@@ -1594,8 +2260,7 @@ def analyze_portfolio_correlation(symbols):
 
 def fetch_detailed_ohlc_data(symbol, period="1mo", interval="1d"):
     try:
-        ticker = yf.Ticker(symbol)
-        history = ticker.history(period=period, interval=interval)
+        history = fetch_history(symbol, period=period, interval=interval)
         
         if history.empty:
             return []
@@ -1616,6 +2281,84 @@ def fetch_detailed_ohlc_data(symbol, period="1mo", interval="1d"):
         print(f"Error fetching OHLC data for {symbol}: {e}")
         return []
 
+# Detail chart timeframe -> (stored base interval, base period, chart interval, calendar days shown)
+TIMEFRAMES = {
+    "1D": ("5m", "5d", "5m", None),
+    "1W": ("5m", "5d", "15m", None),
+    "1M": ("1d", "1y", "1d", 31),
+    "3M": ("1d", "1y", "1d", 92),
+    "YTD": ("1d", "1y", "1d", None),
+    "1Y": ("1d", "1y", "1d", 366),
+    "ALL": ("1d", "max", "1mo", None)
+}
+SESSIONS_SHOWN = {"1D": 1, "1W": 5}
+_FULL_HISTORY = set() # Symbols whose daily bars were downloaded with period="max" this session
+
+def _base_covers(symbol, bars, period, interval):
+    """True if stored base bars are enough to draw a timeframe without downloading."""
+    if not len(bars):
+        return False
+    if interval not in bar_store.DAILY_INTERVALS:
+        # Intraday bars only cover 1D/1W while they're fresh; older sessions would chart as today
+        return bar_store.bars_age_seconds(symbol, interval) < BAR_MAX_AGE_SECONDS
+    if period == "max":
+        return False
+    return len(bars) >= PERIOD_BARS.get(period, 126) * 0.9
+
+def get_timeframe_bars(symbol, timeframe="1M", refresh=False):
+    """
+    OHLC rows (fetch_detailed_ohlc_data format) for a detail chart timeframe, built from
+    the bar store: 5m bars for 1D, 15m resampled from 5m for 1W, daily slices for
+    1M-1Y, and monthly bars resampled from full daily history for ALL. Downloads only
+    when the stored base series doesn't cover the timeframe, or with refresh=True
+    (subject to the usual bar freshness window).
+    """
+    global BARS_VERSION
+    base_interval, period, interval, days = TIMEFRAMES.get(timeframe, TIMEFRAMES["1M"])
+    try:
+        bars = bar_store.load_bars(symbol, base_interval)
+        full_history = period == "max" and symbol in _FULL_HISTORY
+        if not full_history and not _base_covers(symbol, bars, period, base_interval):
+            downloaded = _download_bars([symbol], period, base_interval).get(symbol)
+            if downloaded is not None:
+                bars = bar_store.update_bars(symbol, downloaded, base_interval)
+                BARS_VERSION += 1
+                if period == "max":
+                    _FULL_HISTORY.add(symbol)
+        elif refresh:
+            ensure_bars([symbol], period if period != "max" else "10y", base_interval)
+            bars = bar_store.load_bars(symbol, base_interval)
+    except FetchUnavailable:
+        bars = bar_store.load_bars(symbol, base_interval)
+    except Exception as e:
+        print(f"Error loading {timeframe} bars for {symbol}: {e}")
+        bars = bar_store.load_bars(symbol, base_interval)
+    
+    if not len(bars):
+        return []
+    if timeframe in SESSIONS_SHOWN:
+        bars = resampler.last_sessions(bars, SESSIONS_SHOWN[timeframe])
+    elif timeframe == "YTD":
+        start = np.datetime64(f"{datetime.now().year}-01-01", 's').astype(np.int64)
+        bars = bars[bars[:, 0] >= start]
+    elif days:
+        bars = bars[bars[:, 0] >= bars[-1, 0] - days * 86400]
+    if interval != base_interval:
+        bars = resampler.resample(bars, interval)
+    return ohlc_rows(bars)
+
+def ohlc_rows(bars):
+    """bar_store rows -> list of OHLCV dicts for the detail chart."""
+    dates = np.datetime_as_string(bars[:, 0].astype('datetime64[s]'), unit='m')
+    return [{
+        'date': date.replace('T', ' '),
+        'open': float(row[1]),
+        'high': float(row[2]),
+        'low': float(row[3]),
+        'close': float(row[4]),
+        'volume': float(row[5])
+    } for date, row in zip(dates, bars)]
+
 def get_comparison_data(target_symbol, comparison_symbols=None):
     if comparison_symbols is None:
         comparison_symbols = ['^GSPC', 'XLK'] # Default to S&P 500 and Tech Sector
@@ -1627,8 +2370,7 @@ def get_comparison_data(target_symbol, comparison_symbols=None):
     # 1. Fetch Performance Stats
     for sym in all_symbols:
         try:
-            ticker = yf.Ticker(sym)
-            hist = ticker.history(period="1y")
+            hist = fetch_history(sym, period="1y")
             
             if hist.empty:
                 continue
@@ -1668,18 +2410,20 @@ def get_comparison_data(target_symbol, comparison_symbols=None):
     # 2. Calculate Correlation Matrix
     correlation_matrix = {}
     try:
-        # Download batch data for correlation
-        batch_data = yf.download(all_symbols, period="1y", progress=False)['Close']
-        corr_df = batch_data.corr()
+        # 1y rolling correlation from the shared engine (no per-view download)
+        engine = get_correlation_engine(all_symbols, window=252)
+        known = [sym for sym in all_symbols if sym in engine.index]
+        corr = engine.matrix(known)
         
         # Convert to dictionary format: {'AAPL': {'MSFT': 0.8, ...}, ...}
         for sym1 in all_symbols:
             correlation_matrix[sym1] = {}
             for sym2 in all_symbols:
-                if sym1 in corr_df and sym2 in corr_df:
-                    correlation_matrix[sym1][sym2] = corr_df.loc[sym1, sym2] if sym1 != sym2 else 1.0
+                if sym1 in engine.index and sym2 in engine.index:
+                    val = corr[known.index(sym1), known.index(sym2)]
+                    correlation_matrix[sym1][sym2] = float(val) if np.isfinite(val) else 0.0
                 else:
-                    correlation_matrix[sym1][sym2] = 0.0
+                    correlation_matrix[sym1][sym2] = 1.0 if sym1 == sym2 else 0.0
                     
     except Exception as e:
         print(f"Error calculating correlation matrix: {e}")
@@ -1689,6 +2433,31 @@ def get_comparison_data(target_symbol, comparison_symbols=None):
         'correlation': correlation_matrix
     }
 
+def run_backtest(years=5, settings=None):
+    """
+    Replays the opportunity rules over `years` of daily bars for the scan universe.
+    Each date is scored with the 1y beta and the universe RS as of that date, like
+    get_opportunities. Returns the backtester report (see backtester.format_report);
+    `python backtester.py` prints it.
+    """
+    if settings is None:
+        settings = load_settings()
+    universe = [s for s in get_scan_universe(settings) if s != RISK_BENCHMARK]
+    lookback = int(years * 252)
+    beta_days = risk_engine.LOOKBACKS['1y']
+    period = _period_covering((lookback + beta_days) * 7 / 5)
+    ensure_bars(universe + [RISK_BENCHMARK], period)
+    
+    # The extra year only feeds the rolling beta; the benchmark row isn't traded
+    bars = bar_store.get_aligned_bars(universe + [RISK_BENCHMARK], lookback=lookback + beta_days)
+    beta = risk_engine.rolling_beta(bars, RISK_BENCHMARK, beta_days)
+    rows = [i for i, sym in enumerate(bars['symbols']) if sym != RISK_BENCHMARK]
+    rs = relative_strength.rs_series(bars['close'][rows])
+    bars = {'symbols': [bars['symbols'][i] for i in rows], 'timestamps': bars['timestamps'][-lookback:],
+            **{f: bars[f][rows, -lookback:] for f in ('open', 'high', 'low', 'close', 'volume')}}
+    return backtester.run(bars, sectors=[SYMBOL_TO_SECTOR.get(sym) for sym in bars['symbols']],
+                          beta=beta[rows, -lookback:], rs=rs[:, -lookback:], rvol_threshold=settings.get('rvol_threshold', 0.0))
+
 # --- Async Wrappers ---
 
 def fetch_stock_data_async(symbol):
@@ -1721,6 +2490,9 @@ def get_opportunities_async(profile):
 def fetch_detailed_ohlc_data_async(symbol, period="1mo", interval="1d"):
     return THREAD_POOL.submit(fetch_detailed_ohlc_data, symbol, period, interval)
 
+def get_timeframe_bars_async(symbol, timeframe="1M", refresh=False):
+    return THREAD_POOL.submit(get_timeframe_bars, symbol, timeframe, refresh)
+
 def get_comparison_data_async(symbol):
     return THREAD_POOL.submit(get_comparison_data, symbol)
 
@@ -1732,3 +2504,9 @@ def calculate_risk_metrics_async(symbol):
 
 def get_idea_history_async():
     return THREAD_POOL.submit(get_idea_history)
+
+def run_screens_async():
+    return THREAD_POOL.submit(run_screens)
+
+def run_backtest_async(years=5):
+    return THREAD_POOL.submit(run_backtest, years)
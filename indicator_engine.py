@@ -0,0 +1,449 @@
+# indicator_engine.py
+"""
+Vectorized technical indicators for a whole universe at once.
+
+Every function takes (symbols x bars) float64 matrices, as returned by
+bar_store.get_aligned_bars(), and works along the time axis for all symbols in
+one pass. Leading NaNs (symbols with shorter history) are allowed.
+"""
+import numpy as np
+
+MIN_BARS = 50 # Same requirement as the per-symbol calculation (50 SMA)
+
+# Values reported when an indicator can't be computed (matches calculate_real_indicators)
+DEFAULTS = {
+    'rsi': 50.0, 'macd': 0.0, 'macd_signal': 0.0, 'bb_upper': 0.0, 'bb_lower': 0.0,
+    'bb_middle': 0.0, 'rvol': 1.0, 'sma_50': 0.0, 'sma_50_distance': 0.0, 'atr': 1.0
+}
+
+# --- Series Helpers ---
+
+def ema_series(x, alpha):
+    """
+    Recursive EMA (pandas ewm(adjust=False)) along axis 1.
+    Each row is seeded with its first non-NaN value.
+    """
+    out = np.full(x.shape, np.nan)
+    state = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        col = x[:, t]
+        seeded = np.isnan(state)
+        state = np.where(seeded, col, np.where(np.isnan(col), state, state + alpha * (col - state)))
+        out[:, t] = state
+    return out
+
+def rolling_sum_series(x, window):
+    """Rolling sum along axis 1; NaN until `window` valid values are in the window."""
+    valid = ~np.isnan(x)
+    csum = np.cumsum(np.where(valid, x, 0.0), axis=1)
+    ccount = np.cumsum(valid, axis=1)
+    pad = np.zeros((x.shape[0], 1))
+    csum = np.concatenate([pad, csum], axis=1)
+    ccount = np.concatenate([pad, ccount], axis=1)
+
+    total = np.full(x.shape, np.nan)
+    count = np.zeros(x.shape)
+    if x.shape[1] >= window:
+        total[:, window - 1:] = csum[:, window:] - csum[:, :-window]
+        count[:, window - 1:] = ccount[:, window:] - ccount[:, :-window]
+    return np.where(count == window, total, np.nan)
+
+def rolling_mean_series(x, window):
+    return rolling_sum_series(x, window) / window
+
+def rolling_std_series(x, window):
+    """Rolling sample standard deviation (ddof=1) along axis 1."""
+    mean = rolling_mean_series(x, window)
+    sumsq = rolling_sum_series(x * x, window)
+    var = (sumsq - window * mean * mean) / (window - 1)
+    return np.sqrt(np.maximum(var, 0.0))
+
+def rsi_series(close, period=14):
+    """Wilder RSI via ewm(com=period-1) of gains and losses."""
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    up = np.clip(delta, 0, None)
+    down = -np.clip(delta, None, 0)
+    alpha = 1.0 / period
+    avg_up = ema_series(up, alpha)
+    avg_down = ema_series(down, alpha)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_up / avg_down
+        return 100 - (100 / (1 + rs))
+
+def macd_series(close, fast=12, slow=26, signal=9):
+    """Returns (macd, signal) series."""
+    macd = ema_series(close, 2.0 / (fast + 1)) - ema_series(close, 2.0 / (slow + 1))
+    return macd, ema_series(macd, 2.0 / (signal + 1))
+
+def true_range_series(high, low, close):
+    """True range; the first bar of each series falls back to high - low."""
+    prev_close = np.roll(close, 1, axis=1)
+    prev_close[:, 0] = np.nan
+    high_low = high - low
+    with np.errstate(invalid='ignore'):
+        tr = np.fmax(high_low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return tr
+
+def atr_series(high, low, close, period=14):
+    return rolling_mean_series(true_range_series(high, low, close), period)
+
+# --- Indicator Table ---
+
+class IndicatorTable:
+    """
+    Columnar indicator results for a universe: one numpy array per indicator,
+    one row per symbol, in the order of `symbols`.
+    """
+    def __init__(self, symbols, columns):
+        self.symbols = list(symbols)
+        self.columns = columns
+        self.index = {sym: i for i, sym in enumerate(self.symbols)}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def valid_mask(self):
+        """Rows with enough history for a meaningful reading."""
+        return self.columns['bars'] >= MIN_BARS
+
+    def select(self, rows):
+        """Returns a new table restricted to a boolean mask or list of row indices."""
+        rows = np.flatnonzero(rows) if np.asarray(rows).dtype == bool else np.asarray(rows, dtype=int)
+        return IndicatorTable([self.symbols[i] for i in rows],
+                              {name: col[rows] for name, col in self.columns.items()})
+
+    def row(self, symbol):
+        """
+        Returns one symbol's indicators in the dict format used by the narrative
+        and scoring code, or None if the symbol is missing or has too little history.
+        """
+        i = self.index.get(symbol)
+        if i is None or self.columns['bars'][i] < MIN_BARS:
+            return None
+
+        def val(name):
+            v = self.columns[name][i]
+            return round(float(v), 2) if np.isfinite(v) else DEFAULTS[name]
+
+        indicators = {
+            'rsi': val('rsi'),
+            'macd': val('macd'),
+            'macd_signal': val('macd_signal'),
+            'bb_upper': val('bb_upper'),
+            'bb_lower': val('bb_lower'),
+            'bb_middle': val('bb_middle'),
+            'price': round(float(self.columns['price'][i]), 2),
+            'rvol': val('rvol'),
+            'sma_50': val('sma_50'),
+            'volume': int(self.columns['volume'][i]),
+            'atr': float(self.columns['atr'][i]) if np.isfinite(self.columns['atr'][i]) else DEFAULTS['atr']
+        }
+
+        # Distance from SMA
+        if indicators['sma_50'] > 0:
+            indicators['sma_50_distance'] = round(((indicators['price'] - indicators['sma_50']) / indicators['sma_50']) * 100, 2)
+        else:
+            indicators['sma_50_distance'] = 0.0
+
+        return indicators
+
+def compute_indicators(bars):
+    """
+    Computes RSI(14), MACD(12,26,9), Bollinger(20,2), RVOL(20), SMA50 and ATR(14)
+    for every symbol in an aligned bar set in one vectorized pass.
+    Returns an IndicatorTable holding the latest value of each indicator.
+    """
+    symbols = bars['symbols']
+    close = bars['close']
+    volume = bars['volume']
+    if not symbols or close.shape[1] == 0:
+        return IndicatorTable([], {name: np.empty(0) for name in ('price', 'volume', 'bars')})
+
+    rsi = rsi_series(close)[:, -1]
+    macd, signal = macd_series(close)
+
+    # Rolling windows only matter at the last bar, so take them straight off the tail
+    bb_middle = rolling_mean_series(close[:, -20:], 20)[:, -1]
+    bb_std = rolling_std_series(close[:, -20:], 20)[:, -1]
+    vol_ma = rolling_mean_series(volume[:, -20:], 20)[:, -1]
+    sma_50 = rolling_mean_series(close[:, -50:], 50)[:, -1]
+    atr = atr_series(bars['high'][:, -15:], bars['low'][:, -15:], close[:, -15:])[:, -1]
+
+    price = close[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rvol = volume[:, -1] / vol_ma
+        sma_50_distance = (price - sma_50) / sma_50 * 100
+
+    columns = {
+        'price': price,
+        'rsi': rsi,
+        'macd': macd[:, -1],
+        'macd_signal': signal[:, -1],
+        'bb_upper': bb_middle + 2 * bb_std,
+        'bb_middle': bb_middle,
+        'bb_lower': bb_middle - 2 * bb_std,
+        'rvol': rvol,
+        'sma_50': sma_50,
+        'sma_50_distance': sma_50_distance,
+        'atr': atr,
+        'volume': np.nan_to_num(volume[:, -1]),
+        'bars': np.sum(~np.isnan(close), axis=1)
+    }
+    return IndicatorTable(symbols, columns)
+
+def compute_indicator_series(bars):
+    """
+    Same indicators as compute_indicators, but for every bar: returns a dict of
+    (symbols x bars) matrices, e.g. for backtesting rules over history.
+    """
+    close = bars['close']
+    volume = bars['volume']
+    macd, signal = macd_series(close)
+    bb_middle = rolling_mean_series(close, 20)
+    bb_std = rolling_std_series(close, 20)
+    sma_50 = rolling_mean_series(close, 50)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rvol = volume / rolling_mean_series(volume, 20)
+        sma_50_distance = (close - sma_50) / sma_50 * 100
+
+    return {
+        'price': close,
+        'rsi': rsi_series(close),
+        'macd': macd,
+        'macd_signal': signal,
+        'bb_upper': bb_middle + 2 * bb_std,
+        'bb_middle': bb_middle,
+        'bb_lower': bb_middle - 2 * bb_std,
+        'rvol': rvol,
+        'sma_50': sma_50,
+        'sma_50_distance': sma_50_distance,
+        'atr': atr_series(bars['high'], bars['low'], close),
+        'volume': np.nan_to_num(volume),
+        'bars': np.cumsum(~np.isnan(close), axis=1)
+    }
+
+# --- Incremental State ---
+
+class IndicatorState:
+    """
+    Per-symbol indicator accumulators that advance in constant time per bar.
+
+    The state is split in two: the committed part (EMA12/26, MACD signal, Wilder RSI
+    averages and ring buffers of the last 50 closes, 20 volumes and 14 true ranges,
+    all as of the last completed bar) and one provisional bar per symbol that quotes
+    revise in place. Indicators for the provisional bar are derived from the committed
+    accumulators plus that bar, so a tick costs O(1). A bar with a newer timestamp
+    commits the provisional bar first.
+    """
+    CLOSE_WINDOW = 50
+    VOLUME_WINDOW = 20
+    TR_WINDOW = 14
+
+    ARRAYS = ('ema_fast', 'ema_slow', 'signal', 'avg_up', 'avg_down', 'prev_close', 'count',
+              'close_ring', 'close_pos', 'volume_ring', 'volume_pos', 'tr_ring', 'tr_pos',
+              'bar_close', 'bar_high', 'bar_low', 'bar_volume', 'bar_timestamp')
+
+    def __init__(self, symbols, arrays):
+        self.symbols = list(symbols)
+        self.index = {sym: i for i, sym in enumerate(self.symbols)}
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def from_bars(cls, bars):
+        """Seeds the state from aligned bars; the last bar becomes the provisional one."""
+        symbols = bars['symbols']
+        close, volume = bars['close'], bars['volume']
+        n, t = close.shape if symbols else (0, 0)
+
+        def tail(x, width):
+            # Last `width` committed columns (everything but the final bar), NaN-padded on the left
+            out = np.full((n, width), np.nan)
+            cols = x[:, max(0, t - 1 - width):t - 1] if t > 1 else np.empty((n, 0))
+            if cols.shape[1]:
+                out[:, width - cols.shape[1]:] = cols
+            return out
+
+        def last(series):
+            # Copy: the state is updated in place and must not write through to `bars`
+            return series[:, -1].copy() if series.shape[1] else np.full(n, np.nan)
+
+        committed = close[:, :-1] if t else close
+        macd, signal = macd_series(committed) if committed.shape[1] else (np.empty((n, 0)),) * 2
+        delta = np.diff(committed, axis=1, prepend=np.nan)
+        tr = true_range_series(bars['high'], bars['low'], close) if t else np.empty((n, 0))
+
+        arrays = {
+            'ema_fast': last(ema_series(committed, 2.0 / 13)) if committed.shape[1] else np.full(n, np.nan),
+            'ema_slow': last(ema_series(committed, 2.0 / 27)) if committed.shape[1] else np.full(n, np.nan),
+            'signal': last(signal),
+            'avg_up': last(ema_series(np.clip(delta, 0, None), 1.0 / 14)) if committed.shape[1] else np.full(n, np.nan),
+            'avg_down': last(ema_series(-np.clip(delta, None, 0), 1.0 / 14)) if committed.shape[1] else np.full(n, np.nan),
+            'prev_close': last(committed),
+            'count': np.sum(~np.isnan(committed), axis=1).astype(np.int64),
+            'close_ring': tail(close, cls.CLOSE_WINDOW),
+            'close_pos': np.zeros(n, dtype=np.int64),
+            'volume_ring': tail(volume, cls.VOLUME_WINDOW),
+            'volume_pos': np.zeros(n, dtype=np.int64),
+            'tr_ring': tail(tr, cls.TR_WINDOW),
+            'tr_pos': np.zeros(n, dtype=np.int64),
+            'bar_close': last(close),
+            'bar_high': last(bars['high']) if t else np.full(n, np.nan),
+            'bar_low': last(bars['low']) if t else np.full(n, np.nan),
+            'bar_volume': last(volume),
+            'bar_timestamp': np.full(n, bars['timestamps'][-1] if t else np.nan)
+        }
+        return cls(symbols, arrays)
+
+    # --- Persistence ---
+
+    def save(self, path):
+        np.savez(path, symbols=np.array(self.symbols), **{name: getattr(self, name) for name in self.ARRAYS})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls([str(s) for s in f['symbols']], {name: f[name].copy() for name in cls.ARRAYS})
+
+    # --- Updates ---
+
+    def _commit(self, rows):
+        """Folds the provisional bar of `rows` into the committed accumulators."""
+        rows = rows[~np.isnan(self.bar_close[rows])]
+        if not len(rows):
+            return
+        p = self.bar_close[rows]
+        prev = self.prev_close[rows]
+
+        self.ema_fast[rows] = _ema_step(self.ema_fast[rows], p, 2.0 / 13)
+        self.ema_slow[rows] = _ema_step(self.ema_slow[rows], p, 2.0 / 27)
+        self.signal[rows] = _ema_step(self.signal[rows], self.ema_fast[rows] - self.ema_slow[rows], 2.0 / 10)
+
+        delta = p - prev
+        self.avg_up[rows] = _ema_step(self.avg_up[rows], np.clip(delta, 0, None), 1.0 / 14)
+        self.avg_down[rows] = _ema_step(self.avg_down[rows], -np.clip(delta, None, 0), 1.0 / 14)
+
+        tr = _true_range(self.bar_high[rows], self.bar_low[rows], prev)
+        for ring, pos, value in ((self.close_ring, self.close_pos, p),
+                                 (self.volume_ring, self.volume_pos, self.bar_volume[rows]),
+                                 (self.tr_ring, self.tr_pos, tr)):
+            ring[rows, pos[rows]] = value
+            pos[rows] = (pos[rows] + 1) % ring.shape[1]
+
+        self.prev_close[rows] = p
+        self.count[rows] += 1
+
+    def update(self, symbol, close, volume=None, high=None, low=None, timestamp=None):
+        """
+        Applies a bar or quote for one symbol in O(1).
+        A timestamp newer than the provisional bar starts a new bar; otherwise the
+        provisional bar is revised (close replaced, high/low extended, volume replaced).
+        Returns False if the symbol isn't tracked.
+        """
+        row = self.index.get(symbol)
+        if row is None:
+            return False
+        rows = np.array([row])
+
+        if timestamp is not None and (np.isnan(self.bar_timestamp[row]) or timestamp > self.bar_timestamp[row]):
+            self._commit(rows)
+            self.bar_timestamp[row] = timestamp
+            self.bar_high[row] = high if high is not None else close
+            self.bar_low[row] = low if low is not None else close
+            self.bar_volume[row] = volume if volume is not None else 0.0
+        else:
+            self.bar_high[row] = high if high is not None else np.fmax(self.bar_high[row], close)
+            self.bar_low[row] = low if low is not None else np.fmin(self.bar_low[row], close)
+            if volume is not None:
+                self.bar_volume[row] = volume
+        self.bar_close[row] = close
+        return True
+
+    # --- Readout ---
+
+    def snapshot(self):
+        """Indicators as of each symbol's provisional bar, as an IndicatorTable."""
+        p = self.bar_close
+        rows = np.arange(len(self.symbols))
+
+        ema_fast = _ema_step(self.ema_fast, p, 2.0 / 13)
+        ema_slow = _ema_step(self.ema_slow, p, 2.0 / 27)
+        macd = ema_fast - ema_slow
+        signal = _ema_step(self.signal, macd, 2.0 / 10)
+
+        delta = p - self.prev_close
+        avg_up = _ema_step(self.avg_up, np.clip(delta, 0, None), 1.0 / 14)
+        avg_down = _ema_step(self.avg_down, -np.clip(delta, None, 0), 1.0 / 14)
+
+        # Rolling windows: committed window minus the value that drops out, plus the new bar
+        closes = np.concatenate([self._window(self.close_ring, self.close_pos, rows), p[:, None]], axis=1)
+        volumes = np.concatenate([self._window(self.volume_ring, self.volume_pos, rows), self.bar_volume[:, None]], axis=1)
+        trs = np.concatenate([self._window(self.tr_ring, self.tr_pos, rows),
+                              _true_range(self.bar_high, self.bar_low, self.prev_close)[:, None]], axis=1)
+
+        bb_window = closes[:, -20:]
+        bb_middle = np.mean(bb_window, axis=1)
+        bb_std = np.std(bb_window, axis=1, ddof=1)
+        sma_50 = np.mean(closes[:, -50:], axis=1)
+        vol_ma = np.mean(volumes[:, -20:], axis=1)
+        atr = np.mean(trs[:, -14:], axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + avg_up / avg_down))
+            rvol = self.bar_volume / vol_ma
+            sma_50_distance = (p - sma_50) / sma_50 * 100
+
+        columns = {
+            'price': p.copy(),
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': signal,
+            'bb_upper': bb_middle + 2 * bb_std,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_middle - 2 * bb_std,
+            'rvol': rvol,
+            'sma_50': sma_50,
+            'sma_50_distance': sma_50_distance,
+            'atr': atr,
+            'volume': np.nan_to_num(self.bar_volume),
+            'bars': self.count + ~np.isnan(p)
+        }
+        return IndicatorTable(self.symbols, columns)
+
+    def live_values(self, symbol):
+        """RSI and RVOL of one symbol's provisional bar in O(1), or None if untracked."""
+        row = self.index.get(symbol)
+        if row is None:
+            return None
+        p = self.bar_close[row]
+        delta = p - self.prev_close[row]
+        avg_up = _ema_step(self.avg_up[row], max(delta, 0.0), 1.0 / 14)
+        avg_down = _ema_step(self.avg_down[row], max(-delta, 0.0), 1.0 / 14)
+        volumes = np.append(self._window(self.volume_ring, self.volume_pos, np.array([row]))[0], self.bar_volume[row])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {
+                'rsi': float(100 - (100 / (1 + avg_up / avg_down))),
+                'rvol': float(self.bar_volume[row] / np.mean(volumes[-20:]))
+            }
+
+    def _window(self, ring, pos, rows):
+        """Committed ring contents for `rows`, oldest first, without its oldest value
+        (that one drops out when the provisional bar is appended)."""
+        width = ring.shape[1]
+        order = (pos[rows, None] + np.arange(1, width)) % width
+        return ring[rows[:, None], order]
+
+def _ema_step(state, value, alpha):
+    """One EMA step; NaN state seeds from the value, NaN value leaves the state alone."""
+    with np.errstate(invalid='ignore'):
+        return np.where(np.isnan(state), value, np.where(np.isnan(value), state, state + alpha * (value - state)))
+
+def _true_range(high, low, prev_close):
+    with np.errstate(invalid='ignore'):
+        return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 import json
 import random
 import time
@@ -257,6 +258,20 @@ class MainWindow(QMainWindow):
         header_layout.addWidget(title)
         header_layout.addStretch()
         
+        self.rs_sort_btn = QPushButton("RS")
+        self.rs_sort_btn.setCheckable(True)
+        self.rs_sort_btn.setCursor(Qt.PointingHandCursor)
+        self.rs_sort_btn.setToolTip("Sort by relative strength")
+        self.rs_sort_btn.setFixedWidth(40)
+        self.rs_sort_btn.toggled.connect(self.sort_watchlist)
+        header_layout.addWidget(self.rs_sort_btn)
+        
+        self.watchlist_filter = QLineEdit()
+        self.watchlist_filter.setPlaceholderText("Filter")
+        self.watchlist_filter.setFixedWidth(80)
+        self.watchlist_filter.setClearButtonEnabled(True)
+        header_layout.addWidget(self.watchlist_filter)
+        
         self.stock_input = QLineEdit()
         self.stock_input.setPlaceholderText("+ Add Symbol")
         self.stock_input.setFixedWidth(100)
@@ -265,21 +280,20 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(header_layout)
         
-        # No internal scroll needed if main page scrolls, but keeping it for list management
-        # Actually, if main page scrolls, internal scrolls can be annoying. 
-        # Let's make it a simple layout for now, or keep scroll if list is long.
-        # Keeping scroll for watchlist specifically as it can get very long.
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("background: transparent; border: none;")
-        
-        self.watchlist_container = QWidget()
-        self.watchlist_layout = QVBoxLayout(self.watchlist_container)
-        self.watchlist_layout.setSpacing(10)
-        self.watchlist_layout.setContentsMargins(0, 0, 0, 0)
-        scroll.setWidget(self.watchlist_container)
-        
-        layout.addWidget(scroll)
+        # Virtualized list: rows are painted from the model, so long watchlists cost
+        # only the rows on screen (see ui_components.WatchlistModel)
+        self.watchlist_model = ui_components.WatchlistModel(self)
+        self.watchlist_view = ui_components.WatchlistView(self.watchlist_model)
+        self.watchlist_view.setMinimumHeight(300)
+        self.watchlist_view.symbol_clicked.connect(self.show_detail)
+        self.watchlist_filter.textChanged.connect(self.watchlist_model.set_filter)
+        layout.addWidget(self.watchlist_view)
+        
+        self.watchlist_empty = QLabel("No stocks tracked.")
+        self.watchlist_empty.setStyleSheet(f"color: {styles.COLORS['text_secondary']}; font-style: italic;")
+        self.watchlist_empty.setAlignment(Qt.AlignCenter)
+        self.watchlist_empty.hide()
+        layout.addWidget(self.watchlist_empty)
         
         return card
 
@@ -287,6 +301,7 @@ class MainWindow(QMainWindow):
         self.refresh_indices()
         self.refresh_watchlist()
         self.refresh_performers()
+        self.settings_view.refresh_screens()
         self.update_last_update_time()
 
     def refresh_indices(self):
@@ -295,54 +310,34 @@ class MainWindow(QMainWindow):
         self.threadpool.start(worker)
 
     def update_indices_ui(self, indices):
-        self.clear_layout(self.indices_card.findChild(QVBoxLayout, "marketIndices_content"))
+        # Keyed by symbol: refreshes update existing cards instead of rebuilding them
         layout = self.indices_card.findChild(QVBoxLayout, "marketIndices_content")
-        for data in indices:
-            card = ui_components.TickerCard(data)
-            card.clicked.connect(lambda s=data['symbol']: self.show_detail(s))
-            layout.addWidget(card)
+        ui_components.reconcile_cards(layout, indices, self.show_detail)
 
     def refresh_watchlist(self):
-        self.clear_layout(self.watchlist_layout)
+        # Rows already loaded keep showing their last quote until the new one arrives
+        self.watchlist_model.set_symbols(self.watchlist_symbols)
+        self.watchlist_empty.setVisible(not self.watchlist_symbols)
+        self.watchlist_view.setVisible(bool(self.watchlist_symbols))
         if not self.watchlist_symbols:
-            empty_label = QLabel("No stocks tracked.")
-            empty_label.setStyleSheet(f"color: {styles.COLORS['text_secondary']}; font-style: italic;")
-            empty_label.setAlignment(Qt.AlignCenter)
-            self.watchlist_layout.addWidget(empty_label)
             return
 
-        self.watchlist_queue = list(self.watchlist_symbols)
-        self.process_watchlist_batch()
+        # Cached quotes first so the list fills at once, then one bulk fetch for the rest
+        worker = Worker(data_service.get_watchlist_quotes, list(self.watchlist_symbols), cached=True)
+        worker.signals.result.connect(self.update_watchlist_cached_ui)
+        self.threadpool.start(worker)
 
-    def process_watchlist_batch(self):
-        if not self.watchlist_queue:
-            return
-            
-        batch_size = 3
-        batch = self.watchlist_queue[:batch_size]
-        self.watchlist_queue = self.watchlist_queue[batch_size:]
+    def update_watchlist_cached_ui(self, data_list):
+        self.watchlist_model.update_rows(data_list)
         
-        worker = Worker(self.fetch_watchlist_batch_data, batch)
-        worker.signals.result.connect(self.update_watchlist_batch_ui)
+        # Started only now so cached rows can't overwrite fresher ones
+        worker = Worker(data_service.get_watchlist_quotes, list(self.watchlist_symbols))
+        worker.signals.result.connect(self.watchlist_model.update_rows)
         self.threadpool.start(worker)
 
-    def fetch_watchlist_batch_data(self, symbols):
-        results = []
-        for symbol in symbols:
-            data = data_service.fetch_stock_data(symbol)
-            if data:
-                results.append(data)
-        return results
-
-    def update_watchlist_batch_ui(self, data_list):
-        for data in data_list:
-            card = ui_components.TickerCard(data)
-            card.clicked.connect(lambda s=data['symbol']: self.show_detail(s))
-            self.watchlist_layout.addWidget(card)
-        
-        # Continue with next batch
-        if self.watchlist_queue:
-            QTimer.singleShot(100, self.process_watchlist_batch)
+    def sort_watchlist(self):
+        """Orders the watchlist by RS (strongest first) when the RS toggle is on, else as added."""
+        self.watchlist_model.set_sort('rs' if self.rs_sort_btn.isChecked() else None)
 
     def refresh_performers(self):
         worker = Worker(data_service.get_top_gainers_losers)
@@ -352,19 +347,11 @@ class MainWindow(QMainWindow):
     def update_performers_ui(self, data_tuple):
         gainers, losers = data_tuple
         
-        self.clear_layout(self.best_performers_card.findChild(QVBoxLayout, "bestPerformers_content"))
         best_layout = self.best_performers_card.findChild(QVBoxLayout, "bestPerformers_content")
-        for data in gainers[:3]:
-            card = ui_components.TickerCard(data)
-            card.clicked.connect(lambda s=data['symbol']: self.show_detail(s))
-            best_layout.addWidget(card)
+        ui_components.reconcile_cards(best_layout, gainers[:3], self.show_detail)
             
-        self.clear_layout(self.worst_performers_card.findChild(QVBoxLayout, "worstPerformers_content"))
         worst_layout = self.worst_performers_card.findChild(QVBoxLayout, "worstPerformers_content")
-        for data in losers[:3]:
-            card = ui_components.TickerCard(data)
-            card.clicked.connect(lambda s=data['symbol']: self.show_detail(s))
-            worst_layout.addWidget(card)
+        ui_components.reconcile_cards(worst_layout, losers[:3], self.show_detail)
 
     def update_last_update_time(self):
         from datetime import datetime
@@ -392,14 +379,6 @@ class MainWindow(QMainWindow):
         with open("watchlist.json", "w") as f:
             json.dump(self.watchlist_symbols, f)
 
-    def clear_layout(self, layout):
-        if layout is not None:
-            while layout.count():
-                item = layout.takeAt(0)
-                widget = item.widget()
-                if widget is not None:
-                    widget.deleteLater()
-
     def show_dashboard(self):
         self.stack.setCurrentIndex(0)
         self.update_sidebar_state("Dashboard")
@@ -426,19 +405,23 @@ class MainWindow(QMainWindow):
         self.sector_popup.show()
 
     def _on_sector_data_ready(self, data):
-        if self.sector_popup and isinstance(data, tuple) and len(data) == 2:
-            sector_data, performers = data
-            self.sector_popup.set_data(sector_data, performers)
+        if self.sector_popup and isinstance(data, tuple) and len(data) in (2, 3):
+            self.sector_popup.set_data(*data)
         
     def _fetch_sector_data(self, sector_name, progress_callback=None):
-        # 1. Try to get data from existing cache first (fastest, no API)
+        # 1. Cap-weighted sector index from stored bars and live quotes (no API)
+        index_data = data_service.get_sector_index_data(sector_name)
+        if index_data:
+            return index_data
+            
+        # 2. No bars stored for this sector yet: aggregate cached quotes
         all_tickers = data_service.get_all_cached_tickers()
         sector_data, performers = data_service.get_sector_details_from_tickers(sector_name, all_tickers)
         
         if sector_data and (performers['top'] or performers['bottom']):
             return (sector_data, performers)
             
-        # 2. Fallback: Fetch fresh data
+        # 3. Fallback: Fetch fresh data
         # Fetch performers (this fetches real data for ~10 stocks)
         performers = data_service.get_sector_performers(sector_name)
         
@@ -610,6 +593,10 @@ class MainWindow(QMainWindow):
         
         # self.sector_view removed (replaced by popup)
         
+        # Desktop notifications for triggered alerts
+        self.alert_notifier = ui_components.AlertNotifier(self)
+        self.alert_notifier.alert_received.connect(self.detail_view.alerts_panel.on_alert)
+        
         self.settings_view = ui_components.SettingsView()
         if hasattr(self.settings_view, 'profile_changed'):
             self.settings_view.profile_changed.connect(self.on_risk_profile_changed)
@@ -663,6 +650,7 @@ class MainWindow(QMainWindow):
         QTimer.singleShot(100, self.refresh_all_data)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # Sharded scanner workers in frozen builds
     app = QApplication(sys.argv)
     
     # Splash Screen
@@ -0,0 +1,105 @@
+# outcome_tracker.py
+"""
+Outcome tracking for logged trade ideas.
+
+Every OPEN idea is checked against the bars that came after it was logged: the
+first bar touching its stop or target closes it (a bar touching both counts as a
+stop, as in the backtester), an idea still open after its horizon expires at that
+close, and anything else is marked to market. Ideas are evaluated in bulk, one
+padded (ideas x holding bars) window per pass, and only ideas whose symbol has
+bars newer than the ones they were last evaluated against are touched.
+"""
+import calendar
+from datetime import datetime, timezone
+import numpy as np
+
+import scanner
+from backtester import HORIZON_DAYS
+
+OPEN, CLOSED, EXPIRED = "OPEN", "CLOSED", "EXPIRED"
+HOLD_DAYS = dict(zip(scanner.HORIZONS, HORIZON_DAYS))
+DEFAULT_HOLD_DAYS = HORIZON_DAYS[1]
+
+def _logged_at(idea):
+    """created_at as a bar_store timestamp: epoch seconds of the wall-clock time, no timezone shift."""
+    try:
+        return calendar.timegm(datetime.fromisoformat(idea['created_at']).timetuple())
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def _bar_date(timestamp):
+    """ISO date of a bar_store timestamp (wall-clock epoch, so read it as UTC)."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).date().isoformat()
+
+def needs_update(idea, bars):
+    """True if `bars` (bar_store rows) hold anything the idea hasn't been evaluated against."""
+    if idea.get('status', OPEN) != OPEN or not len(bars):
+        return False
+    # A newer bar, or a revision of the (provisional) last one
+    return (bars[-1, 0] > idea.get('evaluated_through', -np.inf) or
+            round(float(bars[-1, 4]), 2) != idea.get('last_price'))
+
+def evaluate(ideas, bars_by_symbol):
+    """
+    Updates OPEN ideas in place from bar_store rows per symbol and returns the number
+    of ideas changed. Fills status, exit_reason, exit_price, closed_at, result_pct
+    (exit or mark-to-market return vs entry), bars_held, last_price and evaluated_through.
+    """
+    pending = []
+    for idea in ideas:
+        bars = bars_by_symbol.get(idea.get('symbol'))
+        setup = idea.get('trade_setup') or {}
+        logged_at = _logged_at(idea)
+        if bars is None or logged_at is None or not setup.get('entry') or not needs_update(idea, bars):
+            continue
+        pending.append((idea, bars, setup, logged_at))
+    if not pending:
+        return 0
+
+    # Pad each idea's post-entry bars into one (ideas x max hold) window
+    hold = np.array([HOLD_DAYS.get(setup.get('time_horizon'), DEFAULT_HOLD_DAYS) for _, _, setup, _ in pending])
+    width = int(hold.max())
+    n = len(pending)
+    high = np.full((n, width), np.nan)
+    low = np.full((n, width), np.nan)
+    close = np.full((n, width), np.nan)
+    stamps = np.full((n, width), np.nan)
+    for row, (idea, bars, setup, logged_at) in enumerate(pending):
+        start = np.searchsorted(bars[:, 0], logged_at, side='right') # First bar after the idea was logged
+        window = bars[start:start + hold[row]]
+        k = len(window)
+        stamps[row, :k], high[row, :k], low[row, :k], close[row, :k] = window[:, 0], window[:, 2], window[:, 3], window[:, 4]
+
+    entry = np.array([float(setup['entry']) for _, _, setup, _ in pending])
+    stop = np.array([float(setup.get('stop', 0.0)) for _, _, setup, _ in pending])
+    target = np.array([float(setup.get('target', np.inf)) for _, _, setup, _ in pending])
+
+    known = ~np.isnan(close)
+    hit_stop = known & (low <= stop[:, None])
+    hit_target = known & (high >= target[:, None])
+    hit = hit_stop | hit_target
+    first_hit = np.where(hit.any(axis=1), hit.argmax(axis=1), -1)
+    bars_seen = known.sum(axis=1)
+
+    for row, (idea, bars, setup, logged_at) in enumerate(pending):
+        j = first_hit[row]
+        if j >= 0:
+            is_stop = hit_stop[row, j]
+            exit_price = stop[row] if is_stop else target[row]
+            idea.update(status=CLOSED, exit_reason="STOP" if is_stop else "TARGET", bars_held=int(j + 1),
+                        closed_at=_bar_date(stamps[row, j]))
+        elif bars_seen[row] >= hold[row]:
+            j = hold[row] - 1
+            exit_price = close[row, j]
+            idea.update(status=EXPIRED, exit_reason="EXPIRED", bars_held=int(hold[row]),
+                        closed_at=_bar_date(stamps[row, j]))
+        else:
+            exit_price = close[row, bars_seen[row] - 1] if bars_seen[row] else bars[-1, 4]
+            idea.update(bars_held=int(bars_seen[row]))
+
+        if idea.get('status', OPEN) != OPEN:
+            idea['exit_price'] = round(float(exit_price), 2)
+        idea['result_pct'] = round(float(exit_price / entry[row] - 1) * 100, 2)
+        idea['last_price'] = round(float(bars[-1, 4]), 2)
+        idea['evaluated_through'] = float(bars[-1, 0])
+    return n
@@ -0,0 +1,156 @@
+# regime_engine.py
+"""
+Market regime history for any symbol and bar interval.
+
+Classifies every bar (not just the last one) with the detect_market_regime rules:
+trend from price vs the 20/50 SMA, volatility bucket from the 14-bar high-low
+range as % of price, and a regime label from the two. A RegimeHistory is stored
+under cache/regimes and extended with only the bars it hasn't seen, so refreshes
+are lookups and the series can be plotted or joined against other history.
+"""
+import os
+import numpy as np
+
+from indicator_engine import rolling_mean_series
+
+REGIMES_DIR = os.path.join("cache", "regimes")
+MIN_BARS = 50 # 50 SMA
+TAIL_BARS = MIN_BARS # Bars of context needed to classify one more bar
+
+TRENDS = ("SIDEWAYS", "STRONG UPTREND", "STRONG DOWNTREND", "UPTREND", "DOWNTREND")
+VOLATILITIES = ("NORMAL", "HIGH", "LOW")
+REGIMES = ("NEUTRAL", "BULLISH GRIND", "VOLATILE BULL", "BEARISH", "CHOPPY")
+DESCRIPTIONS = {
+    "NEUTRAL": "Market is directionless.",
+    "BULLISH GRIND": "Steady uptrend with low volatility. Buy dips.",
+    "VOLATILE BULL": "Uptrend but choppy. Wide stops needed.",
+    "BEARISH": "Market in correction. Cash is king.",
+    "CHOPPY": "No clear trend and high risk. Reduce size."
+}
+
+def classify(high, low, close):
+    """
+    Classifies every bar of one series. Returns a dict of arrays: sma_20, sma_50,
+    atr_pct and trend/volatility/regime codes (-1 for bars with under 50 bars of history).
+    """
+    close = np.asarray(close, dtype=np.float64)[None, :]
+    high_low = (np.asarray(high, dtype=np.float64) - np.asarray(low, dtype=np.float64))[None, :]
+
+    sma_20 = rolling_mean_series(close, 20)[0]
+    sma_50 = rolling_mean_series(close, 50)[0]
+    atr_14 = rolling_mean_series(high_low, 14)[0]
+    price = close[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        atr_pct = atr_14 / price * 100
+
+    # 1. Trend (first matching rule wins)
+    trend = np.select([(price > sma_20) & (sma_20 > sma_50), (price < sma_20) & (sma_20 < sma_50),
+                       price > sma_50, price < sma_50], [1, 2, 3, 4], 0)
+
+    # 2. Volatility
+    volatility = np.select([atr_pct > 1.5, atr_pct < 0.5], [1, 2], 0)
+
+    # 3. Regime
+    regime = np.select([(trend == 1) & (volatility == 2), (trend == 1) & (volatility == 1),
+                        trend == 2, (trend == 0) & (volatility == 1)], [1, 2, 3, 4], 0)
+
+    known = ~np.isnan(sma_50)
+    return {
+        'sma_20': sma_20, 'sma_50': sma_50, 'atr_pct': atr_pct,
+        'trend': np.where(known, trend, -1), 'volatility': np.where(known, volatility, -1),
+        'regime': np.where(known, regime, -1)
+    }
+
+class RegimeHistory:
+    """Per-bar regime series for one symbol/interval, kept alongside the bars it was built from."""
+    FIELDS = ('timestamp', 'high', 'low', 'close', 'sma_20', 'sma_50', 'atr_pct', 'trend', 'volatility', 'regime')
+
+    def __init__(self, symbol, interval="1d", data=None):
+        self.symbol = symbol
+        self.interval = interval
+        self.data = data if data is not None else {name: np.empty(0) for name in self.FIELDS}
+
+    def __len__(self):
+        return len(self.data['timestamp'])
+
+    @property
+    def last_timestamp(self):
+        return self.data['timestamp'][-1] if len(self) else None
+
+    def extend(self, bars):
+        """
+        Adds bar_store rows [timestamp, open, high, low, close, volume]. Bars at or after
+        the first new timestamp are replaced, and only they (plus 50 bars of context)
+        are reclassified. Returns the number of bars (re)classified.
+        """
+        if bars is None or not len(bars):
+            return 0
+        bars = np.asarray(bars)
+        keep = np.searchsorted(self.data['timestamp'], bars[0, 0]) # Drop revised/overlapping bars
+        start = max(0, keep - TAIL_BARS)
+
+        timestamp = np.concatenate([self.data['timestamp'][:keep], bars[:, 0]])
+        high = np.concatenate([self.data['high'][:keep], bars[:, 2]])
+        low = np.concatenate([self.data['low'][:keep], bars[:, 3]])
+        close = np.concatenate([self.data['close'][:keep], bars[:, 4]])
+
+        tail = classify(high[start:], low[start:], close[start:])
+        new = slice(keep - start, None)
+        data = {'timestamp': timestamp, 'high': high, 'low': low, 'close': close}
+        for name in ('sma_20', 'sma_50', 'atr_pct', 'trend', 'volatility', 'regime'):
+            data[name] = np.concatenate([self.data[name][:keep], tail[name][new]])
+        self.data = data
+        return len(bars)
+
+    def row(self, i):
+        """Regime details for bar i, in the detect_market_regime format."""
+        regime_code = int(self.data['regime'][i])
+        if regime_code < 0:
+            return None
+        regime = REGIMES[regime_code]
+        return {
+            "regime": regime,
+            "trend": TRENDS[int(self.data['trend'][i])],
+            "volatility": VOLATILITIES[int(self.data['volatility'][i])],
+            "description": DESCRIPTIONS[regime],
+            "sma_20": round(float(self.data['sma_20'][i]), 2),
+            "sma_50": round(float(self.data['sma_50'][i]), 2),
+            "atr_pct": round(float(self.data['atr_pct'][i]), 2),
+            "timestamp": float(self.data['timestamp'][i])
+        }
+
+    def latest(self):
+        return self.row(-1) if len(self) else None
+
+    def at(self, timestamp):
+        """Regime in force at `timestamp` (the last bar at or before it)."""
+        i = np.searchsorted(self.data['timestamp'], timestamp, side='right') - 1
+        return self.row(i) if i >= 0 else None
+
+    def series(self, name='regime'):
+        """(timestamps, values) for plotting or joining against other history."""
+        return self.data['timestamp'], self.data[name]
+
+    # --- Persistence ---
+
+    def path(self):
+        return os.path.join(REGIMES_DIR, f"{self.symbol}_{self.interval}.npz")
+
+    def save(self):
+        try:
+            os.makedirs(REGIMES_DIR, exist_ok=True)
+            np.savez(self.path(), **self.data)
+        except Exception as e:
+            print(f"Error saving regime history for {self.symbol}: {e}")
+
+    @classmethod
+    def load(cls, symbol, interval="1d"):
+        """Stored history, or an empty one if there is none."""
+        history = cls(symbol, interval)
+        if os.path.exists(history.path()):
+            try:
+                with np.load(history.path()) as f:
+                    history.data = {name: f[name] for name in cls.FIELDS}
+            except Exception as e:
+                print(f"Error reading regime history for {symbol}: {e}")
+        return history
@@ -0,0 +1,162 @@
+# relative_strength.py
+"""
+Universe relative-strength ranking.
+
+From one aligned close matrix (bar_store.get_aligned_bars) this computes, for every
+symbol and for 1w/1m/3m/6m: the period return, its excess over the market benchmark
+and over the symbol's sector ETF, and percentile ranks (0-100) of the return across
+the whole universe and within the symbol's sector. A composite RS score weights the
+market ranks toward the longer periods. Everything is array operations over the
+return matrix; only the per-sector ranking loops, once per sector. rs_series gives
+the composite for every date of the matrix, for backtests.
+"""
+import numpy as np
+
+PERIODS = {'1w': 5, '1m': 21, '3m': 63, '6m': 126}
+COMPOSITE_WEIGHTS = {'1w': 0.1, '1m': 0.2, '3m': 0.3, '6m': 0.4}
+MIN_PEERS = 3 # Sector ranks need at least this many ranked symbols in the sector
+LOOKBACK_BARS = max(PERIODS.values()) + 1
+
+class RSTable:
+    """Relative-strength columns over `symbols`: return_/vs_market_/vs_sector_/rank_/sector_rank_<period>, rs, sector_rs."""
+    def __init__(self, symbols, columns, last_timestamp=None):
+        self.symbols = list(symbols)
+        self.columns = columns
+        self.index = {sym: i for i, sym in enumerate(self.symbols)}
+        self.last_timestamp = last_timestamp
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def column(self, name, symbols=None):
+        """One column for `symbols` (default: all); NaN where unknown."""
+        col = self.columns[name]
+        if symbols is None:
+            return col
+        return np.array([col[self.index[s]] if s in self.index else np.nan for s in symbols])
+
+    def row(self, symbol):
+        """All columns for one symbol, rounded (None values where unknown), or None if missing."""
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+        return {name: (round(float(col[i]), 2) if np.isfinite(col[i]) else None) for name, col in self.columns.items()}
+
+def percentile_rank(values):
+    """Percentile (0-100) of each value among the finite ones; ties share their average rank."""
+    out = np.full(len(values), np.nan)
+    known = np.isfinite(values)
+    n = known.sum()
+    if n == 0:
+        return out
+    if n == 1:
+        out[known] = 50.0
+        return out
+    ordered = np.sort(values[known])
+    below = np.searchsorted(ordered, values[known], side='left')
+    at_or_below = np.searchsorted(ordered, values[known], side='right')
+    out[known] = (below + (at_or_below - below - 1) / 2) / (n - 1) * 100
+    return out
+
+def percentile_rank_columns(values):
+    """percentile_rank applied to every column of a (N, T) matrix at once."""
+    n, t = values.shape
+    order = np.argsort(values, axis=0, kind='stable') # NaN sorts last
+    ordered = np.take_along_axis(values, order, axis=0)
+    position = np.broadcast_to(np.arange(n)[:, None], (n, t))
+    new_run = np.ones((n, t), dtype=bool)
+    new_run[1:] = ordered[1:] != ordered[:-1]
+    run_end = np.ones((n, t), dtype=bool)
+    run_end[:-1] = new_run[1:]
+    # First and last position of each run of equal values, spread over the run
+    first = np.maximum.accumulate(np.where(new_run, position, 0), axis=0)
+    last = np.minimum.accumulate(np.where(run_end, position, n)[::-1], axis=0)[::-1]
+    count = np.isfinite(values).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ranks = np.where(count > 1, (first + last) / 2 / (count - 1) * 100, 50.0)
+    ranks = np.where(np.isfinite(ordered), ranks, np.nan)
+    out = np.empty((n, t))
+    np.put_along_axis(out, order, ranks, axis=0)
+    return out
+
+def rs_series(close, ranked=None):
+    """
+    Composite RS (0-100) for every symbol on every date of a (N, T) close matrix, each
+    date ranked only on closes known by then; the `rs` column compute() would return
+    at that date. Dates without a period's history leave that period out.
+    """
+    n, t = close.shape
+    ranked = np.ones(n, dtype=bool) if ranked is None else np.asarray(ranked, dtype=bool)
+    composite = np.zeros((n, t))
+    weight = np.zeros((n, t))
+    for period, days in PERIODS.items():
+        returns = np.full((n, t), np.nan)
+        if t > days:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns[:, days:] = (close[:, days:] / close[:, :-days] - 1) * 100
+        rank = percentile_rank_columns(np.where(ranked[:, None], returns, np.nan))
+        known = np.isfinite(rank)
+        composite += np.where(known, rank, 0.0) * COMPOSITE_WEIGHTS[period]
+        weight += known * COMPOSITE_WEIGHTS[period]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(weight > 0, composite / weight, np.nan)
+
+def compute(bars, benchmark, sectors=None, ranked=None):
+    """
+    Builds an RSTable for every symbol in `bars`. `benchmark` is the market symbol
+    (must be one of the aligned rows for vs_market columns); `sectors` gives each
+    symbol's sector ETF (or None), which is also looked up among the rows. Only rows
+    in the `ranked` mask (default: all) take part in, and get, percentile ranks, so
+    reference series like the benchmark can be aligned without being ranked.
+    """
+    symbols = bars['symbols']
+    close = bars['close']
+    n, t = close.shape
+    row_of = {sym: i for i, sym in enumerate(symbols)}
+    sectors = list(sectors) if sectors is not None else [None] * n
+    sector_codes = np.array([s or '' for s in sectors], dtype=object)
+    market_row = row_of.get(benchmark)
+    sector_rows = np.array([row_of.get(s, -1) if s else -1 for s in sectors])
+    ranked = np.ones(n, dtype=bool) if ranked is None else np.asarray(ranked, dtype=bool)
+    sector_codes = np.where(ranked, sector_codes, '')
+
+    columns = {}
+    composite = np.zeros(n)
+    weight = np.zeros(n)
+    for period, days in PERIODS.items():
+        if t > days:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns = (close[:, -1] / close[:, -1 - days] - 1) * 100
+        else:
+            returns = np.full(n, np.nan)
+
+        market = returns[market_row] if market_row is not None else np.nan
+        sector = np.where(sector_rows >= 0, returns[sector_rows], np.nan)
+
+        rank = percentile_rank(np.where(ranked, returns, np.nan))
+        sector_rank = np.full(n, np.nan)
+        for code in np.unique(sector_codes[sector_codes != '']):
+            members = np.flatnonzero(sector_codes == code)
+            if np.isfinite(returns[members]).sum() >= MIN_PEERS:
+                sector_rank[members] = percentile_rank(returns[members])
+
+        columns[f'return_{period}'] = returns
+        columns[f'vs_market_{period}'] = returns - market
+        columns[f'vs_sector_{period}'] = returns - sector
+        columns[f'rank_{period}'] = rank
+        columns[f'sector_rank_{period}'] = sector_rank
+
+        known = np.isfinite(rank)
+        composite += np.where(known, rank, 0.0) * COMPOSITE_WEIGHTS[period]
+        weight += known * COMPOSITE_WEIGHTS[period]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        columns['rs'] = np.where(weight > 0, composite / weight, np.nan)
+    sector_rs = np.full(n, np.nan)
+    for code in np.unique(sector_codes[sector_codes != '']):
+        members = np.flatnonzero(sector_codes == code)
+        if np.isfinite(columns['rs'][members]).sum() >= MIN_PEERS:
+            sector_rs[members] = percentile_rank(columns['rs'][members])
+    columns['sector_rs'] = sector_rs
+
+    return RSTable(symbols, columns, last_timestamp=bars['timestamps'][-1] if t else None)
@@ -0,0 +1,81 @@
+# resampler.py
+"""
+Local OHLCV resampling.
+
+Builds coarser bars from stored finer ones (bar_store rows [timestamp, open, high,
+low, close, volume]) instead of downloading every interval separately: weekly and
+monthly bars from daily bars, and 15m/30m/1h bars from 1m or 5m bars. Aggregation
+is first open, max high, min low, last close, summed volume. Intraday buckets are
+aligned to the session open (9:30 exchange time), like Yahoo's own 1h bars, and
+never span two sessions; weekly bars are labeled by their Monday and monthly bars
+by the first of the month, matching the daily-bar convention of bar_store.
+"""
+import numpy as np
+
+DAY = 86400
+SESSION_OPEN = 9 * 3600 + 30 * 60 # 9:30 exchange wall-clock
+
+# Target interval -> bucket width in seconds (intraday only)
+INTRADAY_SECONDS = {'1m': 60, '2m': 120, '5m': 300, '15m': 900, '30m': 1800, '60m': 3600, '90m': 5400, '1h': 3600}
+
+def bucket_starts(timestamps, interval):
+    """Start timestamp of the `interval` bucket each bar falls in."""
+    t = np.asarray(timestamps, dtype=np.float64)
+    if interval in INTRADAY_SECONDS:
+        width = INTRADAY_SECONDS[interval]
+        day = np.floor(t / DAY) * DAY
+        open_ = day + SESSION_OPEN
+        # Pre-market bars fall in buckets counted back from the open, within the same day
+        return open_ + np.floor((t - open_) / width) * width
+    days = np.floor(t / DAY).astype(np.int64)
+    if interval == '1d':
+        return days * float(DAY)
+    if interval == '1wk':
+        # 1970-01-01 was a Thursday: shift so weeks start on Monday
+        return ((days + 3) // 7 * 7 - 3) * float(DAY)
+    if interval == '1mo':
+        months = days.astype('datetime64[D]').astype('datetime64[M]')
+        return months.astype('datetime64[D]').astype(np.int64) * float(DAY)
+    if interval == '3mo':
+        months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        quarters = (months // 3 * 3).astype('datetime64[M]')
+        return quarters.astype('datetime64[D]').astype(np.int64) * float(DAY)
+    raise ValueError(f"Unsupported resample interval: {interval}")
+
+def resample(bars, interval):
+    """
+    Aggregates time-sorted bars into `interval` bars. Each output bar is stamped with
+    its bucket start; a partial last bucket (e.g. the current week) is included.
+    """
+    bars = np.asarray(bars, dtype=np.float64)
+    if not len(bars):
+        return bars.reshape(0, 6)
+    keys = bucket_starts(bars[:, 0], interval)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(bars)] - 1
+
+    out = np.empty((len(starts), 6))
+    out[:, 0] = keys[starts]
+    out[:, 1] = bars[starts, 1]
+    out[:, 2] = np.fmax.reduceat(bars[:, 2], starts)
+    out[:, 3] = np.fmin.reduceat(bars[:, 3], starts)
+    out[:, 4] = bars[ends, 4]
+    out[:, 5] = np.add.reduceat(np.nan_to_num(bars[:, 5]), starts)
+
+    # Yahoo occasionally leaves a bar's open empty: fall back to the bucket's first known open
+    missing = np.isnan(out[:, 1])
+    if missing.any():
+        opens = bars[:, 1]
+        for i in np.flatnonzero(missing):
+            window = opens[starts[i]:ends[i] + 1]
+            known = window[~np.isnan(window)]
+            out[i, 1] = known[0] if len(known) else out[i, 4]
+    return out
+
+def last_sessions(bars, sessions):
+    """Intraday bars of the last `sessions` trading days present in `bars`."""
+    if not len(bars):
+        return bars
+    days = np.floor(bars[:, 0] / DAY)
+    keep_from = np.unique(days)[-sessions:][0]
+    return bars[days >= keep_from]
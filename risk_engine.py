@@ -0,0 +1,152 @@
+# risk_engine.py
+"""
+Batch risk metrics (beta, Sharpe, volatility, max drawdown) for a whole universe.
+
+Works on aligned (symbols x bars) close matrices from bar_store.get_aligned_bars()
+plus one benchmark close series on the same axis, and computes every metric for
+every symbol and lookback in a few vectorized passes. Matches the per-symbol
+pandas version that calculate_risk_metrics used to run.
+"""
+import numpy as np
+
+# Lookback name -> trading days of returns
+LOOKBACKS = {'3mo': 63, '1y': 252, '3y': 756}
+MIN_COVERAGE = 0.8 # Share of the lookback a symbol needs (the old 1y check was 200 bars)
+RISK_FREE_RATE = 0.04
+METRICS = ('beta', 'sharpe', 'volatility', 'max_drawdown')
+
+class RiskTable:
+    """Risk metric columns per lookback: metrics[lookback][name] -> array over `symbols`."""
+    def __init__(self, symbols, metrics, last_timestamp=None):
+        self.symbols = list(symbols)
+        self.metrics = metrics
+        self.index = {sym: i for i, sym in enumerate(self.symbols)}
+        self.last_timestamp = last_timestamp
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def column(self, name, lookback='1y', symbols=None):
+        """One metric for `symbols` (default: all); NaN where unknown."""
+        col = self.metrics[lookback][name]
+        if symbols is None:
+            return col
+        return np.array([col[self.index[s]] if s in self.index else np.nan for s in symbols])
+
+    def row(self, symbol, lookback='1y'):
+        """
+        Metrics for one symbol in the calculate_risk_metrics format, or None if the
+        symbol is unknown or lacks history for the lookback.
+        """
+        i = self.index.get(symbol)
+        if i is None or lookback not in self.metrics:
+            return None
+        m = {name: self.metrics[lookback][name][i] for name in METRICS}
+        if not all(np.isfinite(v) for v in m.values()):
+            return None
+
+        # Classification
+        risk_level = "MODERATE"
+        if m['beta'] > 1.5 or m['volatility'] > 0.4:
+            risk_level = "AGGRESSIVE"
+        elif m['beta'] < 0.8 and m['volatility'] < 0.2:
+            risk_level = "DEFENSIVE"
+
+        return {
+            'beta': round(float(m['beta']), 2),
+            'sharpe': round(float(m['sharpe']), 2),
+            'volatility': round(float(m['volatility']) * 100, 1),
+            'max_drawdown': round(float(m['max_drawdown']) * 100, 1),
+            'risk_level': risk_level
+        }
+
+def _metrics(returns, market):
+    """All metrics for an (N, T) return matrix against a (T,) benchmark, NaNs skipped pairwise."""
+    valid = ~np.isnan(returns) & ~np.isnan(market)[None, :]
+    n = valid.sum(axis=1)
+    r = np.where(valid, returns, 0.0)
+    m = np.where(valid, market[None, :], 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_r = r.sum(axis=1) / n
+        mean_m = m.sum(axis=1) / n
+        dr = np.where(valid, r - mean_r[:, None], 0.0)
+        dm = np.where(valid, m - mean_m[:, None], 0.0)
+
+        # Sample (ddof=1) moments, as pandas .cov/.var/.std
+        cov = (dr * dm).sum(axis=1) / (n - 1)
+        var_m = (dm * dm).sum(axis=1) / (n - 1)
+        std_r = np.sqrt((dr * dr).sum(axis=1) / (n - 1))
+
+        beta = np.where(var_m != 0, cov / var_m, 1.0)
+        volatility = std_r * np.sqrt(252)
+        sharpe = np.where(std_r != 0, (mean_r - RISK_FREE_RATE / 252) / std_r * np.sqrt(252), 0.0)
+
+    # Max drawdown of the compounded returns (skipped bars count as flat)
+    cumulative = np.cumprod(1 + r, axis=1)
+    peak = np.maximum.accumulate(cumulative, axis=1)
+    max_drawdown = ((cumulative - peak) / peak).min(axis=1) if r.shape[1] else np.full(len(r), np.nan)
+
+    return {'beta': beta, 'sharpe': sharpe, 'volatility': volatility, 'max_drawdown': max_drawdown}, n
+
+def rolling_beta(bars, benchmark, days=LOOKBACKS['1y']):
+    """
+    Beta against `benchmark` (one of the aligned rows) as of every date: column t uses
+    the `days` returns ending at bar t, so a backtest never sees later prices. Same
+    pairwise-complete sample estimate as compute_risk; NaN below MIN_COVERAGE.
+    Returns an (N, T) matrix on the bars' date axis.
+    """
+    symbols = bars['symbols']
+    close = bars['close']
+    n, t = close.shape
+    out = np.full((n, t), np.nan)
+    if benchmark not in symbols or t < 2:
+        return out
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close[:, 1:] / close[:, :-1] - 1
+    market = returns[symbols.index(benchmark)]
+    valid = ~np.isnan(returns) & ~np.isnan(market)[None, :]
+    r = np.where(valid, returns, 0.0)
+    m = np.where(valid, market[None, :], 0.0)
+
+    def window_sum(x):
+        """Trailing `days`-bar sums at every column."""
+        total = np.cumsum(x, axis=1)
+        total[:, days:] -= total[:, :-days].copy()
+        return total
+
+    count = window_sum(valid.astype(np.float64))
+    sum_r, sum_m = window_sum(r), window_sum(m)
+    sum_rm, sum_mm = window_sum(r * m), window_sum(m * m)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_rm - sum_r * sum_m / count
+        var_m = sum_mm - sum_m * sum_m / count
+        beta = np.where(var_m != 0, cov / var_m, 1.0)
+    out[:, 1:] = np.where(count >= MIN_COVERAGE * days, beta, np.nan)
+    return out
+
+def compute_risk(bars, benchmark, lookbacks=None):
+    """
+    Computes RiskTable metrics for every symbol in `bars` against the `benchmark`
+    symbol, which must be one of the aligned rows. Symbols with less than
+    MIN_COVERAGE of a lookback get NaN for it.
+    """
+    lookbacks = lookbacks or LOOKBACKS
+    symbols = bars['symbols']
+    close = bars['close']
+    if benchmark not in symbols or close.shape[1] < 2:
+        empty = {name: np.full(len(symbols), np.nan) for name in METRICS}
+        return RiskTable(symbols, {lb: dict(empty) for lb in lookbacks})
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close[:, 1:] / close[:, :-1] - 1
+    market = returns[symbols.index(benchmark)]
+
+    metrics = {}
+    for name, days in lookbacks.items():
+        values, n = _metrics(returns[:, -days:], market[-days:])
+        enough = n >= MIN_COVERAGE * days
+        metrics[name] = {k: np.where(enough, v, np.nan) for k, v in values.items()}
+
+    return RiskTable(symbols, metrics, last_timestamp=bars['timestamps'][-1])
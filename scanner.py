@@ -0,0 +1,270 @@
+# scanner.py
+"""
+Vectorized opportunity scan over a whole indicator table.
+
+Reproduces the per-symbol rules of data_service.calculate_setup_confidence and
+get_opportunities (confidence, opportunity score, risk-profile match, trade setup,
+time horizon) as column operations, then picks the best rows with a heap.
+
+For large universes scan_sharded() splits the work across processes: each worker
+memory-maps its shard's bars, computes indicators and scores, and writes plain
+float rows into one shared-memory matrix that the parent reads back.
+"""
+import heapq
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+import bar_store
+import indicator_engine
+from indicator_engine import DEFAULTS, IndicatorTable
+
+# Risk profile -> (stop ATR multiple, target ATR multiple, position size)
+PROFILE_SETUPS = {
+    'DEFENSIVE': (1.5, 2.0, "2-3%"),
+    'BALANCED': (2.0, 3.0, "3-5%"),
+    'SPECULATIVE': (2.5, 5.0, "5-8%")
+}
+DEFENSIVE_SECTORS = ('XLP', 'XLU', 'XLV')
+SPECULATIVE_SECTORS = ('XLK', 'XLC', 'XLY')
+
+HORIZONS = ("Position (2-4 Weeks)", "Swing (3-10 Days)", "Mean Reversion (1-3 Days)")
+
+def rounded_column(table, name):
+    """Indicator column rounded and defaulted exactly like IndicatorTable.row()."""
+    col = np.round(table[name].astype(np.float64), 2)
+    return np.where(np.isfinite(col), col, DEFAULTS.get(name, 0.0))
+
+def confidence_column(table):
+    """
+    Vectorized calculate_setup_confidence: integer scores clipped to 50-98.
+    `table` is anything indexable by column name (arrays of any matching shape).
+    """
+    rsi = rounded_column(table, 'rsi')
+    price = rounded_column(table, 'price')
+    bbu = rounded_column(table, 'bb_upper')
+    bbl = rounded_column(table, 'bb_lower')
+    bbm = rounded_column(table, 'bb_middle')
+    rvol = rounded_column(table, 'rvol')
+
+    score = np.full(np.shape(rsi), 50.0)
+
+    # RSI
+    score += np.select([(rsi >= 30) & (rsi <= 70), rsi < 30, rsi > 70], [10, 15, -10], 0)
+
+    # MACD
+    score += np.where(rounded_column(table, 'macd') > rounded_column(table, 'macd_signal'), 10, -5)
+
+    # Bollinger Bands (first matching branch wins, as in the scalar version)
+    score += np.select([price > bbu, (bbm < price) & (price <= bbu), (bbl <= price) & (price <= bbm), price < bbl],
+                       [-15, 5, 5, 10], 0)
+
+    # RVOL
+    score += np.where(rvol > 2.0, 5, 0)
+    score += np.select([rvol > 1.5, rvol < 0.8], [10, -5], 0)
+
+    return np.clip(score, 50, 98).astype(int)
+
+def apply_rules(table, risk_profile, sectors, beta):
+    """
+    The get_opportunities rules as column operations: confidence, opportunity score,
+    profile match, ATR stop/target, risk/reward and horizon code. Works on arrays of
+    any shape (one row per symbol, or symbols x dates for backtests) as long as
+    `sectors` and `beta` broadcast against them.
+    """
+    price = rounded_column(table, 'price')
+    rvol = rounded_column(table, 'rvol')
+    atr = np.where(np.isfinite(table['atr']), table['atr'], DEFAULTS['atr'])
+
+    confidence = confidence_column(table)
+    opp_score = confidence + np.select([rvol > 2.0, rvol > 1.5, rvol < 0.8], [10, 5, -5], 0)
+    opp_score = opp_score + np.where(price > rounded_column(table, 'sma_50'), 3, 0)
+
+    # Risk profile match
+    if risk_profile == "DEFENSIVE":
+        is_match = (beta <= 0.9) | np.isin(sectors, DEFENSIVE_SECTORS)
+    elif risk_profile == "BALANCED":
+        is_match = (beta >= 0.7) & (beta <= 1.5)
+    else:
+        is_match = (beta >= 1.1) | np.isin(sectors, SPECULATIVE_SECTORS)
+    is_match = np.broadcast_to(is_match, np.shape(price))
+
+    # Trade setup
+    stop_mult, target_mult, pos_size = PROFILE_SETUPS.get(risk_profile, PROFILE_SETUPS['SPECULATIVE'])
+    stop = price - stop_mult * atr
+    target = price + target_mult * atr
+    risk = price - stop
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk_reward = np.where(risk > 0, (target - price) / risk, 0.0)
+
+    horizon = np.select([(rvol > 2.5) & (rounded_column(table, 'macd') > rounded_column(table, 'macd_signal')),
+                         rounded_column(table, 'rsi') < 30], [1, 2], 0)
+
+    return {
+        'confidence': confidence, 'opp_score': opp_score, 'is_match': is_match,
+        'stop': stop, 'target': target, 'risk_reward': risk_reward,
+        'position_size': pos_size, 'horizon': horizon
+    }
+
+def scan(table, risk_profile="BALANCED", sectors=None, beta=None, rvol_threshold=0.0):
+    """
+    Scores every valid row of an IndicatorTable.
+    `sectors` is the sector ETF per table row (or None), `beta` an optional beta
+    column (defaults to 1.0). Returns a dict of columns, one entry per valid symbol.
+    """
+    valid = table.valid_mask()
+    table = table.select(valid)
+    n = len(table)
+    sectors = np.array([s or '' for s in sectors], dtype=object)[valid] if sectors is not None else np.full(n, '', dtype=object)
+    beta = np.ones(n) if beta is None else np.where(np.isfinite(beta), beta, 1.0)[valid]
+
+    columns = apply_rules(table, risk_profile, sectors, beta)
+    rvol = rounded_column(table, 'rvol')
+
+    return {
+        'symbols': table.symbols,
+        'table': table,
+        'confidence': columns['confidence'],
+        'opp_score': columns['opp_score'],
+        'is_match': columns['is_match'],
+        'is_rvol_ok': rvol >= rvol_threshold,
+        'stop': np.round(columns['stop'], 2),
+        'target': np.round(columns['target'], 2),
+        'risk_reward': np.round(columns['risk_reward'], 2),
+        'position_size': columns['position_size'],
+        'horizon': columns['horizon']
+    }
+
+def apply_relative_strength(results, rs):
+    """
+    Folds composite relative strength (0-100 percentile, per result row, NaN if
+    unknown) into opp_score: +5 for leaders (80+), -5 for laggards (20 or less).
+    Also stores the column as results['rs'].
+    """
+    rs = np.asarray(rs, dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        adjustment = np.select([rs >= 80, rs <= 20], [5, -5], 0)
+    results['opp_score'] = results['opp_score'] + adjustment
+    results['rs'] = rs
+    return results
+
+def top_k(results, k=10):
+    """
+    Row indices of the k best results, ordered by (is_match, is_rvol_ok, opp_score)
+    descending. Ties go to the alphabetically first symbol so the list is reproducible.
+    """
+    symbols = results['symbols']
+    alpha_rank = np.empty(len(symbols), dtype=int)
+    alpha_rank[np.argsort(symbols, kind='stable')] = np.arange(len(symbols))
+
+    keys = zip(results['is_match'].tolist(), results['is_rvol_ok'].tolist(),
+               results['opp_score'].tolist(), (-alpha_rank).tolist(), range(len(symbols)))
+    return [key[-1] for key in heapq.nlargest(k, keys)]
+
+def trade_setup(results, i):
+    """Trade setup dict for result row i, in the get_opportunities format."""
+    return {
+        'entry': round(float(results['table']['price'][i]), 2),
+        'stop': float(results['stop'][i]),
+        'target': float(results['target'][i]),
+        'risk_reward': float(results['risk_reward'][i]),
+        'position_size': results['position_size'],
+        'time_horizon': HORIZONS[results['horizon'][i]]
+    }
+
+# --- Sharded (multi-process) Scan ---
+
+INDICATOR_COLUMNS = ('price', 'rsi', 'macd', 'macd_signal', 'bb_upper', 'bb_middle', 'bb_lower',
+                     'rvol', 'sma_50', 'sma_50_distance', 'atr', 'volume', 'bars')
+SCORE_COLUMNS = ('confidence', 'opp_score', 'is_match', 'is_rvol_ok', 'stop', 'target', 'risk_reward', 'horizon')
+RESULT_COLUMNS = INDICATOR_COLUMNS + SCORE_COLUMNS + ('valid',)
+RESULT_COL = {name: i for i, name in enumerate(RESULT_COLUMNS)}
+
+SHARD_SIZE = 100 # Symbols per worker task
+MAX_WORKERS = max(1, min(8, (multiprocessing.cpu_count() or 2) - 1))
+
+_PROCESS_POOL = None
+
+def _get_process_pool():
+    """Lazily started worker pool. 'spawn' keeps workers clear of the GUI's threads and Qt state."""
+    global _PROCESS_POOL
+    if _PROCESS_POOL is None:
+        _PROCESS_POOL = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+    return _PROCESS_POOL
+
+def _scan_shard(shm_name, shape, start, symbols, sectors, beta, lookback, interval, risk_profile, rvol_threshold):
+    """Worker: scores one shard and writes its rows into the shared result matrix."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    out = None
+    try:
+        out = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        bars = bar_store.get_aligned_bars(symbols, lookback=lookback, interval=interval, mmap=True)
+        table = indicator_engine.compute_indicators(bars)
+        sector_of = dict(zip(symbols, sectors))
+        beta_of = dict(zip(symbols, beta))
+        results = scan(table, risk_profile, sectors=[sector_of[s] for s in table.symbols],
+                       beta=np.array([beta_of[s] for s in table.symbols]), rvol_threshold=rvol_threshold)
+
+        row_of = {sym: start + i for i, sym in enumerate(symbols)}
+        rows = np.array([row_of[s] for s in results['symbols']], dtype=int)
+        if len(rows):
+            for name in INDICATOR_COLUMNS:
+                out[rows, RESULT_COL[name]] = results['table'][name]
+            for name in SCORE_COLUMNS:
+                out[rows, RESULT_COL[name]] = results[name]
+            out[rows, RESULT_COL['valid']] = 1.0
+        return len(rows)
+    finally:
+        del out # The view must go before the mapping can close
+        shm.close()
+
+def scan_sharded(symbols, risk_profile="BALANCED", sectors=None, beta=None, rvol_threshold=0.0, lookback=None, interval="1d"):
+    """
+    Same result format as scan(), computed in worker processes straight from the bar
+    store. Bars must already be downloaded (data_service.ensure_bars).
+    Workers don't see the parent's live IndicatorState, so quotes applied since the
+    last stored bar are not reflected: scores are as of the latest bar in the store.
+    """
+    symbols = list(symbols)
+    sectors = list(sectors) if sectors is not None else [None] * len(symbols)
+    beta = [float(b) for b in beta] if beta is not None else [1.0] * len(symbols)
+    shape = (len(symbols), len(RESULT_COLUMNS))
+    shm = shared_memory.SharedMemory(create=True, size=max(1, shape[0] * shape[1] * 8))
+    out = None
+    try:
+        out = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        out[:] = np.nan
+
+        pool = _get_process_pool()
+        futures = [pool.submit(_scan_shard, shm.name, shape, start, symbols[start:start + SHARD_SIZE],
+                               sectors[start:start + SHARD_SIZE], beta[start:start + SHARD_SIZE],
+                               lookback, interval, risk_profile, rvol_threshold)
+                   for start in range(0, len(symbols), SHARD_SIZE)]
+        for f in futures:
+            f.result()
+
+        matrix = out.copy()
+    finally:
+        del out
+        shm.close()
+        shm.unlink()
+
+    valid = matrix[:, RESULT_COL['valid']] == 1.0
+    rows = matrix[valid]
+    col = lambda name: rows[:, RESULT_COL[name]]
+    table = IndicatorTable([s for s, ok in zip(symbols, valid) if ok],
+                           {name: col(name) for name in INDICATOR_COLUMNS})
+    return {
+        'symbols': table.symbols,
+        'table': table,
+        'confidence': col('confidence').astype(int),
+        'opp_score': col('opp_score').astype(int),
+        'is_match': col('is_match').astype(bool),
+        'is_rvol_ok': col('is_rvol_ok').astype(bool),
+        'stop': col('stop'),
+        'target': col('target'),
+        'risk_reward': col('risk_reward'),
+        'position_size': PROFILE_SETUPS.get(risk_profile, PROFILE_SETUPS['SPECULATIVE'])[2],
+        'horizon': col('horizon').astype(int)
+    }
@@ -0,0 +1,144 @@
+# screener.py
+"""
+Declarative stock screens.
+
+A screen is a named filter expression over indicator columns, e.g.
+    rsi < 30 and rvol > 2 and sma_50_distance > 0
+    sector in ("Technology", "Energy") and not price < 5
+Expressions use Python syntax (comparisons, chained comparisons, and/or/not,
++ - * /, `in` against a literal list) and are parsed once into a tree of numpy
+column operations, so evaluating a screen over a whole universe is a handful of
+array ops. Missing values (NaN) never pass a comparison.
+"""
+import ast
+import operator
+from functools import lru_cache
+import numpy as np
+
+class ScreenError(ValueError):
+    """Raised for expressions that don't parse or use unsupported syntax or columns."""
+
+_COMPARE = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.Eq: operator.eq, ast.NotEq: operator.ne
+}
+_ARITHMETIC = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+def _compile_node(node, names):
+    """Returns fn(columns) -> array/scalar for one AST node; collects column names used."""
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(v, names) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        def bool_op(cols):
+            result = parts[0](cols)
+            for part in parts[1:]:
+                result = combine(result, part(cols))
+            return result
+        return bool_op
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_node(node.operand, names)
+        if isinstance(node.op, ast.Not):
+            return lambda cols: np.logical_not(operand(cols))
+        if isinstance(node.op, ast.USub):
+            return lambda cols: -operand(cols)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+        op = _ARITHMETIC[type(node.op)]
+        left, right = _compile_node(node.left, names), _compile_node(node.right, names)
+        def arithmetic(cols):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return op(left(cols), right(cols))
+        return arithmetic
+
+    if isinstance(node, ast.Compare):
+        if any(isinstance(op, (ast.In, ast.NotIn)) for op in node.ops):
+            if len(node.ops) != 1:
+                raise ScreenError(f"'in' can't be chained: '{ast.unparse(node)}'")
+            subject = _compile_node(node.left, names)
+            values = _literal_list(node.comparators[0])
+            invert = isinstance(node.ops[0], ast.NotIn)
+            return lambda cols: np.isin(subject(cols), values, invert=invert)
+
+        # a < b < c is (a < b) and (b < c)
+        if any(type(op) not in _COMPARE for op in node.ops):
+            raise ScreenError(f"Unsupported comparison '{ast.unparse(node)}'")
+        ops = [_COMPARE[type(op)] for op in node.ops]
+        operands = [_compile_node(n, names) for n in [node.left] + node.comparators]
+        def compare(cols):
+            values = [operand(cols) for operand in operands]
+            result = True
+            with np.errstate(invalid='ignore'):
+                for op, left, right in zip(ops, values, values[1:]):
+                    result = np.logical_and(result, op(left, right))
+            return result
+        return compare
+
+    if isinstance(node, ast.Name):
+        names.add(node.id)
+        return lambda cols, name=node.id: cols[name]
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str, bool)):
+        value = node.value
+        return lambda cols: value
+
+    raise ScreenError(f"Unsupported syntax '{ast.unparse(node)}'")
+
+def _literal_list(node):
+    if not isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        raise ScreenError(f"'in' needs a literal list, got '{ast.unparse(node)}'")
+    try:
+        return np.array([ast.literal_eval(elt) for elt in node.elts])
+    except ValueError:
+        raise ScreenError(f"'in' needs a literal list, got '{ast.unparse(node)}'")
+
+@lru_cache(maxsize=256)
+def compile_expression(expression):
+    """
+    Parses an expression once. Returns (fn, names): fn(columns) evaluates it over a
+    dict of equal-length arrays, names is the set of columns it reads.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ScreenError(f"Invalid expression: {e.msg}")
+    names = set()
+    fn = _compile_node(tree.body, names)
+    return fn, frozenset(names)
+
+class Screen:
+    """A named, compiled filter expression."""
+    def __init__(self, name, expression, columns=None):
+        self.name = name
+        self.expression = expression
+        self.fn, self.names = compile_expression(expression)
+        if columns is not None:
+            unknown = sorted(self.names - set(columns))
+            if unknown:
+                raise ScreenError(f"Unknown column(s): {', '.join(unknown)}")
+
+    def mask(self, columns, size):
+        """Boolean mask over `size` rows; rows with a missing column value fail."""
+        try:
+            result = self.fn(columns)
+        except KeyError as e:
+            raise ScreenError(f"Unknown column: {e.args[0]}")
+        return np.broadcast_to(np.asarray(result, dtype=bool), (size,))
+
+def table_columns(table, extra=None):
+    """The columns screens can use: the IndicatorTable's plus `extra` (e.g. sector, beta)."""
+    columns = dict(table.columns)
+    columns.update(extra or {})
+    return columns
+
+def run(screens, table, extra=None):
+    """Evaluates screens over a table's valid rows. Returns {screen name: [symbols]}."""
+    columns = table_columns(table, extra)
+    valid = table.valid_mask()
+    results = {}
+    for screen in screens:
+        rows = np.flatnonzero(screen.mask(columns, len(table)) & valid)
+        results[screen.name] = [table.symbols[i] for i in rows]
+    return results
@@ -0,0 +1,186 @@
+# sector_index.py
+"""
+Sector indexes built from constituent bars.
+
+Each sector gets a cap-weighted and an equal-weighted index series from its
+constituents' aligned daily closes (bar_store.get_aligned_bars) and shares
+outstanding. Both are chain-linked: each day's index return is the mean return of
+the constituents priced on both days, weighted by the previous close's market cap
+(or equally), so listings and gaps never make the level jump. Levels start at 100.
+
+The current move (each constituent's latest price vs its previous close) is kept
+as running sums, so folding in a live quote is O(1). The move belongs to one
+session: the last stored bar's until a quote for a later session arrives. Then every
+previous close rolls to the last stored close and only constituents quoted in that
+session count toward the move, so yesterday's and today's moves never mix. Each constituent's
+contribution to the cap-weighted move, in percentage points, sums to the move.
+Constituents without known shares count in the equal-weighted index only.
+"""
+import numpy as np
+
+BASE_LEVEL = 100.0
+HISTORY_POINTS = 30 # Closes kept per constituent for sparklines
+
+def chain_link(close, shares):
+    """Cap- and equal-weighted index levels (T,) from (N,T) closes and (N,) shares."""
+    n, t = close.shape
+    if t < 2:
+        return np.full(t, BASE_LEVEL), np.full(t, BASE_LEVEL)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = close[:, 1:] / close[:, :-1] - 1
+    priced = np.isfinite(returns)
+    returns = np.where(priced, returns, 0.0)
+    caps = np.where(priced & np.isfinite(shares)[:, None], shares[:, None] * close[:, :-1], 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        equal = returns.sum(axis=0) / priced.sum(axis=0)
+        cap = (caps * returns).sum(axis=0) / caps.sum(axis=0)
+    equal = np.nan_to_num(equal) # Days nothing was priced on: flat
+    cap = np.where(np.isfinite(cap), cap, equal) # No shares known yet: equal weights
+    return (BASE_LEVEL * np.r_[1.0, np.cumprod(1 + cap)],
+            BASE_LEVEL * np.r_[1.0, np.cumprod(1 + equal)])
+
+class SectorIndex:
+    """Index series plus the live, incrementally updated move for one sector."""
+    def __init__(self, etf, symbols, close, timestamps, shares):
+        self.etf = etf
+        self.symbols = list(symbols)
+        self.index = {sym: i for i, sym in enumerate(self.symbols)}
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        self.shares = np.asarray(shares, dtype=np.float64)
+        self.levels, self.equal_levels = chain_link(close, self.shares)
+        self.history = close[:, -HISTORY_POINTS:]
+
+        t = close.shape[1]
+        self.last_close = close[:, -1].copy() if t else np.full(len(self.symbols), np.nan)
+        self.prev_close = close[:, -2].copy() if t > 1 else np.full(len(self.symbols), np.nan)
+        self.price = self.last_close.copy()
+        self.session = self.timestamps[-1] if len(self.timestamps) else None
+        self.in_session = np.ones(len(self.symbols), dtype=bool) # Priced for self.session
+        self._recount()
+
+    def __contains__(self, symbol):
+        return symbol in self.index
+
+    def _terms(self, i):
+        """Row i's share of the running sums: (cap base, cap move, cap now, cap at last bar, return, counted)."""
+        prev, price, last, shares = self.prev_close[i], self.price[i], self.last_close[i], self.shares[i]
+        if not self.in_session[i]:
+            # Not quoted this session yet: still part of the level, not of the move
+            held = shares * last if np.isfinite(shares) and np.isfinite(last) else 0.0
+            return 0.0, 0.0, held, held, 0.0, 0
+        if not (np.isfinite(prev) and np.isfinite(price) and prev > 0):
+            return 0.0, 0.0, 0.0, 0.0, 0.0, 0
+        ret = price / prev - 1
+        if not np.isfinite(shares):
+            return 0.0, 0.0, 0.0, 0.0, ret, 1
+        last = last if np.isfinite(last) else prev
+        return shares * prev, shares * (price - prev), shares * price, shares * last, ret, 1
+
+    def _recount(self):
+        self._sums = np.zeros(6)
+        for i in range(len(self.symbols)):
+            self._sums += self._terms(i)
+
+    def start_session(self, session):
+        """Rolls to a session after the last stored bar: moves restart from the last stored closes."""
+        self.session = session
+        self.prev_close = self.last_close.copy()
+        self.price = self.last_close.copy()
+        self.in_session[:] = False
+        self._recount()
+
+    def update(self, symbol, price, prev_close=None, shares=None, session=None):
+        """
+        Folds in one constituent's latest price (and previous close / shares if known). O(1),
+        except for the first quote of a new session (see start_session). `session` is the
+        quote's session timestamp on the bar timestamps' clock; None means the current one.
+        """
+        i = self.index.get(symbol)
+        if i is None or price is None or not np.isfinite(price):
+            return False
+        if session is not None and self.session is not None:
+            if session < self.session:
+                return False # A quote from a session the index has moved past
+            if session > self.session:
+                self.start_session(session)
+        self._sums -= self._terms(i)
+        self.in_session[i] = True
+        self.price[i] = price
+        if prev_close is not None and np.isfinite(prev_close):
+            self.prev_close[i] = prev_close
+        if shares is not None and np.isfinite(shares) and shares > 0:
+            self.shares[i] = shares
+        self._sums += self._terms(i)
+        return True
+
+    @property
+    def change_percent(self):
+        """Cap-weighted move of the current session, in percent."""
+        cap_base, cap_move = self._sums[0], self._sums[1]
+        if cap_base > 0:
+            return cap_move / cap_base * 100
+        return self.equal_change_percent
+
+    @property
+    def equal_change_percent(self):
+        counted = self._sums[5]
+        return self._sums[4] / counted * 100 if counted else 0.0
+
+    @property
+    def change(self):
+        """Cap-weighted move of the current session, in index points."""
+        level = self.level
+        return level - level / (1 + self.change_percent / 100)
+
+    @property
+    def level(self):
+        """Cap-weighted level, including live quotes since the last stored bar."""
+        cap_now, cap_last = self._sums[2], self._sums[3]
+        last = self.levels[-1] if len(self.levels) else BASE_LEVEL
+        return last * cap_now / cap_last if cap_last > 0 else last
+
+    @property
+    def market_cap(self):
+        return self._sums[2]
+
+    def weights(self):
+        """Each constituent's cap weight (NaN where shares or prices are unknown)."""
+        caps = self.shares * self.price
+        total = np.nansum(caps)
+        return caps / total if total > 0 else np.full(len(self.symbols), np.nan)
+
+    def contributions(self):
+        """
+        Per-constituent dicts (symbol, weight, change_percent, contribution in pct points),
+        largest absolute contribution first; None for constituents not quoted this session.
+        """
+        cap_base = self._sums[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.where(self.in_session, (self.price / self.prev_close - 1) * 100, np.nan)
+            weight = self.shares * self.prev_close / cap_base if cap_base > 0 else np.full(len(self.symbols), np.nan)
+        weight = np.where(self.in_session, weight, np.nan)
+        contribution = weight * change
+        order = np.argsort(-np.abs(np.nan_to_num(contribution)), kind='stable')
+        return [{'symbol': self.symbols[i],
+                 'weight': round(float(weight[i]) * 100, 2) if np.isfinite(weight[i]) else None,
+                 'change_percent': round(float(change[i]), 2) if np.isfinite(change[i]) else None,
+                 'contribution': round(float(contribution[i]), 3) if np.isfinite(contribution[i]) else None}
+                for i in order]
+
+    def constituent(self, symbol):
+        """Quote-style dict for one constituent (price, change, change_percent, history)."""
+        i = self.index[symbol]
+        price, prev = self.price[i], self.prev_close[i]
+        if not np.isfinite(price):
+            return None
+        change = price - prev if np.isfinite(prev) else 0.0
+        history = self.history[i]
+        return {
+            'symbol': symbol,
+            'price': float(price),
+            'change': float(change),
+            'change_percent': float(change / prev * 100) if np.isfinite(prev) and prev > 0 else 0.0,
+            'history': history[np.isfinite(history)].tolist(),
+            'market_cap': float(self.shares[i] * price) if np.isfinite(self.shares[i]) else 0
+        }
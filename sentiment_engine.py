@@ -0,0 +1,156 @@
+# sentiment_engine.py
+"""
+Headline sentiment scoring.
+
+The keyword lists are compiled once into a word -> weight table plus a phrase
+index keyed by first word, so a headline is scored in one left-to-right pass over
+its tokens. Negators ("not", "no", "fails to", ...) flip the next few scored terms.
+Results are memoized by a hash of the headline; the memo is exported (when it has
+changed) so data_service can persist it between sessions.
+"""
+import re
+import hashlib
+import threading
+
+BULLISH, BEARISH, NEUTRAL = "BULLISH", "BEARISH", "NEUTRAL"
+
+BULLISH_WORDS = (
+    "beat", "beats", "exceed", "exceeds", "surge", "surges", "surged", "rally", "rallies", "rallied",
+    "upgrade", "upgraded", "breakout", "breakthrough", "growth", "strong", "robust", "outperform",
+    "acquisition", "approved", "approval", "win", "wins", "won", "positive", "record", "high",
+    "soar", "soars", "jump", "jumps", "expand"
+)
+
+BEARISH_WORDS = (
+    "miss", "misses", "missed", "decline", "declines", "declined", "fall", "falls", "fell",
+    "drop", "drops", "dropped", "plunge", "plunges", "plunged", "downgrade", "downgraded",
+    "lawsuit", "investigation", "probe", "recall", "cut", "cuts", "loss", "losses", "weak",
+    "weakness", "underperform", "concern", "concerns", "warning", "warns", "warned", "risk",
+    "low", "slump", "slumps", "tumble"
+)
+
+# Multi-word terms score once, replacing their individual words
+PHRASES = {
+    "price target raised": 1, "raises price target": 1, "raises guidance": 1, "raised guidance": 1,
+    "all-time high": 1, "record high": 1, "short squeeze": 1, "buy rating": 1,
+    "price target cut": -1, "cuts price target": -1, "cuts guidance": -1, "cut guidance": -1,
+    "lowers guidance": -1, "52-week low": -1, "sell rating": -1, "going concern": -1,
+    "profit warning": -1, "job cuts": -1, "layoffs": -1,
+    "low risk": 1, "high risk": -1
+}
+
+NEGATORS = ("not", "no", "never", "without", "isn't", "wasn't", "didn't", "doesn't", "won't", "can't",
+            "fails to", "failed to", "unlikely to")
+NEGATION_WINDOW = 3 # Tokens after a negator whose score is flipped
+
+VOCABULARY_VERSION = 1 # Bump when the tables or scoring change so memoized scores are recomputed
+
+_TOKEN_RE = re.compile(r"[^\s.,:;!?\"()]+")
+_APOSTROPHES = str.maketrans("‘’ʼ", "'''") # Typographic apostrophes, as in "don’t"
+
+def _compile():
+    words = {w: 1 for w in BULLISH_WORDS}
+    words.update({w: -1 for w in BEARISH_WORDS if w not in words})
+
+    phrases = {} # first token -> [(tokens, weight, is_negator)], longest first
+    for text, weight in PHRASES.items():
+        tokens = tuple(text.split())
+        if len(tokens) == 1:
+            words[tokens[0]] = weight
+        else:
+            phrases.setdefault(tokens[0], []).append((tokens, weight, False))
+    negators = set()
+    for text in NEGATORS:
+        tokens = tuple(text.split())
+        if len(tokens) == 1:
+            negators.add(tokens[0])
+        else:
+            phrases.setdefault(tokens[0], []).append((tokens, 0, True))
+    for entries in phrases.values():
+        entries.sort(key=lambda e: -len(e[0]))
+    return words, phrases, frozenset(negators)
+
+WORDS, PHRASE_INDEX, NEGATOR_WORDS = _compile()
+
+def score(headline):
+    """Net sentiment score: bullish terms minus bearish terms, negation applied."""
+    tokens = _TOKEN_RE.findall(headline.lower().translate(_APOSTROPHES))
+    total = 0
+    negate_left = 0 # Scored-or-not tokens still inside the current negation window
+    i = 0
+    n = len(tokens)
+    while i < n:
+        token = tokens[i]
+        weight = 0
+        step = 1
+
+        for phrase, phrase_weight, is_negator in PHRASE_INDEX.get(token, ()):
+            if tuple(tokens[i:i + len(phrase)]) == phrase:
+                step = len(phrase)
+                if is_negator:
+                    weight = None
+                else:
+                    weight = phrase_weight
+                break
+        else:
+            if token in NEGATOR_WORDS:
+                weight = None
+            else:
+                weight = WORDS.get(token, 0)
+
+        if weight is None:
+            negate_left = NEGATION_WINDOW
+        else:
+            total += -weight if negate_left > 0 else weight
+            negate_left = max(0, negate_left - step)
+        i += step
+    return total
+
+def classify(headline):
+    """BULLISH, BEARISH or NEUTRAL for one headline (memoized)."""
+    global _MEMO_DIRTY
+    key = headline_key(headline)
+    label = MEMO.get(key)
+    if label is None:
+        s = score(headline)
+        label = BULLISH if s > 0 else BEARISH if s < 0 else NEUTRAL
+        with _MEMO_LOCK:
+            MEMO[key] = label
+            _MEMO_DIRTY = True
+            if len(MEMO) > MEMO_LIMIT * 1.1: # Trim in bulk, not on every insert
+                for old in list(MEMO)[:len(MEMO) - MEMO_LIMIT]:
+                    del MEMO[old]
+    return label
+
+def classify_batch(headlines):
+    """Labels for many headlines in one pass; repeated headlines are scored once."""
+    return [classify(h) for h in headlines]
+
+# --- Memo ---
+
+MEMO = {} # headline hash -> label (insertion ordered, oldest dropped first)
+MEMO_LIMIT = 20000
+_MEMO_LOCK = threading.Lock()
+_MEMO_DIRTY = False # New entries since the last export
+
+def headline_key(headline):
+    digest = hashlib.blake2b(headline.encode('utf-8'), digest_size=8).hexdigest()
+    return f"{VOCABULARY_VERSION}:{digest}"
+
+def load_memo(entries):
+    """Merges persisted memo entries, ignoring ones from an older vocabulary."""
+    prefix = f"{VOCABULARY_VERSION}:"
+    with _MEMO_LOCK:
+        for key, label in (entries or {}).items():
+            if key.startswith(prefix) and key not in MEMO:
+                MEMO[key] = label
+
+def memo_dirty():
+    return _MEMO_DIRTY
+
+def export_memo():
+    """Copy of the memo for persisting; marks it clean."""
+    global _MEMO_DIRTY
+    with _MEMO_LOCK:
+        _MEMO_DIRTY = False
+        return dict(MEMO)
@@ -1,13 +1,25 @@
 from PySide6.QtWidgets import (QWidget, QLabel, QVBoxLayout, QHBoxLayout, QFrame, QDialog, 
                                QGraphicsDropShadowEffect, QSizePolicy, QScrollArea, QPushButton, QGridLayout, 
                                QButtonGroup, QComboBox, QTabWidget, QTableWidget, QHeaderView, QAbstractItemView, 
-                               QProgressBar, QCheckBox, QRadioButton, QLineEdit, QTableWidgetItem, QSlider, QSpinBox, QApplication)
-from PySide6.QtCore import Qt, QTimer, QSize, QPoint, QRect, Signal, QUrl, QThreadPool
-from PySide6.QtGui import QColor, QPainter, QBrush, QPen, QFont, QLinearGradient, QPainterPath, QPixmap
+                               QProgressBar, QCheckBox, QRadioButton, QLineEdit, QTableWidgetItem, QSlider, QSpinBox, QApplication,
+                               QSystemTrayIcon, QMainWindow, QListView, QStyledItemDelegate, QStyle)
+from PySide6.QtCore import (Qt, QTimer, QSize, QPoint, QPointF, QRect, Signal, QUrl, QThreadPool, QObject, QEvent,
+                            QAbstractListModel, QModelIndex)
+from PySide6.QtGui import (QColor, QPainter, QBrush, QPen, QFont, QLinearGradient, QPainterPath, QPixmap, QIcon, QRegion,
+                           QPolygonF, QPixmapCache)
 from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 from datetime import datetime
+import html
+import itertools
+import json
+import math
+import os
+import time
+import numpy as np
 import styles
+import chart_decimation
 import data_service
+import alerts_engine
 from async_utils import Worker
 
 # --- Ticker to Domain Mapping ---
@@ -22,36 +34,153 @@ TICKER_TO_DOMAIN = {
     '^DJI': 'dowjones.com'
 }
 
+def paint_symbol_tile(painter, rect, symbol, radius=12):
+    """Fallback logo: a gradient tile with the symbol's initial, hued by the symbol."""
+    hash_val = sum(ord(c) for c in symbol)
+    hue = (hash_val * 137.508) % 360
+    bg_color = QColor.fromHsl(int(hue), 200, 100)
+    
+    gradient = QLinearGradient(rect.x(), rect.y(), rect.x() + rect.width(), rect.y() + rect.height())
+    gradient.setColorAt(0, bg_color.lighter(130))
+    gradient.setColorAt(1, bg_color)
+    
+    painter.setBrush(QBrush(gradient))
+    painter.setPen(Qt.NoPen)
+    painter.drawRoundedRect(rect, radius, radius)
+    
+    # Text (Initials)
+    painter.setPen(QColor("white"))
+    font_size = int(rect.height() * 0.4)
+    font = QFont("Arial", font_size, QFont.Bold)
+    painter.setFont(font)
+    painter.drawText(rect, Qt.AlignCenter, symbol[:1])
+
+LOGO_DIR = os.path.join(data_service.CACHE_DIR, "logos")
+
+class LogoService(QObject):
+    """
+    Application-wide logo cache. One network manager serves every LogoWidget, each
+    symbol is fetched at most once at a time, downloaded logos persist under
+    cache/logos, and scaled copies are kept per size so painting never rescales.
+    Symbols without a logo (or fetched while offline) are remembered as misses and
+    not retried until MISS_TTL expires; widgets paint the letter tile meanwhile.
+    """
+    LOGO_TTL = 30 * 86400 # Older logos are refetched (the cached one keeps showing)
+    MISS_TTL = 86400
+    logo_ready = Signal(str) # symbol
+    _instance = None
+    
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+        
+    def __init__(self, directory=LOGO_DIR):
+        super().__init__(QApplication.instance())
+        self.directory = directory
+        self.manager = QNetworkAccessManager(self)
+        self.originals = {} # symbol -> QPixmap, or None once the disk cache had nothing
+        self.scaled = {} # (symbol, width, height, dpr) -> QPixmap
+        self.pending = {} # symbol -> in-flight QNetworkReply
+        self.misses = self.load_misses() # symbol -> time of the failed fetch
+        
+    def path(self, symbol):
+        return os.path.join(self.directory, f"{symbol}.img")
+        
+    def load_misses(self):
+        try:
+            with open(os.path.join(self.directory, "misses.json"), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+            
+    def save_misses(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, "misses.json"), "w") as f:
+                json.dump(self.misses, f)
+        except OSError as e:
+            print(f"Error writing logo misses: {e}")
+            
+    def pixmap(self, symbol, size=None, dpr=1.0):
+        """
+        The symbol's logo, scaled to fit `size` (device pixels = size * dpr) if given, or
+        None if there is none yet. Unknown or expired logos are fetched in the background
+        and announced with logo_ready.
+        """
+        if symbol not in self.originals:
+            self.originals[symbol] = None
+            path = self.path(symbol)
+            pixmap = QPixmap()
+            if os.path.exists(path) and pixmap.load(path):
+                self.originals[symbol] = pixmap
+                if time.time() - os.path.getmtime(path) > self.LOGO_TTL:
+                    self.request(symbol)
+            else:
+                self.request(symbol)
+        original = self.originals[symbol]
+        if original is None or size is None:
+            return original
+        key = (symbol, size.width(), size.height(), dpr)
+        scaled = self.scaled.get(key)
+        if scaled is None:
+            scaled = original.scaled(size * dpr, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            scaled.setDevicePixelRatio(dpr)
+            self.scaled[key] = scaled
+        return scaled
+        
+    def request(self, symbol):
+        domain = TICKER_TO_DOMAIN.get(symbol)
+        if not domain or symbol in self.pending:
+            return
+        missed = self.misses.get(symbol)
+        if missed and time.time() - missed < self.MISS_TTL:
+            return
+        reply = self.manager.get(QNetworkRequest(QUrl(f"https://unavatar.io/{domain}?fallback=false")))
+        reply.finished.connect(lambda: self.on_reply(symbol, reply))
+        self.pending[symbol] = reply
+        
+    def on_reply(self, symbol, reply):
+        self.pending.pop(symbol, None)
+        data = bytes(reply.readAll()) if reply.error() == QNetworkReply.NetworkError.NoError else b""
+        reply.deleteLater()
+        pixmap = QPixmap()
+        if not data or not pixmap.loadFromData(data):
+            # No logo, or offline: keep whatever is cached and don't ask again for a while
+            self.misses[symbol] = time.time()
+            self.save_misses()
+            return
+        self.originals[symbol] = pixmap
+        self.scaled = {key: value for key, value in self.scaled.items() if key[0] != symbol}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path(symbol), "wb") as f:
+                f.write(data)
+        except OSError as e:
+            print(f"Error writing logo for {symbol}: {e}")
+        if self.misses.pop(symbol, None) is not None:
+            self.save_misses()
+        self.logo_ready.emit(symbol)
+
 class LogoWidget(QWidget):
     def __init__(self, symbol, size=50, parent=None):
         super().__init__(parent)
         self.symbol = symbol
         self.setFixedSize(size, size)
-        self.pixmap = None
-        self.manager = QNetworkAccessManager(self)
-        self.manager.finished.connect(self.on_reply)
+        self.service = LogoService.instance()
+        self.service.logo_ready.connect(self.on_logo_ready)
         
-        # Initial fetch
+        # Initial lookup (memory, disk, then one shared fetch)
         self.fetch_logo()
 
     def fetch_logo(self):
-        domain = TICKER_TO_DOMAIN.get(self.symbol)
-        if domain:
-            url = f"https://unavatar.io/{domain}?fallback=false"
-            request = QNetworkRequest(QUrl(url))
-            self.manager.get(request)
-        else:
-            # No domain mapping, stay with fallback
-            pass
+        self.service.pixmap(self.symbol)
+        self.update()
 
-    def on_reply(self, reply):
-        if reply.error() == QNetworkReply.NetworkError.NoError:
-            data = reply.readAll()
-            pixmap = QPixmap()
-            if pixmap.loadFromData(data):
-                self.pixmap = pixmap
-                self.update()
-        reply.deleteLater()
+    def on_logo_ready(self, symbol):
+        if symbol == self.symbol:
+            self.update()
 
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -60,46 +189,108 @@ class LogoWidget(QWidget):
         # Background Container (White for transparency safety or fallback gradient)
         rect = self.rect()
         
-        if self.pixmap:
+        # Margins to keep it looking nice
+        margin = 4
+        target_rect = rect.adjusted(margin, margin, -margin, -margin)
+        dpr = self.devicePixelRatioF()
+        scaled = self.service.pixmap(self.symbol, target_rect.size(), dpr)
+        
+        if scaled is not None:
             # Draw White Container for Logo Safety
             painter.setBrush(QColor("white"))
             painter.setPen(Qt.NoPen)
             painter.drawRoundedRect(rect, 12, 12)
             
-            # Draw Logo (Scaled)
-            # Margins to keep it looking nice
-            margin = 4
-            target_rect = rect.adjusted(margin, margin, -margin, -margin)
-            scaled = self.pixmap.scaled(target_rect.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            
-            # Center it
-            x = target_rect.x() + (target_rect.width() - scaled.width()) / 2
-            y = target_rect.y() + (target_rect.height() - scaled.height()) / 2
+            # Draw Logo (pre-scaled by the service), centered
+            x = target_rect.x() + (target_rect.width() - scaled.width() / dpr) / 2
+            y = target_rect.y() + (target_rect.height() - scaled.height() / dpr) / 2
             
             painter.drawPixmap(int(x), int(y), scaled)
             
         else:
             # Fallback: Graphical Icon Tile
-            hash_val = sum(ord(c) for c in self.symbol)
-            hue = (hash_val * 137.508) % 360
-            bg_color = QColor.fromHsl(int(hue), 200, 100)
-            
-            gradient = QLinearGradient(0, 0, rect.width(), rect.height())
-            gradient.setColorAt(0, bg_color.lighter(130))
-            gradient.setColorAt(1, bg_color)
-            
-            painter.setBrush(QBrush(gradient))
-            painter.setPen(Qt.NoPen)
-            painter.drawRoundedRect(rect, 12, 12)
-            
-            # Text (Initials)
-            painter.setPen(QColor("white"))
-            font_size = int(rect.height() * 0.4)
-            font = QFont("Arial", font_size, QFont.Bold)
-            painter.setFont(font)
-            painter.drawText(rect, Qt.AlignCenter, self.symbol[:1])
+            paint_symbol_tile(painter, rect, self.symbol)
+
+class AnimationClock(QObject):
+    """
+    One application-wide timer driving every widget animation. Widgets subscribe
+    while they are shown and still animating; each tick only repaints subscribers
+    that are actually on screen, and the timer stops altogether when there are none
+    or their windows are hidden or minimized. Animations are driven by elapsed time,
+    so skipped ticks never slow them down.
+    """
+    FAST_INTERVAL = 16 # ms, while something is drawing in
+    SLOW_INTERVAL = 50 # ms, pulses only
+    _instance = None
+    
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+        
+    def __init__(self):
+        super().__init__(QApplication.instance())
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+        self.widgets = set()
+        self.windows = set()
+        self.ticks = 0
+        
+    def add(self, widget):
+        self.widgets.add(widget)
+        window = widget.window()
+        if window not in self.windows:
+            # Pause/resume on minimize, restore, hide and show
+            window.installEventFilter(self)
+            self.windows.add(window)
+        self.reschedule()
+        
+    def remove(self, widget):
+        self.widgets.discard(widget)
+        self.reschedule()
+        
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.WindowStateChange, QEvent.Show, QEvent.Hide):
+            QTimer.singleShot(0, self.reschedule)
+        return False
+        
+    def _live(self):
+        """Subscribed widgets that still exist and whose window is on screen."""
+        live = []
+        for widget in list(self.widgets):
+            try:
+                window = widget.window()
+                if widget.isVisible() and not window.isMinimized():
+                    live.append(widget)
+            except RuntimeError: # Deleted on the C++ side
+                self.widgets.discard(widget)
+        return live
+        
+    def reschedule(self):
+        live = self._live()
+        if not live:
+            self.timer.stop()
+            return
+        drawing = any(w.is_drawing_in() and not w.visibleRegion().isEmpty() for w in live)
+        interval = self.FAST_INTERVAL if drawing else self.SLOW_INTERVAL
+        if not self.timer.isActive() or self.timer.interval() != interval:
+            self.timer.start(interval)
+            
+    def tick(self):
+        self.ticks += 1
+        now = time.monotonic()
+        for widget in self._live():
+            if widget.visibleRegion().isEmpty(): # Scrolled out of view
+                continue
+            if not widget.advance(now):
+                self.widgets.discard(widget)
+        self.reschedule()
 
 class SparklineWidget(QWidget):
+    DRAW_IN_SECONDS = 0.8
+    PULSE_SECONDS = 2.0 # Radius 4 -> 8 -> 4
+    
     def __init__(self, data, rvol=1.0, parent=None):
         super().__init__(parent)
         self.data = data
@@ -107,52 +298,62 @@ class SparklineWidget(QWidget):
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.setMinimumHeight(40)
         
-        # Animation State
+        # Animation State (driven by the shared AnimationClock while shown)
         self._progress = 0.0
         self._pulse_radius = 4.0
-        self._pulse_growing = True
-        
-        # Progressive Draw Animation
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.animate_progress)
-        self.timer.start(16) # ~60 FPS
-        
-        # Pulse Animation
-        self.pulse_timer = QTimer(self)
-        self.pulse_timer.timeout.connect(self.animate_pulse)
-        self.pulse_timer.start(50)
+        self._started = None
         
-        # Cache
-        self.cached_path = None
-        self.cached_fill_path = None
+        # Cache: points per (data version, size); static line/fill/RVOL pill as a
+        # pixmap per (data version, size, device pixel ratio)
+        self._data_version = 0
+        self._points_key = None
+        self._points = []
+        self._pixmap_key = None
+        self._pixmap = None
 
     def update_data(self, data, rvol=None):
         self.data = data
         if rvol is not None:
             self.rvol = rvol
-        self.cached_path = None
-        self.cached_fill_path = None
+        self._data_version += 1
         self._progress = 0.0
-        self.timer.start(16)
+        self._started = None
+        if self.isVisible():
+            AnimationClock.instance().add(self)
         self.update()
 
-    def animate_progress(self):
-        if self._progress < 1.0:
-            self._progress += 0.02 # 800ms duration approx (50 frames)
-            self.update()
-        else:
-            self.timer.stop()
+    def showEvent(self, event):
+        super().showEvent(event)
+        AnimationClock.instance().add(self)
 
-    def animate_pulse(self):
-        if self._pulse_growing:
-            self._pulse_radius += 0.2
-            if self._pulse_radius >= 8.0:
-                self._pulse_growing = False
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        AnimationClock.instance().remove(self)
+
+    def is_drawing_in(self):
+        return self._progress < 1.0
+
+    def advance(self, now):
+        """Clock tick: steps the draw-in, then the pulse. Returns False once there is nothing to animate."""
+        if not self.data or len(self.data) < 2:
+            return False
+        if self._progress < 1.0:
+            if self._started is None:
+                self._started = now
+            self._progress = min(1.0, (now - self._started) / self.DRAW_IN_SECONDS)
         else:
-            self._pulse_radius -= 0.2
-            if self._pulse_radius <= 4.0:
-                self._pulse_growing = True
+            phase = (now % self.PULSE_SECONDS) / self.PULSE_SECONDS
+            radius = 4.0 + 4.0 * (1 - abs(2 * phase - 1))
+            if abs(radius - self._pulse_radius) < 0.1: # Below what a frame can show
+                return True
+            self._pulse_radius = radius
+            if self._points:
+                # Only the pulse changes: repaint just around the last point
+                x, y = self._points[-1]
+                self.update(int(x - 10), int(y - 10), 20, 20)
+                return True
         self.update()
+        return True
 
     def calculate_points(self, width, height):
         if not self.data or len(self.data) < 2:
@@ -172,61 +373,45 @@ class SparklineWidget(QWidget):
             points.append((x, y))
         return points
 
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        points = self.calculate_points(self.width(), self.height())
-        if not points:
-            return
-            
-        # Progressive Draw Limit
-        num_points_to_draw = int(len(points) * self._progress)
-        if num_points_to_draw < 2:
-            return
-            
-        current_points = points[:num_points_to_draw]
-        
-        # 1. Create Path with Smooth Curves (Cubic Bezier)
+    def points(self):
+        key = (self._data_version, self.width(), self.height())
+        if self._points_key != key:
+            self._points = self.calculate_points(self.width(), self.height())
+            self._points_key = key
+        return self._points
+
+    def build_paths(self, points):
+        """Smooth line (cubic Bezier) through `points`, and the same path closed down to the bottom edge."""
         path = QPainterPath()
-        fill_path = QPainterPath()
-        
-        # Check cache if animation complete
-        if self._progress >= 1.0 and self.cached_path:
-            path = self.cached_path
-            fill_path = self.cached_fill_path
-        else:
-            path.moveTo(current_points[0][0], current_points[0][1])
-            
-            for i in range(len(current_points) - 1):
-                p1 = current_points[i]
-                p2 = current_points[i+1]
-                
-                # Control points for smooth curve
-                c1_x = p1[0] + (p2[0] - p1[0]) * 0.5
-                c1_y = p1[1]
-                c2_x = p1[0] + (p2[0] - p1[0]) * 0.5
-                c2_y = p2[1]
-                
-                path.cubicTo(c1_x, c1_y, c2_x, c2_y, p2[0], p2[1])
-                
-            # 2. Draw Gradient Fill (Luma Fade: 40% -> 0%)
-            # Close the path for filling
-            fill_path = QPainterPath(path)
-            fill_path.lineTo(current_points[-1][0], self.height())
-            fill_path.lineTo(current_points[0][0], self.height())
-            fill_path.closeSubpath()
-            
-            # Update cache if complete
-            if self._progress >= 1.0:
-                self.cached_path = path
-                self.cached_fill_path = fill_path
-        
-        # Determine Color
+        path.moveTo(points[0][0], points[0][1])
+        for i in range(len(points) - 1):
+            p1 = points[i]
+            p2 = points[i+1]
+            
+            # Control points for smooth curve
+            c1_x = p1[0] + (p2[0] - p1[0]) * 0.5
+            c1_y = p1[1]
+            c2_x = p1[0] + (p2[0] - p1[0]) * 0.5
+            c2_y = p2[1]
+            
+            path.cubicTo(c1_x, c1_y, c2_x, c2_y, p2[0], p2[1])
+            
+        fill_path = QPainterPath(path)
+        fill_path.lineTo(points[-1][0], self.height())
+        fill_path.lineTo(points[0][0], self.height())
+        fill_path.closeSubpath()
+        return path, fill_path
+
+    def base_color(self):
         is_positive = self.data[-1] >= self.data[0]
-        color_hex = styles.COLORS["success"] if is_positive else styles.COLORS["danger"]
-        base_color = QColor(color_hex)
+        return QColor(styles.COLORS["success"] if is_positive else styles.COLORS["danger"])
+
+    def paint_static(self, painter, points):
+        """Gradient fill, line and RVOL pill: everything but the pulse."""
+        path, fill_path = self.build_paths(points)
+        base_color = self.base_color()
         
+        # Gradient Fill (Luma Fade: 40% -> 0%)
         gradient = QLinearGradient(0, 0, 0, self.height())
         gradient.setColorAt(0, QColor(base_color.red(), base_color.green(), base_color.blue(), 102)) # 40% opacity
         gradient.setColorAt(1.0, QColor(base_color.red(), base_color.green(), base_color.blue(), 0)) # 0% opacity
@@ -235,38 +420,17 @@ class SparklineWidget(QWidget):
         painter.setPen(Qt.NoPen)
         painter.drawPath(fill_path)
         
-        # 3. Draw Line (Neon Stroke)
+        # Line (Neon Stroke)
         pen = QPen(base_color, 2)
         pen.setCapStyle(Qt.RoundCap)
         pen.setJoinStyle(Qt.RoundJoin)
         painter.setPen(pen)
         painter.setBrush(Qt.NoBrush)
         painter.drawPath(path)
-            
-        # 3. Pulse Effect (Last Point)
-        if self._progress >= 1.0:
-            last_x, last_y = points[-1]
-            
-            # Glow
-            painter.setBrush(Qt.NoBrush)
-            glow_pen = QPen(base_color, 2)
-            glow_color = QColor(base_color)
-            glow_color.setAlpha(100)
-            glow_pen.setColor(glow_color)
-            painter.setPen(glow_pen)
-            painter.drawEllipse(int(last_x - self._pulse_radius), int(last_y - self._pulse_radius), 
-                                int(self._pulse_radius * 2), int(self._pulse_radius * 2))
-            
-            # Dot
-            painter.setBrush(base_color)
-            painter.setPen(Qt.NoPen)
-            painter.drawEllipse(int(last_x - 3), int(last_y - 3), 6, 6)
-
+        
         # RVOL Indicator
         width = self.width()
         height = self.height()
-        
-        rvol_rect = [width - 8, height/2 - 10, 4, 20]
         painter.setPen(Qt.NoPen)
         
         pill_color = QColor(styles.COLORS["surface_light"])
@@ -278,107 +442,305 @@ class SparklineWidget(QWidget):
         painter.setBrush(pill_color)
         painter.drawRoundedRect(int(width - 8), int(height/2 - 10), 4, 20, 2, 2)
 
+    def static_pixmap(self, points):
+        dpr = self.devicePixelRatioF()
+        key = (self._data_version, self.width(), self.height(), dpr)
+        if self._pixmap_key != key:
+            pixmap = QPixmap(math.ceil(self.width() * dpr), math.ceil(self.height() * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.Antialiasing)
+            self.paint_static(painter, points)
+            painter.end()
+            self._pixmap, self._pixmap_key = pixmap, key
+        return self._pixmap
+
+    def paintEvent(self, event):
+        points = self.points()
+        if not points:
+            return
+            
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        
+        # Progressive Draw: the partial line is transient, so it isn't cached
+        if self._progress < 1.0:
+            num_points_to_draw = int(len(points) * self._progress)
+            if num_points_to_draw >= 2:
+                self.paint_static(painter, points[:num_points_to_draw])
+            return
+        
+        painter.drawPixmap(0, 0, self.static_pixmap(points))
+            
+        # Pulse Effect (Last Point), drawn over the cached pixmap each frame
+        base_color = self.base_color()
+        last_x, last_y = points[-1]
+        
+        # Glow
+        painter.setBrush(Qt.NoBrush)
+        glow_color = QColor(base_color)
+        glow_color.setAlpha(100)
+        painter.setPen(QPen(glow_color, 2))
+        painter.drawEllipse(int(last_x - self._pulse_radius), int(last_y - self._pulse_radius), 
+                            int(self._pulse_radius * 2), int(self._pulse_radius * 2))
+        
+        # Dot
+        painter.setBrush(base_color)
+        painter.setPen(Qt.NoPen)
+        painter.drawEllipse(int(last_x - 3), int(last_y - 3), 6, 6)
+
 class DetailedChartWidget(QWidget):
+    TOOLTIP_WIDTH = 140
+    MAX_CANDLES = 300
+    MIN_VISIBLE = 20 # Bars on screen at full zoom
+    ZOOM_STEP = 0.8 # Visible range per wheel notch
+    
     def __init__(self, data=None, dates=None, parent=None):
         super().__init__(parent)
-        self.data = data if data else [] # Can be list of floats (line) or list of dicts (ohlc)
-        self.dates = dates if dates else []
         self.chart_type = "CANDLE" # LINE or CANDLE
         self.setMinimumHeight(300)
         self.setMouseTracking(True)
-        self.cursor_pos = None
+        self.hover_index = None # Bar under the cursor (crosshair/tooltip overlay)
+        self.drag_origin = None # (x, view_start) while drag-panning
+        self.zoom_anchor = None # (x, view, bar position) of the last wheel step
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.cached_pixmap = None
+        self.scale = None
+        self.dates = []
+        self.set_data(data if data else [], dates) # Can be list of floats (line) or list of dicts (ohlc)
 
     def set_data(self, data, dates=None):
         self.data = data
         if dates:
             self.dates = dates
+        self.series = self.to_columns(data)
+        self.pyramids = {} # Decimation pyramids, built on first draw
+        self.extremes = None # Range min/max table for the Y axis, built on first draw
+        self.hover_index = None
+        self.drag_origin = None
+        self.zoom_anchor = None
+        # Visible bars [view_start, view_end); a new series starts fully zoomed out
+        self.view_start, self.view_end = 0, len(data)
+        self.invalidate()
+
+    def pyramid(self, kind):
+        """The series' chart_decimation pyramid ('candle' or 'line'), built once per series."""
+        if kind not in self.pyramids:
+            if kind == 'candle':
+                self.pyramids[kind] = chart_decimation.OHLCPyramid(self.series)
+            else:
+                self.pyramids[kind] = chart_decimation.LinePyramid(self.series['close'])
+        return self.pyramids[kind]
+
+    @staticmethod
+    def to_columns(data):
+        """OHLC dicts or plain values -> float arrays ('close' always, OHLCV for candles)."""
+        if data and isinstance(data[0], dict):
+            columns = {key: np.array([d.get(key, np.nan) for d in data], dtype=np.float64)
+                       for key in ('open', 'high', 'low', 'close', 'volume')}
+            columns['date'] = [d.get('date', '') for d in data]
+            return columns
+        return {'close': np.asarray(data, dtype=np.float64)}
+
+    def invalidate(self):
+        """Drops the cached chart and scale (new data, size or type)."""
         self.cached_pixmap = None
+        self.scale = None
         self.update()
 
-    def decimate_data(self, data, threshold=200):
-        if len(data) <= threshold:
-            return data
-            
-        # Simple aggregation/resampling
-        new_data = []
-        bucket_size = len(data) / threshold
-        
-        for i in range(threshold):
-            start_idx = int(i * bucket_size)
-            end_idx = int((i + 1) * bucket_size)
-            chunk = data[start_idx:end_idx]
-            
-            if not chunk: continue
-            
-            if isinstance(chunk[0], dict): # OHLC
-                agg = {
-                    'date': chunk[0]['date'], # Use first date
-                    'open': chunk[0]['open'],
-                    'high': max(d['high'] for d in chunk),
-                    'low': min(d['low'] for d in chunk),
-                    'close': chunk[-1]['close'],
-                    'volume': sum(d.get('volume', 0) for d in chunk)
-                }
-                new_data.append(agg)
-            else: # Line
-                # Average or just take first? Average is smoother.
-                avg_val = sum(chunk) / len(chunk)
-                new_data.append(avg_val)
-                
-        return new_data
-        
+    def chart_scale(self):
+        """(min value, value range, padding, drawable height) of the visible bars, computed once per data/size/view change."""
+        if self.scale is None:
+            if self.extremes is None:
+                if 'high' in self.series:
+                    self.extremes = chart_decimation.RangeExtremes(self.series['low'], self.series['high'])
+                else:
+                    self.extremes = chart_decimation.RangeExtremes(self.series['close'], self.series['close'])
+            min_val, max_val = self.extremes.query(self.view_start, self.view_end)
+            if not np.isfinite(min_val):
+                min_val, max_val = 0.0, 1.0
+            val_range = max_val - min_val if max_val != min_val else 1.0
+            padding = self.height() * 0.05
+            self.scale = (min_val, val_range, padding, self.height() - 2 * padding)
+        return self.scale
+
+    def map_y(self, val):
+        min_val, val_range, padding, available_height = self.chart_scale()
+        return self.height() - padding - ((val - min_val) / val_range) * available_height
+
+    def map_x(self, idx):
+        span = self.view_end - 1 - self.view_start
+        return ((idx - self.view_start) / span) * self.width() if span > 0 else self.width() / 2
+
+    def index_at(self, x):
+        """Nearest visible bar to screen x, in O(1)."""
+        span = self.view_end - 1 - self.view_start
+        idx = self.view_start + int(round((x / max(1, self.width())) * span))
+        return max(self.view_start, min(idx, self.view_end - 1))
+
+    def set_view(self, start, end):
+        """Shows bars [start, end), clamped to the series; False if nothing changed."""
+        data_len = len(self.data)
+        count = max(min(self.MIN_VISIBLE, data_len), min(end - start, data_len))
+        start = max(0, min(start, data_len - count))
+        if (start, start + count) == (self.view_start, self.view_end):
+            return False
+        self.view_start, self.view_end = start, start + count
+        self.invalidate()
+        return True
+
+    def zoom(self, notches, x):
+        """Zooms in (notches > 0) or out around screen x, keeping the bar under it in place."""
+        count = self.view_end - self.view_start
+        new_count = int(round(count * self.ZOOM_STEP ** notches))
+        if new_count == count:
+            new_count += -1 if notches > 0 else 1
+        new_count = max(min(self.MIN_VISIBLE, len(self.data)), min(new_count, len(self.data)))
+        if new_count == count:
+            return False # Already fully zoomed in/out
+        anchor = x / max(1, self.width())
+        position = self.view_start + anchor * (count - 1) # Fractional bar under x
+        if self.zoom_anchor and self.zoom_anchor[:2] == (x, (self.view_start, self.view_end)):
+            position = self.zoom_anchor[2] # Same gesture: don't let rounding drift the anchor
+        start = int(round(position - anchor * (new_count - 1)))
+        changed = self.set_view(start, start + new_count)
+        self.zoom_anchor = (x, (self.view_start, self.view_end), position)
+        return changed
+
+    def reset_view(self):
+        self.set_view(0, len(self.data))
+
     def set_chart_type(self, type_str):
         self.chart_type = type_str
-        self.cached_pixmap = None
-        self.update()
+        self.invalidate()
         
     def resizeEvent(self, event):
         self.cached_pixmap = None
+        self.scale = None
         super().resizeEvent(event)
         
+    def wheelEvent(self, event):
+        notches = event.angleDelta().y() / 120
+        if self.data and notches and self.zoom(notches, event.position().x()):
+            self.hover_index = self.index_at(event.position().x())
+            event.accept()
+        else:
+            event.ignore() # Fully zoomed in/out: let the page scroll
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self.data:
+            self.drag_origin = (event.position().x(), self.view_start)
+            self.setCursor(Qt.ClosedHandCursor)
+        super().mousePressEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton and self.drag_origin is not None:
+            self.drag_origin = None
+            self.unsetCursor()
+        super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
+        super().mouseDoubleClickEvent(event)
+
     def mouseMoveEvent(self, event):
-        self.cursor_pos = event.pos()
-        self.update()
+        if self.drag_origin is not None:
+            # Pan by whole bars relative to where the drag began, so it never drifts
+            origin_x, origin_start = self.drag_origin
+            span = max(1, self.view_end - 1 - self.view_start)
+            shift = int(round((event.position().x() - origin_x) / max(1, self.width()) * span))
+            count = self.view_end - self.view_start
+            if self.set_view(origin_start - shift, origin_start - shift + count):
+                self.hover_index = self.index_at(event.pos().x())
+            super().mouseMoveEvent(event)
+            return
+        idx = self.index_at(event.pos().x()) if self.data else None
+        if idx != self.hover_index:
+            # Only the old and new crosshair/tooltip areas need repainting
+            dirty = self.overlay_region()
+            self.hover_index = idx
+            self.update(dirty.united(self.overlay_region()))
         super().mouseMoveEvent(event)
         
     def leaveEvent(self, event):
-        self.cursor_pos = None
-        self.update()
+        if self.hover_index is not None:
+            dirty = self.overlay_region()
+            self.hover_index = None
+            self.update(dirty)
         super().leaveEvent(event)
+
+    def tooltip_lines(self, idx):
+        if 'high' in self.series:
+            s = self.series
+            return [
+                f"Date: {s['date'][idx]}",
+                f"Open: {s['open'][idx]:.2f}",
+                f"High: {s['high'][idx]:.2f}",
+                f"Low:  {s['low'][idx]:.2f}",
+                f"Close:{s['close'][idx]:.2f}"
+            ]
+        date_str = self.dates[idx] if self.dates and idx < len(self.dates) else "N/A"
+        return [
+            f"Date: {date_str}",
+            f"Price: {self.series['close'][idx]:.2f}"
+        ]
+
+    def overlay_geometry(self):
+        """Crosshair point and tooltip rect for the hovered bar, or None."""
+        if self.hover_index is None or not self.view_start <= self.hover_index < self.view_end:
+            return None
+        width = self.width()
+        x = self.map_x(self.hover_index)
+        y = self.map_y(self.series['close'][self.hover_index])
+        lines = 5 if 'high' in self.series else 2
+        tw, th = self.TOOLTIP_WIDTH, 20 * lines + 10
+        tx = x + 10 if x + 10 + tw < width else x - 10 - tw
+        ty = y - th - 10 if y - th - 10 > 0 else y + 10
+        return x, y, QRect(int(tx), int(ty), int(tw), int(th))
+
+    def overlay_region(self):
+        geometry = self.overlay_geometry()
+        if geometry is None:
+            return QRegion()
+        x, y, tooltip = geometry
+        region = QRegion(int(x) - 2, 0, 4, self.height())
+        region = region.united(QRegion(0, int(y) - 2, self.width(), 4))
+        return region.united(QRegion(tooltip.adjusted(-2, -2, 2, 2)))
+
+    def paint_overlay(self, painter):
+        """Crosshair and tooltip for the hovered bar, over the cached chart."""
+        geometry = self.overlay_geometry()
+        if geometry is None:
+            return
+        x, y, tooltip = geometry
+        
+        # Draw Crosshair
+        painter.setPen(QPen(QColor("white"), 1, Qt.DashLine))
+        painter.drawLine(int(x), 0, int(x), self.height())
+        painter.drawLine(0, int(y), self.width(), int(y))
         
+        # Tooltip Box
+        painter.setBrush(QColor(30, 30, 30, 230))
+        painter.setPen(QPen(QColor(styles.COLORS['surface_light']), 1))
+        painter.drawRoundedRect(tooltip, 5, 5)
+        
+        painter.setPen(QColor("white"))
+        for i, line in enumerate(self.tooltip_lines(self.hover_index)):
+            painter.drawText(tooltip.x() + 10, tooltip.y() + 20 + (i*18), line)
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
         
         width = self.width()
         height = self.height()
-        data_len = len(self.data)
         
         # 1. Background & Grid
         # painter.fillRect(0, 0, width, height, QColor(styles.COLORS['surface'])) # Transparent background
         
-        # Calculate value range for mapping (needed for both caching and tooltip)
-        all_vals = []
-        for d in self.data:
-            if isinstance(d, dict):
-                all_vals.extend([d['open'], d['high'], d['low'], d['close']])
-            else:
-                all_vals.append(d)
-        
-        min_val = min(all_vals) if all_vals else 0
-        max_val = max(all_vals) if all_vals else 1
-        val_range = max_val - min_val if max_val != min_val else 1.0
-        
-        # Define map_y helper (used in both cache creation and tooltip)
-        def map_y(val):
-            padding = height * 0.05
-            available_height = height - (2 * padding)
-            return height - padding - ((val - min_val) / val_range) * available_height
-        
         # 2. Draw Chart (Cached)
-        if self.cached_pixmap is None:
+        if self.cached_pixmap is None and self.data:
             self.cached_pixmap = QPixmap(width, height)
             self.cached_pixmap.fill(Qt.transparent)
             
@@ -394,45 +756,26 @@ class DetailedChartWidget(QWidget):
                 y = i * (height / 5)
                 cache_painter.drawLine(0, int(y), width, int(y))
             
-            # Decimate Data for Rendering
-            render_data = self.decimate_data(self.data, threshold=300) # Limit to 300 candles/points
-            render_len = len(render_data)
-            
-            # Helper to map index to X (Local scope for cache_painter)
-            # Helper to map index to X (Local scope for cache_painter)
-            def map_x_render(idx):
-                return (idx / (render_len - 1)) * width if render_len > 1 else width / 2
-            
-            # Helper to map Value to Y
-            all_vals = []
-            for d in render_data:
-                if isinstance(d, dict):
-                    all_vals.extend([d['open'], d['high'], d['low'], d['close']])
-                else:
-                    all_vals.append(d)
-            
-            min_val = min(all_vals) if all_vals else 0
-            max_val = max(all_vals) if all_vals else 1
-            val_range = max_val - min_val if max_val != min_val else 1.0
-            
-            def map_y(val):
-                # Add some padding (5%)
-                padding = height * 0.05
-                available_height = height - (2 * padding)
-                return height - padding - ((val - min_val) / val_range) * available_height
+            min_val, val_range, _, _ = self.chart_scale()
+            map_y = self.map_y
+            map_x = self.map_x
 
-            if self.chart_type == "CANDLE" and isinstance(render_data[0], dict):
-                # Draw Candlesticks
-                candle_width = max(1, (width / render_len) * 0.6)
+            if self.chart_type == "CANDLE" and 'high' in self.series:
+                # Draw Candlesticks (min/max buckets, so no wick is lost)
+                # Only the visible bars, from the pyramid level matching the zoom
+                candles = self.pyramid('candle').view(self.MAX_CANDLES, self.view_start, self.view_end)
+                bucket = candles['bucket']
+                candle_width = max(1, (width * bucket / max(1, self.view_end - 1 - self.view_start)) * 0.6)
                 
-                for i, candle in enumerate(render_data):
-                    x = map_x_render(i)
-                    y_open = map_y(candle['open'])
-                    y_close = map_y(candle['close'])
-                    y_high = map_y(candle['high'])
-                    y_low = map_y(candle['low'])
+                for start, open_, high, low, close in zip(candles['start'].tolist(), candles['open'].tolist(), candles['high'].tolist(),
+                                                          candles['low'].tolist(), candles['close'].tolist()):
+                    x = map_x(start + (bucket - 1) / 2)
+                    y_open = map_y(open_)
+                    y_close = map_y(close)
+                    y_high = map_y(high)
+                    y_low = map_y(low)
                     
-                    is_up = candle['close'] >= candle['open']
+                    is_up = close >= open_
                     color = QColor(styles.COLORS['success']) if is_up else QColor(styles.COLORS['danger'])
                     
                     cache_painter.setPen(QPen(color, 1))
@@ -447,17 +790,14 @@ class DetailedChartWidget(QWidget):
                     cache_painter.drawRect(int(x - candle_width/2), int(rect_top), int(candle_width), int(rect_height))
                     
             else:
-                # Draw Line Chart
+                # Draw Line Chart (LTTB, a point every 2px)
                 path = QPainterPath()
                 fill_path = QPainterPath()
                 
                 # Prepare points
-                points = []
-                for i in range(render_len):
-                    val = render_data[i] if not isinstance(render_data[i], dict) else render_data[i]['close']
-                    x = map_x_render(i)
-                    y = map_y(val)
-                    points.append((x, y))
+                closes = self.series['close']
+                visible = self.pyramid('line').view(max(2, width // 2), self.view_start, self.view_end)
+                points = [(map_x(i), map_y(closes[i])) for i in visible.tolist()]
                     
                 if points:
                     path.moveTo(points[0][0], points[0][1])
@@ -499,9 +839,8 @@ class DetailedChartWidget(QWidget):
                 
             # X-Axis
             x_steps = 5
-            data_len = len(self.data)
             for i in range(x_steps + 1):
-                idx = int(i * (data_len - 1) / x_steps) # Use original data len for dates
+                idx = self.view_start + int(i * (self.view_end - 1 - self.view_start) / x_steps) # Visible bars' dates
                 x = (i / x_steps) * width
                 
                 date_str = ""
@@ -515,55 +854,11 @@ class DetailedChartWidget(QWidget):
             cache_painter.end()
 
         # Draw Cached Pixmap
-        painter.drawPixmap(0, 0, self.cached_pixmap)
+        if self.cached_pixmap is not None:
+            painter.drawPixmap(0, 0, self.cached_pixmap)
+        
         # 4. Cursor / Tooltip
-        if self.cursor_pos:
-            mx = self.cursor_pos.x()
-            # Find nearest index
-            idx = int((mx / width) * (data_len - 1))
-            idx = max(0, min(idx, data_len - 1))
-            
-            x = (idx / (data_len - 1)) * width if data_len > 1 else width / 2
-            
-            # Draw Crosshair
-            painter.setPen(QPen(QColor("white"), 1, Qt.DashLine))
-            painter.drawLine(int(x), 0, int(x), height)
-            
-            # Draw Tooltip
-            if isinstance(self.data[0], dict):
-                candle = self.data[idx]
-                lines = [
-                    f"Date: {candle['date']}",
-                    f"Open: {candle['open']:.2f}",
-                    f"High: {candle['high']:.2f}",
-                    f"Low:  {candle['low']:.2f}",
-                    f"Close:{candle['close']:.2f}"
-                ]
-                val = candle['close']
-            else:
-                val = self.data[idx]
-                date_str = self.dates[idx] if self.dates and idx < len(self.dates) else "N/A"
-                lines = [
-                    f"Date: {date_str}",
-                    f"Price: {val:.2f}"
-                ]
-                
-            y = map_y(val)
-            painter.drawLine(0, int(y), width, int(y))
-            
-            # Tooltip Box
-            tw, th = 140, 20 * len(lines) + 10
-            tx = x + 10 if x + 10 + tw < width else x - 10 - tw
-            ty = y - th - 10 if y - th - 10 > 0 else y + 10
-            
-            painter.setBrush(QColor(30, 30, 30, 230))
-            painter.setPen(QPen(QColor(styles.COLORS['surface_light']), 1))
-            painter.drawRoundedRect(int(tx), int(ty), int(tw), int(th), 5, 5)
-            
-            painter.setPen(QColor("white"))
-            for i, line in enumerate(lines):
-                painter.drawText(int(tx) + 10, int(ty) + 20 + (i*18), line)
-                
+        self.paint_overlay(painter)
         painter.end()
 
 class ComparisonWidget(QFrame):
@@ -832,6 +1127,24 @@ class TickerCard(QFrame):
         self.change_lbl.setStyleSheet(f"color: {color}; font-weight: bold; font-size: 14px; border: none; background: transparent;")
         self.change_lbl.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.change_lbl)
+        
+        # Relative strength (percentile across the universe), when known
+        self.rs_lbl = QLabel()
+        self.rs_lbl.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.rs_lbl)
+        self.set_rs(data.get('rs'))
+
+    def set_rs(self, rs):
+        if rs is None:
+            self.rs_lbl.hide()
+            return
+        color = styles.COLORS['success'] if rs >= 80 else styles.COLORS['danger'] if rs <= 20 else styles.COLORS['text_secondary']
+        self.rs_lbl.setText(f"RS {rs}")
+        self.rs_lbl.setToolTip("Relative strength: percentile vs the scan universe over 1W/1M/3M/6M")
+        style = f"color: {color}; font-size: 11px; font-weight: bold; border: none; background: transparent;"
+        if self.rs_lbl.styleSheet() != style:
+            self.rs_lbl.setStyleSheet(style)
+        self.rs_lbl.show()
 
     def update_data(self, data):
         self.data = data
@@ -845,13 +1158,323 @@ class TickerCard(QFrame):
         sign = "+" if change_val >= 0 else ""
         color = styles.COLORS['success'] if change_val >= 0 else styles.COLORS['danger']
         self.change_lbl.setText(f"{sign}{change_val:.2f} ({sign}{change_pct:.2f}%)")
-        self.change_lbl.setStyleSheet(f"color: {color}; font-weight: bold; font-size: 14px; border: none; background: transparent;")
+        style = f"color: {color}; font-weight: bold; font-size: 14px; border: none; background: transparent;"
+        if self.change_lbl.styleSheet() != style: # Restyling re-polishes the label; only do it when the sign flips
+            self.change_lbl.setStyleSheet(style)
+        if 'rs' in data:
+            self.set_rs(data['rs'])
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.clicked.emit(self.symbol)
         super().mousePressEvent(event)
 
+def reconcile_cards(layout, data_list, clicked=None):
+    """
+    Brings a layout of TickerCards in line with `data_list`, keyed by symbol: existing
+    cards are updated in place (only if their data changed) and moved if reordered,
+    new symbols get a card and dropped ones are deleted. Other widgets in the layout
+    (e.g. an empty-state label) are removed; trailing spacers are kept.
+    Returns counts of what changed: {'created', 'updated', 'moved', 'removed'}.
+    """
+    stats = {'created': 0, 'updated': 0, 'moved': 0, 'removed': 0}
+    wanted = {}
+    for data in data_list:
+        wanted.setdefault(data['symbol'], data) # First occurrence wins
+
+    cards = {}
+    for i in reversed(range(layout.count())):
+        widget = layout.itemAt(i).widget()
+        if isinstance(widget, TickerCard) and widget.symbol in wanted and widget.symbol not in cards:
+            cards[widget.symbol] = widget
+        elif widget is not None:
+            layout.takeAt(i)
+            widget.deleteLater()
+            stats['removed'] += isinstance(widget, TickerCard)
+
+    for position, (symbol, data) in enumerate(wanted.items()):
+        card = cards.get(symbol)
+        if card is None:
+            card = TickerCard(data)
+            if clicked is not None:
+                card.clicked.connect(clicked)
+            layout.insertWidget(position, card)
+            stats['created'] += 1
+            continue
+        if card.data != data:
+            card.update_data(data)
+            stats['updated'] += 1
+        if layout.indexOf(card) != position:
+            layout.insertWidget(position, card) # Re-inserting an existing widget moves it
+            stats['moved'] += 1
+    return stats
+
+class WatchlistModel(QAbstractListModel):
+    """
+    Watchlist rows as compact dicts (no widgets). Filtering and sorting happen here,
+    and quote updates change rows in place, so the view only repaints what moved.
+    """
+    RowRole = Qt.UserRole + 1
+    versions = itertools.count() # Row versions key the delegate's pixmap cache
+    SORT_KEYS = {
+        'rs': lambda row: (row['rs'] is None, -(row['rs'] or 0)),
+        'change': lambda row: (row['change_percent'] is None, -(row['change_percent'] or 0)),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.symbols = [] # Watchlist order
+        self.rows = {} # symbol -> row
+        self.visible = [] # Symbols shown, filtered and sorted
+        self.positions = {} # symbol -> row in self.visible
+        self.sort_key = None
+        self.filter_text = ""
+
+    @classmethod
+    def make_row(cls, symbol, data=None):
+        """The few fields a watchlist row paints; the sparkline is kept as heights normalized to 0..1."""
+        data = data or {}
+        history = [v for v in data.get('history') or [] if v is not None and math.isfinite(v)]
+        spark = None
+        if len(history) > 1:
+            low, span = min(history), max(history) - min(history)
+            spark = tuple((v - low) / span if span > 0 else 0.5 for v in history)
+        return {
+            'version': next(cls.versions),
+            'symbol': symbol,
+            'name': data.get('name', ''),
+            'price': data.get('price'),
+            'change': data.get('change'),
+            'change_percent': data.get('change_percent'),
+            'rs': data.get('rs'),
+            'spark': spark
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.visible)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.visible):
+            return None
+        row = self.rows[self.visible[index.row()]]
+        if role == Qt.DisplayRole:
+            return row['symbol']
+        if role == self.RowRole:
+            return row
+        if role == Qt.ToolTipRole:
+            return row['name'] or None
+        return None
+
+    def set_symbols(self, symbols):
+        """Sets the watchlist; rows already loaded keep their data until refreshed."""
+        self.symbols = list(dict.fromkeys(symbols))
+        self.rows = {sym: self.rows.get(sym) or self.make_row(sym) for sym in self.symbols}
+        self.rearrange()
+
+    def update_rows(self, data_list):
+        """Updates rows in place from fetch_stock_data-style dicts; unknown symbols are ignored."""
+        changed = []
+        for data in data_list:
+            symbol = data.get('symbol')
+            if symbol in self.rows:
+                self.rows[symbol] = self.make_row(symbol, data)
+                changed.append(symbol)
+        if not self.rearrange():
+            for symbol in changed:
+                if symbol in self.positions:
+                    index = self.index(self.positions[symbol])
+                    self.dataChanged.emit(index, index)
+
+    def on_logo_ready(self, symbol):
+        """Repaints a row whose logo just arrived (a new version misses the delegate's pixmap cache)."""
+        row = self.rows.get(symbol)
+        if row is None:
+            return
+        self.rows[symbol] = dict(row, version=next(self.versions))
+        if symbol in self.positions:
+            index = self.index(self.positions[symbol])
+            self.dataChanged.emit(index, index)
+
+    def set_sort(self, key):
+        """'rs', 'change' or None (watchlist order)."""
+        self.sort_key = key
+        self.rearrange()
+
+    def set_filter(self, text):
+        """Shows rows whose symbol or name contains `text` (case-insensitive)."""
+        self.filter_text = text.strip().lower()
+        self.rearrange()
+
+    def arranged(self):
+        text = self.filter_text
+        symbols = [sym for sym in self.symbols
+                   if not text or text in sym.lower() or text in self.rows[sym]['name'].lower()]
+        if self.sort_key in self.SORT_KEYS:
+            key = self.SORT_KEYS[self.sort_key]
+            symbols.sort(key=lambda sym: key(self.rows[sym])) # Stable: ties keep watchlist order
+        return symbols
+
+    def rearrange(self):
+        """Re-applies filter and sort; True if the visible order changed (views were told)."""
+        order = self.arranged()
+        if order == self.visible:
+            return False
+        if set(order) == set(self.visible):
+            # Same rows, new order: a layout change keeps hover/persistent indexes on their symbols
+            self.layoutAboutToBeChanged.emit()
+            positions = {sym: i for i, sym in enumerate(order)}
+            old = self.persistentIndexList()
+            self.changePersistentIndexList(old, [self.index(positions[self.visible[i.row()]]) for i in old])
+            self.visible, self.positions = order, positions
+            self.layoutChanged.emit()
+        else:
+            self.beginResetModel()
+            self.visible = order
+            self.positions = {sym: i for i, sym in enumerate(order)}
+            self.endResetModel()
+        return True
+
+    def symbol_at(self, row):
+        return self.visible[row]
+
+class WatchlistDelegate(QStyledItemDelegate):
+    """Paints one watchlist row (logo, symbol, name, RS, sparkline, price, change) straight from the model row."""
+    ROW_HEIGHT = 64
+    SPARK_WIDTH = 70
+    PRICE_WIDTH = 110
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.symbol_font = QFont(styles.FONTS['primary'])
+        self.symbol_font.setPixelSize(15)
+        self.symbol_font.setWeight(QFont.Black)
+        self.small_font = QFont(styles.FONTS['primary'])
+        self.small_font.setPixelSize(11)
+        self.small_bold_font = QFont(self.small_font)
+        self.small_bold_font.setBold(True)
+        self.price_font = QFont(styles.FONTS['primary'])
+        self.price_font.setPixelSize(14)
+        self.price_font.setBold(True)
+        self.colors = {key: QColor(styles.COLORS[key]) for key in
+                       ('surface', 'surface_light', 'accent', 'success', 'danger', 'text_secondary')}
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        model = index.model()
+        if index.row() >= len(model.visible):
+            return
+        row = model.rows[model.symbol_at(index.row())]
+        # Rows are painted once per version/size/hover state, then blitted (QPixmapCache is size-bounded)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        dpr = painter.device().devicePixelRatioF()
+        size = option.rect.size()
+        key = f"watchlist:{row['symbol']}:{row['version']}:{size.width()}x{size.height()}:{int(hovered)}:{dpr}"
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None:
+            pixmap = QPixmap(size * dpr)
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.transparent)
+            row_painter = QPainter(pixmap)
+            self.paint_row(row_painter, QRect(QPoint(0, 0), size), row, hovered)
+            row_painter.end()
+            QPixmapCache.insert(key, pixmap)
+        painter.drawPixmap(option.rect.topLeft(), pixmap)
+
+    def paint_row(self, painter, rect, row, hovered):
+        colors = self.colors
+        painter.setRenderHint(QPainter.Antialiasing)
+        
+        # Card background (hover like TickerCard)
+        rect = rect.adjusted(0, 3, -1, -3)
+        painter.setBrush(colors['surface'] if hovered else colors['surface_light'])
+        painter.setPen(QPen(colors['accent'] if hovered else colors['surface_light'], 1))
+        painter.drawRoundedRect(rect, 12, 12)
+        
+        # Logo (from the shared cache), or the letter tile until it arrives
+        tile = QRect(rect.x() + 10, rect.center().y() - 19, 38, 38)
+        logo_rect = tile.adjusted(3, 3, -3, -3)
+        dpr = painter.device().devicePixelRatioF()
+        logo = LogoService.instance().pixmap(row['symbol'], logo_rect.size(), dpr)
+        if logo is not None:
+            painter.setBrush(QColor("white"))
+            painter.setPen(Qt.NoPen)
+            painter.drawRoundedRect(tile, 8, 8)
+            x = logo_rect.x() + (logo_rect.width() - logo.width() / dpr) / 2
+            y = logo_rect.y() + (logo_rect.height() - logo.height() / dpr) / 2
+            painter.drawPixmap(int(x), int(y), logo)
+        else:
+            paint_symbol_tile(painter, tile, row['symbol'], 8)
+        
+        # Price / change column
+        price_rect = QRect(rect.right() - self.PRICE_WIDTH - 10, rect.y() + 8, self.PRICE_WIDTH, rect.height() - 16)
+        change = row['change']
+        trend = colors['success'] if (change or 0) >= 0 else colors['danger']
+        painter.setFont(self.price_font)
+        painter.setPen(QColor("white"))
+        price = f"${row['price']:.2f}" if row['price'] is not None else "--"
+        painter.drawText(price_rect, Qt.AlignRight | Qt.AlignTop, price)
+        if change is not None:
+            sign = "+" if change >= 0 else ""
+            painter.setFont(self.small_bold_font)
+            painter.setPen(trend)
+            painter.drawText(price_rect, Qt.AlignRight | Qt.AlignBottom,
+                             f"{sign}{change:.2f} ({sign}{row['change_percent'] or 0:.2f}%)")
+        
+        # Sparkline
+        spark_rect = QRect(price_rect.x() - self.SPARK_WIDTH - 10, rect.y() + 14, self.SPARK_WIDTH, rect.height() - 28)
+        spark = row['spark']
+        if spark is not None and spark_rect.x() > tile.right() + 80:
+            step = spark_rect.width() / (len(spark) - 1)
+            bottom, height = spark_rect.bottom(), spark_rect.height()
+            painter.setPen(QPen(trend, 1.5))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPolyline(QPolygonF([QPointF(spark_rect.x() + i * step, bottom - v * height) for i, v in enumerate(spark)]))
+        
+        # Symbol, RS and name
+        text_x = tile.right() + 12
+        text_right = (spark_rect.x() if spark is not None else price_rect.x()) - 8
+        painter.setFont(self.symbol_font)
+        painter.setPen(QColor("white"))
+        symbol_rect = QRect(text_x, rect.y() + 10, max(0, text_right - text_x), 20)
+        painter.drawText(symbol_rect, Qt.AlignLeft | Qt.AlignVCenter, row['symbol'])
+        if row['rs'] is not None:
+            rs = row['rs']
+            rs_x = text_x + painter.fontMetrics().horizontalAdvance(row['symbol']) + 8
+            rs_color = colors['success'] if rs >= 80 else colors['danger'] if rs <= 20 else colors['text_secondary']
+            painter.setFont(self.small_bold_font)
+            painter.setPen(rs_color)
+            painter.drawText(QRect(rs_x, symbol_rect.y(), max(0, text_right - rs_x), 20), Qt.AlignLeft | Qt.AlignVCenter, f"RS {rs}")
+        if row['name']:
+            painter.setFont(self.small_font)
+            painter.setPen(colors['text_secondary'])
+            name = painter.fontMetrics().elidedText(row['name'], Qt.ElideRight, max(0, text_right - text_x))
+            painter.drawText(QRect(text_x, rect.bottom() - 28, max(0, text_right - text_x), 18), Qt.AlignLeft | Qt.AlignVCenter, name)
+
+class WatchlistView(QListView):
+    """
+    Virtualized watchlist: uniform rows painted by WatchlistDelegate, so only the
+    visible rows cost anything no matter how many symbols are tracked.
+    """
+    symbol_clicked = Signal(str)
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(WatchlistDelegate(self))
+        LogoService.instance().logo_ready.connect(model.on_logo_ready)
+        self.setUniformItemSizes(True) # Row geometry is arithmetic, not measured per row
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WA_Hover)
+        self.viewport().setCursor(Qt.PointingHandCursor)
+        self.setStyleSheet("QListView { background: transparent; border: none; }")
+        self.clicked.connect(lambda index: self.symbol_clicked.emit(index.data()))
+
 class NewsItemWidget(QFrame):
     clicked = Signal(str) # url
 
@@ -952,6 +1575,145 @@ class MarketNewsWidget(QWidget):
         # To be implemented for Dashboard
         pass
 
+class AlertsPanel(QWidget):
+    """Lists the current symbol's alerts and adds/removes price, move, RSI and RVOL alerts."""
+    KINDS = [("PRICE ABOVE", 'price_above'), ("PRICE BELOW", 'price_below'), ("MOVE %", 'move'),
+             ("RSI ABOVE", 'rsi_above'), ("RSI BELOW", 'rsi_below'), ("RVOL ABOVE", 'rvol_above')]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.symbol = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 10, 0, 10)
+        layout.setSpacing(8)
+
+        header = QLabel("ALERTS")
+        header.setStyleSheet(f"color: {styles.COLORS['text_secondary']}; font-size: 12px; font-weight: bold; letter-spacing: 1px;")
+        layout.addWidget(header)
+
+        input_layout = QHBoxLayout()
+        input_layout.setSpacing(10)
+
+        self.kind_combo = QComboBox()
+        for label, kind in self.KINDS:
+            self.kind_combo.addItem(label, kind)
+        self.kind_combo.setCursor(Qt.PointingHandCursor)
+        self.kind_combo.setStyleSheet(f"""
+            QComboBox {{
+                background-color: {styles.COLORS['surface_light']};
+                color: white;
+                border: none;
+                border-radius: 4px;
+                padding: 4px 8px;
+                font-weight: bold;
+            }}
+            QComboBox::drop-down {{ border: none; }}
+        """)
+
+        self.level_input = QLineEdit()
+        self.level_input.setPlaceholderText("Level")
+        self.level_input.setFixedWidth(100)
+        self.level_input.setStyleSheet(f"""
+            QLineEdit {{
+                background-color: {styles.COLORS['input_bg']};
+                color: white;
+                border: 1px solid {styles.COLORS['surface_light']};
+                border-radius: 8px;
+                padding: 4px 10px;
+                font-size: 12px;
+            }}
+            QLineEdit:focus {{
+                border: 1px solid {styles.COLORS['accent']};
+            }}
+        """)
+        self.level_input.returnPressed.connect(self.on_add_alert)
+
+        add_btn = QPushButton("ADD")
+        add_btn.setCursor(Qt.PointingHandCursor)
+        add_btn.setFixedHeight(28)
+        add_btn.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {styles.COLORS['accent']}20;
+                color: {styles.COLORS['accent']};
+                border: 1px solid {styles.COLORS['accent']};
+                border-radius: 8px;
+                font-size: 11px;
+                font-weight: bold;
+                padding: 0 12px;
+            }}
+        """)
+        add_btn.clicked.connect(self.on_add_alert)
+
+        input_layout.addWidget(self.kind_combo)
+        input_layout.addWidget(self.level_input)
+        input_layout.addWidget(add_btn)
+        input_layout.addStretch()
+        layout.addLayout(input_layout)
+
+        self.error_label = QLabel("")
+        self.error_label.setStyleSheet(f"color: {styles.COLORS['danger']}; font-size: 11px;")
+        self.error_label.setVisible(False)
+        layout.addWidget(self.error_label)
+
+        self.alerts_layout = QVBoxLayout()
+        self.alerts_layout.setSpacing(6)
+        layout.addLayout(self.alerts_layout)
+
+    def set_symbol(self, symbol):
+        self.symbol = symbol
+        self.error_label.setVisible(False)
+        self.refresh()
+
+    def on_alert(self, alert):
+        """Drops a triggered alert (the engine removes it) from the list if it's showing."""
+        if alert.get('symbol') == self.symbol:
+            self.refresh()
+
+    def on_add_alert(self):
+        if not self.symbol:
+            return
+        try:
+            level = float(self.level_input.text().replace(",", "").replace("$", "").strip())
+        except ValueError:
+            self.error_label.setText("Enter a number for the alert level")
+            self.error_label.setVisible(True)
+            return
+        data_service.add_alert(self.symbol, self.kind_combo.currentData(), level)
+        self.level_input.clear()
+        self.error_label.setVisible(False)
+        self.refresh()
+
+    def on_remove_alert(self, alert_id):
+        data_service.remove_alert(alert_id)
+        self.refresh()
+
+    def refresh(self):
+        while self.alerts_layout.count():
+            item = self.alerts_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+        if not self.symbol:
+            return
+
+        for alert in data_service.get_alerts(self.symbol):
+            row = QFrame()
+            row.setStyleSheet(f"background-color: {styles.COLORS['surface_light']}; border-radius: 8px;")
+            row_layout = QHBoxLayout(row)
+            row_layout.setContentsMargins(10, 4, 6, 4)
+
+            text = QLabel(alerts_engine.describe(alert) + (f"  ({alert['note']})" if alert.get('note') else ""))
+            text.setStyleSheet("color: white; font-size: 12px; background: transparent;")
+
+            delete_btn = QPushButton("✕")
+            delete_btn.setCursor(Qt.PointingHandCursor)
+            delete_btn.setFixedSize(24, 24)
+            delete_btn.setStyleSheet(f"color: {styles.COLORS['text_secondary']}; background: transparent; border: none;")
+            delete_btn.clicked.connect(lambda checked=False, i=alert['id']: self.on_remove_alert(i))
+
+            row_layout.addWidget(text, 1)
+            row_layout.addWidget(delete_btn)
+            self.alerts_layout.addWidget(row)
+
 class DetailedAnalysisView(QWidget):
     back_clicked = Signal()
 
@@ -1065,9 +1827,6 @@ class DetailedAnalysisView(QWidget):
             
             if tf == "1M":
                 btn.setChecked(True)
-        
-        # Connect timeframe button group to handler
-        self.timeframe_group.buttonClicked.connect(self.on_timeframe_changed)
                 
         card_layout.addLayout(control_header)
         
@@ -1119,6 +1878,10 @@ class DetailedAnalysisView(QWidget):
         # For now, add below chart
         card_layout.addWidget(self.news_timeline)
         
+        # Price/move/RSI/RVOL alerts for this symbol
+        self.alerts_panel = AlertsPanel()
+        card_layout.addWidget(self.alerts_panel)
+        
         self.layout.addWidget(self.card)
         
         # 5. Comparative Analysis
@@ -1134,35 +1897,8 @@ class DetailedAnalysisView(QWidget):
         self.chart.set_chart_type(text)
 
     def on_timeframe_changed(self, btn):
-        tf = btn.text()
-        period = "1mo"
-        interval = "1d"
-        
-        if tf == "1D":
-            period = "1d"
-            interval = "5m"
-        elif tf == "1W":
-            period = "5d"
-            interval = "15m"
-        elif tf == "1M":
-            period = "1mo"
-            interval = "1d"
-        elif tf == "3M":
-            period = "3mo"
-            interval = "1d"
-        elif tf == "YTD":
-            period = "ytd"
-            interval = "1d"
-        elif tf == "1Y":
-            period = "1y"
-            interval = "1d" # or 1wk
-        elif tf == "ALL":
-            period = "max"
-            interval = "1mo" # Monthly candles for max history
-            
-        # Fetch new data
-        # Async Fetch
-        worker = Worker(data_service.fetch_detailed_ohlc_data, self.ticker_label.text(), period=period, interval=interval)
+        # Timeframes are cut and resampled from locally stored bars (see data_service.TIMEFRAMES)
+        worker = Worker(data_service.get_timeframe_bars, self.ticker_label.text(), btn.text())
         worker.signals.result.connect(self.chart.set_data)
         QThreadPool.globalInstance().start(worker)
 
@@ -1174,7 +1910,10 @@ class DetailedAnalysisView(QWidget):
         
         self.ticker_label.setText(data['symbol'])
         self.name_label.setText(data['name'])
+        self.alerts_panel.set_symbol(data['symbol'])
         self.price_label.setText(f"${data['price']:.2f}")
+        # Quotes served from cache during a Yahoo outage are flagged stale by data_service
+        self.timestamp_label.setText("STALE" if data.get('stale') else "LIVE")
         
         change = data['change']
         change_pct = data['change_percent']
@@ -1191,7 +1930,8 @@ class DetailedAnalysisView(QWidget):
         symbol = data['symbol']
         
         # 1. Chart
-        worker_chart = Worker(data_service.fetch_detailed_ohlc_data, symbol, period="1mo", interval="1d")
+        timeframe = self.timeframe_group.checkedButton().text() if self.timeframe_group.checkedButton() else "1M"
+        worker_chart = Worker(data_service.get_timeframe_bars, symbol, timeframe, refresh=True)
         worker_chart.signals.result.connect(self.chart.set_data)
         QThreadPool.globalInstance().start(worker_chart)
         
@@ -1959,6 +2699,7 @@ class TalkingPointsView(QWidget):
         risk_layout.addStretch()
         
         self.risk_selector = RiskProfileSelector()
+        self.correlation_symbols = [] # Top picks the pending correlation check belongs to
         self.risk_selector.profileChanged.connect(self.refresh_opportunities)
         risk_layout.addWidget(self.risk_selector)
         
@@ -2045,14 +2786,15 @@ class TalkingPointsView(QWidget):
             if item.widget():
                 item.widget().deleteLater()
         
-        # Check Correlation of Top Picks
+        # Check Correlation of Top Picks (Async: a cold engine downloads and aligns bars)
+        self.correlation_symbols = [o['symbol'] for o in opps]
         if opps:
-            symbols = [o['symbol'] for o in opps]
-            # This is fast enough to do here, or make async too? 
-            # Let's assume fast enough for now, or skip to avoid lag
-            # correlation = data_service.analyze_portfolio_correlation(symbols)
-            pass 
-        
+            worker = Worker(self._fetch_correlation, self.correlation_symbols)
+            worker.signals.result.connect(self.show_correlation)
+            QThreadPool.globalInstance().start(worker)
+        else:
+            self.risk_selector.set_risk_warning(False)
+
         for opp in opps:
             card = OpportunityCard(opp)
             # Connect click signal
@@ -2061,6 +2803,18 @@ class TalkingPointsView(QWidget):
             
         self.opp_layout.addStretch()
 
+    def _fetch_correlation(self, symbols):
+        return symbols, data_service.analyze_portfolio_correlation(symbols)
+
+    def show_correlation(self, result):
+        symbols, correlation = result
+        if symbols is not self.correlation_symbols:
+            return # A newer list is already showing
+        if correlation > 0.7:
+            self.risk_selector.set_risk_warning(True, f"⚠ HIGH CORRELATION ({correlation:.2f})")
+        else:
+            self.risk_selector.set_risk_warning(False)
+
     def show_history(self):
         self.history_window = IdeaHistoryView()
         history_data = data_service.get_idea_history()
@@ -2089,6 +2843,7 @@ class IdeaHistoryView(QWidget):
             QTableWidget {{
                 background-color: transparent;
                 border: none;
+                color: white;
                 gridline-color: {styles.COLORS['surface_light']};
             }}
             QHeaderView::section {{
@@ -2099,7 +2854,6 @@ class IdeaHistoryView(QWidget):
                 font-weight: bold;
             }}
             QTableWidget::item {{
-                color: white;
                 padding: 5px;
             }}
         """)
@@ -2113,14 +2867,67 @@ class IdeaHistoryView(QWidget):
             
             self.table.setItem(i, 0, QTableWidgetItem(date_str))
             self.table.setItem(i, 1, QTableWidgetItem(item.get('symbol', '')))
-            self.table.setItem(i, 2, QTableWidgetItem(item.get('status', 'OPEN')))
+            status = item.get('status', 'OPEN')
+            if status == 'CLOSED' and item.get('exit_reason'):
+                status = f"CLOSED ({item['exit_reason']})"
+            self.table.setItem(i, 2, QTableWidgetItem(status))
             self.table.setItem(i, 3, QTableWidgetItem(f"${setup.get('entry', 0):.2f}"))
             
-            # Mock Result
+            # Realized result for closed/expired ideas, mark-to-market for open ones
             result = "---"
-            if item.get('status') == 'CLOSED':
-                result = "+5.2%" # Mock
-            self.table.setItem(i, 4, QTableWidgetItem(result))
+            result_pct = item.get('result_pct')
+            if result_pct is not None:
+                result = f"{result_pct:+.1f}%"
+                if item.get('status', 'OPEN') == 'OPEN':
+                    result += " (open)"
+            result_item = QTableWidgetItem(result)
+            if result_pct:
+                result_item.setForeground(QColor(styles.COLORS['success'] if result_pct > 0 else styles.COLORS['danger']))
+            self.table.setItem(i, 4, result_item)
+
+# --- Alert Notifications ---
+
+class AlertNotifier(QObject):
+    """
+    Shows triggered data_service alerts as desktop notifications via the system tray,
+    or in the parent window's status bar where there is no tray. Alerts arrive on
+    worker threads; the signal hands them to the GUI thread.
+    """
+    alert_received = Signal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tray = None
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            self.tray = QSystemTrayIcon(self._icon(), parent)
+            self.tray.setToolTip("Market Alerts")
+            self.tray.show()
+        self.alert_received.connect(self.show_alert)
+        data_service.add_alert_listener(self.alert_received.emit)
+
+    def _icon(self):
+        icon = QApplication.windowIcon()
+        if not icon.isNull():
+            return icon
+        pixmap = QPixmap(32, 32)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setBrush(QColor(styles.COLORS['accent']))
+        painter.setPen(Qt.NoPen)
+        painter.drawEllipse(4, 4, 24, 24)
+        painter.end()
+        return QIcon(pixmap)
+
+    def show_alert(self, alert):
+        if self.tray is None:
+            # No tray (some Linux desktops, remote sessions): keep it on screen until the next message
+            window = self.parent()
+            if isinstance(window, QMainWindow):
+                window.statusBar().showMessage(f"{alert['symbol']} Alert: {alert['message']}")
+            return
+        icon = QSystemTrayIcon.Warning if alert['kind'] == 'stop' else QSystemTrayIcon.Information
+        self.tray.showMessage(f"{alert['symbol']} Alert", alert['message'], icon, 8000)
 
 # --- Settings View ---
 
@@ -2129,6 +2936,7 @@ class SettingsView(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.loading = False # True while load_state fills the widgets
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(40, 40, 40, 40)
         self.layout.setSpacing(30)
@@ -2217,6 +3025,7 @@ class SettingsView(QWidget):
         self.notif_toggle = QCheckBox()
         self.notif_toggle.setChecked(True)
         self.notif_toggle.setCursor(Qt.PointingHandCursor)
+        self.notif_toggle.stateChanged.connect(self.save_state)
         self.notif_toggle.setStyleSheet(f"""
             QCheckBox::indicator {{
                 width: 40px;
@@ -2293,7 +3102,66 @@ class SettingsView(QWidget):
         rvol_layout.addWidget(self.rvol_label)
         self.layout.addLayout(rvol_layout)
         
-        # 6. Client Tiers (Matrix)
+        # 6. Screens
+        self.add_section_header("SCREENS")
+        
+        input_style = f"""
+            QLineEdit {{
+                background-color: {styles.COLORS['input_bg']};
+                color: white;
+                border: 1px solid {styles.COLORS['surface_light']};
+                border-radius: 8px;
+                padding: 6px 10px;
+                font-size: 12px;
+            }}
+            QLineEdit:focus {{
+                border: 1px solid {styles.COLORS['accent']};
+            }}
+        """
+        screen_input_layout = QHBoxLayout()
+        screen_input_layout.setSpacing(10)
+        
+        self.screen_name_input = QLineEdit()
+        self.screen_name_input.setPlaceholderText("Name")
+        self.screen_name_input.setFixedWidth(140)
+        self.screen_name_input.setStyleSheet(input_style)
+        
+        self.screen_expr_input = QLineEdit()
+        self.screen_expr_input.setPlaceholderText("rsi < 30 and rvol > 2 and sma_50_distance > 0")
+        self.screen_expr_input.setStyleSheet(input_style)
+        self.screen_expr_input.returnPressed.connect(self.on_save_screen)
+        
+        save_screen_btn = QPushButton("SAVE")
+        save_screen_btn.setCursor(Qt.PointingHandCursor)
+        save_screen_btn.setFixedHeight(30)
+        save_screen_btn.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {styles.COLORS['accent']}20;
+                color: {styles.COLORS['accent']};
+                border: 1px solid {styles.COLORS['accent']};
+                border-radius: 8px;
+                font-size: 11px;
+                font-weight: bold;
+                padding: 0 12px;
+            }}
+        """)
+        save_screen_btn.clicked.connect(self.on_save_screen)
+        
+        screen_input_layout.addWidget(self.screen_name_input)
+        screen_input_layout.addWidget(self.screen_expr_input)
+        screen_input_layout.addWidget(save_screen_btn)
+        self.layout.addLayout(screen_input_layout)
+        
+        self.screen_error_label = QLabel("")
+        self.screen_error_label.setStyleSheet(f"color: {styles.COLORS['danger']}; font-size: 11px;")
+        self.screen_error_label.setVisible(False)
+        self.layout.addWidget(self.screen_error_label)
+        
+        self.screens_layout = QVBoxLayout()
+        self.screens_layout.setSpacing(6)
+        self.layout.addLayout(self.screens_layout)
+        
+        # 7. Client Tiers (Matrix)
         self.add_section_header("CLIENT TIERS")
         
         tiers_layout = QGridLayout()
@@ -2340,6 +3208,7 @@ class SettingsView(QWidget):
         
         # Load Settings
         self.load_state()
+        self.display_screens({})
 
     def set_risk_warning(self, visible, text=""):
         # This method should be in RiskProfileSelector, not SettingsView
@@ -2354,7 +3223,15 @@ class SettingsView(QWidget):
 
     def load_state(self):
         settings = data_service.load_settings()
-        
+        # Filling the widgets fires their save_state hooks (and on_profile_changed saves
+        # directly); a save mid-load would write the defaults of widgets not yet filled
+        self.loading = True
+        try:
+            self._apply_settings(settings)
+        finally:
+            self.loading = False
+
+    def _apply_settings(self, settings):
         # Risk Profile
         profile = settings.get("risk_profile", "BALANCED")
         if profile in self.profile_btns:
@@ -2385,14 +3262,18 @@ class SettingsView(QWidget):
                 chk.setChecked(False)
                 
     def save_state(self):
-        settings = {
+        if self.loading:
+            return
+        # Merge into the stored settings so keys this view doesn't edit (screens, universe file) survive
+        settings = data_service.load_settings()
+        settings.update({
             "risk_profile": next((p for p, b in self.profile_btns.items() if b.isChecked()), "BALANCED"),
             "dark_mode": self.dark_toggle.isChecked(),
             "notifications": self.notif_toggle.isChecked(),
             "rvol_threshold": self.rvol_slider.value() / 10.0,
             "coverage_sectors": [s for s, b in self.sector_btns.items() if b.isChecked()],
             "client_tiers": {}
-        }
+        })
         
         # Reconstruct tiers dict
         tiers_dict = {}
@@ -2406,6 +3287,68 @@ class SettingsView(QWidget):
         
         data_service.save_settings(settings)
 
+    def on_save_screen(self):
+        name = self.screen_name_input.text().strip()
+        expression = self.screen_expr_input.text().strip()
+        if not name or not expression:
+            return
+        try:
+            data_service.save_screen(name, expression)
+        except ValueError as e: # screener.ScreenError
+            self.screen_error_label.setText(str(e))
+            self.screen_error_label.setVisible(True)
+            return
+        self.screen_error_label.setVisible(False)
+        self.screen_name_input.clear()
+        self.screen_expr_input.clear()
+        self.refresh_screens()
+
+    def on_delete_screen(self, name):
+        data_service.delete_screen(name)
+        self.display_screens(data_service.SCREEN_RESULTS)
+
+    def refresh_screens(self):
+        """Re-runs the saved screens in the background and updates their match lists."""
+        worker = Worker(data_service.run_screens)
+        worker.signals.result.connect(self.display_screens)
+        QThreadPool.globalInstance().start(worker)
+
+    def display_screens(self, results):
+        while self.screens_layout.count():
+            item = self.screens_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+                
+        for name, expression in data_service.load_settings().get("screens", {}).items():
+            row = QFrame()
+            row.setStyleSheet(f"background-color: {styles.COLORS['surface_light']}; border-radius: 8px;")
+            row_layout = QHBoxLayout(row)
+            row_layout.setContentsMargins(10, 6, 6, 6)
+            
+            matches = results.get(name)
+            if matches is None:
+                summary = "not run yet"
+            else:
+                summary = f"{len(matches)} match{'es' if len(matches) != 1 else ''}"
+                if matches:
+                    summary += ": " + ", ".join(matches[:8]) + ("..." if len(matches) > 8 else "")
+            
+            # User-written names and expressions ("price<sma_50") must not be parsed as markup
+            text = QLabel(f"<b>{html.escape(name)}</b>  <span style='color:{styles.COLORS['text_secondary']}'>{html.escape(expression)}</span><br>"
+                          f"<span style='color:{styles.COLORS['accent']}'>{summary}</span>")
+            text.setStyleSheet("color: white; font-size: 12px; background: transparent;")
+            text.setWordWrap(True)
+            
+            delete_btn = QPushButton("✕")
+            delete_btn.setCursor(Qt.PointingHandCursor)
+            delete_btn.setFixedSize(24, 24)
+            delete_btn.setStyleSheet(f"color: {styles.COLORS['text_secondary']}; background: transparent; border: none;")
+            delete_btn.clicked.connect(lambda checked=False, n=name: self.on_delete_screen(n))
+            
+            row_layout.addWidget(text, 1)
+            row_layout.addWidget(delete_btn)
+            self.screens_layout.addWidget(row)
+
     def add_section_header(self, text):
         lbl = QLabel(text)
         lbl.setStyleSheet(f"color: {styles.COLORS['text_secondary']}; font-size: 12px; font-weight: bold; letter-spacing: 1px; margin-top: 20px;")
@@ -2469,6 +3412,55 @@ class MarketNewsWidget(QFrame):
             lbl.setStyleSheet(f"color: {styles.COLORS['text_secondary']}; font-style: italic; border: none; background: transparent;")
             self.news_list.addWidget(lbl)
 
+class ContributionBarsWidget(QWidget):
+    """Horizontal bars of each constituent's contribution to the sector move (percentage points)."""
+    ROW_HEIGHT = 22
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.setMinimumHeight(self.ROW_HEIGHT)
+        
+    def set_data(self, contributions, limit=10):
+        self.rows = [c for c in contributions if c.get('contribution') is not None][:limit]
+        self.setFixedHeight(max(1, len(self.rows)) * self.ROW_HEIGHT)
+        self.update()
+        
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setFont(QFont("Consolas", 9))
+        
+        if not self.rows:
+            painter.setPen(QColor(styles.COLORS['text_secondary']))
+            painter.drawText(self.rect(), Qt.AlignLeft | Qt.AlignVCenter, "No contributions yet")
+            return
+        
+        label_w, value_w = 70, 150
+        bar_left, bar_right = label_w, self.width() - value_w
+        mid = (bar_left + bar_right) / 2
+        scale = max(abs(r['contribution']) for r in self.rows) or 1.0
+        
+        painter.setPen(QPen(QColor(styles.COLORS['surface_light']), 1))
+        painter.drawLine(int(mid), 0, int(mid), self.height())
+        
+        for i, row in enumerate(self.rows):
+            y = i * self.ROW_HEIGHT
+            value = row['contribution']
+            color = QColor(styles.COLORS['success'] if value >= 0 else styles.COLORS['danger'])
+            width = abs(value) / scale * (bar_right - bar_left) / 2
+            x = mid if value >= 0 else mid - width
+            painter.fillRect(QRect(int(x), y + 5, max(1, int(width)), self.ROW_HEIGHT - 10), color)
+            
+            painter.setPen(QColor("white"))
+            painter.drawText(QRect(0, y, label_w - 8, self.ROW_HEIGHT), Qt.AlignRight | Qt.AlignVCenter, row['symbol'])
+            
+            weight = f"{row['weight']:.1f}% wt" if row.get('weight') is not None else ""
+            change = f"{row['change_percent']:+.2f}%" if row.get('change_percent') is not None else "--"
+            painter.setPen(color)
+            painter.drawText(QRect(bar_right + 8, y, value_w - 8, self.ROW_HEIGHT), Qt.AlignLeft | Qt.AlignVCenter,
+                             f"{value:+.2f}pt  {change}  {weight}")
+
 class SectorPopup(QDialog):
     ticker_clicked = Signal(str)
 
@@ -2531,7 +3523,7 @@ class SectorPopup(QDialog):
         stats_layout.setSpacing(40)
         
         self.stats_labels = {}
-        for key in ["YIELD", "AVG P/E", "BETA", "ASSETS"]:
+        for key in ["EQUAL WT", "YIELD", "AVG P/E", "BETA", "MKT CAP"]:
             col = QVBoxLayout()
             lbl = QLabel(key)
             lbl.setStyleSheet(f"color: {styles.COLORS['text_secondary']}; font-size: 10px; font-weight: bold;")
@@ -2556,6 +3548,14 @@ class SectorPopup(QDialog):
         content_layout.setContentsMargins(0, 0, 0, 0)
         content_layout.setSpacing(20)
         
+        # Contribution to the move
+        contrib_header = QLabel("CONTRIBUTION TO MOVE")
+        contrib_header.setStyleSheet(f"color: {styles.COLORS['accent']}; font-weight: 900; letter-spacing: 1px; font-size: 14px;")
+        content_layout.addWidget(contrib_header)
+        
+        self.contributions = ContributionBarsWidget()
+        content_layout.addWidget(self.contributions)
+        
         # Top Performers
         perf_header = QLabel("TOP PERFORMERS")
         perf_header.setStyleSheet(f"color: {styles.COLORS['success']}; font-weight: 900; letter-spacing: 1px; font-size: 14px;")
@@ -2599,7 +3599,7 @@ class SectorPopup(QDialog):
         scroll.setWidget(container)
         return scroll, layout
         
-    def set_data(self, sector_data, performers):
+    def set_data(self, sector_data, performers, contributions=None):
         # Even if sector_data is None, we might have performers.
         # Construct dummy sector_data if needed to show something.
         if not sector_data:
@@ -2611,9 +3611,10 @@ class SectorPopup(QDialog):
         self.title_lbl.setText(title.upper())
         
         price = sector_data.get('price', 0)
-        change = sector_data.get('change', 0)
+        change = sector_data.get('change_percent', 0)
         
-        self.price_lbl.setText(f"${price:.2f}")
+        # Sector indexes are levels (base 100), ETF proxies are prices
+        self.price_lbl.setText(f"{price:,.2f}" if sector_data.get('is_index') else f"${price:.2f}")
         
         color = styles.COLORS['success'] if change >= 0 else styles.COLORS['danger']
         sign = "+" if change >= 0 else ""
@@ -2621,18 +3622,21 @@ class SectorPopup(QDialog):
         self.change_lbl.setStyleSheet(f"color: {color}; font-size: 18px; font-weight: bold;")
         
         # Stats
+        equal = sector_data.get('equal_change_percent')
+        self.stats_labels["EQUAL WT"].setText(f"{equal:+.2f}%" if equal is not None else "--")
         self.stats_labels["YIELD"].setText(f"{sector_data.get('yield', 0):.2f}%")
         self.stats_labels["AVG P/E"].setText(f"{sector_data.get('pe', 0):.1f}")
         self.stats_labels["BETA"].setText(f"{sector_data.get('beta', 1.0):.2f}")
         
-        assets = sector_data.get('assets', 0)
+        assets = sector_data.get('market_cap', sector_data.get('assets', 0))
         if assets > 1e9:
             assets_str = f"${assets/1e9:.1f}B"
         elif assets > 1e6:
             assets_str = f"${assets/1e6:.1f}M"
         else:
             assets_str = f"${assets:,.0f}"
-        self.stats_labels["ASSETS"].setText(assets_str)
+        self.stats_labels["MKT CAP"].setText(assets_str)
+        self.contributions.set_data(contributions or [])
         
         # Helper to populate list
         def populate_list(layout, items):
@@ -0,0 +1,82 @@
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import alerts_engine
+import indicator_engine
+from verify_indicator_engine import make_bars
+
+def test_crossings():
+    print("\n--- Testing Alert Crossings ---")
+    rng = np.random.default_rng(3)
+    engine = alerts_engine.AlertsEngine()
+    alerts = []
+    for i in range(2000):
+        kind = rng.choice(['price_above', 'price_below', 'move'])
+        level = rng.uniform(1, 5) if kind == 'move' else rng.uniform(90, 110)
+        alerts.append(engine.add('AAA', kind, level))
+
+    # Brute force: every alert is checked against each move
+    pending = {a['id']: a for a in alerts}
+    expected = []
+    price, change = 100.0, 0.0
+    engine.check('AAA', {'price': price, 'change_percent': change})
+    fired = []
+    for _ in range(500):
+        new_price = price * (1 + rng.normal(0, 0.01))
+        new_change = change + rng.normal(0, 0.5)
+        fired += [a['id'] for a in engine.check('AAA', {'price': new_price, 'change_percent': new_change})]
+        for a in list(pending.values()):
+            hit = ((a['kind'] == 'price_above' and price < a['level'] <= new_price) or
+                   (a['kind'] == 'price_below' and new_price <= a['level'] < price) or
+                   (a['kind'] == 'move' and (change < a['level'] <= new_change or new_change <= -a['level'] < change)))
+            if hit:
+                expected.append(a['id'])
+                del pending[a['id']]
+        price, change = new_price, new_change
+
+    print(f"{len(fired)} of {len(alerts)} alerts fired, {len(engine)} still active")
+    if sorted(fired) == sorted(expected) and len(engine) == len(pending):
+        print("PASS: Same alerts fire as a brute-force check")
+    else:
+        print("FAIL: Alerts differ from brute force")
+
+def test_tick_cost():
+    print("\n--- Testing Per-Tick Cost ---")
+    rng = np.random.default_rng(4)
+    symbols = [f"S{i}" for i in range(500)]
+    engine = alerts_engine.AlertsEngine()
+    for i in range(10000):
+        engine.add(symbols[i % 500], 'price_above', rng.uniform(200, 300))
+    empty = alerts_engine.AlertsEngine()
+
+    def run(e):
+        start = time.perf_counter()
+        for i in range(20000):
+            e.check(symbols[i % 500], {'price': 100 + (i % 7), 'change_percent': 0.5, 'rsi': 50.0, 'rvol': 1.0})
+        return (time.perf_counter() - start) / 20000
+
+    with_alerts, without = run(engine), run(empty)
+    print(f"{with_alerts * 1e6:.1f}us per tick with 10,000 alerts, {without * 1e6:.1f}us with none")
+    print("PASS: Per-tick cost independent of alert count" if with_alerts < 100e-6 else "FAIL: Ticks too slow")
+
+def test_live_values():
+    print("\n--- Testing Live RSI/RVOL Readout ---")
+    state = indicator_engine.IndicatorState.from_bars(make_bars(50, 120))
+    state.update("S7", 123.0, volume=2.5e6)
+    table = state.snapshot()
+    live = state.live_values("S7")
+    i = table.index["S7"]
+    print(f"live {live}  snapshot rsi={table['rsi'][i]:.6f} rvol={table['rvol'][i]:.6f}")
+    if np.isclose(live['rsi'], table['rsi'][i]) and np.isclose(live['rvol'], table['rvol'][i]):
+        print("PASS: O(1) readout matches the snapshot")
+    else:
+        print("FAIL: Readout differs")
+
+if __name__ == "__main__":
+    test_crossings()
+    test_tick_cost()
+    test_live_values()
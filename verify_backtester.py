@@ -0,0 +1,88 @@
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import backtester
+import risk_engine
+import relative_strength
+from verify_indicator_engine import make_bars
+
+def test_trade_simulation():
+    print("\n--- Testing Stop/Target Simulation ---")
+    # One symbol: entry at 100, target hit on bar 2, then a stop-and-target bar, then expiry
+    bars = {
+        'high': np.array([[100.0, 101.0, 106.0, 120.0, 101.0, 101.0]]),
+        'low': np.array([[100.0, 99.0, 99.0, 80.0, 99.0, 99.0]]),
+        'close': np.array([[100.0, 100.0, 100.0, 100.0, 100.0, 102.0]])
+    }
+    stop = np.full((1, 6), 95.0)
+    target = np.full((1, 6), 105.0)
+    hold = np.array([[3, 3, 3, 2, 2, 2]])
+    outcome, returns, held = backtester.simulate_trades(bars, bars['close'], stop, target, hold)
+
+    expected = [0, 0, 1, 2, -1, -1] # target, target, stop (both touched), expired, not judged
+    print(f"Outcomes: {outcome[0].tolist()}  returns: {np.round(returns[0], 3).tolist()}")
+    if outcome[0].tolist() == expected and np.isclose(returns[0, 3], 0.02):
+        print("PASS: Trades exit at the right level and bar")
+    else:
+        print("FAIL: Unexpected trade outcomes")
+
+def test_rolling_beta():
+    print("\n--- Testing Point-in-Time Beta ---")
+    bars = make_bars(100, 600, seed=8)
+    bars['symbols'][0] = "SPY"
+    beta = risk_engine.rolling_beta(bars, "SPY")
+
+    worst = 0.0
+    for end in (300, 450, 600):
+        head = {k: (v[:end] if k == 'timestamps' else v[:, :end] if k != 'symbols' else v) for k, v in bars.items()}
+        table = risk_engine.compute_risk(head, "SPY", {'1y': 252})
+        worst = max(worst, float(np.nanmax(np.abs(beta[:, end - 1] - table.column('beta')))))
+    print(f"{'PASS' if worst < 1e-9 else 'FAIL'}: Each date's beta equals the 1y beta computed on that date ({worst:.1e})")
+
+    # Rewriting the future must not move any earlier beta
+    changed = dict(bars, close=bars['close'].copy())
+    changed['close'][:, 400:] *= np.linspace(1, 3, 200)
+    moved = risk_engine.rolling_beta(changed, "SPY")
+    print(f"{'PASS' if np.array_equal(moved[:, :400], beta[:, :400], equal_nan=True) else 'FAIL'}: No look-ahead")
+    print(f"{'PASS' if np.isnan(beta[:, :200]).all() else 'FAIL'}: Dates without enough history have no beta")
+
+    # Per-date beta and numpy sector arrays both feed run()
+    sectors = np.array(['XLU', 'XLK', None, 'XLE'] * 25, dtype=object)
+    report = backtester.run(bars, profiles=("DEFENSIVE",), sectors=sectors, beta=beta)
+    flat = backtester.run(bars, profiles=("DEFENSIVE",), sectors=list(sectors), beta=beta[:, -1])
+    matched = report['profiles']['DEFENSIVE']['matched_setups']['trades']
+    ok = matched > 0 and matched != flat['profiles']['DEFENSIVE']['matched_setups']['trades']
+    print(f"{'PASS' if ok else 'FAIL'}: Matches follow the beta of each date ({matched} vs {flat['profiles']['DEFENSIVE']['matched_setups']['trades']} with today's beta)")
+
+def test_relative_strength():
+    print("\n--- Testing RS in Backtest Scores ---")
+    bars = make_bars(100, 600, seed=9)
+    rs = relative_strength.rs_series(bars['close'])
+    scored = backtester.run(bars, profiles=("BALANCED",), rs=rs)['profiles']['BALANCED']
+    plain = backtester.run(bars, profiles=("BALANCED",))['profiles']['BALANCED']
+    unknown = backtester.run(bars, profiles=("BALANCED",), rs=np.full(rs.shape, np.nan))['profiles']['BALANCED']
+    print(f"{'PASS' if scored['score_ic_10d'] != plain['score_ic_10d'] else 'FAIL'}: Per-date RS moves opp_score "
+          f"(IC {scored['score_ic_10d']:+.3f} vs {plain['score_ic_10d']:+.3f} without)")
+    print(f"{'PASS' if unknown == plain else 'FAIL'}: Unknown RS leaves scores unchanged")
+
+def test_universe_speed():
+    print("\n--- Testing Backtest Speed (500 symbols x 5 years) ---")
+    bars = make_bars(500, 1260)
+    start = time.perf_counter()
+    report = backtester.run(bars)
+    elapsed = time.perf_counter() - start
+    print(backtester.format_report(report))
+    if elapsed < 30:
+        print(f"PASS: Backtest finished in {elapsed:.1f}s")
+    else:
+        print(f"FAIL: Backtest took {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    test_trade_simulation()
+    test_rolling_beta()
+    test_relative_strength()
+    test_universe_speed()
@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import bar_store
+import data_service
+
+DAY = 86400
+
+def make_bars(closes, end=None):
+    """Daily bars ending today (or at `end`) with the given closes."""
+    end = end if end is not None else (int(time.time()) // DAY) * DAY
+    n = len(closes)
+    bars = np.zeros((n, len(bar_store.FIELDS)))
+    bars[:, 0] = end - np.arange(n)[::-1] * DAY
+    bars[:, 1:5] = np.asarray(closes, dtype=float)[:, None]
+    bars[:, 5] = 1e6
+    return bars
+
+def use_scratch_store():
+    bar_store.BARS_DIR = tempfile.mkdtemp(prefix="bars_")
+    bar_store.BAR_CACHE.clear()
+    return bar_store.BARS_DIR
+
+def store_old(symbol, bars):
+    """Stores bars with a file time old enough for ensure_bars to refresh them."""
+    bar_store.save_bars(symbol, bars)
+    os.utime(bar_store.bar_path(symbol), (0, 0))
+
+def test_readjustment():
+    print("\n--- Testing Split/Dividend Re-adjustment ---")
+    directory = use_scratch_store()
+    closes = 100 + np.arange(130.0)
+    stored = make_bars(closes, end=make_bars([0])[0, 0] - DAY) # Missing today's bar
+    store_old("DIV", stored)
+    store_old("SAME", stored)
+
+    # Yahoo after DIV's ex-date: every close before it scaled by 0.98
+    calls = []
+    def download(symbols, period, interval="1d"):
+        calls.append((tuple(symbols), period))
+        result = {}
+        for sym in symbols:
+            full = make_bars(np.append(closes, 231.0))
+            if sym == "DIV":
+                full[:-1, 1:5] *= 0.98
+            days = data_service.PERIOD_BARS.get(period, 10 ** 6)
+            result[sym] = full[-days:]
+        return result
+
+    original = data_service._download_bars
+    data_service._download_bars = download
+    try:
+        data_service.ensure_bars(["DIV", "SAME"], period="6mo")
+    finally:
+        data_service._download_bars = original
+
+    same = bar_store.load_bars("SAME")
+    ok = len(same) == 131 and np.allclose(same[:130, 4], closes) and same[-1, 4] == 231.0
+    print(f"{'PASS' if ok else 'FAIL'}: An unchanged history is extended incrementally")
+
+    div = bar_store.load_bars("DIV")
+    ok = np.allclose(div[:-1, 4], closes[-(len(div) - 1):] * 0.98) and div[-1, 4] == 231.0
+    print(f"{'PASS' if ok else 'FAIL'}: A re-adjusted history is replaced, not spliced onto the old basis")
+    refetched = [c for c in calls if c[0] == ("DIV",)]
+    print(f"{'PASS' if refetched else 'FAIL'}: Only the re-adjusted symbol is downloaded again ({calls})")
+    print(f"{'PASS' if 'DIV' in data_service.READJUSTED_SYMBOLS else 'FAIL'}: Incremental state is marked for a rebuild")
+
+    # The still-forming last bar may legitimately differ from its final value
+    live = make_bars(np.append(closes, 230.0))
+    final = make_bars(np.append(closes, 231.0))[-5:]
+    print(f"{'PASS' if not bar_store.adjustment_changed(live, final) else 'FAIL'}: A revised last bar is not a re-adjustment")
+    shutil.rmtree(directory, ignore_errors=True)
+
+def test_capped_fill():
+    print("\n--- Testing Forward-Fill Cap ---")
+    directory = use_scratch_store()
+    end = make_bars([0])[0, 0]
+    bar_store.save_bars("LIVE", make_bars(np.arange(20.0) + 1, end=end))
+    halted = make_bars(np.arange(20.0) + 1, end=end)
+    bar_store.save_bars("HALT", np.delete(halted, [10, 11], axis=0)) # Two-day halt
+    bar_store.save_bars("GONE", make_bars(np.arange(10.0) + 1, end=end - 10 * DAY)) # Stopped trading
+
+    aligned = bar_store.get_aligned_bars(["LIVE", "HALT", "GONE"])
+    close = dict(zip(aligned['symbols'], aligned['close']))
+    volume = dict(zip(aligned['symbols'], aligned['volume']))
+    ok = close["HALT"][10] == close["HALT"][11] == 10.0 and volume["HALT"][10] == 0
+    print(f"{'PASS' if ok else 'FAIL'}: A short gap is bridged with a flat bar at the last close")
+
+    cap = bar_store.MAX_FILL_BARS
+    gone = close["GONE"]
+    ok = np.all(gone[10:10 + cap] == 10.0) and np.all(np.isnan(gone[10 + cap:]))
+    print(f"{'PASS' if ok else 'FAIL'}: A trailing gap is filled for {cap} bars, then left NaN instead of a stale price")
+
+    unlimited = bar_store.get_aligned_bars(["GONE", "LIVE"], max_fill=None)
+    print(f"{'PASS' if not np.isnan(unlimited['close'][0, -1]) else 'FAIL'}: max_fill=None keeps the uncapped fill")
+    shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_readjustment()
+    test_capped_fill()
@@ -0,0 +1,92 @@
+import sys
+import os
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+import ui_components
+
+def make_quotes(symbols, seed=1):
+    rng = random.Random(seed)
+    quotes = []
+    for symbol in symbols:
+        price = rng.uniform(50, 500)
+        change = price * rng.gauss(0, 0.02)
+        quotes.append({'symbol': symbol, 'name': f"{symbol} Inc.", 'price': price, 'change': change,
+                       'change_percent': change / price * 100})
+    return quotes
+
+def cards(layout):
+    return [layout.itemAt(i).widget() for i in range(layout.count())]
+
+def test_reconcile():
+    print("\n--- Testing Keyed Card Reconciliation ---")
+    host = QWidget()
+    layout = QVBoxLayout(host)
+    layout.addWidget(QLabel("Loading...")) # Placeholder content gets cleared
+    clicks = []
+    quotes = make_quotes(["SPY", "QQQ", "DIA", "IWM"])
+
+    stats = ui_components.reconcile_cards(layout, quotes, clicks.append)
+    app.processEvents()
+    first = cards(layout)
+    ok = stats['created'] == 4 and [c.symbol for c in first] == ["SPY", "QQQ", "DIA", "IWM"]
+    print(f"{'PASS' if ok else 'FAIL'}: First refresh builds the cards ({stats})")
+
+    stats = ui_components.reconcile_cards(layout, quotes, clicks.append)
+    print(f"{'PASS' if not any(stats.values()) else 'FAIL'}: An unchanged refresh touches nothing ({stats})")
+
+    quotes[1] = dict(quotes[1], price=123.45, change=-1.0, change_percent=-0.8)
+    stats = ui_components.reconcile_cards(layout, quotes, clicks.append)
+    ok = stats == {'created': 0, 'updated': 1, 'moved': 0, 'removed': 0} and cards(layout)[1] is first[1] and \
+         first[1].price_lbl.text() == "$123.45"
+    print(f"{'PASS' if ok else 'FAIL'}: A new quote updates its card in place ({stats})")
+
+    reordered = [quotes[3], quotes[0], quotes[1]] + make_quotes(["VTI"])
+    stats = ui_components.reconcile_cards(layout, reordered, clicks.append)
+    app.processEvents()
+    now = cards(layout)
+    ok = [c.symbol for c in now] == ["IWM", "SPY", "QQQ", "VTI"] and now[0] is first[3] and now[1] is first[0] and \
+         stats['created'] == 1 and stats['removed'] == 1
+    print(f"{'PASS' if ok else 'FAIL'}: Reordering moves cards; only the difference is created/removed ({stats})")
+
+    now[0].clicked.emit(now[0].symbol)
+    print(f"{'PASS' if clicks == ['IWM'] else 'FAIL'}: Reused cards keep their click handler")
+
+def test_refresh_cost():
+    print("\n--- Testing Refresh Cost (9 dashboard cards, 1 quote changed) ---")
+    host = QWidget()
+    layout = QVBoxLayout(host)
+    quotes = make_quotes([f"S{i}" for i in range(9)])
+    ui_components.reconcile_cards(layout, quotes)
+    rounds = 50
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        quotes[0] = dict(quotes[0], price=100 + i)
+        ui_components.reconcile_cards(layout, quotes)
+        app.processEvents()
+    reconciled = (time.perf_counter() - start) / rounds * 1000
+
+    # What every refresh used to do: delete all cards and build new ones
+    start = time.perf_counter()
+    for i in range(rounds):
+        while layout.count():
+            layout.takeAt(0).widget().deleteLater()
+        for data in quotes:
+            layout.addWidget(ui_components.TickerCard(data))
+        app.processEvents()
+    rebuilt = (time.perf_counter() - start) / rounds * 1000
+    print(f"Rebuilding every card: {rebuilt:.2f}ms per refresh")
+    print(f"Reconciling by symbol: {reconciled:.2f}ms per refresh")
+    print(f"{'PASS' if reconciled < rebuilt else 'FAIL'}: {rebuilt / reconciled:.0f}x cheaper")
+
+if __name__ == "__main__":
+    test_reconcile()
+    test_refresh_cost()
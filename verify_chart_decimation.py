@@ -0,0 +1,112 @@
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import chart_decimation
+
+def make_series(n=5000, seed=4):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, n)))
+    open_ = close * (1 + rng.normal(0, 0.003, n))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, n))
+    return {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': rng.uniform(1e5, 1e6, n)}
+
+def reference_lttb(x, y, threshold):
+    """Textbook LTTB, one bucket at a time."""
+    n = len(y)
+    bucket = (n - 2) / (threshold - 2)
+    keep, a = [0], 0
+    for b in range(threshold - 2):
+        lo, hi = int(b * bucket) + 1, int((b + 1) * bucket) + 1
+        nlo, nhi = hi, min(int((b + 2) * bucket) + 1, n)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        keep.append(a)
+    return np.array(keep + [n - 1])
+
+def test_candles():
+    print("\n--- Testing OHLC Pyramid ---")
+    series = make_series(4096)
+    pyramid = chart_decimation.OHLCPyramid(series)
+    level = pyramid.levels[4] # 16 bars per candle
+    ok = (np.allclose(level['high'], series['high'].reshape(-1, 16).max(axis=1)) and
+          np.allclose(level['low'], series['low'].reshape(-1, 16).min(axis=1)) and
+          np.allclose(level['open'], series['open'][::16]) and
+          np.allclose(level['close'], series['close'][15::16]) and
+          np.allclose(level['volume'], series['volume'].reshape(-1, 16).sum(axis=1)))
+    print(f"{'PASS' if ok else 'FAIL'}: Level 4 equals direct 16-bar min/max bucketing")
+
+    view = pyramid.view(300)
+    ok = len(view['close']) <= 300 and np.isclose(view['high'].max(), series['high'].max()) and np.isclose(view['low'].min(), series['low'].min())
+    print(f"{'PASS' if ok else 'FAIL'}: {len(view['close'])} candles ({view['bucket']} bars each) keep the extreme wicks")
+
+    odd = chart_decimation.OHLCPyramid(make_series(1001))
+    print(f"{'PASS' if len(odd.levels[-1]['close']) == 1 and np.isclose(odd.levels[-1]['high'][0], odd.levels[0]['high'].max()) else 'FAIL'}: "
+          f"Odd lengths collapse to one candle")
+
+def test_lines():
+    print("\n--- Testing Line Pyramid + LTTB ---")
+    series = make_series()
+    close = series['close'].copy()
+    close[3333] *= 1.4 # One-day spike
+    x = np.arange(len(close), dtype=np.float64)
+
+    ours = chart_decimation.lttb(x, close, 400)
+    print(f"{'PASS' if np.array_equal(ours, reference_lttb(x, close, 400)) else 'FAIL'}: LTTB matches the textbook version")
+
+    pyramid = chart_decimation.LinePyramid(close)
+    indices = pyramid.view(450)
+    ok = len(indices) <= 450 and 3333 in indices and indices[0] == 0 and indices[-1] == len(close) - 1
+    print(f"{'PASS' if ok else 'FAIL'}: {len(indices)} points keep the spike and both ends")
+
+    averaged = close[:len(close) // 11 * 11].reshape(-1, 11).mean(axis=1)
+    print(f"{'PASS' if close[indices].max() > averaged.max() else 'FAIL'}: Bucket averages would have flattened it "
+          f"({averaged.max():.1f} vs {close[indices].max():.1f})")
+
+    indices = pyramid.view(450, 2000, 2100)
+    print(f"{'PASS' if np.array_equal(indices, np.arange(2000, 2100)) else 'FAIL'}: A narrow range is served at full resolution")
+
+def test_range_extremes():
+    print("\n--- Testing Range Min/Max Table ---")
+    series = make_series()
+    low, high = series['low'].copy(), series['high'].copy()
+    low[100:110] = np.nan # Missing bars never win
+    table = chart_decimation.RangeExtremes(low, high)
+    rng = np.random.default_rng(7)
+    ranges = [tuple(sorted(rng.integers(0, len(low) + 1, 2))) for _ in range(2000)]
+    ranges = [(a, b) for a, b in ranges if b > a] + [(0, len(low)), (100, 110), (4999, 5000)]
+    known_low = np.where(np.isnan(low), np.inf, low)
+    ok = all(table.query(a, b) == (known_low[a:b].min(), high[a:b].max()) for a, b in ranges)
+    print(f"{'PASS' if ok else 'FAIL'}: {len(ranges)} random ranges match a scan")
+
+    start = time.perf_counter()
+    for a, b in ranges:
+        table.query(a, b)
+    per_query = (time.perf_counter() - start) / len(ranges) * 1e6
+    print(f"{'PASS' if per_query < 50 else 'FAIL'}: {per_query:.1f}us per query")
+
+def test_speed():
+    print("\n--- Testing Speed (20 years of daily bars) ---")
+    series = make_series(5040)
+    start = time.perf_counter()
+    candles = chart_decimation.OHLCPyramid(series)
+    lines = chart_decimation.LinePyramid(series['close'])
+    built = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for width in range(600, 1200, 20):
+        candles.view(300)
+        lines.view(width // 2)
+    served = (time.perf_counter() - start) * 1000 / 30
+    print(f"{'PASS' if built < 50 else 'FAIL'}: Pyramids built once in {built:.1f}ms")
+    print(f"{'PASS' if served < 10 else 'FAIL'}: Any width served in {served:.2f}ms")
+
+if __name__ == "__main__":
+    test_candles()
+    test_lines()
+    test_range_extremes()
+    test_speed()
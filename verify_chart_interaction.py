@@ -0,0 +1,122 @@
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QMouseEvent, QWheelEvent
+from PySide6.QtCore import QPointF, QPoint, Qt, QEvent
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+import ui_components
+
+def make_rows(n=5000, seed=2):
+    """Daily OHLC dicts in the data_service.ohlc_rows() format (~20 years for 5000)."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, n)))
+    dates = np.datetime_as_string(np.datetime64('2006-01-02') + np.arange(n), unit='D')
+    return [{'date': str(d), 'open': c * 0.995, 'high': c * 1.01, 'low': c * 0.985, 'close': c, 'volume': 1e6}
+            for d, c in zip(dates, close)]
+
+def move(chart, x, y=200):
+    event = QMouseEvent(QEvent.MouseMove, QPointF(x, y), QPointF(x, y), Qt.NoButton, Qt.NoButton, Qt.NoModifier)
+    chart.mouseMoveEvent(event)
+    app.processEvents()
+
+def wheel(chart, x, notches, y=200):
+    event = QWheelEvent(QPointF(x, y), QPointF(x, y), QPoint(), QPoint(0, int(120 * notches)),
+                        Qt.NoButton, Qt.NoModifier, Qt.NoScrollPhase, False)
+    chart.wheelEvent(event)
+    chart.repaint()
+    return event.isAccepted()
+
+def drag(chart, x0, x1, steps=20, y=200):
+    def mouse(kind, x, buttons):
+        return QMouseEvent(kind, QPointF(x, y), QPointF(x, y), Qt.LeftButton, buttons, Qt.NoModifier)
+    chart.mousePressEvent(mouse(QEvent.MouseButtonPress, x0, Qt.LeftButton))
+    for i in range(1, steps + 1):
+        chart.mouseMoveEvent(mouse(QEvent.MouseMove, x0 + (x1 - x0) * i / steps, Qt.LeftButton))
+        chart.repaint()
+    chart.mouseReleaseEvent(mouse(QEvent.MouseButtonRelease, x1, Qt.NoButton))
+
+def make_chart(rows):
+    chart = ui_components.DetailedChartWidget(rows)
+    chart.resize(900, 400)
+    chart.show()
+    app.processEvents()
+    return chart
+
+def test_crosshair():
+    print("\n--- Testing Crosshair Overlay ---")
+    rows = make_rows()
+    chart = make_chart(rows)
+
+    moves = 300
+    start = time.perf_counter()
+    for i in range(moves):
+        move(chart, 50 + i * 2)
+    per_move = (time.perf_counter() - start) / moves * 1000
+    print(f"{'PASS' if per_move < 16 else 'FAIL'}: {per_move:.2f}ms per mouse move over {len(rows)} bars")
+
+    idx = chart.hover_index
+    x, y, _ = chart.overlay_geometry()
+    lows = min(r['low'] for r in rows)
+    highs = max(r['high'] for r in rows)
+    expected = chart.height() * 0.95 - (rows[idx]['close'] - lows) / (highs - lows) * chart.height() * 0.9
+    print(f"{'PASS' if abs(y - expected) < 1e-6 else 'FAIL'}: Crosshair sits on the hovered close (bar {idx})")
+
+    pixmap = chart.cached_pixmap
+    move(chart, 600)
+    print(f"{'PASS' if chart.cached_pixmap is pixmap else 'FAIL'}: Mouse moves reuse the cached chart")
+
+def test_zoom_pan():
+    print("\n--- Testing Zoom & Pan ---")
+    rows = make_rows()
+    chart = make_chart(rows)
+    lows = np.array([r['low'] for r in rows])
+    highs = np.array([r['high'] for r in rows])
+
+    x = 450
+    anchor = chart.index_at(x)
+    start = time.perf_counter()
+    notches = 0
+    while wheel(chart, x, 1):
+        notches += 1
+    per_zoom = (time.perf_counter() - start) / max(1, notches) * 1000
+    visible = chart.view_end - chart.view_start
+    print(f"{'PASS' if visible == chart.MIN_VISIBLE else 'FAIL'}: {notches} wheel notches zoom to {visible} bars")
+    print(f"{'PASS' if abs(chart.index_at(x) - anchor) <= 1 else 'FAIL'}: The bar under the cursor stays put ({anchor} -> {chart.index_at(x)})")
+
+    min_val, val_range, _, _ = chart.chart_scale()
+    ok = np.isclose(min_val, lows[chart.view_start:chart.view_end].min()) and \
+         np.isclose(min_val + val_range, highs[chart.view_start:chart.view_end].max())
+    print(f"{'PASS' if ok else 'FAIL'}: Y axis fits the visible bars only")
+
+    for _ in range(8):
+        wheel(chart, x, -1)
+    before = chart.view_start
+    start = time.perf_counter()
+    drag(chart, 600, 300)
+    per_pan = (time.perf_counter() - start) / 20 * 1000
+    span = chart.view_end - 1 - chart.view_start
+    expected = before + round(300 / chart.width() * span)
+    print(f"{'PASS' if abs(chart.view_start - expected) <= 1 else 'FAIL'}: Dragging left by 300px pans {chart.view_start - before} bars forward")
+
+    min_val, val_range, _, _ = chart.chart_scale()
+    ok = np.isclose(min_val, lows[chart.view_start:chart.view_end].min())
+    print(f"{'PASS' if ok else 'FAIL'}: Y axis follows the pan")
+    print(f"{'PASS' if per_zoom < 16 and per_pan < 16 else 'FAIL'}: {per_zoom:.2f}ms per zoom step, {per_pan:.2f}ms per pan step over {len(rows)} bars")
+
+    drag(chart, 100, 100000)
+    print(f"{'PASS' if chart.view_start == 0 else 'FAIL'}: Panning stops at the first bar")
+    chart.reset_view()
+    print(f"{'PASS' if (chart.view_start, chart.view_end) == (0, len(rows)) else 'FAIL'}: Double-click resets to the full series")
+    print(f"{'PASS' if not wheel(chart, x, -1) else 'FAIL'}: Zooming out past the full series passes the wheel on (page scroll)")
+
+if __name__ == "__main__":
+    test_crosshair()
+    test_zoom_pan()
@@ -0,0 +1,61 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import correlation_engine
+from verify_indicator_engine import make_bars
+
+WINDOW = 63
+
+def pandas_reference(close, window=WINDOW):
+    """DataFrame.corr (pairwise-complete Pearson) over the last `window` returns."""
+    returns = pd.DataFrame(close.T).pct_change(fill_method=None).iloc[1:].iloc[-window:]
+    return returns.corr(min_periods=3).to_numpy()
+
+def make_universe(n=200, t=160):
+    bars = make_bars(n, t, seed=11)
+    bars['close'][5, :120] = np.nan # Listed recently: fewer shared returns
+    bars['close'][9, 140:150] = np.nan # Halted for a while
+    return bars
+
+def worst_difference(a, b):
+    both = ~np.isnan(a) & ~np.isnan(b)
+    same_nan = np.array_equal(np.isnan(a), np.isnan(b))
+    return float(np.max(np.abs(a[both] - b[both]))), same_nan
+
+def test_full_build():
+    print("\n--- Testing Engine vs DataFrame.corr ---")
+    bars = make_universe()
+    engine = correlation_engine.RollingCorrelation.from_bars(bars, WINDOW)
+    worst, same_nan = worst_difference(engine.matrix(), pandas_reference(bars['close']))
+    print(f"Max abs difference: {worst:.2e}")
+    print(f"{'PASS' if worst < 1e-9 and same_nan else 'FAIL'}: Full build matches pandas (NaN pairs agree: {same_nan})")
+
+def test_rolling_updates():
+    print("\n--- Testing Rolling Updates vs DataFrame.corr ---")
+    bars = make_universe()
+    head = {k: (v[:100] if k == 'timestamps' else v[:, :100] if k != 'symbols' else v) for k, v in bars.items()}
+    engine = correlation_engine.RollingCorrelation.from_bars(head, WINDOW)
+    start = time.perf_counter()
+    for t in range(100, bars['close'].shape[1]):
+        engine.update(bars['close'][:, t], bars['timestamps'][t])
+    per_bar = (time.perf_counter() - start) / (bars['close'].shape[1] - 100) * 1000
+
+    worst, same_nan = worst_difference(engine.matrix(), pandas_reference(bars['close']))
+    print(f"Max abs difference: {worst:.2e} ({per_bar:.2f}ms per bar for {len(bars['symbols'])} symbols)")
+    print(f"{'PASS' if worst < 1e-8 and same_nan else 'FAIL'}: Window slid bar by bar matches pandas")
+
+    picks = ['S0', 'S3', 'S5', 'S7']
+    rows = [bars['symbols'].index(s) for s in picks]
+    reference = pandas_reference(bars['close'][rows])
+    expected = reference[~np.eye(len(picks), dtype=bool)].mean()
+    got = engine.average_pairwise(picks)
+    print(f"{'PASS' if abs(got - expected) < 1e-8 else 'FAIL'}: Average pairwise correlation {got:.4f} (pandas {expected:.4f})")
+
+if __name__ == "__main__":
+    test_full_build()
+    test_rolling_updates()
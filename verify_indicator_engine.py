@@ -0,0 +1,142 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import indicator_engine
+
+def make_bars(n_symbols, n_bars, seed=42):
+    """Random-walk OHLCV universe in the bar_store.get_aligned_bars() format."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_symbols, n_bars)), axis=1))
+    open_ = close * (1 + rng.normal(0, 0.005, close.shape))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, close.shape))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, close.shape))
+    volume = rng.uniform(1e6, 5e6, close.shape)
+    return {
+        'symbols': [f"S{i}" for i in range(n_symbols)],
+        'timestamps': np.arange(n_bars) * 86400.0,
+        'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume
+    }
+
+def pandas_reference(bars, row):
+    """The original per-symbol pandas implementation."""
+    df = pd.DataFrame({
+        'Close': bars['close'][row], 'High': bars['high'][row],
+        'Low': bars['low'][row], 'Volume': bars['volume'][row]
+    })
+    close = df['Close']
+    delta = close.diff()
+    up = delta.clip(lower=0)
+    down = -1 * delta.clip(upper=0)
+    rs = up.ewm(com=13, adjust=False).mean() / down.ewm(com=13, adjust=False).mean()
+    rsi = 100 - (100 / (1 + rs))
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    bbm = close.rolling(window=20).mean()
+    std = close.rolling(window=20).std()
+    rvol = df['Volume'] / df['Volume'].rolling(window=20).mean()
+    sma_50 = close.rolling(window=50).mean()
+    tr = pd.concat([df['High'] - df['Low'], (df['High'] - close.shift()).abs(),
+                    (df['Low'] - close.shift()).abs()], axis=1).max(axis=1)
+    atr = tr.rolling(window=14).mean()
+    return {
+        'rsi': rsi.iloc[-1], 'macd': macd.iloc[-1], 'macd_signal': signal.iloc[-1],
+        'bb_middle': bbm.iloc[-1], 'bb_upper': bbm.iloc[-1] + 2 * std.iloc[-1],
+        'bb_lower': bbm.iloc[-1] - 2 * std.iloc[-1], 'rvol': rvol.iloc[-1],
+        'sma_50': sma_50.iloc[-1], 'atr': atr.iloc[-1]
+    }
+
+def test_matches_pandas():
+    print("\n--- Testing Engine vs Pandas Reference ---")
+    bars = make_bars(20, 126)
+    # Shorter history for one symbol (leading NaNs)
+    for field in ('open', 'high', 'low', 'close', 'volume'):
+        bars[field][3, :40] = np.nan
+
+    table = indicator_engine.compute_indicators(bars)
+    worst = 0.0
+    for row in range(len(bars['symbols'])):
+        valid = ~np.isnan(bars['close'][row])
+        ref = pandas_reference({k: (v[:, valid] if k in ('close', 'high', 'low', 'volume') else v)
+                                for k, v in bars.items()}, row)
+        for name, expected in ref.items():
+            worst = max(worst, abs(table[name][row] - expected))
+
+    print(f"Max abs difference: {worst:.2e}")
+    if worst < 1e-8:
+        print("PASS: Vectorized indicators match pandas")
+    else:
+        print("FAIL: Vectorized indicators diverge from pandas")
+
+def test_universe_speed():
+    print("\n--- Testing Universe Speed (500 symbols x 126 bars) ---")
+    bars = make_bars(500, 126)
+    start = time.perf_counter()
+    table = indicator_engine.compute_indicators(bars)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Computed {len(table)} symbols in {elapsed:.1f} ms")
+    print(f"Sample row: {table.row('S0')}")
+
+def test_incremental_state():
+    print("\n--- Testing Incremental State vs Full Recompute ---")
+    bars = make_bars(20, 126)
+    for field in ('open', 'high', 'low', 'close', 'volume'):
+        bars[field][3, :60] = np.nan
+
+    # Seed from the first 100 bars, then feed the rest one quote tick + one final bar at a time
+    head = {k: (v[:100] if k == 'timestamps' else v[:, :100] if k != 'symbols' else v) for k, v in bars.items()}
+    state = indicator_engine.IndicatorState.from_bars(head)
+    start = time.perf_counter()
+    updates = 0
+    for t in range(100, 126):
+        for row, sym in enumerate(bars['symbols']):
+            state.update(sym, bars['close'][row, t] * 0.99, timestamp=bars['timestamps'][t])
+            state.update(sym, bars['close'][row, t], volume=bars['volume'][row, t], high=bars['high'][row, t],
+                         low=bars['low'][row, t], timestamp=bars['timestamps'][t])
+            updates += 2
+    elapsed = (time.perf_counter() - start) * 1e6 / updates
+
+    table = state.snapshot()
+    reference = indicator_engine.compute_indicators(bars)
+    worst = max(np.nanmax(np.abs(table[name] - reference[name]))
+                for name in ('price', 'rsi', 'macd', 'macd_signal', 'bb_upper', 'bb_lower', 'rvol', 'sma_50', 'atr'))
+
+    print(f"Max abs difference: {worst:.2e} ({elapsed:.1f} us per update)")
+    if worst < 1e-8:
+        print("PASS: Incremental state matches full recompute")
+    else:
+        print("FAIL: Incremental state diverges from full recompute")
+
+def test_quote_sessions():
+    print("\n--- Testing Quotes Land on Their Own Session ---")
+    import data_service
+    bars = make_bars(2, 60)
+    last = np.datetime64('2026-10-09', 's').astype(np.int64) # A Friday
+    bars['timestamps'] = last - (59 - np.arange(60)) * 86400.0
+    state = indicator_engine.IndicatorState.from_bars(bars)
+    data_service.INDICATOR_STATE = state
+    committed = state.count[0]
+
+    # Monday pre-market (or a holiday): Yahoo's latest bar is still Friday's
+    data_service.apply_quote_to_indicators("S0", {'price': 101.0, 'session_date': '2026-10-09'})
+    ok = state.count[0] == committed and state.bar_timestamp[0] == last and state.bar_close[0] == 101.0
+    print(f"{'PASS' if ok else 'FAIL'}: A pre-market quote revises the last session's bar instead of opening a new one")
+
+    data_service.apply_quote_to_indicators("S0", {'price': 102.0, 'session_date': '2026-10-13'})
+    ok = state.count[0] == committed + 1 and state.bar_timestamp[0] == last + 4 * 86400
+    print(f"{'PASS' if ok else 'FAIL'}: A quote from the next session starts its bar")
+
+    data_service.apply_quote_to_indicators("S0", {'price': 90.0, 'session_date': '2026-10-09'})
+    data_service.apply_quote_to_indicators("S0", {'price': 90.0})
+    print(f"{'PASS' if state.bar_close[0] == 102.0 else 'FAIL'}: Older and undated quotes are ignored")
+    data_service.INDICATOR_STATE = None
+
+if __name__ == "__main__":
+    test_matches_pandas()
+    test_universe_speed()
+    test_incremental_state()
+    test_quote_sessions()
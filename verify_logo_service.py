@@ -0,0 +1,104 @@
+import sys
+import os
+import time
+import json
+import shutil
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QPixmap, QColor, QImage
+from PySide6.QtCore import Qt, QSize, QTimer, QEventLoop
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+import ui_components
+
+def make_service():
+    """A LogoService on a scratch directory, installed as the shared instance."""
+    service = ui_components.LogoService(tempfile.mkdtemp(prefix="logos_"))
+    ui_components.LogoService._instance = service
+    return service
+
+def wait_for(condition, seconds=20):
+    deadline = time.time() + seconds
+    while not condition() and time.time() < deadline:
+        loop = QEventLoop()
+        QTimer.singleShot(50, loop.quit)
+        loop.exec()
+    return condition()
+
+def test_dedup_and_misses():
+    print("\n--- Testing Shared Fetches & Misses ---")
+    service = make_service()
+    requests = []
+    get = service.manager.get
+    service.manager.get = lambda request: requests.append(request.url().toString()) or get(request)
+
+    widgets = [ui_components.LogoWidget("AAPL", size=40) for _ in range(50)]
+    widgets += [ui_components.LogoWidget("NOT_MAPPED", size=40) for _ in range(10)]
+    print(f"{'PASS' if len(requests) == 1 else 'FAIL'}: 60 widgets made {len(requests)} request(s) (one per mapped symbol)")
+
+    # Offline here (or no logo): the failure is remembered
+    settled = wait_for(lambda: not service.pending)
+    has_logo = service.originals.get("AAPL") is not None
+    print(f"{'PASS' if settled else 'FAIL'}: Fetch settled ({'logo downloaded' if has_logo else 'recorded as a miss'})")
+    if not has_logo:
+        ui_components.LogoWidget("AAPL", size=40)
+        print(f"{'PASS' if len(requests) == 1 else 'FAIL'}: A miss is not retried before its TTL")
+        service.misses["AAPL"] -= service.MISS_TTL + 1
+        service.request("AAPL")
+        print(f"{'PASS' if len(requests) == 2 else 'FAIL'}: It is retried once the TTL expires")
+        wait_for(lambda: not service.pending)
+
+        with open(os.path.join(service.directory, "misses.json")) as f:
+            print(f"{'PASS' if 'AAPL' in json.load(f) else 'FAIL'}: Misses persist across sessions")
+    for w in widgets:
+        w.deleteLater()
+    shutil.rmtree(service.directory, ignore_errors=True)
+
+def test_disk_and_scaling():
+    print("\n--- Testing Disk Cache & Scaled Copies ---")
+    service = make_service()
+    logo = QPixmap(400, 200)
+    logo.fill(QColor("red"))
+    logo.save(service.path("MSFT"), "PNG")
+    requests = []
+    get = service.manager.get
+    service.manager.get = lambda request: requests.append(request.url().toString()) or get(request)
+
+    widget = ui_components.LogoWidget("MSFT", size=60)
+    ok = service.originals.get("MSFT") is not None and not requests
+    print(f"{'PASS' if ok else 'FAIL'}: A logo saved last session loads from disk without a request")
+
+    first = service.pixmap("MSFT", QSize(52, 52), 2.0)
+    again = service.pixmap("MSFT", QSize(52, 52), 2.0)
+    ok = first is again and first.width() == 104 and first.height() == 52 and first.devicePixelRatio() == 2.0
+    print(f"{'PASS' if ok else 'FAIL'}: Scaled once per size and pixel ratio ({first.width()}x{first.height()} device px)")
+
+    image = QImage(60, 60, QImage.Format_ARGB32_Premultiplied)
+    start = time.perf_counter()
+    for _ in range(200):
+        widget.render(image)
+    per_paint = (time.perf_counter() - start) / 200 * 1000
+    start = time.perf_counter()
+    for _ in range(200):
+        logo.scaled(QSize(52, 52), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    rescaled = (time.perf_counter() - start) / 200 * 1000
+    print(f"Rescaling the logo on every paint: {rescaled:.3f}ms")
+    print(f"{'PASS' if per_paint < 2 else 'FAIL'}: {per_paint:.3f}ms per logo paint from the scaled cache")
+
+    os.utime(service.path("MSFT"), (0, 0)) # Older than LOGO_TTL
+    service.originals.clear()
+    service.pixmap("MSFT")
+    ok = len(requests) == 1 and service.originals.get("MSFT") is not None
+    print(f"{'PASS' if ok else 'FAIL'}: An expired logo still shows while it is refetched")
+    wait_for(lambda: not service.pending)
+    widget.deleteLater()
+    shutil.rmtree(service.directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_dedup_and_misses()
+    test_disk_and_scaling()
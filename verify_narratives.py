@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import data_service
+
+def make_case(rng, symbol):
+    indicators = {'rvol': round(rng.uniform(0.5, 3.0), 2), 'rsi': round(rng.uniform(15, 85), 2),
+                  'price': round(rng.uniform(50, 300), 2), 'sma_50': round(rng.uniform(50, 300), 2)}
+    inputs = {'stock_change': round(rng.gauss(0, 2), 2), 'sector_change': round(rng.gauss(0, 1), 2),
+              'index_change': round(rng.gauss(0, 1), 2),
+              'news_headline': rng.choice([None, f"{symbol} announces a new product line for the coming fiscal year"]),
+              'news_sentiment': "NEUTRAL", 'rs': rng.choice([None, 10.0, 50.0, 92.0]),
+              'rs_vs_market_3m': 4.2, 'sector_rank_3m': 85.0}
+    return indicators, inputs
+
+def test_memo_hits():
+    print("\n--- Testing Narrative Memo ---")
+    rng = random.Random(4)
+    symbols = list(data_service.SYMBOL_TO_SECTOR)[:40] or [f"S{i}" for i in range(40)]
+    cases = {sym: make_case(rng, sym) for sym in symbols}
+    data_service._narrative_tokens.cache_clear()
+
+    start = time.perf_counter()
+    first = {sym: data_service.generate_narrative(sym, *cases[sym]) for sym in symbols}
+    cold = (time.perf_counter() - start) / len(symbols) * 1e6
+    refreshes = 25
+    start = time.perf_counter()
+    for _ in range(refreshes):
+        again = {sym: data_service.generate_narrative(sym, *cases[sym]) for sym in symbols}
+    warm = (time.perf_counter() - start) / (len(symbols) * refreshes) * 1e6
+
+    info = data_service._narrative_tokens.cache_info()
+    ok = info.misses == len(symbols) and info.hits == len(symbols) * refreshes
+    print(f"{'PASS' if ok else 'FAIL'}: Unchanged inputs hit the memo ({info.hits} hits, {info.misses} misses)")
+    print(f"{'PASS' if again == first else 'FAIL'}: Memoized narratives equal the first build")
+    print(f"Building: {cold:.1f}us per narrative, memo hit: {warm:.1f}us")
+
+    sym = symbols[0]
+    indicators, inputs = cases[sym]
+    changed = data_service.generate_narrative(sym, indicators, dict(inputs, rs=95.0 if inputs['rs'] != 95.0 else 5.0))
+    print(f"{'PASS' if changed != first[sym] and data_service._narrative_tokens.cache_info().misses == len(symbols) + 1 else 'FAIL'}: "
+          f"A changed input builds a new narrative")
+
+    # Callers get fresh dicts, so editing one can't corrupt the memo
+    first[sym][0]['content'] = "EDITED"
+    print(f"{'PASS' if data_service.generate_narrative(sym, *cases[sym])[0]['content'] != 'EDITED' else 'FAIL'}: "
+          f"Returned tokens are copies of the memo entry")
+
+def test_matches_unmemoized():
+    print("\n--- Testing Memo vs Direct Build ---")
+    rng = random.Random(9)
+    build = data_service._narrative_tokens.__wrapped__
+    differ = 0
+    for i in range(300):
+        indicators, inputs = make_case(rng, f"S{i}")
+        args = (indicators['rvol'], indicators['rsi'], indicators['price'], indicators['sma_50'],
+                inputs['stock_change'], inputs['sector_change'], inputs['index_change'],
+                inputs['news_headline'], inputs['news_sentiment'], True,
+                inputs['rs'], inputs['rs_vs_market_3m'], inputs['sector_rank_3m'])
+        if data_service._narrative_tokens(*args) != build(*args):
+            differ += 1
+    print(f"{'PASS' if not differ else 'FAIL'}: 300 memoized narratives match a direct build ({differ} differ)")
+
+if __name__ == "__main__":
+    test_memo_hits()
+    test_matches_unmemoized()
@@ -0,0 +1,50 @@
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import data_service
+
+def fresh_breaker(endpoint='news'):
+    breaker = data_service.CircuitBreaker(endpoint, failure_threshold=2, cooldown_seconds=0.05)
+    data_service.BREAKERS[endpoint] = breaker
+    return breaker
+
+def fail():
+    raise RuntimeError("boom")
+
+def test_half_open_probe():
+    print("\n--- Testing Half-Open Probes ---")
+    breaker = fresh_breaker()
+    for _ in range(2):
+        try:
+            data_service.guarded_fetch('news', None, fail)
+        except data_service.FetchUnavailable:
+            pass
+    print(f"{'PASS' if breaker.state == breaker.OPEN else 'FAIL'}: Breaker opens after repeated failures")
+
+    time.sleep(0.06)
+    value, stale = data_service.guarded_fetch('news', None, lambda: [], is_empty=lambda v: not v)
+    ok = breaker.state == breaker.CLOSED and value == [] and not stale
+    print(f"{'PASS' if ok else 'FAIL'}: An empty probe answer closes the breaker ({breaker.state})")
+
+    value, _ = data_service.guarded_fetch('news', None, lambda: ["headline"], is_empty=lambda v: not v)
+    print(f"{'PASS' if value == ['headline'] else 'FAIL'}: Later calls go through")
+
+def test_deadline():
+    print("\n--- Testing Deadlines ---")
+    breaker = fresh_breaker('quote')
+    deadline = data_service.FETCH_DEADLINES['quote']
+    data_service.FETCH_DEADLINES['quote'] = 0.05
+    data_service.set_cached_data("T_quote", {'last_price': 1.0})
+    start = time.perf_counter()
+    value, stale = data_service.guarded_fetch('quote', "T_quote", lambda: time.sleep(0.3) or {'last_price': 2.0})
+    waited = time.perf_counter() - start
+    data_service.FETCH_DEADLINES['quote'] = deadline
+    ok = stale and value == {'last_price': 1.0} and waited < 0.2 and breaker.failures == 1
+    print(f"{'PASS' if ok else 'FAIL'}: A missed deadline serves the cached value after {waited * 1000:.0f}ms")
+
+if __name__ == "__main__":
+    test_half_open_probe()
+    test_deadline()
@@ -0,0 +1,99 @@
+import sys
+import os
+import time
+import calendar
+from datetime import datetime, timedelta
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import outcome_tracker
+
+DAY = 86400
+
+def wall_clock(dt):
+    """bar_store timestamp for a wall-clock datetime (epoch seconds, no timezone shift)."""
+    return calendar.timegm(dt.timetuple())
+
+def make_bars(start, closes, highs=None, lows=None):
+    closes = np.asarray(closes, dtype=float)
+    highs = closes + 0.5 if highs is None else np.asarray(highs, dtype=float)
+    lows = closes - 0.5 if lows is None else np.asarray(lows, dtype=float)
+    stamps = start + DAY * np.arange(len(closes))
+    return np.column_stack([stamps, closes, highs, lows, closes, np.full(len(closes), 1e6)])
+
+def make_idea(symbol, logged, horizon="Swing (3-10 Days)"):
+    return {
+        'symbol': symbol, 'status': 'OPEN', 'created_at': logged.isoformat(),
+        'trade_setup': {'entry': 100.0, 'stop': 95.0, 'target': 110.0, 'time_horizon': horizon}
+    }
+
+def test_outcomes():
+    print("\n--- Testing Idea Outcomes ---")
+    logged = datetime(2026, 1, 5, 15, 0)
+    first_bar = wall_clock(datetime(2026, 1, 5)) # Bar of the logging day is not counted
+    bars = {
+        'TGT': make_bars(first_bar, [100, 104, 111, 90]),
+        'STP': make_bars(first_bar, [100, 99, 94, 120]),
+        'EXP': make_bars(first_bar, [100, 101, 102, 103, 104]),
+        'OPN': make_bars(first_bar, [100, 103])
+    }
+    ideas = [make_idea('TGT', logged), make_idea('STP', logged),
+             make_idea('EXP', logged, "Mean Reversion (1-3 Days)"), make_idea('OPN', logged)]
+    outcome_tracker.evaluate(ideas, bars)
+    got = [(i['status'], i.get('exit_reason'), i['result_pct']) for i in ideas]
+    print(got)
+    expected = [('CLOSED', 'TARGET', 10.0), ('CLOSED', 'STOP', -5.0), ('EXPIRED', 'EXPIRED', 3.0), ('OPEN', None, 3.0)]
+    print("PASS: Outcomes match" if got == expected else "FAIL: Unexpected outcomes")
+
+    # Nothing new: nothing re-evaluated. One new bar: only that symbol's open idea
+    changed = outcome_tracker.evaluate(ideas, bars)
+    bars['OPN'] = make_bars(first_bar, [100, 103, 96])
+    changed_after = outcome_tracker.evaluate(ideas, bars)
+    print(f"Re-evaluated: {changed} without new bars, {changed_after} after one new bar; OPN now {ideas[3]['result_pct']}%")
+    if changed == 0 and changed_after == 1 and ideas[3]['result_pct'] == -4.0:
+        print("PASS: Only ideas with new bars are updated")
+    else:
+        print("FAIL: Incremental update")
+
+def test_timezones():
+    print("\n--- Testing Local Timezones ---")
+    if not hasattr(time, 'tzset'):
+        print("SKIP: time.tzset is not available on this platform")
+        return
+    saved = os.environ.get('TZ')
+    try:
+        for tz in ('America/New_York', 'Asia/Tokyo', 'UTC'):
+            os.environ['TZ'] = tz
+            time.tzset()
+            # Logged Monday evening; Tuesday 2026-10-13's bar hits the target
+            idea = make_idea('TZ', datetime(2026, 10, 12, 20, 0))
+            bars = {'TZ': make_bars(wall_clock(datetime(2026, 10, 12)), [100, 111, 100])}
+            outcome_tracker.evaluate([idea], bars)
+            ok = idea.get('closed_at') == '2026-10-13' and idea.get('bars_held') == 1
+            print(f"{'PASS' if ok else 'FAIL'}: TZ={tz}: closed on {idea.get('closed_at')} after {idea.get('bars_held')} bar(s)")
+    finally:
+        if saved is None:
+            os.environ.pop('TZ', None)
+        else:
+            os.environ['TZ'] = saved
+        time.tzset()
+
+def test_history_size():
+    print("\n--- Testing 10,000 Ideas ---")
+    rng = np.random.default_rng(1)
+    start = wall_clock(datetime(2025, 1, 1))
+    bars = {f"S{i}": make_bars(start, 100 * np.cumprod(1 + rng.normal(0, 0.02, 400))) for i in range(200)}
+    ideas = [make_idea(f"S{rng.integers(200)}", datetime(2025, 1, 1) + timedelta(days=int(rng.integers(390))))
+             for _ in range(10000)]
+    t0 = time.perf_counter()
+    outcome_tracker.evaluate(ideas, bars)
+    elapsed = time.perf_counter() - t0
+    statuses = {s: sum(i['status'] == s for i in ideas) for s in ('OPEN', 'CLOSED', 'EXPIRED')}
+    print(f"{statuses} in {elapsed * 1000:.0f}ms")
+    print("PASS: Large history evaluated" if elapsed < 5 else "FAIL: Too slow")
+
+if __name__ == "__main__":
+    test_outcomes()
+    test_timezones()
+    test_history_size()
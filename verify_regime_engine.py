@@ -0,0 +1,176 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import regime_engine
+from verify_indicator_engine import make_bars
+
+def make_series(n=400, seed=21):
+    """bar_store rows [timestamp, open, high, low, close, volume] for one symbol."""
+    bars = make_bars(1, n, seed=seed)
+    return np.column_stack([bars['timestamps']] + [bars[f][0] for f in ('open', 'high', 'low', 'close', 'volume')])
+
+def scalar_reference(rows):
+    """The old detect_market_regime rules, on the last bar of `rows`."""
+    df = pd.DataFrame(rows[:, 2:5], columns=['High', 'Low', 'Close'])
+    close = df['Close']
+    sma_20 = close.rolling(window=20).mean().iloc[-1]
+    sma_50 = close.rolling(window=50).mean().iloc[-1]
+    price = close.iloc[-1]
+    trend = "SIDEWAYS"
+    if price > sma_20 > sma_50:
+        trend = "STRONG UPTREND"
+    elif price < sma_20 < sma_50:
+        trend = "STRONG DOWNTREND"
+    elif price > sma_50:
+        trend = "UPTREND"
+    elif price < sma_50:
+        trend = "DOWNTREND"
+    atr_pct = (df['High'] - df['Low']).rolling(window=14).mean().iloc[-1] / price * 100
+    volatility = "HIGH" if atr_pct > 1.5 else "LOW" if atr_pct < 0.5 else "NORMAL"
+    regime = "NEUTRAL"
+    if trend == "STRONG UPTREND" and volatility == "LOW":
+        regime = "BULLISH GRIND"
+    elif trend == "STRONG UPTREND" and volatility == "HIGH":
+        regime = "VOLATILE BULL"
+    elif trend == "STRONG DOWNTREND":
+        regime = "BEARISH"
+    elif trend == "SIDEWAYS" and volatility == "HIGH":
+        regime = "CHOPPY"
+    return regime, trend, volatility
+
+def same_history(a, b):
+    """Codes and bars equal; SMAs/ATR% equal up to rolling-sum rounding."""
+    for name in a.FIELDS:
+        if name in ('sma_20', 'sma_50', 'atr_pct'):
+            if not np.allclose(a.data[name], b.data[name], rtol=1e-9, atol=0, equal_nan=True):
+                return False
+        elif not np.array_equal(a.data[name], b.data[name]):
+            return False
+    return True
+
+def test_matches_scalar_rules():
+    print("\n--- Testing Per-Bar Regimes vs detect_market_regime Rules ---")
+    rows = make_series()
+    history = regime_engine.RegimeHistory("TEST")
+    history.extend(rows)
+    mismatches = 0
+    for i in range(regime_engine.MIN_BARS - 1, len(rows)):
+        got = history.row(i)
+        if (got['regime'], got['trend'], got['volatility']) != scalar_reference(rows[:i + 1]):
+            mismatches += 1
+    seen = {history.row(i)['regime'] for i in range(regime_engine.MIN_BARS - 1, len(rows))}
+    print(f"{'PASS' if not mismatches else 'FAIL'}: Every bar matches the scalar rules ({mismatches} differ, regimes seen: {sorted(seen)})")
+    print(f"{'PASS' if history.row(regime_engine.MIN_BARS - 2) is None else 'FAIL'}: Bars without 50 bars of history stay unclassified")
+
+def test_extension():
+    print("\n--- Testing Incremental Extension ---")
+    rows = make_series()
+    full = regime_engine.RegimeHistory("TEST")
+    full.extend(rows)
+
+    history = regime_engine.RegimeHistory("TEST")
+    history.extend(rows[:200])
+    classified = 0
+    for end in range(201, len(rows) + 1):
+        # Each refresh re-feeds the last known bar (it may have been revised) plus the new one
+        provisional = rows[end - 1].copy()
+        provisional[4] *= 1.01
+        history.extend(np.vstack([rows[end - 2], provisional]))
+        classified += history.extend(rows[end - 2:end])
+    same = same_history(history, full)
+    print(f"{'PASS' if same else 'FAIL'}: Bar-by-bar extension with revised bars equals a full build")
+    print(f"{'PASS' if classified == 2 * (len(rows) - 200) else 'FAIL'}: Each refresh reclassified only the bars it was given")
+
+    history = regime_engine.RegimeHistory("TEST")
+    history.extend(rows[:300])
+    history.extend(rows[250:]) # An overlapping download
+    same = same_history(history, full)
+    print(f"{'PASS' if same else 'FAIL'}: An overlapping chunk replaces the bars it covers")
+
+    start = time.perf_counter()
+    for _ in range(200):
+        history.extend(rows[-2:])
+    per_extend = (time.perf_counter() - start) / 200 * 1000
+    start = time.perf_counter()
+    regime_engine.classify(rows[:, 2], rows[:, 3], rows[:, 4])
+    rebuild = (time.perf_counter() - start) * 1000
+    print(f"Extending by one bar: {per_extend:.3f}ms, reclassifying {len(rows)} bars: {rebuild:.3f}ms")
+
+def test_persistence():
+    print("\n--- Testing Persistence & Lookups ---")
+    rows = make_series()
+    regime_engine.REGIMES_DIR = tempfile.mkdtemp(prefix="regimes_")
+    try:
+        history = regime_engine.RegimeHistory("TEST")
+        history.extend(rows[:300])
+        history.save()
+        loaded = regime_engine.RegimeHistory.load("TEST")
+        same = same_history(loaded, history)
+        print(f"{'PASS' if same else 'FAIL'}: A saved history loads back unchanged")
+
+        loaded.extend(rows[299:])
+        full = regime_engine.RegimeHistory("TEST")
+        full.extend(rows)
+        same = same_history(loaded, full)
+        print(f"{'PASS' if same else 'FAIL'}: A loaded history extends like a fresh one")
+
+        between = (rows[120, 0] + rows[121, 0]) / 2
+        ok = loaded.at(between) == loaded.row(120) and loaded.at(rows[0, 0] - 1) is None
+        print(f"{'PASS' if ok else 'FAIL'}: at() returns the regime in force at a timestamp")
+    finally:
+        shutil.rmtree(regime_engine.REGIMES_DIR, ignore_errors=True)
+
+def test_stored_histories():
+    print("\n--- Testing Stored Histories vs Re-Adjusted Bars ---")
+    import data_service
+    import bar_store
+    rows = make_series()
+    bars_dir, bar_store.BARS_DIR = bar_store.BARS_DIR, tempfile.mkdtemp(prefix="bars_")
+    regimes_dir, regime_engine.REGIMES_DIR = regime_engine.REGIMES_DIR, tempfile.mkdtemp(prefix="regimes_")
+    try:
+        def history_for(stored):
+            # Freshly written bars keep ensure_bars from downloading
+            bar_store.save_bars("TEST", stored)
+            return data_service.get_regime_history("TEST")
+
+        history_for(rows[:300])
+        adjusted = rows.copy()
+        adjusted[:, 1:5] *= 0.5 # A 2-for-1 split back-adjusts every stored price
+        data_service.REGIME_HISTORIES.clear() # As on the next launch: only the saved history is left
+        history = history_for(adjusted)
+        full = regime_engine.RegimeHistory("TEST")
+        full.extend(adjusted)
+        print(f"{'PASS' if same_history(history, full) else 'FAIL'}: A re-adjusted history is rebuilt on the new price basis")
+
+        extended = history_for(np.vstack([adjusted, adjusted[-1:] + [86400, 0, 0, 0, 0, 0]]))
+        print(f"{'PASS' if len(extended) == len(adjusted) + 1 else 'FAIL'}: An unadjusted update only extends it")
+
+        data_service.REGIME_HISTORIES.clear()
+        os.remove(regime_engine.RegimeHistory("TEST").path())
+        try:
+            history = history_for(rows[:1])
+            ok = len(history) == 1
+        except IndexError:
+            ok = False
+        print(f"{'PASS' if ok else 'FAIL'}: A new history can start from a single stored bar")
+        history.save()
+        cached = data_service.REGIME_HISTORIES[("TEST", "1d")] = regime_engine.RegimeHistory("TEST")
+        print(f"{'PASS' if data_service.get_regime_history('TEST') is cached else 'FAIL'}: "
+              f"An empty cached history is reused, not reloaded from disk")
+    finally:
+        shutil.rmtree(bar_store.BARS_DIR, ignore_errors=True)
+        shutil.rmtree(regime_engine.REGIMES_DIR, ignore_errors=True)
+        bar_store.BARS_DIR, regime_engine.REGIMES_DIR = bars_dir, regimes_dir
+
+if __name__ == "__main__":
+    test_matches_scalar_rules()
+    test_extension()
+    test_persistence()
+    test_stored_histories()
@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import relative_strength
+import scanner
+
+def make_bars(n=500, t=relative_strength.LOOKBACK_BARS, seed=3):
+    """Aligned closes for S0..S{n-1} plus SPY and two sector ETFs, with a few gaps."""
+    rng = np.random.default_rng(seed)
+    symbols = [f"S{i}" for i in range(n)] + ['SPY', 'XLK', 'XLE']
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, (len(symbols), t)), axis=1))
+    close[5, :-10] = np.nan # Recent listing: only the 1w return is known
+    close[6] = np.nan # No data at all
+    sectors = [('XLK' if i % 2 else 'XLE') for i in range(n)] + [None, None, None]
+    return {'symbols': symbols, 'close': close, 'timestamps': np.arange(t) * 86400.0}, sectors
+
+def test_ranks():
+    print("\n--- Testing Percentile Ranks ---")
+    bars, sectors = make_bars()
+    n = len(bars['symbols']) - 3
+    ranked = [True] * n + [False] * 3
+    table = relative_strength.compute(bars, 'SPY', sectors=sectors, ranked=ranked)
+
+    df = pd.DataFrame(bars['close'][:n].T, columns=bars['symbols'][:n])
+    ok = True
+    for period, days in relative_strength.PERIODS.items():
+        returns = (df.iloc[-1] / df.iloc[-1 - days] - 1) * 100
+        expected = (returns.rank(method='average') - 1) / (returns.count() - 1) * 100
+        ours = table.column(f'rank_{period}', symbols=bars['symbols'][:n])
+        ok &= np.allclose(ours, expected.to_numpy(), equal_nan=True)
+
+        # Within-sector ranks
+        sector = pd.Series(sectors[:n], index=df.columns)
+        grouped = returns.groupby(sector)
+        expected = (grouped.rank(method='average') - 1) / (grouped.transform('count') - 1) * 100
+        ours = table.column(f'sector_rank_{period}', symbols=bars['symbols'][:n])
+        ok &= np.allclose(ours, expected.to_numpy(), equal_nan=True)
+
+        spy = bars['close'][n, -1] / bars['close'][n, -1 - days] * 100 - 100
+        ok &= np.allclose(table.column(f'vs_market_{period}', symbols=bars['symbols'][:n]), returns.to_numpy() - spy, equal_nan=True)
+    print(f"{'PASS' if ok else 'FAIL'}: Ranks match pandas rank() over the universe and per sector")
+
+    row = table.row('S5')
+    print(f"{'PASS' if row['rank_1w'] is not None and row['rank_3m'] is None and row['rs'] == row['rank_1w'] else 'FAIL'}: "
+          f"Partial history uses the periods it has (S5 rs={row['rs']})")
+    row = table.row('S6')
+    print(f"{'PASS' if row['rs'] is None else 'FAIL'}: No history, no RS")
+    spy = table.column('rank_1m', symbols=['SPY'])[0]
+    print(f"{'PASS' if np.isnan(spy) else 'FAIL'}: Benchmark is aligned but not ranked")
+
+    ties = relative_strength.percentile_rank(np.array([1.0, 2.0, 2.0, 3.0, np.nan]))
+    print(f"{'PASS' if np.allclose(ties[:4], [0, 50, 50, 100]) and np.isnan(ties[4]) else 'FAIL'}: Ties share their average rank")
+
+def test_scoring():
+    print("\n--- Testing Opportunity Scoring ---")
+    results = {'opp_score': np.array([50, 50, 50, 50])}
+    scanner.apply_relative_strength(results, [90.0, 50.0, 10.0, np.nan])
+    ok = results['opp_score'].tolist() == [55, 50, 45, 50]
+    print(f"{'PASS' if ok else 'FAIL'}: Leaders +5, laggards -5, unknown unchanged ({results['opp_score'].tolist()})")
+
+def test_series():
+    print("\n--- Testing Per-Date Composite RS ---")
+    bars, sectors = make_bars(200, 300)
+    close = bars['close'][:200]
+    close[7, 150:] = close[7, 149] # Flat for a while: tied returns
+    close[8, 150:] = close[7, 149]
+    series = relative_strength.rs_series(close)
+
+    worst, unknown_ok = 0.0, True
+    for end in (30, 127, 200, 300):
+        head = {'symbols': bars['symbols'][:200], 'close': close[:, :end], 'timestamps': bars['timestamps'][:end]}
+        expected = relative_strength.compute(head, 'SPY').column('rs')
+        got = series[:, end - 1]
+        unknown_ok &= np.array_equal(np.isnan(got), np.isnan(expected))
+        known = ~np.isnan(expected)
+        worst = max(worst, float(np.abs(got[known] - expected[known]).max()))
+    print(f"{'PASS' if worst < 1e-9 and unknown_ok else 'FAIL'}: Each date's RS equals compute() on that date ({worst:.1e})")
+
+    changed = close.copy()
+    changed[:, 250:] *= 2
+    moved = relative_strength.rs_series(changed)
+    print(f"{'PASS' if np.array_equal(moved[:, :250], series[:, :250], equal_nan=True) else 'FAIL'}: No look-ahead")
+
+def test_speed():
+    print("\n--- Testing Speed (500 symbols x 127 bars) ---")
+    bars, sectors = make_bars()
+    start = time.perf_counter()
+    runs = 20
+    for _ in range(runs):
+        relative_strength.compute(bars, 'SPY', sectors=sectors)
+    elapsed = (time.perf_counter() - start) / runs * 1000
+    print(f"{'PASS' if elapsed < 50 else 'FAIL'}: One pass in {elapsed:.1f}ms")
+
+if __name__ == "__main__":
+    test_ranks()
+    test_scoring()
+    test_series()
+    test_speed()
@@ -0,0 +1,54 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import resampler
+
+def make_intraday(days=5, step=300, seed=7):
+    """5m-style bars for `days` sessions 9:30-16:00, wall-clock epoch seconds."""
+    rng = np.random.default_rng(seed)
+    stamps = []
+    for d in pd.bdate_range("2026-03-02", periods=days):
+        start = d.value // 10**9 + resampler.SESSION_OPEN
+        stamps += list(range(start, start + 390 * 60, step))
+    n = len(stamps)
+    close = 100 + np.cumsum(rng.normal(0, 0.1, n))
+    open_ = close + rng.normal(0, 0.05, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 0.1, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 0.1, n)
+    return np.column_stack([stamps, open_, high, low, close, rng.integers(1000, 5000, n)]).astype(float)
+
+def pandas_resample(bars, rule, **kwargs):
+    df = pd.DataFrame(bars[:, 1:], index=pd.to_datetime(bars[:, 0], unit='s'),
+                      columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+    out = df.resample(rule, **kwargs).agg({'Open': 'first', 'High': 'max', 'Low': 'min',
+                                            'Close': 'last', 'Volume': 'sum'}).dropna()
+    return np.column_stack([out.index.values.astype('datetime64[s]').astype(np.int64), out.to_numpy()])
+
+def check(name, ours, theirs):
+    ok = ours.shape == theirs.shape and np.allclose(ours, theirs)
+    print(f"{'PASS' if ok else 'FAIL'}: {name} ({len(ours)} bars)")
+
+def test_intraday():
+    print("\n--- Testing Intraday Resampling ---")
+    bars = make_intraday()
+    check("15m from 5m", resampler.resample(bars, '15m'), pandas_resample(bars, '15min'))
+    # 1h bars start at the 9:30 open, not on the hour
+    check("1h from 5m (session aligned)", resampler.resample(bars, '1h'), pandas_resample(bars, '60min', offset='30min'))
+
+def test_daily():
+    print("\n--- Testing Weekly/Monthly Resampling ---")
+    rng = np.random.default_rng(1)
+    days = pd.bdate_range("2024-01-01", "2026-03-31")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+    bars = np.column_stack([days.values.astype('datetime64[s]').astype(np.int64), close * 0.999, close * 1.01,
+                            close * 0.99, close, rng.integers(1e6, 5e6, len(days))]).astype(float)
+    check("Weekly (Monday labels)", resampler.resample(bars, '1wk'), pandas_resample(bars, 'W-MON', label='left', closed='left'))
+    check("Monthly", resampler.resample(bars, '1mo'), pandas_resample(bars, 'MS'))
+
+if __name__ == "__main__":
+    test_intraday()
+    test_daily()
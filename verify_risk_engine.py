@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import risk_engine
+from verify_indicator_engine import make_bars
+
+def make_universe(n=300, t=300):
+    bars = make_bars(n, t, seed=5)
+    bars['symbols'][0] = "SPY"
+    bars['close'][3, :120] = np.nan # Listed recently: enough for 3mo, not for 1y
+    bars['close'][4, 200:210] = np.nan # Halted for two weeks
+    return bars
+
+def pandas_reference(close, spy_close, days):
+    """The per-symbol pandas version calculate_risk_metrics used to run, on the last `days` returns."""
+    returns = pd.Series(close).pct_change(fill_method=None).iloc[1:].iloc[-days:]
+    market = pd.Series(spy_close).pct_change(fill_method=None).iloc[1:].iloc[-days:]
+    aligned = pd.concat([returns, market], axis=1, join='inner').dropna()
+    aligned.columns = ['Stock', 'SPY']
+    returns, market_returns = aligned['Stock'], aligned['SPY']
+
+    variance = market_returns.var()
+    beta = returns.cov(market_returns) / variance if variance != 0 else 1.0
+    volatility = returns.std() * np.sqrt(252)
+    excess_returns = returns - (risk_engine.RISK_FREE_RATE / 252)
+    sharpe = (excess_returns.mean() / returns.std()) * np.sqrt(252) if returns.std() != 0 else 0
+    cumulative = (1 + returns).cumprod()
+    peak = cumulative.cummax()
+    max_drawdown = ((cumulative - peak) / peak).min()
+    return {'beta': beta, 'sharpe': sharpe, 'volatility': volatility, 'max_drawdown': max_drawdown}, len(aligned)
+
+def test_matches_pandas():
+    print("\n--- Testing Risk Engine vs Pandas Reference ---")
+    bars = make_universe()
+    lookbacks = {'3mo': 63, '1y': 252}
+    table = risk_engine.compute_risk(bars, "SPY", lookbacks)
+    close = bars['close']
+
+    for lookback, days in lookbacks.items():
+        worst, coverage_ok = 0.0, True
+        for i, sym in enumerate(bars['symbols']):
+            expected, observations = pandas_reference(close[i], close[0], days)
+            enough = observations >= risk_engine.MIN_COVERAGE * days
+            got = {name: table.column(name, lookback)[i] for name in risk_engine.METRICS}
+            if not enough:
+                coverage_ok &= all(np.isnan(v) for v in got.values())
+                continue
+            worst = max(worst, max(abs(got[name] - expected[name]) for name in risk_engine.METRICS))
+        print(f"{lookback}: max abs difference {worst:.2e}")
+        print(f"{'PASS' if worst < 1e-9 and coverage_ok else 'FAIL'}: {lookback} metrics match pandas "
+              f"(short-history symbols NaN: {coverage_ok})")
+
+    row = table.row("S4", '1y')
+    expected, _ = pandas_reference(close[4], close[0], 252)
+    ok = row is not None and row['beta'] == round(expected['beta'], 2) and \
+         row['max_drawdown'] == round(expected['max_drawdown'] * 100, 1)
+    print(f"{'PASS' if ok else 'FAIL'}: row() keeps the calculate_risk_metrics format ({row})")
+
+def test_speed():
+    print("\n--- Testing Universe Speed ---")
+    bars = make_bars(1000, 800, seed=6)
+    bars['symbols'][0] = "SPY"
+    start = time.perf_counter()
+    risk_engine.compute_risk(bars, "SPY")
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{'PASS' if elapsed < 2000 else 'FAIL'}: 1000 symbols x 3 lookbacks in {elapsed:.0f}ms")
+
+if __name__ == "__main__":
+    test_matches_pandas()
+    test_speed()
@@ -0,0 +1,97 @@
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import scanner
+import indicator_engine
+import data_service
+from verify_indicator_engine import make_bars
+
+SECTORS = ('XLK', 'XLU', 'XLE', None)
+
+def per_symbol_reference(table, risk_profile, sectors, beta):
+    """The old get_opportunities loop: one symbol at a time from IndicatorTable.row()."""
+    stop_mult, target_mult, _ = scanner.PROFILE_SETUPS[risk_profile]
+    expected = {}
+    for i, sym in enumerate(table.symbols):
+        ind = table.row(sym)
+        if ind is None:
+            continue
+        confidence = data_service.calculate_setup_confidence(ind)
+        score = confidence
+        if ind['rvol'] > 2.0:
+            score += 10
+        elif ind['rvol'] > 1.5:
+            score += 5
+        elif ind['rvol'] < 0.8:
+            score -= 5
+        if ind['price'] > ind['sma_50']:
+            score += 3
+
+        b, sector = beta[i], sectors[i]
+        if risk_profile == "DEFENSIVE":
+            match = b <= 0.9 or sector in scanner.DEFENSIVE_SECTORS
+        elif risk_profile == "BALANCED":
+            match = 0.7 <= b <= 1.5
+        else:
+            match = b >= 1.1 or sector in scanner.SPECULATIVE_SECTORS
+        stop = round(ind['price'] - stop_mult * ind['atr'], 2)
+        expected[sym] = (confidence, score, bool(match), stop)
+    return expected
+
+def make_universe(n=1000):
+    """Random-walk universe where every 7th symbol has too little history to score."""
+    bars = make_bars(n, 126, seed=7)
+    for row in range(0, n, 7):
+        for field in ('open', 'high', 'low', 'close', 'volume'):
+            bars[field][row, :100] = np.nan
+    sectors = [SECTORS[i % len(SECTORS)] for i in range(n)]
+    beta = np.random.default_rng(7).uniform(0.4, 1.8, n)
+    return bars, sectors, beta
+
+def test_full_universe():
+    print("\n--- Testing Full-Universe Scan vs Per-Symbol Rules ---")
+    bars, sectors, beta = make_universe()
+    table = indicator_engine.compute_indicators(bars)
+
+    for profile in ("DEFENSIVE", "BALANCED", "SPECULATIVE"):
+        results = scanner.scan(table, profile, sectors=sectors, beta=beta)
+        expected = per_symbol_reference(table, profile, sectors, beta)
+        got = {sym: (int(results['confidence'][i]), int(results['opp_score'][i]), bool(results['is_match'][i]),
+                     float(results['stop'][i])) for i, sym in enumerate(results['symbols'])}
+        diffs = [sym for sym in expected if got.get(sym) != expected[sym]]
+        ok = not diffs and set(got) == set(expected)
+        print(f"{'PASS' if ok else 'FAIL'}: {profile}: {len(got)} scored rows match "
+              f"({len(table) - len(got)} short-history rows skipped, {len(diffs)} differ)")
+
+def test_sector_alignment():
+    print("\n--- Testing Sectors Stay on Their Rows ---")
+    bars, _, _ = make_universe(70)
+    table = indicator_engine.compute_indicators(bars)
+    # High beta everywhere: DEFENSIVE matches come from the sector alone
+    sectors = ['XLU' if i % 2 else 'XLK' for i in range(len(table))]
+    results = scanner.scan(table, "DEFENSIVE", sectors=sectors, beta=np.full(len(table), 2.0))
+    want = [sectors[table.index[s]] == 'XLU' for s in results['symbols']]
+    ok = results['is_match'].tolist() == want
+    print(f"{'PASS' if ok else 'FAIL'}: Sector matches follow their symbols past dropped short-history rows")
+
+def test_top_k():
+    print("\n--- Testing Top-K Selection ---")
+    bars, sectors, beta = make_universe()
+    results = scanner.scan(indicator_engine.compute_indicators(bars), "BALANCED", sectors=sectors, beta=beta,
+                           rvol_threshold=1.0)
+    start = time.perf_counter()
+    top = scanner.top_k(results, 10)
+    elapsed = (time.perf_counter() - start) * 1000
+    order = sorted(range(len(results['symbols'])),
+                   key=lambda i: (not results['is_match'][i], not results['is_rvol_ok'][i],
+                                  -results['opp_score'][i], results['symbols'][i]))
+    print(f"{'PASS' if top == order[:10] else 'FAIL'}: Heap top 10 equals a full sort ({elapsed:.2f}ms)")
+
+if __name__ == "__main__":
+    test_full_universe()
+    test_sector_alignment()
+    test_top_k()
@@ -0,0 +1,44 @@
+import sys
+import os
+import timeit
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import screener
+import indicator_engine
+from verify_indicator_engine import make_bars
+
+def test_expressions():
+    print("\n--- Testing Screen Expressions ---")
+    bars = make_bars(500, 120)
+    table = indicator_engine.compute_indicators(bars)
+    sectors = np.array(["Technology", "Energy", ""] * 166 + ["Energy", "Energy"], dtype=object)
+    screen = screener.Screen("Momentum", "rsi < 45 and rvol > 1 and sma_50_distance > 0 and sector in ('Technology', '')")
+    got = screener.run([screen], table, {'sector': sectors})["Momentum"]
+
+    # Same filter, one symbol at a time
+    expected = []
+    for i, sym in enumerate(table.symbols):
+        c = {name: table[name][i] for name in ('rsi', 'rvol', 'sma_50_distance', 'bars')}
+        if c['bars'] >= indicator_engine.MIN_BARS and c['rsi'] < 45 and c['rvol'] > 1 and c['sma_50_distance'] > 0 and sectors[i] in ('Technology', ''):
+            expected.append(sym)
+    print(f"{len(got)} matches")
+    print("PASS: Matches the per-symbol filter" if got == expected else "FAIL: Results differ")
+
+    errors = 0
+    for bad in ("rsi <", "open('x')", "rsi is None", "unknown_column > 1"):
+        try:
+            screener.Screen("Bad", bad, columns=table.columns)
+        except screener.ScreenError as e:
+            print(f"Rejected {bad!r}: {e}")
+            errors += 1
+    print("PASS: Invalid expressions rejected" if errors == 4 else "FAIL: Invalid expression accepted")
+
+    columns = screener.table_columns(table, {'sector': sectors})
+    per_run = timeit.timeit(lambda: screen.mask(columns, len(table)), number=2000) / 2000
+    print(f"{per_run * 1e6:.1f}us per evaluation over {len(table)} symbols")
+    print("PASS: Screen evaluates in microseconds" if per_run < 1e-3 else "FAIL: Screen too slow")
+
+if __name__ == "__main__":
+    test_expressions()
@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import sector_index
+
+def make_sector(n=40, t=252, seed=5):
+    """Aligned closes and shares for S0..S{n-1}."""
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, (n, t)), axis=1))
+    shares = rng.uniform(1e8, 5e9, n)
+    return [f"S{i}" for i in range(n)], close, np.arange(t) * 86400.0, shares
+
+def test_levels():
+    print("\n--- Testing Index Levels ---")
+    symbols, close, stamps, shares = make_sector()
+    index = sector_index.SectorIndex("XLK", symbols, close, stamps, shares)
+
+    # With every constituent priced, chain-linking equals total cap / base cap
+    caps = (shares[:, None] * close).sum(axis=0)
+    expected = 100 * caps / caps[0]
+    print(f"{'PASS' if np.allclose(index.levels, expected) else 'FAIL'}: Cap-weighted levels match market cap / divisor")
+
+    daily = close[:, 1:] / close[:, :-1] - 1
+    expected = 100 * np.r_[1, np.cumprod(1 + daily.mean(axis=0))]
+    print(f"{'PASS' if np.allclose(index.equal_levels, expected) else 'FAIL'}: Equal-weighted levels rebalance daily")
+
+    # A late listing doesn't make the level jump
+    late = close.copy()
+    late[0, :200] = np.nan
+    gapped = sector_index.SectorIndex("XLK", symbols, late, stamps, shares)
+    step = gapped.levels[200] / gapped.levels[199] - 1
+    others = (shares[1:] * close[1:, 200]).sum() / (shares[1:] * close[1:, 199]).sum() - 1
+    print(f"{'PASS' if np.isclose(step, others) else 'FAIL'}: Listing day uses only constituents priced on both days")
+
+def test_live_updates():
+    print("\n--- Testing Live Updates ---")
+    symbols, close, stamps, shares = make_sector()
+    index = sector_index.SectorIndex("XLK", symbols, close, stamps, shares)
+    rng = np.random.default_rng(9)
+
+    start = time.perf_counter()
+    ticks = 10000
+    for _ in range(ticks):
+        i = rng.integers(len(symbols))
+        index.update(symbols[i], close[i, -1] * (1 + rng.normal(0, 0.01)))
+    per_tick = (time.perf_counter() - start) / ticks * 1e6
+
+    # Rebuilding from the same prices gives the same move
+    expected = (shares * (index.price - close[:, -2])).sum() / (shares * close[:, -2]).sum() * 100
+    ok = np.isclose(index.change_percent, expected)
+    print(f"{'PASS' if ok else 'FAIL'}: Running sums match a full recount ({index.change_percent:+.3f}%)")
+    expected_level = index.levels[-1] * (shares * index.price).sum() / (shares * close[:, -1]).sum()
+    print(f"{'PASS' if np.isclose(index.level, expected_level) else 'FAIL'}: Live level {index.level:.2f}")
+
+    total = sum(c['contribution'] for c in index.contributions())
+    print(f"{'PASS' if abs(total - index.change_percent) < 0.01 else 'FAIL'}: Contributions sum to the move ({total:+.3f}pt)")
+    print(f"{'PASS' if per_tick < 50 else 'FAIL'}: {per_tick:.1f}us per quote")
+
+    index.update("NOT_IN_SECTOR", 10.0)
+    print(f"{'PASS' if np.isclose(index.change_percent, expected) else 'FAIL'}: Quotes for other symbols are ignored")
+
+def test_sessions():
+    print("\n--- Testing Session Rollover ---")
+    symbols, close, stamps, shares = make_sector(n=10)
+    index = sector_index.SectorIndex("XLK", symbols, close, stamps, shares)
+    today = stamps[-1] + 86400
+
+    # First quote of a new session: only S0 is priced today, the rest keep yesterday's close
+    index.update("S0", close[0, -1] * 1.02, prev_close=close[0, -1], session=today)
+    ok = np.isclose(index.change_percent, 2.0) and np.isclose(index.equal_change_percent, 2.0)
+    print(f"{'PASS' if ok else 'FAIL'}: Unquoted constituents don't carry yesterday's move ({index.change_percent:+.3f}%)")
+
+    index.update("S1", close[1, -1] * 0.99, prev_close=close[1, -1], session=today)
+    base = shares[:2] * close[:2, -1]
+    expected = (base * np.array([0.02, -0.01])).sum() / base.sum() * 100
+    expected_level = index.levels[-1] * ((shares * close[:, -1]).sum() + (base * np.array([0.02, -0.01])).sum()) / (shares * close[:, -1]).sum()
+    print(f"{'PASS' if np.isclose(index.change_percent, expected) else 'FAIL'}: The move is weighted over this session's quotes")
+    print(f"{'PASS' if np.isclose(index.level, expected_level) else 'FAIL'}: The level still covers every constituent")
+    total = sum(c['contribution'] or 0 for c in index.contributions())
+    print(f"{'PASS' if abs(total - index.change_percent) < 0.01 else 'FAIL'}: Contributions sum to the move")
+
+    moved = index.change_percent
+    index.update("S2", 1.0, prev_close=0.5, session=stamps[-1])
+    print(f"{'PASS' if index.change_percent == moved else 'FAIL'}: Quotes from an earlier session are ignored")
+    print(f"{'PASS' if np.isclose(index.level - index.change, index.level / (1 + moved / 100)) else 'FAIL'}: "
+          f"change is in index points ({index.change:+.3f})")
+
+def test_unknown_shares():
+    print("\n--- Testing Unknown Shares ---")
+    symbols, close, stamps, shares = make_sector(n=5)
+    index = sector_index.SectorIndex("XLE", symbols, close, stamps, np.full(5, np.nan))
+    ok = np.allclose(index.levels, index.equal_levels) and np.isclose(index.change_percent, index.equal_change_percent)
+    print(f"{'PASS' if ok else 'FAIL'}: Without shares the cap index falls back to equal weights")
+    index.update("S0", close[0, -1], shares=shares[0])
+    ok = all(c['weight'] is None for c in index.contributions() if c['symbol'] != "S0")
+    print(f"{'PASS' if ok else 'FAIL'}: Shares learned from a quote start weighting that constituent")
+
+if __name__ == "__main__":
+    test_levels()
+    test_live_updates()
+    test_sessions()
+    test_unknown_shares()
@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import sentiment_engine
+import data_service
+
+CASES = [
+    ("Apple beats estimates as iPhone sales surge", "BULLISH"),
+    ("Tesla shares plunge after delivery miss", "BEARISH"),
+    ("Nvidia does not miss estimates", "BULLISH"),
+    ("Nvidia doesn't miss estimates", "BULLISH"),
+    ("Nvidia doesn’t miss estimates", "BULLISH"), # Typographic apostrophe
+    ("Intel isn’t expected to beat", "BEARISH"),
+    ("Boeing fails to win Air Force contract", "BEARISH"),
+    ("Analyst raises price target on Microsoft", "BULLISH"),
+    ("Utility offers low risk income", "BULLISH"),
+    ("Company schedules annual meeting", "NEUTRAL"),
+]
+
+def test_scoring():
+    print("\n--- Testing Headline Scoring & Negation ---")
+    failures = [(h, sentiment_engine.classify(h), want) for h, want in CASES if sentiment_engine.classify(h) != want]
+    for headline, got, want in failures:
+        print(f"  {headline!r}: {got}, expected {want}")
+    print(f"{'PASS' if not failures else 'FAIL'}: {len(CASES) - len(failures)}/{len(CASES)} headlines classified as expected")
+
+def test_memo():
+    print("\n--- Testing Memo Hits ---")
+    sentiment_engine.MEMO.clear()
+    calls = []
+    score = sentiment_engine.score
+    sentiment_engine.score = lambda h: calls.append(h) or score(h)
+    try:
+        headlines = [f"Company {i} shares surge on record growth" for i in range(500)]
+        sentiment_engine.classify_batch(headlines)
+        sentiment_engine.export_memo()
+        start = time.perf_counter()
+        labels = sentiment_engine.classify_batch(headlines * 4)
+        per_headline = (time.perf_counter() - start) / len(headlines * 4) * 1e6
+    finally:
+        sentiment_engine.score = score
+    ok = len(calls) == 500 and set(labels) == {"BULLISH"}
+    print(f"{'PASS' if ok else 'FAIL'}: 2500 lookups scored each of 500 headlines once ({per_headline:.1f}us per memo hit)")
+    print(f"{'PASS' if not sentiment_engine.memo_dirty() else 'FAIL'}: Memo hits leave the memo clean")
+    sentiment_engine.classify("A headline never seen before")
+    print(f"{'PASS' if sentiment_engine.memo_dirty() else 'FAIL'}: A new headline marks it for saving")
+
+def test_persistence():
+    print("\n--- Testing Memo Persistence ---")
+    cache_dir, data_service.CACHE_DIR = data_service.CACHE_DIR, tempfile.mkdtemp(prefix="sentiment_")
+    try:
+        sentiment_engine.MEMO.clear()
+        sentiment_engine.classify_batch([h for h, _ in CASES])
+        data_service.save_sentiment_memo()
+        path = os.path.join(data_service.CACHE_DIR, data_service.SENTIMENT_MEMO_FILE)
+        os.utime(path, (0, 0))
+        data_service.save_sentiment_memo()
+        print(f"{'PASS' if os.path.getmtime(path) == 0 else 'FAIL'}: An unchanged memo is not rewritten")
+
+        saved = dict(sentiment_engine.MEMO)
+        sentiment_engine.MEMO.clear()
+        data_service._SENTIMENT_MEMO_LOADED = False
+        data_service._load_sentiment_memo()
+        print(f"{'PASS' if sentiment_engine.MEMO == saved else 'FAIL'}: The memo loads back next session")
+
+        sentiment_engine.MEMO.clear()
+        sentiment_engine.load_memo({f"{sentiment_engine.VOCABULARY_VERSION + 1}:abc": "BULLISH"})
+        print(f"{'PASS' if not sentiment_engine.MEMO else 'FAIL'}: Entries from another vocabulary version are ignored")
+    finally:
+        shutil.rmtree(data_service.CACHE_DIR, ignore_errors=True)
+        data_service.CACHE_DIR = cache_dir
+
+if __name__ == "__main__":
+    test_scoring()
+    test_memo()
+    test_persistence()
@@ -0,0 +1,57 @@
+import sys
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import bar_store
+import scanner
+import indicator_engine
+from verify_scanner import make_universe
+
+def store_universe(bars):
+    """Writes an aligned universe into the bar store, dropping each symbol's NaN rows."""
+    for row, sym in enumerate(bars['symbols']):
+        stored = np.column_stack([bars['timestamps']] + [bars[f][row] for f in ('open', 'high', 'low', 'close', 'volume')])
+        bar_store.save_bars(sym, stored[~np.isnan(stored[:, 4])])
+
+def test_equivalence(n=1000):
+    print(f"\n--- Testing Sharded vs Single-Process Scan ({n} symbols) ---")
+    # Workers resolve cache/bars relative to the working directory, so run from a scratch one
+    cwd = os.getcwd()
+    scratch = tempfile.mkdtemp(prefix="sharded_")
+    os.chdir(scratch)
+    try:
+        bars, sectors, beta = make_universe(n)
+        store_universe(bars)
+        symbols = bars['symbols']
+
+        start = time.perf_counter()
+        table = indicator_engine.compute_indicators(bar_store.get_aligned_bars(symbols, lookback=126))
+        serial = scanner.scan(table, "DEFENSIVE", sectors=sectors, beta=beta, rvol_threshold=1.0)
+        serial_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        sharded = scanner.scan_sharded(symbols, "DEFENSIVE", sectors=sectors, beta=beta, rvol_threshold=1.0, lookback=126)
+        sharded_ms = (time.perf_counter() - start) * 1000
+        print(f"Single process: {serial_ms:.0f}ms, {scanner.MAX_WORKERS} worker(s): {sharded_ms:.0f}ms (includes pool start-up)")
+
+        print(f"{'PASS' if sharded['symbols'] == serial['symbols'] else 'FAIL'}: Same {len(serial['symbols'])} scored symbols, same order")
+        worst = 0.0
+        for name in scanner.SCORE_COLUMNS:
+            worst = max(worst, float(np.max(np.abs(np.asarray(sharded[name], float) - np.asarray(serial[name], float)))))
+        for name in scanner.INDICATOR_COLUMNS:
+            worst = max(worst, float(np.nanmax(np.abs(sharded['table'][name] - serial['table'][name]))))
+        print(f"{'PASS' if worst < 1e-9 else 'FAIL'}: Scores and indicators agree (max abs difference {worst:.1e})")
+        same_top = scanner.top_k(sharded, 10) == scanner.top_k(serial, 10)
+        print(f"{'PASS' if same_top else 'FAIL'}: Same top 10")
+    finally:
+        os.chdir(cwd)
+        bar_store.BAR_CACHE.clear()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_equivalence()
@@ -0,0 +1,122 @@
+import sys
+import os
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QMainWindow, QScrollArea, QWidget, QVBoxLayout
+from PySide6.QtGui import QImage, QColor
+from PySide6.QtCore import QTimer, QEventLoop
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+import ui_components
+
+CARDS = 500
+FRAMES = 10
+
+def make_sparklines(n, seed=11):
+    rng = random.Random(seed)
+    widgets = []
+    for _ in range(n):
+        w = ui_components.SparklineWidget([100 + rng.gauss(0, 2) for _ in range(31)], rvol=rng.uniform(0.5, 3.0))
+        w.resize(160, 50)
+        w._progress = 1.0 # Skip the draw-in: measure steady-state (pulse) frames
+        widgets.append(w)
+    return widgets
+
+def render_frames(widgets, frames, cached=True):
+    """Renders every widget `frames` times; returns ms per frame for the whole grid."""
+    image = QImage(160, 50, QImage.Format_ARGB32_Premultiplied)
+    start = time.perf_counter()
+    for frame in range(frames):
+        for w in widgets:
+            if not cached:
+                w._pixmap_key = None # Rebuild the static layer, as every frame used to
+            w._pulse_radius = 4.0 + frame % 5
+            image.fill(QColor(0, 0, 0, 0))
+            w.render(image)
+    return (time.perf_counter() - start) / frames * 1000
+
+def grab(widget):
+    image = QImage(160, 50, QImage.Format_ARGB32_Premultiplied)
+    image.fill(QColor(0, 0, 0, 0))
+    widget.render(image)
+    return image
+
+def test_render_cost():
+    print(f"\n--- Testing Paint Cost ({CARDS} sparklines, offscreen) ---")
+    widgets = make_sparklines(CARDS)
+    render_frames(widgets, 1) # Warm the pixmap cache
+    uncached = render_frames(widgets, FRAMES, cached=False)
+    cached = render_frames(widgets, FRAMES, cached=True)
+    print(f"Static layer redrawn every frame: {uncached:.1f}ms per frame")
+    print(f"Cached static pixmap + pulse:     {cached:.1f}ms per frame")
+    print(f"{'PASS' if cached < uncached else 'FAIL'}: Cached frames are {uncached / cached:.1f}x cheaper")
+
+def test_cache_keys():
+    print("\n--- Testing Cache Invalidation ---")
+    w = make_sparklines(1)[0]
+    first = grab(w)
+    fresh = ui_components.SparklineWidget(w.data, rvol=w.rvol)
+    fresh.resize(160, 50)
+    fresh._progress = 1.0
+    print(f"{'PASS' if grab(w) == grab(fresh) else 'FAIL'}: Cached frame matches a fresh render")
+
+    pixmap = w._pixmap
+    w.update_data([1, 2, 3, 2, 1])
+    w._progress = 1.0
+    changed = grab(w)
+    print(f"{'PASS' if w._pixmap is not pixmap and changed != first else 'FAIL'}: New data rebuilds the pixmap")
+
+    pixmap = w._pixmap
+    w.resize(200, 60)
+    grab(w)
+    print(f"{'PASS' if w._pixmap is not pixmap and w._pixmap.width() == round(200 * w.devicePixelRatioF()) else 'FAIL'}: Resizing rebuilds it at the device pixel ratio")
+
+    pixmap = w._pixmap
+    w._pulse_radius = 7.0
+    grab(w)
+    print(f"{'PASS' if w._pixmap is pixmap else 'FAIL'}: Pulse frames reuse it")
+
+def run_events(seconds):
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+def test_animation_clock():
+    print("\n--- Testing Shared Animation Clock ---")
+    window = QMainWindow()
+    scroll = QScrollArea()
+    scroll.setWidgetResizable(True)
+    container = QWidget()
+    layout = QVBoxLayout(container)
+    for w in make_sparklines(200):
+        w._progress = 0.0
+        w.setFixedHeight(60)
+        layout.addWidget(w)
+    scroll.setWidget(container)
+    window.setCentralWidget(scroll)
+    window.resize(400, 600)
+    window.show()
+    clock = ui_components.AnimationClock.instance()
+
+    run_events(1.2)
+    print(f"{'PASS' if clock.timer.isActive() and clock.timer.interval() == clock.SLOW_INTERVAL else 'FAIL'}: "
+          f"Pulses tick at {clock.timer.interval()}ms once on-screen sparklines have drawn in")
+    window.showMinimized()
+    run_events(0.1)
+    print(f"{'PASS' if not clock.timer.isActive() else 'FAIL'}: Clock stops while minimized")
+    window.showNormal()
+    run_events(0.1)
+    print(f"{'PASS' if clock.timer.isActive() else 'FAIL'}: Clock resumes on restore")
+    window.hide()
+    run_events(0.1)
+    print(f"{'PASS' if not clock.timer.isActive() else 'FAIL'}: Clock stops while hidden")
+
+if __name__ == "__main__":
+    test_render_cost()
+    test_cache_keys()
+    test_animation_clock()
@@ -0,0 +1,125 @@
+import sys
+import os
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+import ui_components
+
+def make_quotes(n, seed=3):
+    """fetch_stock_data-style dicts for W0..W{n-1}."""
+    rng = random.Random(seed)
+    quotes = []
+    for i in range(n):
+        price = rng.uniform(10, 500)
+        change = price * rng.gauss(0, 0.02)
+        quotes.append({'symbol': f"W{i}", 'name': f"Watch Corp {i}", 'price': price, 'change': change,
+                       'change_percent': change / price * 100, 'rs': rng.randint(1, 99),
+                       'history': [price * (1 + rng.gauss(0, 0.01)) for _ in range(30)]})
+    return quotes
+
+def test_model():
+    print("\n--- Testing Watchlist Model ---")
+    quotes = make_quotes(50)
+    model = ui_components.WatchlistModel()
+    model.set_symbols([q['symbol'] for q in quotes])
+    model.update_rows(quotes)
+    print(f"{'PASS' if model.visible == [q['symbol'] for q in quotes] else 'FAIL'}: Rows follow watchlist order")
+
+    model.set_sort('rs')
+    rs = [model.rows[s]['rs'] for s in model.visible]
+    print(f"{'PASS' if rs == sorted(rs, reverse=True) else 'FAIL'}: RS sort puts the strongest first")
+
+    model.set_filter("corp 1")
+    ok = model.rowCount() == 11 and all("1" in s for s in model.visible) # W1, W10..W19
+    print(f"{'PASS' if ok else 'FAIL'}: Filter matches names ({model.rowCount()} rows)")
+    model.set_filter("")
+    model.set_sort(None)
+
+    changed = []
+    model.dataChanged.connect(lambda a, b: changed.append((a.row(), b.row())))
+    resets = []
+    model.modelReset.connect(lambda: resets.append(1))
+    model.layoutChanged.connect(lambda: resets.append(1))
+    quote = dict(quotes[7], price=123.45)
+    model.update_rows([quote])
+    print(f"{'PASS' if changed == [(7, 7)] and not resets and model.rows['W7']['price'] == 123.45 else 'FAIL'}: "
+          f"A quote repaints only its own row")
+
+    model.set_sort('rs')
+    changed.clear()
+    moved = dict(quotes[7], rs=100)
+    model.update_rows([moved])
+    print(f"{'PASS' if model.visible[0] == 'W7' and resets else 'FAIL'}: A quote that changes the sort order moves its row")
+
+    model.set_sort(None)
+    changed.clear()
+    version = model.rows["W5"]['version']
+    model.on_logo_ready("W5")
+    ok = changed == [(5, 5)] and model.rows["W5"]['version'] != version and model.rows["W5"]['price'] == quotes[5]['price']
+    print(f"{'PASS' if ok else 'FAIL'}: An arriving logo repaints only its row")
+
+    model.set_symbols(["W3", "NEW"])
+    ok = model.rows["W3"]['price'] == quotes[3]['price'] and model.rows["NEW"]['price'] is None
+    print(f"{'PASS' if ok else 'FAIL'}: Re-setting symbols keeps loaded rows and adds placeholders")
+
+def test_scrolling():
+    count = 5000
+    print(f"\n--- Testing Scrolling ({count} symbols) ---")
+    quotes = make_quotes(count)
+    model = ui_components.WatchlistModel()
+    start = time.perf_counter()
+    model.set_symbols([q['symbol'] for q in quotes])
+    model.update_rows(quotes)
+    loaded = (time.perf_counter() - start) * 1000
+
+    view = ui_components.WatchlistView(model)
+    view.resize(420, 640)
+    view.show()
+    app.processEvents()
+    bar = view.verticalScrollBar()
+    print(f"Loading {count} rows: {loaded:.1f}ms")
+
+    # Wheel-style scrolling: Qt blits the viewport and paints only the exposed rows
+    frames = 600
+    start = time.perf_counter()
+    for i in range(frames):
+        bar.setValue(i * 40)
+        app.processEvents()
+    per_frame = (time.perf_counter() - start) / frames * 1000
+    print(f"{'PASS' if per_frame < 16 else 'FAIL'}: {per_frame:.2f}ms per frame scrolling 40px at a time")
+
+    # Dragging the scrollbar: every frame lands on rows never painted before
+    frames = 120
+    start = time.perf_counter()
+    for i in range(frames):
+        bar.setValue(int(bar.maximum() * i / frames))
+        view.viewport().repaint()
+    per_frame = (time.perf_counter() - start) / frames * 1000
+    print(f"{'PASS' if per_frame < 16 else 'FAIL'}: {per_frame:.2f}ms per frame jumping through the list")
+
+    # Rows already painted (hover, unrelated quote ticks) are blitted from the pixmap cache
+    start = time.perf_counter()
+    for i in range(frames):
+        view.viewport().repaint()
+    cached = (time.perf_counter() - start) / frames * 1000
+    print(f"{'PASS' if cached < per_frame else 'FAIL'}: {cached:.2f}ms per frame repainting painted rows")
+
+    # For scale: the old watchlist built one TickerCard (sparkline, logo, labels) per symbol
+    cards = 100
+    start = time.perf_counter()
+    widgets = [ui_components.TickerCard(q) for q in quotes[:cards]]
+    per_card = (time.perf_counter() - start) / cards * 1000
+    print(f"TickerCard widgets: {per_card:.2f}ms each, ~{per_card * count / 1000:.1f}s for {count} symbols")
+    for w in widgets:
+        w.deleteLater()
+
+if __name__ == "__main__":
+    test_model()
+    test_scrolling()